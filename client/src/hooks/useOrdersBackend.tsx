@@ -1,3 +1,4 @@
+import { useEffect } from "react";
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import { apiUrl } from "@/lib/api";
 import { Order, OrderItem, OrderStatus } from "@/data/orders";
@@ -162,6 +163,52 @@ export function useOrdersBackend() {
   });
 }
 
+function toOrderStatus(status: string): OrderStatus {
+  if (status === "approved" || status === "rejected" || status === "delivered") return status;
+  return "pending";
+}
+
+interface StatusChangedEvent {
+  bestell_id: string;
+  changes: Partial<BackendOrder>;
+}
+
+/**
+ * Live order updates over server-sent events (GET /bestellungen/events).
+ * Status changes patch the cached list in place; anything that needs order
+ * items or alternatives (new orders, item changes, resync) re-fetches.
+ * EventSource reconnects by itself and resumes via Last-Event-ID.
+ */
+export function useOrderEvents() {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    const source = new EventSource(apiUrl("/api/v1/bestellungen/events"));
+    const refetch = () => queryClient.invalidateQueries({ queryKey: ["orders"] });
+
+    source.addEventListener("status-changed", (event) => {
+      const { bestell_id, changes } = JSON.parse((event as MessageEvent).data) as StatusChangedEvent;
+      queryClient.setQueryData<Order[]>(["orders"], (orders) =>
+        orders?.map((order) =>
+          order.id !== bestell_id
+            ? order
+            : {
+                ...order,
+                status: changes.status ? toOrderStatus(changes.status) : order.status,
+                adminNotes: changes.admin_notizen ?? order.adminNotes,
+                updatedAt: changes.aktualisiert_am ? new Date(changes.aktualisiert_am) : order.updatedAt,
+              }
+        )
+      );
+    });
+    for (const type of ["order-created", "order-updated", "order-deleted", "item-changed", "resync"]) {
+      source.addEventListener(type, refetch);
+    }
+
+    return () => source.close();
+  }, [queryClient]);
+}
+
 export function useCreateOrder() {
   const queryClient = useQueryClient();
   
@@ -3,7 +3,7 @@ import { useMemo, useState, useEffect } from "react";
 import { useQueryClient } from "@tanstack/react-query";
 import { Package, ArrowDownCircle, ArrowUpCircle, MapPin, ArrowLeft, X, Plus, Trash2, Loader2, ChevronDown, Check, RefreshCw } from "lucide-react";
 import { useNavigate } from "react-router-dom";
-import { useOrdersBackend, useUpdateOrderStatus } from "@/hooks/useOrdersBackend";
+import { useOrderEvents, useOrdersBackend, useUpdateOrderStatus } from "@/hooks/useOrdersBackend";
 import { Order as BackendOrder, OrderStatus } from "@/data/orders";
 import { useConstructionSites } from "@/hooks/useConstructionSites";
 import { useInventory } from "@/hooks/useInventory";
@@ -615,6 +615,7 @@ function ShipmentList({
 
 function AdminOrders() {
   const { data: backendOrders = [], isLoading, error } = useOrdersBackend();
+  useOrderEvents();
   const updateOrderStatusMutation = useUpdateOrderStatus();
   const [selectedOrder, setSelectedOrder] = useState<Order | null>(null);
   const [expandedItems, setExpandedItems] = useState<Record<string, boolean>>({});
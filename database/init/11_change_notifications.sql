@@ -0,0 +1,112 @@
+-- Change notifications: NOTIFY 'table_changes' after writes to catalog, stock and order tables.
+-- The server LISTENs on this channel to invalidate its in-process caches (see
+-- server/api/v1/data_access/database/change_listener.py).
+--
+-- One notification per statement (not per row), so bulk loads don't flood the
+-- channel. Payload (JSON):
+--   {"table": "artikel", "op": "UPDATE", "rows": 2,
+--    "keys": ["W-SICH-004", "H-SICH-013"], "names": ["Sicherheitsbrille"]}
+-- "keys" (primary keys) and "names" (artikelname, where the table has one) are
+-- null when a statement touched more than 100 rows or the payload would get too
+-- large; listeners then treat the whole table as changed.
+-- Safe to re-run.
+
+CREATE OR REPLACE FUNCTION notify_table_change() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    key_col  text := TG_ARGV[0];
+    name_col text := CASE WHEN TG_NARGS > 1 THEN TG_ARGV[1] END;
+    max_keys CONSTANT int := 100;
+    changed_rows text;
+    counted_rows text;
+    row_count bigint;
+    keys jsonb;
+    names jsonb;
+    payload jsonb;
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        PERFORM pg_notify('table_changes', jsonb_build_object(
+            'table', TG_TABLE_NAME, 'op', TG_OP, 'rows', NULL, 'keys', NULL, 'names', NULL)::text);
+        RETURN NULL;
+    END IF;
+
+    -- Transition tables: new_rows (INSERT/UPDATE), old_rows (UPDATE/DELETE).
+    IF TG_OP = 'INSERT' THEN
+        changed_rows := 'SELECT * FROM new_rows';
+        counted_rows := changed_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        changed_rows := 'SELECT * FROM old_rows';
+        counted_rows := changed_rows;
+    ELSE
+        -- Old and new values both matter (e.g. a renamed artikel).
+        changed_rows := 'SELECT * FROM new_rows UNION ALL SELECT * FROM old_rows';
+        counted_rows := 'SELECT * FROM new_rows';
+    END IF;
+
+    EXECUTE format('SELECT count(*) FROM (%s) AS r', counted_rows) INTO row_count;
+    IF row_count = 0 THEN
+        RETURN NULL;
+    END IF;
+
+    IF row_count <= max_keys THEN
+        EXECUTE format('SELECT jsonb_agg(DISTINCT r.%I) FROM (%s) AS r', key_col, changed_rows) INTO keys;
+        IF name_col IS NOT NULL THEN
+            EXECUTE format(
+                'SELECT jsonb_agg(DISTINCT r.%I) FROM (%s) AS r WHERE r.%I IS NOT NULL',
+                name_col, changed_rows, name_col
+            ) INTO names;
+        END IF;
+    END IF;
+
+    payload := jsonb_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'rows', row_count, 'keys', keys, 'names', names);
+    -- NOTIFY payloads must stay below 8000 bytes.
+    IF octet_length(payload::text) > 7000 THEN
+        payload := payload || jsonb_build_object('keys', NULL, 'names', NULL);
+    END IF;
+    PERFORM pg_notify('table_changes', payload::text);
+    RETURN NULL;
+END;
+$$;
+
+-- (table, key column, optional name column)
+DO $$
+DECLARE
+    t record;
+    args text;
+BEGIN
+    FOR t IN
+        SELECT * FROM (VALUES
+            ('artikel', 'artikel_id', 'artikelname'),
+            ('inventory', 'artikel_id', 'artikelname'),
+            ('bestellungen', 'bestell_id', NULL),
+            ('construction_sites', 'id', 'name')
+        ) AS v(tbl, key_col, name_col)
+    LOOP
+        IF to_regclass(t.tbl) IS NULL THEN
+            CONTINUE;
+        END IF;
+        args := quote_literal(t.key_col) || COALESCE(', ' || quote_literal(t.name_col), '');
+
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t.tbl || '_notify_insert', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t.tbl || '_notify_update', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t.tbl || '_notify_delete', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t.tbl || '_notify_truncate', t.tbl);
+
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER INSERT ON %I REFERENCING NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change(%s)',
+            t.tbl || '_notify_insert', t.tbl, args);
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER UPDATE ON %I REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change(%s)',
+            t.tbl || '_notify_update', t.tbl, args);
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER DELETE ON %I REFERENCING OLD TABLE AS old_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change(%s)',
+            t.tbl || '_notify_delete', t.tbl, args);
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER TRUNCATE ON %I '
+            'FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change(%s)',
+            t.tbl || '_notify_truncate', t.tbl, args);
+    END LOOP;
+END $$;
@@ -0,0 +1,121 @@
+-- Order events: NOTIFY 'order_events' with small deltas after writes to
+-- bestellungen and bestellpositionen. The server fans them out to admin
+-- dashboards (GET /api/v1/bestellungen/events, server-sent events).
+--
+-- One notification per changed row, for statements touching up to 100 rows:
+--   {"table": "bestellungen", "op": "UPDATE", "key": "ORD-1A2B3C4D", "bestell_id": "ORD-1A2B3C4D",
+--    "fields": {"status": "approved", ...}, "previous": {"status": "pending", ...}}
+-- "fields" is the whole row for INSERT, only the changed columns for UPDATE
+-- (with their old values in "previous") and empty for DELETE. Larger
+-- statements send one {"table", "op", "bulk": true, "rows": n} instead, and
+-- rows too large for a NOTIFY payload are sent with "truncated": true and no
+-- fields; in both cases clients re-fetch.
+-- Safe to re-run.
+
+CREATE OR REPLACE FUNCTION notify_order_event() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    key_col    text := TG_ARGV[0];
+    parent_col text := TG_ARGV[1];
+    max_events CONSTANT int := 100;
+    row_pairs text;
+    row_count bigint;
+    r record;
+    fields jsonb;
+    previous jsonb;
+    payload jsonb;
+BEGIN
+    -- Transition tables: new_rows (INSERT/UPDATE), old_rows (UPDATE/DELETE).
+    IF TG_OP = 'INSERT' THEN
+        row_pairs := 'SELECT to_jsonb(n) AS new_row, NULL::jsonb AS old_row FROM new_rows n';
+    ELSIF TG_OP = 'DELETE' THEN
+        row_pairs := 'SELECT NULL::jsonb AS new_row, to_jsonb(o) AS old_row FROM old_rows o';
+    ELSE
+        row_pairs := format(
+            'SELECT to_jsonb(n) AS new_row, to_jsonb(o) AS old_row FROM new_rows n JOIN old_rows o ON o.%1$I = n.%1$I',
+            key_col);
+    END IF;
+
+    EXECUTE format('SELECT count(*) FROM (%s) AS p', row_pairs) INTO row_count;
+    IF row_count = 0 THEN
+        RETURN NULL;
+    END IF;
+    IF row_count > max_events THEN
+        PERFORM pg_notify('order_events', jsonb_build_object(
+            'table', TG_TABLE_NAME, 'op', TG_OP, 'bulk', true, 'rows', row_count)::text);
+        RETURN NULL;
+    END IF;
+
+    FOR r IN EXECUTE row_pairs LOOP
+        previous := NULL;
+        IF TG_OP = 'INSERT' THEN
+            fields := r.new_row;
+        ELSIF TG_OP = 'DELETE' THEN
+            fields := '{}'::jsonb;
+        ELSE
+            SELECT COALESCE(jsonb_object_agg(e.key, e.value), '{}'::jsonb)
+              INTO fields
+              FROM jsonb_each(r.new_row) AS e
+             WHERE r.old_row -> e.key IS DISTINCT FROM e.value;
+            IF fields = '{}'::jsonb THEN
+                CONTINUE;
+            END IF;
+            SELECT jsonb_object_agg(e.key, r.old_row -> e.key)
+              INTO previous
+              FROM jsonb_each(fields) AS e;
+        END IF;
+
+        payload := jsonb_build_object(
+            'table', TG_TABLE_NAME,
+            'op', TG_OP,
+            'key', COALESCE(r.new_row, r.old_row) -> key_col,
+            'bestell_id', COALESCE(r.new_row, r.old_row) -> parent_col,
+            'fields', fields);
+        IF previous IS NOT NULL THEN
+            payload := payload || jsonb_build_object('previous', previous);
+        END IF;
+        -- NOTIFY payloads must stay below 8000 bytes.
+        IF octet_length(payload::text) > 7000 THEN
+            payload := (payload - 'fields' - 'previous') || jsonb_build_object('truncated', true);
+        END IF;
+        PERFORM pg_notify('order_events', payload::text);
+    END LOOP;
+    RETURN NULL;
+END;
+$$;
+
+-- (table, key column, order id column)
+DO $$
+DECLARE
+    t record;
+    args text;
+BEGIN
+    FOR t IN
+        SELECT * FROM (VALUES
+            ('bestellungen', 'bestell_id', 'bestell_id'),
+            ('bestellpositionen', 'position_id', 'bestell_id')
+        ) AS v(tbl, key_col, parent_col)
+    LOOP
+        IF to_regclass(t.tbl) IS NULL THEN
+            CONTINUE;
+        END IF;
+        args := quote_literal(t.key_col) || ', ' || quote_literal(t.parent_col);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t.tbl || '_order_event_insert', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t.tbl || '_order_event_update', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t.tbl || '_order_event_delete', t.tbl);
+
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER INSERT ON %I REFERENCING NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION notify_order_event(%s)',
+            t.tbl || '_order_event_insert', t.tbl, args);
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER UPDATE ON %I REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION notify_order_event(%s)',
+            t.tbl || '_order_event_update', t.tbl, args);
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER DELETE ON %I REFERENCING OLD TABLE AS old_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION notify_order_event(%s)',
+            t.tbl || '_order_event_delete', t.tbl, args);
+    END LOOP;
+END $$;
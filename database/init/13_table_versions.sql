@@ -0,0 +1,51 @@
+-- Table versions: a per-table change counter bumped by a statement-level trigger.
+-- The server derives ETag / Last-Modified for its list endpoints from it, so an
+-- unchanged collection is answered with 304 after one primary-key lookup
+-- instead of a full query + serialization.
+--
+-- Only tables behind cacheable list endpoints are tracked: every write bumps
+-- one row, which briefly serializes concurrent writers to the same table.
+-- `bauprojekte` is created by server/init_db.sql, which calls
+-- track_table_version() itself when this script has run first.
+-- Safe to re-run.
+
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 1,
+    changed_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+);
+
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO table_versions AS tv (table_name) VALUES (TG_TABLE_NAME)
+    ON CONFLICT (table_name)
+    DO UPDATE SET version = tv.version + 1, changed_at = clock_timestamp();
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION track_table_version(tbl regclass) RETURNS void
+LANGUAGE plpgsql AS $$
+DECLARE
+    tbl_name text := (SELECT relname FROM pg_class WHERE oid = tbl);
+BEGIN
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', tbl_name || '_version', tbl);
+    EXECUTE format(
+        'CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %s '
+        'FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()',
+        tbl_name || '_version', tbl);
+    INSERT INTO table_versions (table_name) VALUES (tbl_name) ON CONFLICT DO NOTHING;
+END;
+$$;
+
+DO $$
+DECLARE
+    tbl text;
+BEGIN
+    FOREACH tbl IN ARRAY ARRAY['artikel', 'inventory', 'construction_sites', 'bauprojekte'] LOOP
+        IF to_regclass(tbl) IS NOT NULL THEN
+            PERFORM track_table_version(tbl::regclass);
+        END IF;
+    END LOOP;
+END $$;
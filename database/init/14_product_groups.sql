@@ -0,0 +1,76 @@
+-- Product groups: supplier SKUs (artikel rows) mapped to one canonical product,
+-- so "Sicherheitsbrille" from Würth and "Schutzbrille" from Hilti are offered
+-- as alternatives to each other without renaming either.
+--
+-- - product_groups: one row per canonical product.
+-- - product_group_aliases: normalized names (lower(btrim(name))) -> group.
+--   Every group's canonical name is an alias of itself. To merge differently
+--   named products, add rows here and re-run the backfill at the end.
+-- - artikel.product_group_id: maintained by a BEFORE trigger from artikelname.
+--   Unknown names get a new group of their own.
+-- - idx_artikel_group_price: (group, price) B-tree. The per-group price ranking
+--   (cheapest supplier first) is an index scan, not a sort.
+-- Safe to re-run.
+
+CREATE TABLE IF NOT EXISTS product_groups (
+    group_id SERIAL PRIMARY KEY,
+    canonical_name VARCHAR(255) NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS product_group_aliases (
+    alias_key VARCHAR(255) PRIMARY KEY,
+    group_id INTEGER NOT NULL REFERENCES product_groups(group_id) ON DELETE CASCADE
+);
+
+ALTER TABLE artikel ADD COLUMN IF NOT EXISTS product_group_id INTEGER REFERENCES product_groups(group_id);
+
+CREATE INDEX IF NOT EXISTS idx_artikel_group_price
+    ON artikel(product_group_id, preis_eur NULLS LAST, artikel_id);
+
+CREATE OR REPLACE FUNCTION resolve_product_group(name text) RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    key text := lower(btrim(name));
+    gid integer;
+BEGIN
+    IF key IS NULL OR key = '' THEN
+        RETURN NULL;
+    END IF;
+    SELECT group_id INTO gid FROM product_group_aliases WHERE alias_key = key;
+    IF gid IS NULL THEN
+        INSERT INTO product_groups (canonical_name) VALUES (btrim(name))
+        ON CONFLICT (canonical_name) DO UPDATE SET canonical_name = EXCLUDED.canonical_name
+        RETURNING group_id INTO gid;
+        INSERT INTO product_group_aliases (alias_key, group_id) VALUES (key, gid)
+        ON CONFLICT (alias_key) DO NOTHING;
+        SELECT group_id INTO gid FROM product_group_aliases WHERE alias_key = key;
+    END IF;
+    RETURN gid;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION assign_product_group() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.product_group_id := resolve_product_group(NEW.artikelname);
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS artikel_product_group ON artikel;
+CREATE TRIGGER artikel_product_group
+    BEFORE INSERT OR UPDATE OF artikelname ON artikel
+    FOR EACH ROW EXECUTE FUNCTION assign_product_group();
+
+-- Known equivalents
+INSERT INTO product_groups (canonical_name) VALUES ('Sicherheitsbrille') ON CONFLICT DO NOTHING;
+INSERT INTO product_group_aliases (alias_key, group_id)
+SELECT alias, g.group_id
+FROM product_groups g, unnest(ARRAY['sicherheitsbrille', 'schutzbrille']) AS alias
+WHERE g.canonical_name = 'Sicherheitsbrille'
+ON CONFLICT (alias_key) DO UPDATE SET group_id = EXCLUDED.group_id;
+
+-- Backfill existing rows
+UPDATE artikel
+SET product_group_id = resolve_product_group(artikelname)
+WHERE product_group_id IS DISTINCT FROM resolve_product_group(artikelname);
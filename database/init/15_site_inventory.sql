@@ -0,0 +1,69 @@
+-- Site-aware inventory: stock is kept per (construction site, artikel).
+--
+-- - inventory.construction_site_id: FK to construction_sites. The free-text
+--   `construction_site` column stays (API compatibility) and is kept in sync
+--   by a BEFORE trigger: set either one, the other is filled in.
+-- - The primary key on artikel_id alone is replaced by a unique
+--   (construction_site_id, artikel_id) index. NULL site = unassigned stock,
+--   still one row per artikel (NULLS NOT DISTINCT, Postgres 15+).
+--   Site-filtered searches scan only that site's index range.
+-- - inventory_site_stock / inventory_artikel_stock: per-site and per-artikel
+--   aggregate views.
+-- Safe to re-run.
+
+ALTER TABLE inventory
+    ADD COLUMN IF NOT EXISTS construction_site_id INTEGER REFERENCES construction_sites(id);
+
+UPDATE inventory i
+SET construction_site_id = cs.id
+FROM construction_sites cs
+WHERE i.construction_site_id IS NULL AND cs.name = i.construction_site;
+
+ALTER TABLE inventory DROP CONSTRAINT IF EXISTS inventory_pkey;
+
+CREATE UNIQUE INDEX IF NOT EXISTS inventory_site_artikel_key
+    ON inventory (construction_site_id, artikel_id) NULLS NOT DISTINCT;
+CREATE INDEX IF NOT EXISTS idx_inventory_artikel ON inventory (artikel_id);
+-- Stock lookups by name (same item, other supplier): see inventory_service.get_artikel_stock.
+CREATE INDEX IF NOT EXISTS idx_inventory_artikelname ON inventory (artikelname);
+
+CREATE OR REPLACE FUNCTION sync_inventory_site() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.construction_site IS DISTINCT FROM OLD.construction_site
+       AND NEW.construction_site_id IS NOT DISTINCT FROM OLD.construction_site_id THEN
+        -- Only the name changed: resolve the id from it.
+        NEW.construction_site_id := (SELECT id FROM construction_sites WHERE name = NEW.construction_site);
+    ELSIF NEW.construction_site_id IS NOT NULL THEN
+        NEW.construction_site := (SELECT name FROM construction_sites WHERE id = NEW.construction_site_id);
+    ELSIF NEW.construction_site IS NOT NULL THEN
+        NEW.construction_site_id := (SELECT id FROM construction_sites WHERE name = NEW.construction_site);
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS inventory_site_sync ON inventory;
+CREATE TRIGGER inventory_site_sync
+    BEFORE INSERT OR UPDATE OF construction_site, construction_site_id ON inventory
+    FOR EACH ROW EXECUTE FUNCTION sync_inventory_site();
+
+CREATE OR REPLACE VIEW inventory_site_stock AS
+SELECT
+    cs.id AS construction_site_id,
+    cs.name AS construction_site,
+    count(i.artikel_id) AS artikel_count,
+    COALESCE(sum(i.quantity), 0) AS total_quantity,
+    count(i.artikel_id) FILTER (WHERE COALESCE(i.quantity, 0) <= 0) AS out_of_stock_count
+FROM construction_sites cs
+LEFT JOIN inventory i ON i.construction_site_id = cs.id
+GROUP BY cs.id, cs.name;
+
+CREATE OR REPLACE VIEW inventory_artikel_stock AS
+SELECT
+    artikel_id,
+    min(artikelname) AS artikelname,
+    COALESCE(sum(quantity), 0) AS total_quantity,
+    count(*) FILTER (WHERE quantity > 0) AS sites_in_stock
+FROM inventory
+GROUP BY artikel_id;
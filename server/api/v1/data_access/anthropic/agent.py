@@ -1,43 +1,213 @@
 from __future__ import annotations
 import asyncio
 import logging
+import time
 from typing import Any, Dict, List, Optional
 from collections.abc import AsyncIterator
 
 from .anthropic_config import MAX_TOKENS, MODEL, get_system_prompt
 import anthropic
 
+from ...observability.metrics import (
+    ANTHROPIC_CIRCUIT_OPEN,
+    ANTHROPIC_CIRCUIT_REJECTIONS,
+    ANTHROPIC_HEDGED_REQUESTS,
+    ANTHROPIC_REQUEST_DURATION,
+    ANTHROPIC_RETRIES,
+    ANTHROPIC_ROUNDS_PER_TURN,
+    ANTHROPIC_TOKENS,
+)
+from ...observability.tracing import span
+from ..database.cancellation import QueryCancelScope, run_in_cancel_scope
+from ..helpers import env_flag
 from ..tools_runtime import execute_tool, stringify_tool_result
+from .resilience import CircuitBreaker, LatencyWindow, ProviderUnavailableError, backoff_delay, is_retryable
 
 logger = logging.getLogger(__name__)
 
 # build the client
 client = anthropic.Anthropic()
+# Async client for the tool loop: cancelling the awaiting task closes the
+# underlying HTTP request instead of leaving it running in a worker thread.
+# Retries are ours (`_anthropic_create`), so the SDK's own are disabled.
+async_client = anthropic.AsyncAnthropic(max_retries=0)
 
 # Production timeouts (seconds)
-PROVIDER_REQUEST_TIMEOUT_S = 45.0
+PROVIDER_REQUEST_TIMEOUT_S = 45.0  # whole round trip, retries included
+PROVIDER_ATTEMPT_TIMEOUT_S = 20.0  # one attempt (and its hedge)
 TOOL_EXEC_TIMEOUT_S = 10.0
 MAX_TOOL_ROUND_TRIPS = 10
 
+MAX_PROVIDER_RETRIES = 2
+# Hedging (opt-in, ANTHROPIC_HEDGING=1): a duplicate request is sent when the
+# first one is slower than the model's recent p95, clamped to this range.
+HEDGE_QUANTILE = 0.95
+HEDGE_MIN_DELAY_S = 1.0
+HEDGE_MAX_DELAY_S = 15.0
 
-async def _anthropic_create_in_thread(**kwargs: Any) -> Any:
+PROVIDER_BREAKER = CircuitBreaker(failure_threshold=5, reset_after_s=30.0)
+ANTHROPIC_CIRCUIT_OPEN.set_function(lambda: 0.0 if PROVIDER_BREAKER.state == "closed" else 1.0)
+_latencies: Dict[str, LatencyWindow] = {}
+
+
+def hedging_enabled() -> bool:
+    return env_flag("ANTHROPIC_HEDGING")
+
+
+def _latency_window(model: str) -> LatencyWindow:
+    window = _latencies.get(model)
+    if window is None:
+        window = _latencies.setdefault(model, LatencyWindow())
+    return window
+
+
+def _hedge_delay(model: str) -> Optional[float]:
+    """Seconds after which to hedge a request to `model`; None when off or still learning."""
+    if not hedging_enabled():
+        return None
+    p95 = _latency_window(model).quantile(HEDGE_QUANTILE)
+    if p95 is None:
+        return None
+    return min(HEDGE_MAX_DELAY_S, max(HEDGE_MIN_DELAY_S, p95))
+
+
+async def _attempt(model: str, kwargs: Dict[str, Any]) -> Any:
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        resp = await async_client.messages.create(**kwargs)
+        outcome = "ok"
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        ANTHROPIC_REQUEST_DURATION.observe(elapsed, model=model, outcome=outcome)
+    _latency_window(model).observe(elapsed)
+    return resp
+
+
+async def _first_response(model: str, kwargs: Dict[str, Any], *, timeout: float) -> Any:
     """
-    Run the sync Anthropic SDK call off the event loop.
+    One attempt, hedged: if no response came within `_hedge_delay(model)`, a
+    duplicate request is sent. The first successful response wins and the
+    other request is cancelled. Raises asyncio.TimeoutError after `timeout`.
     """
-    return await asyncio.wait_for(
-        asyncio.to_thread(client.messages.create, **kwargs),
-        timeout=PROVIDER_REQUEST_TIMEOUT_S,
-    )
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    hedge_delay = _hedge_delay(model)
+    hedge_at = loop.time() + hedge_delay if hedge_delay is not None and hedge_delay < timeout else None
+    hedge: Optional[asyncio.Future] = None
+    pending = {asyncio.ensure_future(_attempt(model, kwargs))}
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            wake_at = deadline if hedge_at is None else min(deadline, hedge_at)
+            done, pending = await asyncio.wait(
+                pending, timeout=max(0.0, wake_at - loop.time()), return_when=asyncio.FIRST_COMPLETED
+            )
+            winner = None
+            for task in done:
+                if task.exception() is None:
+                    winner = winner or task
+                else:
+                    error = error or task.exception()
+            if winner is not None:
+                if winner is hedge:
+                    ANTHROPIC_HEDGED_REQUESTS.inc(result="won")
+                return winner.result()
+            if not pending:
+                break
+            if hedge_at is not None and loop.time() >= hedge_at:
+                hedge_at = None
+                hedge = asyncio.ensure_future(_attempt(model, kwargs))
+                pending.add(hedge)
+                ANTHROPIC_HEDGED_REQUESTS.inc(result="sent")
+                logger.info("Hedging slow Anthropic request to %s after %.1fs", model, hedge_delay)
+            elif loop.time() >= deadline:
+                raise asyncio.TimeoutError()
+        assert error is not None
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def _anthropic_create(**kwargs: Any) -> Any:
+    """
+    Create a message with the async SDK client.
 
+    Retryable errors (timeouts, connection errors, 408/409/429/5xx) are
+    retried up to `MAX_PROVIDER_RETRIES` times with jittered backoff, within
+    `PROVIDER_REQUEST_TIMEOUT_S` overall. Each attempt may be hedged (see
+    `_first_response`). While `PROVIDER_BREAKER` is open this fails fast
+    with `ProviderUnavailableError`.
 
-async def _execute_tool_in_thread(*, name: str, tool_input: Dict[str, Any]) -> Any:
+    Cancellation (barge-in, new turn, disconnect) aborts the in-flight HTTP
+    request(s) immediately.
+    """
+    model = kwargs.get("model", MODEL)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + PROVIDER_REQUEST_TIMEOUT_S
+    retry = 0
+    while True:
+        if not PROVIDER_BREAKER.allow():
+            ANTHROPIC_CIRCUIT_REJECTIONS.inc()
+            raise ProviderUnavailableError("Anthropic is unavailable (circuit open)")
+        remaining = deadline - loop.time()
+        try:
+            resp = await _first_response(model, kwargs, timeout=min(PROVIDER_ATTEMPT_TIMEOUT_S, remaining))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not is_retryable(e):
+                # The provider answered; the request itself is at fault.
+                PROVIDER_BREAKER.record_success()
+                raise
+            PROVIDER_BREAKER.record_failure()
+            retry += 1
+            delay = backoff_delay(retry, e)
+            if retry > MAX_PROVIDER_RETRIES or deadline - loop.time() - delay <= 0:
+                raise
+            ANTHROPIC_RETRIES.inc(reason=type(e).__name__)
+            logger.warning("Anthropic request failed (%s: %s); retry %d in %.2fs", type(e).__name__, e, retry, delay)
+            await asyncio.sleep(delay)
+            continue
+        PROVIDER_BREAKER.record_success()
+        break
+
+    usage = getattr(resp, "usage", None)
+    if usage is not None:
+        ANTHROPIC_TOKENS.inc(getattr(usage, "input_tokens", 0) or 0, direction="input")
+        ANTHROPIC_TOKENS.inc(getattr(usage, "output_tokens", 0) or 0, direction="output")
+    return resp
+
+
+async def _execute_tool_in_thread(
+    *, name: str, tool_input: Dict[str, Any], conversation_id: Optional[str] = None
+) -> Any:
     """
     Execute potentially-blocking tools (DB) off the event loop.
+
+    If the awaiting task is cancelled or times out, running queries are cancelled
+    server-side so the worker thread doesn't keep hitting the DB.
     """
-    return await asyncio.wait_for(
-        asyncio.to_thread(execute_tool, name=name, tool_input=tool_input),
-        timeout=TOOL_EXEC_TIMEOUT_S,
-    )
+    scope = QueryCancelScope()
+    try:
+        return await asyncio.wait_for(
+            asyncio.to_thread(
+                run_in_cancel_scope, scope, execute_tool,
+                name=name, tool_input=tool_input, conversation_id=conversation_id,
+            ),
+            timeout=TOOL_EXEC_TIMEOUT_S,
+        )
+    except (asyncio.CancelledError, asyncio.TimeoutError):
+        cancelled = scope.cancel()
+        if cancelled:
+            logger.info("Cancelled %d running DB quer%s for tool %s", cancelled, "y" if cancelled == 1 else "ies", name)
+        raise
 
 
 # Async function that streams the response from the anthropic agent
@@ -83,7 +253,14 @@ async def stream_anthropic_response_with_history(
             yield text
 
 async def stream_anthropic_response_with_history_and_tools(
-    *, messages: list[dict[str, Any]], tools: list[dict[str, Any]], language: str = "en"
+    *,
+    messages: list[dict[str, Any]],
+    tools: list[dict[str, Any]],
+    language: str = "en",
+    conversation_id: Optional[str] = None,
+    tool_names: Optional[List[str]] = None,
+    model: Optional[str] = None,
+    usage: Optional[Dict[str, int]] = None,
 ) -> AsyncIterator[str]:
     """
     Streams a response from Anthropic using a pre-built `messages=[...]` payload and tools.
@@ -98,6 +275,14 @@ async def stream_anthropic_response_with_history_and_tools(
         messages: Anthropic "messages" array, e.g. [{"role": "user", "content": "..."}]
         tools: List of tools to use, e.g. [{"type": "function", "function": {"name": "get_product_prices", "description": "Get the prices of a product", "parameters": {"type": "object", "properties": {"name": {"type": "string", "description": "The name of the product"}}}}}]
         language: Language code ("en" or "de")
+        conversation_id: Optional conversation id; repeated tool calls within
+            it are served from the per-conversation tool memo
+        tool_names: Optional list; the name of every tool called is appended
+            (`<name>:error` when it failed, and `max_tool_round_trips` when
+            the loop gives up), e.g. for deciding whether a reply is cacheable
+        model: Model for every round of this turn (default `MODEL`)
+        usage: Optional dict; `input_tokens` and `output_tokens` of all rounds
+            are added to it
     """
     if not isinstance(messages, list):
         raise TypeError("messages must be a list")
@@ -106,6 +291,7 @@ async def stream_anthropic_response_with_history_and_tools(
         raise TypeError("tools must be a list")
     
     system_prompt = get_system_prompt(language)
+    model = model or MODEL
 
     # Defensive: older callers used to append {"role":"assistant","content":""}.
     # That pattern breaks tool-calling (we want Claude to produce the assistant turn).
@@ -155,15 +341,25 @@ async def stream_anthropic_response_with_history_and_tools(
             )
         return tool_uses
 
-    for _ in range(MAX_TOOL_ROUND_TRIPS):
+    for round_number in range(1, MAX_TOOL_ROUND_TRIPS + 1):
         # Note: using create() (non-stream) so we can reliably handle tool_use.
-        resp = await _anthropic_create_in_thread(
-            model=MODEL,
-            max_tokens=MAX_TOKENS,
-            system=system_prompt,
-            messages=messages_for_model,
-            tools=tools,
-        )
+        with span("anthropic.round", round=round_number, model=model) as round_span:
+            resp = await _anthropic_create(
+                model=model,
+                max_tokens=MAX_TOKENS,
+                system=system_prompt,
+                messages=messages_for_model,
+                tools=tools,
+            )
+            resp_usage = getattr(resp, "usage", None)
+            round_span.set_attributes(
+                stop_reason=getattr(resp, "stop_reason", None),
+                input_tokens=getattr(resp_usage, "input_tokens", None),
+                output_tokens=getattr(resp_usage, "output_tokens", None),
+            )
+        if usage is not None and resp_usage is not None:
+            for direction in ("input_tokens", "output_tokens"):
+                usage[direction] = usage.get(direction, 0) + (getattr(resp_usage, direction, 0) or 0)
 
         # Normalize content blocks to plain dicts.
         raw_content = getattr(resp, "content", [])  # sdk Message.content
@@ -176,6 +372,7 @@ async def stream_anthropic_response_with_history_and_tools(
 
         tool_uses = _extract_tool_uses(content_blocks)
         if not tool_uses:
+            ANTHROPIC_ROUNDS_PER_TURN.observe(round_number)
             return
 
         # Append Claude's tool request message to the running conversation we send back.
@@ -201,20 +398,26 @@ async def stream_anthropic_response_with_history_and_tools(
                 )
                 continue
 
+            if tool_names is not None:
+                tool_names.append(name)
             try:
-                result = await _execute_tool_in_thread(
-                    name=name,
-                    tool_input=tool_input if isinstance(tool_input, dict) else {},
-                )
+                with span("tool.call", tool_name=name, round=round_number):
+                    result = await _execute_tool_in_thread(
+                        name=name,
+                        tool_input=tool_input if isinstance(tool_input, dict) else {},
+                        conversation_id=conversation_id,
+                    )
                 tool_results.append(
                     {
                         "type": "tool_result",
                         "tool_use_id": tool_use_id,
-                        "content": stringify_tool_result(result),
+                        "content": stringify_tool_result(result, tool_name=name, tool_input=tool_input),
                     }
                 )
             except Exception as e:
                 logger.exception("Tool execution failed: %s", name)
+                if tool_names is not None:
+                    tool_names.append(f"{name}:error")
                 tool_results.append(
                     {
                         "type": "tool_result",
@@ -227,4 +430,7 @@ async def stream_anthropic_response_with_history_and_tools(
         messages_for_model.append({"role": "user", "content": tool_results})
 
     # If we hit the max tool round-trips, return a graceful fallback.
+    ANTHROPIC_ROUNDS_PER_TURN.observe(MAX_TOOL_ROUND_TRIPS)
+    if tool_names is not None:
+        tool_names.append("max_tool_round_trips")
     yield "\n\nI’m having trouble completing the tool checks right now. Please try again."
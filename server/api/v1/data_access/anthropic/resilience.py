@@ -0,0 +1,151 @@
+"""
+Tail-latency control for Anthropic requests (data-access layer).
+
+A voice turn waits on every `messages.create` round trip, so one slow or
+failing upstream response stalls the foreman. `agent._anthropic_create`
+combines the pieces below: retries with jittered backoff, optional hedged
+duplicate requests, and a circuit breaker.
+
+Responsibilities:
+- `is_retryable(...)` / `backoff_delay(...)`: which provider errors are
+  worth another attempt (timeouts, connection errors, 408/409/429/5xx/529)
+  and how long to wait first (exponential, jittered, `retry-after` honoured
+  up to the cap).
+- `LatencyWindow`: recent successful request latencies per model; its p95
+  is the hedging threshold.
+- `CircuitBreaker`: opens after consecutive provider failures and fails
+  fast until `reset_after_s` has passed, then lets a single probe through.
+
+Non-responsibilities:
+- Issuing requests, racing hedges and metrics (see `agent.py`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Optional
+
+import anthropic
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429})
+
+
+class ProviderUnavailableError(RuntimeError):
+    """Raised without calling the provider while the circuit breaker is open."""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (asyncio.TimeoutError, anthropic.APIConnectionError)):
+        return True
+    if isinstance(exc, anthropic.APIStatusError):
+        status = getattr(exc, "status_code", 0) or 0
+        return status in RETRYABLE_STATUS_CODES or status >= 500
+    return False
+
+
+def _retry_after_s(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(
+    retry: int, exc: Optional[BaseException] = None, *, base_s: float = 0.5, max_s: float = 4.0
+) -> float:
+    """Delay before retry number `retry` (1-based): jittered exponential, at least `retry-after` (capped)."""
+    backoff = min(max_s, base_s * 2 ** (retry - 1))
+    delay = backoff * random.uniform(0.5, 1.0)
+    retry_after = _retry_after_s(exc) if exc is not None else None
+    if retry_after is not None:
+        delay = max(delay, min(max_s, retry_after))
+    return delay
+
+
+class LatencyWindow:
+    """The last `size` latencies; `quantile` is None until `min_samples` were seen."""
+
+    def __init__(self, *, size: int = 200, min_samples: int = 20) -> None:
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(q * len(samples)) - 1)]
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures.
+
+    While open, `allow()` is False. After `reset_after_s` one probe request is
+    allowed (half-open); its success closes the breaker, its failure re-opens
+    it. A probe that never reports back (e.g. cancelled) expires after
+    another `reset_after_s`.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        reset_after_s: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_after_s = reset_after_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._clock() - self._opened_at < self.reset_after_s:
+                return "open"
+            return "half_open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = self._clock()
+            if now - self._opened_at < self.reset_after_s:
+                return False
+            if self._probe_at is not None and now - self._probe_at < self.reset_after_s:
+                return False
+            self._probe_at = now
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+                self._probe_at = None
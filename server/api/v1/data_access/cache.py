@@ -0,0 +1,346 @@
+"""
+Read-through cache for catalog and reference data (data-access layer).
+
+Catalog tables (`artikel`, `construction_sites`) change maybe once a day, yet
+the REST routes and the agent's tools re-query them on every call. This module
+keeps recent results in process.
+
+Responsibilities:
+- `ReadThroughCache`: per-key TTL, size-bounded LRU eviction, and single-flight
+  loading (concurrent misses for one key run the loader once; the others wait
+  for its result instead of stampeding Postgres).
+- Invalidation hooks: every cache declares the tables it is derived from.
+  A committed write is described by a `TableChange`; `apply_change(...)` drops
+  the affected caches and notifies callbacks registered with `on_table_change`
+  (other in-process indexes). Changes that name the touched keys/artikelnamen
+  only drop the matching entries of caches that declare an `affected`
+  predicate; everything else is cleared wholesale.
+  Write paths in this process call `invalidate_tables(...)` after committing;
+  writes from anywhere else arrive through the Postgres change listener
+  (`database/change_listener.py`).
+- `cached(...)`: decorator for functions whose result depends only on their
+  arguments. Calls are keyed on the bound arguments with defaults applied,
+  so `f(1)`, `f(x=1)` and `f(1, y=<default>)` share one entry.
+
+Non-responsibilities:
+- Delivering changes. Without the change listener (or with it disconnected),
+  writes made elsewhere are picked up after the TTL.
+
+Rows are handed out as copies: lists, dicts and `Record`s (and the dict/Record
+rows of a list) are copied on every hit, so callers may sort, append and edit
+fields freely. Any other value (an index or matcher object) is shared between
+callers and must be treated as read-only.
+
+Configuration: `CATALOG_CACHE_TTL_S` (default 300; `0` disables caching).
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, List, Optional, Tuple, TypeVar
+
+from ..observability.metrics import CACHE_ENTRIES, CACHE_INVALIDATIONS, CACHE_REQUESTS
+from .helpers import env_ttl
+from .records import Record
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+F = TypeVar("F", bound=Callable[..., Any])
+
+DEFAULT_TTL_S = 300.0
+
+# Sentinel for "every key" in `ReadThroughCache.invalidate`.
+_ALL: Any = object()
+
+_registry_lock = threading.Lock()
+_caches: List["ReadThroughCache"] = []
+_change_callbacks: List[Callable[["TableChange"], None]] = []
+
+
+@dataclass(frozen=True)
+class TableChange:
+    """
+    A committed write to `table`.
+
+    `keys` (primary keys) and `names` (artikelname or similar) list what was
+    touched, old and new values alike; `None` means unknown, i.e. treat the
+    whole table as changed.
+    """
+
+    table: str
+    op: str = "WRITE"
+    keys: Optional[FrozenSet[str]] = None
+    names: Optional[FrozenSet[str]] = None
+
+    @property
+    def precise(self) -> bool:
+        return self.keys is not None
+
+
+def _copy_row(row: Any) -> Any:
+    if isinstance(row, Record):
+        return type(row)(*row.values())
+    if isinstance(row, dict):
+        return dict(row)
+    return row
+
+
+def _copy_out(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_copy_row(row) for row in value]
+    return _copy_row(value)
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at")
+
+    def __init__(self, value: Any, expires_at: float) -> None:
+        self.value = value
+        self.expires_at = expires_at
+
+
+class _Flight:
+    """One in-progress load that concurrent callers of the same key wait on."""
+
+    __slots__ = ("done", "value", "failed")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.failed = False
+
+
+class ReadThroughCache:
+    """
+    Thread-safe TTL + LRU cache with single-flight loads.
+
+    `ttl_s=None` reads `ttl_env` (default `CATALOG_CACHE_TTL_S`) on first use,
+    after `.env` is loaded; a TTL of 0 turns the cache into a pass-through.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        tables: Iterable[str],
+        max_entries: int = 256,
+        ttl_s: Optional[float] = None,
+        ttl_env: str = "CATALOG_CACHE_TTL_S",
+        default_ttl_s: float = DEFAULT_TTL_S,
+        clock: Callable[[], float] = time.monotonic,
+        affected: Optional[Callable[[Hashable, TableChange], bool]] = None,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.name = name
+        self.tables = frozenset(tables)
+        self.max_entries = max_entries
+        self._ttl_s = ttl_s
+        self._ttl_env = ttl_env
+        self._default_ttl_s = default_ttl_s
+        self._clock = clock
+        # For precise changes: does `change` affect the entry under `key`?
+        self.affected = affected
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        # Bumped by invalidate(); loads started before it must not be stored.
+        self._generation = 0
+        with _registry_lock:
+            _caches.append(self)
+
+    @property
+    def ttl_s(self) -> float:
+        if self._ttl_s is None:
+            self._ttl_s = env_ttl(self._ttl_env, self._default_ttl_s)
+        return self._ttl_s
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], T]) -> T:
+        """Return the cached value for `key`, calling `loader()` at most once per miss."""
+        ttl_s = self.ttl_s
+        if ttl_s <= 0:
+            return loader()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > self._clock():
+                self._entries.move_to_end(key)
+                CACHE_REQUESTS.inc(cache=self.name, result="hit")
+                return _copy_out(entry.value)
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                generation = self._generation
+
+        if not leader:
+            CACHE_REQUESTS.inc(cache=self.name, result="coalesced")
+            flight.done.wait()
+            if not flight.failed:
+                return _copy_out(flight.value)
+            # The leader's load failed (or was cancelled with its caller); don't
+            # inherit someone else's error, load for ourselves.
+            return loader()
+
+        CACHE_REQUESTS.inc(cache=self.name, result="miss")
+        try:
+            value = loader()
+        except BaseException:
+            flight.failed = True
+            raise
+        else:
+            flight.value = value
+            with self._lock:
+                if generation == self._generation:
+                    self._entries[key] = _Entry(value, self._clock() + ttl_s)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                    CACHE_ENTRIES.set(len(self._entries), cache=self.name)
+            return _copy_out(value)
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+            flight.done.set()
+
+    def invalidate(self, key: Any = _ALL) -> None:
+        """Drop one key, or everything when called without arguments."""
+        with self._lock:
+            if key is _ALL:
+                self._entries.clear()
+                # Loads in progress may have read pre-write data: let them finish
+                # for their current waiters, but neither store nor share them.
+                self._inflight.clear()
+                self._generation += 1
+            else:
+                self._entries.pop(key, None)
+                self._inflight.pop(key, None)
+                self._generation += 1
+            CACHE_ENTRIES.set(len(self._entries), cache=self.name)
+        CACHE_INVALIDATIONS.inc(cache=self.name)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop the entries whose key matches `predicate`; returns how many were dropped."""
+        with self._lock:
+            doomed = [key for key in self._entries if predicate(key)]
+            for key in doomed:
+                del self._entries[key]
+            for key in [key for key in self._inflight if predicate(key)]:
+                del self._inflight[key]
+            # Unrelated loads in flight are discarded too; cheap and always safe.
+            self._generation += 1
+            CACHE_ENTRIES.set(len(self._entries), cache=self.name)
+        CACHE_INVALIDATIONS.inc(cache=self.name)
+        return len(doomed)
+
+    def apply_change(self, change: TableChange) -> None:
+        if not change.precise or self.affected is None:
+            self.invalidate()
+            return
+        affected = self.affected
+        self.invalidate_where(lambda key: affected(key, change))
+
+
+def cached_args(key: Hashable) -> Tuple[Any, ...]:
+    """
+    Arguments of a key built by `cached`, in signature order with defaults
+    applied (for `affected` predicates). `**kwargs` arrive as one sorted tuple
+    of items.
+    """
+    return key if isinstance(key, tuple) else (key,)
+
+
+def _call_key(signature: inspect.Signature, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Tuple[Any, ...]:
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    key: List[Any] = []
+    for name, param in signature.parameters.items():
+        value = bound.arguments[name]
+        if param.kind is inspect.Parameter.VAR_KEYWORD:
+            value = tuple(sorted(value.items()))
+        key.append(value)
+    return tuple(key)
+
+
+def cached(cache: ReadThroughCache) -> Callable[[F], F]:
+    """Cache a function's results in `cache`, keyed by its arguments (which must be hashable)."""
+
+    def decorator(fn: F) -> F:
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = _call_key(signature, args, kwargs)
+            return cache.get_or_load(key, lambda: fn(*args, **kwargs))
+
+        wrapper.cache = cache  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def on_table_change(callback: Callable[[TableChange], None]) -> None:
+    """Register `callback(change)` to run after every `apply_change` / `invalidate_tables`."""
+    with _registry_lock:
+        _change_callbacks.append(callback)
+
+
+def remove_table_change_callback(callback: Callable[[TableChange], None]) -> None:
+    """Undo `on_table_change(callback)`; unknown callbacks are ignored."""
+    with _registry_lock:
+        if callback in _change_callbacks:
+            _change_callbacks.remove(callback)
+
+
+def apply_change(change: TableChange) -> int:
+    """
+    Drop what `change` makes stale in every cache derived from its table, then
+    run the `on_table_change` callbacks. Returns the number of caches touched.
+    """
+    with _registry_lock:
+        caches = [c for c in _caches if change.table in c.tables]
+        callbacks = list(_change_callbacks)
+    for cache in caches:
+        cache.apply_change(change)
+    for callback in callbacks:
+        try:
+            callback(change)
+        except Exception:
+            logger.exception("Table change callback failed")
+    if caches:
+        logger.info(
+            "Invalidated caches %s after %s on %s%s",
+            [c.name for c in caches],
+            change.op,
+            change.table,
+            f" ({len(change.keys)} keys)" if change.keys is not None else "",
+        )
+    return len(caches)
+
+
+def invalidate_tables(*tables: str) -> int:
+    """
+    Invalidation hook for write paths: drop every cache derived from `tables`.
+
+    Call after the write has committed. Returns the number of caches cleared.
+    """
+    return sum(apply_change(TableChange(table)) for table in sorted(set(tables)))
+
+
+def invalidate_all() -> None:
+    """Drop every registered cache (tests, admin tooling)."""
+    with _registry_lock:
+        caches = list(_caches)
+    for cache in caches:
+        cache.invalidate()
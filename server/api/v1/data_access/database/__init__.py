@@ -1,7 +1,11 @@
 import os
+from contextlib import contextmanager
+from typing import Any, Iterator
 
 import psycopg2
 
+from .cancellation import current_cancel_scope
+
 
 def get_db_connection():
     """Create and return a database connection."""
@@ -22,3 +26,20 @@ def get_db_connection():
 
     return conn
 
+
+@contextmanager
+def scoped_connection() -> Iterator[Any]:
+    """
+    Yield a connection that is closed on exit and registered with the active
+    `QueryCancelScope` (if any), so an abandoned caller can cancel its query.
+    """
+    conn = get_db_connection()
+    scope = current_cancel_scope()
+    try:
+        if scope is not None:
+            scope.register(conn)
+        yield conn
+    finally:
+        if scope is not None:
+            scope.unregister(conn)
+        conn.close()
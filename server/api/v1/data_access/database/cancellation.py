@@ -0,0 +1,98 @@
+"""
+Cancellation scopes for blocking DB work running in worker threads.
+
+Tool calls run via `asyncio.to_thread`, so cancelling the awaiting asyncio task
+does not stop the thread: its psycopg2 query keeps running on the server. A
+`QueryCancelScope` collects the connections opened inside a unit of work so the
+event loop side can ask Postgres to cancel them (`PQcancel`, thread-safe).
+
+Usage (event loop side):
+    scope = QueryCancelScope()
+    try:
+        await asyncio.to_thread(run_in_cancel_scope, scope, fn, **kwargs)
+    except asyncio.CancelledError:
+        scope.cancel()
+        raise
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Set, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class QueryCancelledError(RuntimeError):
+    """Raised when a connection is requested inside an already-cancelled scope."""
+
+
+class QueryCancelScope:
+    """Thread-safe registry of live connections that can be cancelled together."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._connections: Set[Any] = set()
+        self._cancelled = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def register(self, conn: Any) -> None:
+        with self._lock:
+            if self._cancelled:
+                raise QueryCancelledError("query scope was cancelled")
+            self._connections.add(conn)
+
+    def unregister(self, conn: Any) -> None:
+        with self._lock:
+            self._connections.discard(conn)
+
+    def cancel(self) -> int:
+        """
+        Cancel every running query in this scope; later `register` calls fail.
+
+        Returns the number of connections a cancel request was sent to.
+        """
+        with self._lock:
+            self._cancelled = True
+            connections = list(self._connections)
+        sent = 0
+        for conn in connections:
+            try:
+                conn.cancel()
+                sent += 1
+            except Exception as e:
+                # Connection may have closed between snapshot and cancel.
+                logger.debug("DB cancel request failed: %s", e)
+        return sent
+
+
+_current_scope: contextvars.ContextVar[Optional[QueryCancelScope]] = contextvars.ContextVar(
+    "query_cancel_scope", default=None
+)
+
+
+def current_cancel_scope() -> Optional[QueryCancelScope]:
+    return _current_scope.get()
+
+
+@contextmanager
+def use_cancel_scope(scope: QueryCancelScope) -> Iterator[QueryCancelScope]:
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+def run_in_cancel_scope(scope: QueryCancelScope, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run `fn` with `scope` active (intended as the target of `asyncio.to_thread`)."""
+    with use_cancel_scope(scope):
+        return fn(*args, **kwargs)
@@ -0,0 +1,285 @@
+"""
+Postgres LISTEN/NOTIFY change listener (data-access layer).
+
+`database/init/11_change_notifications.sql` installs statement-level triggers
+that `NOTIFY table_changes` with a small JSON payload after every write to
+`artikel`, `inventory`, `bestellungen` and `construction_sites`. This module
+holds one dedicated connection LISTENing on that channel and turns each
+notification into a `TableChange` for `cache.apply_change`, so in-process
+caches (and indexes registered with `on_table_change`) drop exactly what the
+write made stale, whoever made it. Other channels (e.g. `order_events`) ride
+on the same connection via `subscribe`.
+
+Responsibilities:
+- `ChangeListener`: background asyncio task; waits on the connection socket
+  with `loop.add_reader` (no polling thread), reconnects with exponential
+  backoff, and pings the connection when idle so a dead socket is noticed.
+  The ping is a blocking round trip, so it runs in a worker thread and a
+  ping that takes longer than `keepalive_s` counts as a dead connection.
+  Callbacks run on the event loop thread.
+- Resync: notifications sent while disconnected are lost, so on every
+  (re)connect each subscription's `on_resync` runs (for table changes: all
+  watched tables are reported as changed wholesale).
+- `table_changes_live()`: whether a connected (and resynced) listener is
+  delivering table changes, i.e. whether this process hears about every
+  write; `tool_memo` then skips its `table_versions` reads.
+- `create_change_listener_from_env()`: app wiring (`main.py` lifespan).
+
+Non-responsibilities:
+- Installing the triggers (SQL init scripts).
+- Deciding what to invalidate: that is `cache.apply_change` and its callbacks.
+
+Configuration: `DB_CHANGE_LISTENER` (default on; `0`/`false`/`off` disables).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+from ..cache import TableChange, apply_change
+from ..helpers import env_flag
+from ...observability.metrics import DB_CHANGE_LISTENER_CONNECTED, DB_CHANGE_NOTIFICATIONS
+from . import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+CHANGE_CHANNEL = "table_changes"
+WATCHED_TABLES = ("artikel", "inventory", "bestellungen", "construction_sites")
+
+# Connected listeners subscribed to CHANGE_CHANNEL (changed on the event loop thread).
+_live_table_listeners = 0
+
+
+def table_changes_live() -> bool:
+    """Is a connected listener delivering table changes to this process?"""
+    return _live_table_listeners > 0
+
+
+def parse_change(payload: str) -> Optional[TableChange]:
+    """Decode one notification payload; `None` if it is malformed."""
+    try:
+        data = json.loads(payload)
+        table = data["table"]
+    except (ValueError, TypeError, KeyError):
+        return None
+    if not isinstance(table, str) or not table:
+        return None
+
+    def _as_set(value: Any) -> Optional[frozenset]:
+        if not isinstance(value, list):
+            return None
+        return frozenset(str(v) for v in value if v is not None)
+
+    keys = _as_set(data.get("keys"))
+    return TableChange(
+        table=table,
+        op=str(data.get("op") or "WRITE"),
+        keys=keys,
+        # Names without keys can't be trusted to be complete.
+        names=_as_set(data.get("names")) if keys is not None else None,
+    )
+
+
+def _set_live(delta: int) -> None:
+    global _live_table_listeners
+    _live_table_listeners += delta
+
+
+class _Subscription:
+    __slots__ = ("on_notify", "on_resync")
+
+    def __init__(self, on_notify: Callable[[str], Any], on_resync: Optional[Callable[[], Any]]) -> None:
+        self.on_notify = on_notify
+        self.on_resync = on_resync
+
+
+class ChangeListener:
+    """One LISTEN connection; dispatches `NOTIFY` payloads to per-channel subscribers until stopped."""
+
+    def __init__(
+        self,
+        *,
+        connect: Callable[[], Any] = get_db_connection,
+        keepalive_s: float = 30.0,
+        min_backoff_s: float = 1.0,
+        max_backoff_s: float = 30.0,
+    ) -> None:
+        self._connect = connect
+        self.keepalive_s = keepalive_s
+        self.min_backoff_s = min_backoff_s
+        self.max_backoff_s = max_backoff_s
+        self._subscriptions: Dict[str, List[_Subscription]] = {}
+        self._task: Optional[asyncio.Task] = None
+        # Set once a LISTEN is active (tests, health checks).
+        self.connected = asyncio.Event()
+
+    @property
+    def channels(self) -> Tuple[str, ...]:
+        return tuple(self._subscriptions)
+
+    def subscribe(
+        self,
+        channel: str,
+        on_notify: Callable[[str], Any],
+        *,
+        on_resync: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        """
+        Call `on_notify(payload)` for each notification on `channel`, and
+        `on_resync()` after every (re)connect. Subscribe before `start()`.
+        """
+        self._subscriptions.setdefault(channel, []).append(_Subscription(on_notify, on_resync))
+
+    def start(self) -> None:
+        """Start the background task (call from a running event loop)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="db-change-listener")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self) -> None:
+        backoff = self.min_backoff_s
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                delay = backoff * random.uniform(0.5, 1.0)
+                logger.warning("Change listener disconnected (%s); retrying in %.1fs", e, delay)
+                await asyncio.sleep(delay)
+                backoff = min(self.max_backoff_s, backoff * 2)
+            else:
+                backoff = self.min_backoff_s
+
+    async def _listen(self) -> None:
+        conn = await asyncio.to_thread(self._connect)
+        loop = asyncio.get_running_loop()
+        readable = asyncio.Event()
+        fd: Optional[int] = None
+        ping: Optional[asyncio.Future] = None
+        live = False
+        try:
+            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cur:
+                for channel in self._subscriptions:
+                    cur.execute(f'LISTEN "{channel}"')
+            fd = conn.fileno()
+            loop.add_reader(fd, readable.set)
+            self.connected.set()
+            DB_CHANGE_LISTENER_CONNECTED.set(1)
+            logger.info("Change listener subscribed to %s", list(self._subscriptions))
+            self._resync()
+            if CHANGE_CHANNEL in self._subscriptions:
+                live = True
+                _set_live(+1)
+
+            while True:
+                try:
+                    await asyncio.wait_for(readable.wait(), timeout=self.keepalive_s)
+                except asyncio.TimeoutError:
+                    # Idle: a round trip surfaces a dead connection as an error.
+                    # Off the event loop, so a hung connection stalls nothing else.
+                    ping = asyncio.ensure_future(asyncio.to_thread(self._ping, conn))
+                    try:
+                        await asyncio.wait_for(asyncio.shield(ping), timeout=self.keepalive_s)
+                    except asyncio.TimeoutError:
+                        raise ConnectionError(f"keepalive got no answer within {self.keepalive_s}s") from None
+                readable.clear()
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    self._dispatch(notify.channel, notify.payload)
+        finally:
+            if live:
+                _set_live(-1)
+            self.connected.clear()
+            DB_CHANGE_LISTENER_CONNECTED.set(0)
+            if fd is not None:
+                loop.remove_reader(fd)
+            if ping is not None and not ping.done():
+                # The worker thread still holds the connection; closing would block on it.
+                loop.run_in_executor(None, self._close, conn)
+            else:
+                self._close(conn)
+
+    @staticmethod
+    def _ping(conn: Any) -> None:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+
+    @staticmethod
+    def _close(conn: Any) -> None:
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _resync(self) -> None:
+        for channel, subscriptions in self._subscriptions.items():
+            for subscription in subscriptions:
+                if subscription.on_resync is not None:
+                    self._call(channel, subscription.on_resync)
+
+    def _dispatch(self, channel: str, payload: str) -> None:
+        for subscription in self._subscriptions.get(channel, ()):
+            self._call(channel, subscription.on_notify, payload)
+
+    @staticmethod
+    def _call(channel: str, callback: Callable[..., Any], *args: Any) -> None:
+        try:
+            callback(*args)
+        except Exception:
+            logger.exception("Change listener callback failed on %r", channel)
+
+
+def subscribe_table_changes(
+    listener: ChangeListener,
+    *,
+    tables: Iterable[str] = WATCHED_TABLES,
+    handler: Callable[[TableChange], Any] = apply_change,
+) -> None:
+    """Feed `CHANGE_CHANNEL` notifications to `handler` (cache invalidation by default)."""
+    tables = tuple(tables)
+
+    def on_notify(payload: str) -> None:
+        change = parse_change(payload)
+        if change is None:
+            logger.warning("Ignoring malformed change notification: %.200s", payload)
+            return
+        DB_CHANGE_NOTIFICATIONS.inc(table=change.table)
+        handler(change)
+
+    def on_resync() -> None:
+        for table in tables:
+            handler(TableChange(table, op="RESYNC"))
+
+    listener.subscribe(CHANGE_CHANNEL, on_notify, on_resync=on_resync)
+
+
+def create_change_listener_from_env() -> Optional[ChangeListener]:
+    """
+    A `ChangeListener` subscribed to table changes (not started yet, so other
+    channels can be added), or `None` if `DB_CHANGE_LISTENER` disables it.
+    """
+    if not env_flag("DB_CHANGE_LISTENER", default=True):
+        logger.info("Change listener disabled (DB_CHANGE_LISTENER)")
+        return None
+    listener = ChangeListener()
+    subscribe_table_changes(listener)
+    return listener
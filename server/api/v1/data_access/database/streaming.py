@@ -0,0 +1,97 @@
+"""
+Row streaming with server-side (named) cursors (data-access layer).
+
+A plain psycopg2 cursor transfers the whole result set into client memory on
+`execute()`, even if the caller then iterates it. A named cursor keeps the
+result on the server and fetches `itersize` rows per round trip, so reading a
+million-row table costs one batch of memory.
+
+Responsibilities:
+- `stream_query(sql, params)`: context manager yielding a `RowStream` (column
+  names + an iterator of tuples). The connection is held for the duration and
+  closed on exit, including when the consumer stops early.
+- `iter_records(sql, params)`: the same rows as lightweight `Record`s
+  (`data_access/records.py`), for services building responses incrementally
+  instead of `fetchall()` + `dict(row)` copies.
+
+Non-responsibilities:
+- Formatting rows (exports, JSON): the caller's job.
+
+Named cursors live inside a transaction; keep the `with` block short-lived
+relative to other work, and don't write through this connection.
+"""
+
+from __future__ import annotations
+
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple, Type
+
+from ..records import Record, record_type
+from . import get_db_connection
+
+DEFAULT_ITERSIZE = 2000
+
+_NOT_FETCHED: Any = object()
+
+
+class RowStream:
+    """Iterator of result tuples from a named cursor; `columns` names their fields."""
+
+    def __init__(self, cursor: Any) -> None:
+        self._cursor = cursor
+        self._first: Any = _NOT_FETCHED
+
+    @property
+    def columns(self) -> List[str]:
+        # Named cursors only learn the result shape with the first FETCH.
+        if self._cursor.description is None and self._first is _NOT_FETCHED:
+            self._first = self._cursor.fetchone()
+        return [column[0] for column in self._cursor.description]
+
+    def __iter__(self) -> Iterator[Tuple[Any, ...]]:
+        if self._first is not _NOT_FETCHED:
+            first, self._first = self._first, None
+            if first is None:
+                return
+            yield first
+        yield from self._cursor
+
+
+@contextmanager
+def stream_query(
+    sql: str,
+    params: Optional[Sequence[Any]] = None,
+    *,
+    itersize: int = DEFAULT_ITERSIZE,
+    connect: Callable[[], Any] = get_db_connection,
+) -> Iterator[RowStream]:
+    """Run `sql` on a server-side cursor and stream its rows in batches of `itersize`."""
+    conn = connect()
+    try:
+        with conn.cursor(name=f"stream_{uuid.uuid4().hex[:12]}") as cur:
+            cur.itersize = itersize
+            cur.execute(sql, params)
+            yield RowStream(cur)
+    finally:
+        conn.close()
+
+
+def iter_records(
+    sql: str,
+    params: Optional[Sequence[Any]] = None,
+    *,
+    record: Optional[Type[Record]] = None,
+    name: str = "Row",
+    itersize: int = DEFAULT_ITERSIZE,
+    connect: Callable[[], Any] = get_db_connection,
+) -> Iterator[Record]:
+    """
+    Stream `sql` as records: instances of `record` (fields in column order) or
+    of a `record_type(name, columns)` built from the result. Exhaust or close
+    the iterator to release the connection.
+    """
+    with stream_query(sql, params, itersize=itersize, connect=connect) as rows:
+        cls = record if record is not None else record_type(name, rows.columns)
+        for row in rows:
+            yield cls(*row)
@@ -0,0 +1,97 @@
+"""
+Per-table change counters (data-access layer).
+
+`database/init/13_table_versions.sql` keeps a `table_versions` row per tracked
+table, bumped by a statement-level trigger on every write. Reading it is one
+primary-key lookup, which makes it the cheap "has this collection changed?"
+check behind the list endpoints' ETag / Last-Modified headers.
+
+Responsibilities:
+- `get_table_versions(tables)`: current versions, cached briefly
+  (`TABLE_VERSION_TTL_S`, default 5s) and dropped immediately on table
+  changes (change listener / local write paths).
+- Change detection fallback: when a version moves that this process has not
+  heard about, the table is reported through `cache.apply_change`, so data
+  caches never hand out a body older than the version it is tagged with.
+
+Non-responsibilities:
+- HTTP semantics (validators, 304s): `routes/conditional.py`.
+
+Returns `None` when versions are unavailable (migration not applied, table not
+tracked, database error); callers then just serve the full response.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import psycopg2
+
+from ..cache import ReadThroughCache, TableChange, apply_change
+from . import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+VERSIONED_TABLES = ("artikel", "inventory", "construction_sites", "bauprojekte")
+
+
+@dataclass(frozen=True)
+class TableVersion:
+    table: str
+    version: int
+    changed_at: datetime
+
+
+_VERSIONS_CACHE = ReadThroughCache(
+    "table_versions",
+    tables=VERSIONED_TABLES,
+    max_entries=64,
+    ttl_env="TABLE_VERSION_TTL_S",
+    default_ttl_s=5.0,
+)
+
+_seen_lock = threading.Lock()
+_last_seen: Dict[str, int] = {}
+
+
+def _load_versions(tables: Tuple[str, ...]) -> List[TableVersion]:
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT table_name, version, changed_at FROM table_versions WHERE table_name = ANY(%s)",
+                (list(tables),),
+            )
+            rows = {name: TableVersion(name, version, changed_at) for name, version, changed_at in cur.fetchall()}
+    finally:
+        conn.close()
+    return [rows[table] for table in tables if table in rows]
+
+
+def get_table_versions(tables: Iterable[str]) -> Optional[List[TableVersion]]:
+    """Versions of `tables` (sorted by name), or `None` if any is unavailable."""
+    key = tuple(sorted(set(tables)))
+    try:
+        versions = _VERSIONS_CACHE.get_or_load(key, lambda: _load_versions(key))
+    except psycopg2.Error as e:
+        logger.warning("Table versions unavailable for %s: %s", key, e)
+        return None
+    if len(versions) != len(key):
+        return None
+
+    moved = []
+    with _seen_lock:
+        for v in versions:
+            previous = _last_seen.get(v.table)
+            if previous is None or v.version > previous:
+                if previous is not None:
+                    moved.append(v.table)
+                _last_seen[v.table] = v.version
+    for table in moved:
+        # A write we weren't told about (no change listener, or it lagged).
+        apply_change(TableChange(table, op="VERSION"))
+    return versions
@@ -3,26 +3,35 @@ Predefined database queries intended to be wrapped as AI tools elsewhere.
 
 Important:
 - This module ONLY defines DB queries (no tool/wrapper logic).
-- Uses the same Postgres/psycopg2 connection pattern as other services.
+- Uses the same Postgres/psycopg2 connection pattern as other services, via
+  `scoped_connection()` so in-flight queries can be cancelled when the caller
+  (a voice turn) is interrupted.
 """
 
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence
 
 from psycopg2.extras import RealDictCursor
 
-from . import get_db_connection
+from ...observability.metrics import track_db_query
+from ...observability.tracing import span
+from ..cache import ReadThroughCache, cached
+from ..records import ArtikelRecord, BatchSearchRecord, InventoryItemRecord
+from . import scoped_connection
 
+_PRODUCT_NAMES_CACHE = ReadThroughCache("product_names", tables=("artikel",), max_entries=1)
 
+
+@cached(_PRODUCT_NAMES_CACHE)
+@track_db_query()
 def get_all_product_names() -> List[str]:
     """
     Retrieve all distinct product names from the `artikel` table (the table with prices).
 
-    Returns a sorted list of product names.
+    Returns a sorted list of product names (cached; see `data_access/cache.py`).
     """
-    conn = get_db_connection()
-    try:
+    with span("db.query", query="get_all_product_names"), scoped_connection() as conn:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(
                 """
@@ -34,11 +43,10 @@ def get_all_product_names() -> List[str]:
             )
             rows = cur.fetchall()
             return [str(row["artikelname"]) for row in rows]
-    finally:
-        conn.close()
 
 
-def get_product_prices_by_name_regex(name_regex: str) -> List[Dict]:
+@track_db_query()
+def get_product_prices_by_name_regex(name_regex: str) -> List[ArtikelRecord]:
     """
     Retrieve products (including price) from `artikel` whose name matches a Postgres regex.
 
@@ -47,9 +55,8 @@ def get_product_prices_by_name_regex(name_regex: str) -> List[Dict]:
     - Caller is responsible for providing a safe/appropriate regex pattern.
       (e.g. 'Handschuh' or '.*handschuh.*')
     """
-    conn = get_db_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+    with span("db.query", query="get_product_prices_by_name_regex"), scoped_connection() as conn:
+        with conn.cursor() as cur:
             sql = """
                 SELECT
                     artikel_id,
@@ -66,22 +73,27 @@ def get_product_prices_by_name_regex(name_regex: str) -> List[Dict]:
                 ORDER BY preis_eur ASC NULLS LAST, artikelname ASC, artikel_id ASC
             """
             cur.execute(sql, (name_regex,))
-            rows = cur.fetchall()
-            return [dict(row) for row in rows]
-    finally:
-        conn.close()
+            return [ArtikelRecord(*row) for row in cur]
 
 
-def get_inventory_items_by_name_regex(name_regex: str) -> List[Dict]:
+@track_db_query()
+def get_inventory_items_by_name_regex(
+    name_regex: str,
+    *,
+    site_id: Optional[int] = None,
+    site_name: Optional[str] = None,
+) -> List[InventoryItemRecord]:
     """
     Retrieve inventory items from `inventory` whose name matches a Postgres regex.
 
     Matching:
     - Uses case-insensitive regex operator `~*`.
+    - `site_id` (or else `site_name`, exact) restricts the search to one
+      construction site, so only that site's rows are scanned (composite
+      (construction_site_id, artikel_id) index).
     """
-    conn = get_db_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+    with span("db.query", query="get_inventory_items_by_name_regex"), scoped_connection() as conn:
+        with conn.cursor() as cur:
             sql = """
                 SELECT
                     artikel_id,
@@ -89,14 +101,102 @@ def get_inventory_items_by_name_regex(name_regex: str) -> List[Dict]:
                     kategorie,
                     lieferant,
                     construction_site,
-                    quantity
+                    quantity,
+                    construction_site_id
                 FROM inventory
                 WHERE artikelname ~* %s
-                ORDER BY artikelname ASC, artikel_id ASC
             """
-            cur.execute(sql, (name_regex,))
-            rows = cur.fetchall()
-            return [dict(row) for row in rows]
-    finally:
-        conn.close()
+            params: List[object] = [name_regex]
+            if site_id is not None:
+                sql += " AND construction_site_id = %s"
+                params.append(site_id)
+            elif site_name is not None:
+                sql += " AND construction_site_id = (SELECT id FROM construction_sites WHERE name = %s)"
+                params.append(site_name)
+            sql += " ORDER BY artikelname ASC, artikel_id ASC, construction_site_id ASC"
+            cur.execute(sql, params)
+            return [InventoryItemRecord(*row) for row in cur]
+
+
+_BATCH_SEARCH_SQL = """
+    WITH q AS (
+        SELECT pattern, ord FROM unnest(%(patterns)s::text[]) WITH ORDINALITY AS u(pattern, ord)
+    )
+    SELECT
+        q.ord, 'inventory' AS source, i.total, i.rn,
+        i.artikel_id, i.artikelname, i.kategorie, NULL AS einheit, NULL::numeric AS preis_eur,
+        i.lieferant, NULL AS verbrauchsart, NULL::boolean AS gefahrgut, NULL AS lagerort,
+        i.construction_site, i.quantity, i.construction_site_id
+    FROM q
+    CROSS JOIN LATERAL (
+        SELECT
+            artikel_id, artikelname, kategorie, lieferant, construction_site, quantity, construction_site_id,
+            count(*) OVER () AS total,
+            row_number() OVER (ORDER BY artikelname, artikel_id, construction_site_id) AS rn
+        FROM inventory
+        WHERE artikelname ~* q.pattern {site_filter}
+        ORDER BY rn
+        LIMIT %(limit)s
+    ) i
+    UNION ALL
+    SELECT
+        q.ord, 'artikel', a.total, a.rn,
+        a.artikel_id, a.artikelname, a.kategorie, a.einheit, a.preis_eur,
+        a.lieferant, a.verbrauchsart, a.gefahrgut, a.lagerort,
+        NULL, NULL, NULL
+    FROM q
+    CROSS JOIN LATERAL (
+        SELECT
+            artikel_id, artikelname, kategorie, lieferant, einheit, preis_eur, verbrauchsart, gefahrgut, lagerort,
+            count(*) OVER () AS total,
+            row_number() OVER (ORDER BY preis_eur ASC NULLS LAST, artikelname ASC, artikel_id ASC) AS rn
+        FROM artikel
+        WHERE artikelname ~* q.pattern
+        ORDER BY rn
+        LIMIT %(limit)s
+    ) a
+    ORDER BY 1, 2, 4
+"""
+
+
+@track_db_query()
+def search_items_by_name_regexes(
+    name_regexes: Sequence[str],
+    *,
+    site_id: Optional[int] = None,
+    site_name: Optional[str] = None,
+    limit: int = 25,
+) -> List[BatchSearchRecord]:
+    """
+    Inventory and price matches for several name regexes in one round trip.
+
+    The patterns are unnested and each is searched in `inventory` and `artikel`
+    through a LATERAL join, at most `limit` rows per table and pattern (with the
+    total match count). Returns one `BatchSearchRecord` per pattern, in input
+    order. `site_id` / `site_name` restrict the inventory side as in
+    `get_inventory_items_by_name_regex`.
+    """
+    results = [BatchSearchRecord(pattern, [], 0, [], 0) for pattern in name_regexes]
+    if not results:
+        return results
+    params: Dict[str, object] = {"patterns": list(name_regexes), "limit": limit}
+    site_filter = ""
+    if site_id is not None:
+        site_filter = "AND construction_site_id = %(site_id)s"
+        params["site_id"] = site_id
+    elif site_name is not None:
+        site_filter = "AND construction_site_id = (SELECT id FROM construction_sites WHERE name = %(site_name)s)"
+        params["site_name"] = site_name
 
+    with span("db.query", query="search_items_by_name_regexes", patterns=len(results)), scoped_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(_BATCH_SEARCH_SQL.format(site_filter=site_filter), params)
+            for ord_, source, total, _rn, *row in cur:
+                result = results[ord_ - 1]
+                if source == "inventory":
+                    result.inventory.append(InventoryItemRecord(*row[:3], row[5], *row[9:]))
+                    result.inventory_total = total
+                else:
+                    result.prices.append(ArtikelRecord(*row[:9]))
+                    result.prices_total = total
+    return results
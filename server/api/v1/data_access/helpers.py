@@ -0,0 +1,74 @@
+"""
+Small shared helpers (data-access layer, importable from services too).
+
+Responsibilities:
+- Environment settings: `env_float`, `env_int`, `env_ttl` (non-negative
+  seconds) and `env_flag` (1/true/yes/on, 0/false/no/off). Unset or blank
+  values give the default; invalid ones are logged and give the default.
+- `stem(word)`: the crude German/English plural folding shared by the
+  utterance parser and the response cache.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+_TRUE = ("1", "true", "yes", "on")
+_FALSE = ("0", "false", "no", "off")
+
+
+def _raw(name: str) -> "str | None":
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return None
+    return raw.strip()
+
+
+def env_float(name: str, default: float) -> float:
+    raw = _raw(name)
+    if raw is None:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        logger.warning("Invalid %s=%r; using %s", name, raw, default)
+        return default
+
+
+def env_int(name: str, default: int) -> int:
+    raw = _raw(name)
+    if raw is None:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning("Invalid %s=%r; using %s", name, raw, default)
+        return default
+
+
+def env_ttl(name: str, default: float) -> float:
+    """Seconds from `name`; negative values mean 0 (disabled)."""
+    return max(0.0, env_float(name, default))
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    raw = _raw(name)
+    if raw is None:
+        return default
+    if raw.lower() in _TRUE:
+        return True
+    if raw.lower() in _FALSE:
+        return False
+    logger.warning("Invalid %s=%r; using %s", name, raw, default)
+    return default
+
+
+def stem(word: str) -> str:
+    """Crude plural folding for German/English nouns (Handschuhe -> handschuh, gloves -> glove)."""
+    for suffix in ("en", "e", "n", "s"):
+        if len(word) > 4 and word.endswith(suffix):
+            return word[: -len(suffix)]
+    return word
@@ -0,0 +1,219 @@
+"""
+Per-conversation order drafts (data-access layer).
+
+The system prompt has Claude keep a draft purchase list whose lines are
+`confirmed`, `needs_user_confirm` or `pending_clarification`. The draft lives
+here, on the server, and the agent edits it with tools. The model then gets a
+one-line summary of the draft each turn and no longer re-derives it from the
+whole chat history.
+
+Responsibilities:
+- `OrderDraftStore`: draft lines per conversation (in memory, thread-safe,
+  LRU-bounded in the number of conversations). `upsert` matches lines by
+  `artikel_id` or by normalized name, so a pending line keeps its place once
+  it is resolved to an artikel.
+- `summarize(...)`: the compact text form of a draft.
+- Submitting: `submit(...)` takes the confirmed lines out of the draft and
+  hands them to the handler registered with `register_submit_handler` (they
+  are put back if it fails).
+
+Non-responsibilities:
+- Creating the order (prices, persistence): the services layer registers the
+  submit handler, since data_access must not import services.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .records import DraftLineRecord
+
+STATUSES = ("confirmed", "needs_user_confirm", "pending_clarification")
+
+SubmitHandler = Callable[[str, List[DraftLineRecord], Dict[str, Any]], Any]
+
+
+class DraftError(ValueError):
+    """Raised for invalid draft edits or when a draft cannot be submitted."""
+
+
+def _name_key(name: Optional[str]) -> str:
+    return " ".join((name or "").split()).casefold()
+
+
+def _format_number(value: Any) -> str:
+    if isinstance(value, (Decimal, float)):
+        return f"{value:.2f}"
+    return str(value)
+
+
+def summarize(lines: Sequence[DraftLineRecord]) -> str:
+    """
+    One line per draft line plus the confirmed total, e.g.
+
+        Draft: 1) W-1 Kabelbinder 200mm 5 Pack à 3.10 [confirmed]; 2) Handschuhe [pending_clarification: size]. Confirmed total 15.50
+    """
+    if not lines:
+        return "Draft: empty."
+    parts = []
+    total = Decimal(0)
+    for index, line in enumerate(lines, start=1):
+        text = " ".join(
+            str(v)
+            for v in (line.artikel_id, line.artikel_name, line.menge, line.einheit)
+            if v not in (None, "")
+        )
+        if line.einzelpreis is not None:
+            text += f" à {_format_number(line.einzelpreis)}"
+            if line.status == "confirmed" and line.menge is not None:
+                total += Decimal(str(line.einzelpreis)) * line.menge
+        status = line.status
+        if line.missing_fields:
+            status += ": " + ", ".join(line.missing_fields)
+        parts.append(f"{index}) {text} [{status}]")
+    return f"Draft: {'; '.join(parts)}. Confirmed total {_format_number(total)}"
+
+
+class OrderDraftStore:
+    """Draft lines per conversation, oldest line first."""
+
+    def __init__(self, *, max_conversations: int = 256, max_lines: int = 100) -> None:
+        self.max_conversations = max_conversations
+        self.max_lines = max_lines
+        self._lock = threading.Lock()
+        self._drafts: "OrderedDict[str, List[DraftLineRecord]]" = OrderedDict()
+        self._submit_handler: Optional[SubmitHandler] = None
+
+    def register_submit_handler(self, handler: SubmitHandler) -> None:
+        self._submit_handler = handler
+
+    def lines(self, conversation_id: str) -> List[DraftLineRecord]:
+        """Copies of the draft lines of `conversation_id`."""
+        with self._lock:
+            return [
+                DraftLineRecord(*line.values()[:-1], list(line.missing_fields))
+                for line in self._drafts.get(conversation_id, ())
+            ]
+
+    def summary(self, conversation_id: str) -> Optional[str]:
+        """`summarize(...)` of the draft, or None when the conversation has none."""
+        with self._lock:
+            lines = self._drafts.get(conversation_id)
+            return summarize(lines) if lines else None
+
+    def upsert(
+        self,
+        conversation_id: str,
+        *,
+        artikel_name: str,
+        artikel_id: Optional[str] = None,
+        menge: Optional[int] = None,
+        einheit: Optional[str] = None,
+        einzelpreis: Optional[Any] = None,
+        status: str = "pending_clarification",
+        missing_fields: Optional[Sequence[str]] = None,
+    ) -> List[DraftLineRecord]:
+        """Add or update a line (matched by `artikel_id`, else by name). Returns the draft."""
+        if not _name_key(artikel_name):
+            raise DraftError("artikel_name must be a non-empty string")
+        if status not in STATUSES:
+            raise DraftError(f"status must be one of {', '.join(STATUSES)}")
+        if menge is not None and (isinstance(menge, bool) or not isinstance(menge, int) or menge <= 0):
+            raise DraftError("menge must be a positive integer")
+        with self._lock:
+            lines = self._drafts.get(conversation_id)
+            if lines is None:
+                lines = self._drafts[conversation_id] = []
+            self._drafts.move_to_end(conversation_id)
+            line = self._find(lines, artikel_id, artikel_name)
+            if line is None:
+                if len(lines) >= self.max_lines:
+                    raise DraftError(f"a draft holds at most {self.max_lines} lines")
+                line = DraftLineRecord(None, None, None, None, None, status, [])
+                lines.append(line)
+            line.artikel_name = " ".join(artikel_name.split())
+            for field, value in (("artikel_id", artikel_id), ("menge", menge), ("einheit", einheit), ("einzelpreis", einzelpreis)):
+                if value is not None:
+                    setattr(line, field, value)
+            line.status = status
+            line.missing_fields = list(missing_fields or ())
+            while len(self._drafts) > self.max_conversations:
+                self._drafts.popitem(last=False)
+        return self.lines(conversation_id)
+
+    def remove(
+        self, conversation_id: str, *, artikel_id: Optional[str] = None, artikel_name: Optional[str] = None
+    ) -> List[DraftLineRecord]:
+        """Drop the matching line. Returns the draft."""
+        with self._lock:
+            lines = self._drafts.get(conversation_id, [])
+            line = self._find(lines, artikel_id, artikel_name)
+            if line is None:
+                raise DraftError("no such line in the draft")
+            lines.remove(line)
+        return self.lines(conversation_id)
+
+    def clear(self, conversation_id: str) -> None:
+        with self._lock:
+            self._drafts.pop(conversation_id, None)
+
+    def submit(self, conversation_id: str, **order_fields: Any) -> Any:
+        """
+        Submit the confirmed lines through the registered handler.
+
+        The lines leave the draft under the lock before the handler runs, so
+        overlapping submits (e.g. a cancelled turn's tool still running) cannot
+        order them twice; if the handler raises they are put back. Other lines
+        stay. Returns what the handler returns (the created order).
+        """
+        if self._submit_handler is None:
+            raise DraftError("order submission is not available")
+        with self._lock:
+            lines = self._drafts.get(conversation_id, [])
+            confirmed = [line for line in lines if line.status == "confirmed"]
+            if not confirmed:
+                raise DraftError("the draft has no confirmed lines")
+            incomplete = [line.artikel_name for line in confirmed if not line.artikel_id or not line.menge]
+            if incomplete:
+                raise DraftError(f"confirmed lines need artikel_id and menge: {', '.join(incomplete)}")
+            lines[:] = [line for line in lines if line.status != "confirmed"]
+            if not lines:
+                self._drafts.pop(conversation_id, None)
+        try:
+            return self._submit_handler(conversation_id, confirmed, order_fields)
+        except BaseException:
+            self._restore(conversation_id, confirmed)
+            raise
+
+    def _restore(self, conversation_id: str, confirmed: List[DraftLineRecord]) -> None:
+        """Put the lines of a failed submit back in front, unless they were re-added meanwhile."""
+        with self._lock:
+            lines = self._drafts.setdefault(conversation_id, [])
+            present = {line.artikel_id for line in lines}
+            lines[:0] = [line for line in confirmed if line.artikel_id not in present]
+
+    @staticmethod
+    def _find(
+        lines: List[DraftLineRecord], artikel_id: Optional[str], artikel_name: Optional[str]
+    ) -> Optional[DraftLineRecord]:
+        if artikel_id:
+            for line in lines:
+                if line.artikel_id == artikel_id:
+                    return line
+        key = _name_key(artikel_name)
+        if key:
+            for line in lines:
+                if _name_key(line.artikel_name) == key:
+                    return line
+        return None
+
+
+ORDER_DRAFTS = OrderDraftStore()
+
+
+def register_submit_handler(handler: SubmitHandler) -> None:
+    """Called by the services layer: how a submitted draft becomes an order."""
+    ORDER_DRAFTS.register_submit_handler(handler)
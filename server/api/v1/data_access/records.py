@@ -0,0 +1,239 @@
+"""
+Lightweight row records (data-access layer).
+
+A `dict` per row repeats every column name and costs ~200+ bytes before any
+values. Records are slotted objects built straight from cursor tuples: the
+field names live once on the class, and building one is a single generated
+`__init__` call.
+
+Responsibilities:
+- `Record`: base class. Subclasses list their fields in `__slots__`; an
+  `__init__` taking them positionally (in that order) is generated, with
+  fields named in `_optional` defaulting to `None`.
+- Dict-style access for code written against `RealDictRow` dicts:
+  `row["artikel_id"]`, `row.get(...)`, `keys()`/`items()`, `in`, assignment to
+  existing fields, and `to_dict()`. `serialization.dumps` encodes records as
+  JSON objects.
+- `record_type(name, columns)`: a (cached) `Record` subclass for an ad-hoc
+  column list, e.g. a cursor's `description`.
+- The row shapes the API and tools return: `ArtikelRecord` (+
+  `SiteArtikelRecord` with the construction site), `InventoryItemRecord`,
+  `SiteStockRecord`, `BatchSearchRecord` (one item of a batch search),
+  `DraftLineRecord` (a line of an order draft),
+  `OrderRecord` / `OrderPositionRecord` (nested `bestellpositionen` /
+  `alternatives`) and `AlternativeRecord`. Their leading fields follow the
+  SELECT column order, so a cursor tuple maps with `Cls(*row)`.
+
+Non-responsibilities:
+- Adding keys: a record has exactly its declared fields (`KeyError` otherwise).
+"""
+
+from __future__ import annotations
+
+import keyword
+import threading
+from typing import Any, Dict, Iterator, Sequence, Tuple, Type
+
+
+class Record:
+    """Slotted, dict-readable row. Subclasses define `__slots__` (field order = column order)."""
+
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+    _optional: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        fields: Tuple[str, ...] = ()
+        for klass in reversed(cls.__mro__):
+            slots = klass.__dict__.get("__slots__", ())
+            fields += (slots,) if isinstance(slots, str) else tuple(slots)
+        cls._fields = fields
+        unknown = set(cls._optional) - set(fields)
+        if unknown:
+            raise TypeError(f"{cls.__name__}._optional names unknown fields: {sorted(unknown)}")
+        params = ", ".join(f"{name}=None" if name in cls._optional else name for name in fields)
+        body = "".join(f"\n    self.{name} = {name}" for name in fields) or "\n    pass"
+        namespace: Dict[str, Any] = {}
+        exec(f"def __init__(self, {params}):{body}", namespace)  # noqa: S102 - generated from identifiers
+        # to_dict is generated too: it runs once per row when serializing.
+        items = ", ".join(f"{name!r}: self.{name}" for name in fields)
+        exec(f"def to_dict(self):\n    return {{{items}}}", namespace)  # noqa: S102
+        for attr in ("__init__", "to_dict"):
+            func = namespace[attr]
+            func.__qualname__ = f"{cls.__qualname__}.{attr}"
+            setattr(cls, attr, func)
+
+    # -- dict-style read access ------------------------------------------
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self._fields:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default) if key in self._fields else default
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._fields
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._fields
+
+    def values(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name, None) for name in self._fields)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return ((name, getattr(self, name, None)) for name in self._fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name, None) for name in self._fields}
+
+    # -- value semantics ---------------------------------------------------
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Record):
+            return self._fields == other._fields and self.values() == other.values()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]  # mutable, like dict
+
+    def __repr__(self) -> str:
+        inner = ", ".join(f"{name}={getattr(self, name, None)!r}" for name in self._fields)
+        return f"{type(self).__name__}({inner})"
+
+    def __reduce__(self) -> Any:
+        return (type(self), self.values())
+
+
+_types_lock = threading.Lock()
+_types: Dict[Tuple[str, Tuple[str, ...]], Type[Record]] = {}
+
+
+def record_type(name: str, columns: Sequence[str]) -> Type[Record]:
+    """A `Record` subclass with `columns` as fields (one class per distinct name/columns)."""
+    key = (name, tuple(columns))
+    bad = [c for c in key[1] if not c.isidentifier() or keyword.iskeyword(c)]
+    if bad or len(set(key[1])) != len(key[1]):
+        raise ValueError(f"Columns must be unique identifiers to become record fields: {list(key[1])}")
+    with _types_lock:
+        cls = _types.get(key)
+        if cls is None:
+            cls = _types[key] = type(name, (Record,), {"__slots__": key[1]})
+        return cls
+
+
+# -- row shapes ------------------------------------------------------------
+
+ORDER_COLUMNS: Tuple[str, ...] = (
+    "bestell_id",
+    "polier_name",
+    "projekt_name",
+    "gesamt_betrag",
+    "status",
+    "admin_notizen",
+    "erstellt_am",
+    "aktualisiert_am",
+    "erstellt_von",
+    "genehmigt_von",
+    "genehmigt_am",
+)
+POSITION_COLUMNS: Tuple[str, ...] = (
+    "position_id",
+    "artikel_id",
+    "artikel_name",
+    "menge",
+    "einheit",
+    "einzelpreis",
+    "gesamt_preis",
+    "position_nummer",
+    "notizen",
+)
+
+
+class ArtikelRecord(Record):
+    """An `artikel` catalog row."""
+
+    __slots__ = (
+        "artikel_id",
+        "artikelname",
+        "kategorie",
+        "einheit",
+        "preis_eur",
+        "lieferant",
+        "verbrauchsart",
+        "gefahrgut",
+        "lagerort",
+    )
+
+
+class SiteArtikelRecord(ArtikelRecord):
+    """An `artikel` row joined with its construction site."""
+
+    __slots__ = ("construction_site_id", "construction_site_name")
+
+
+class InventoryItemRecord(Record):
+    """An `inventory` row: stock of one artikel at one construction site."""
+
+    __slots__ = (
+        "artikel_id",
+        "artikelname",
+        "kategorie",
+        "lieferant",
+        "construction_site",
+        "quantity",
+        "construction_site_id",
+    )
+
+
+class SiteStockRecord(Record):
+    """A row of the `inventory_site_stock` view (stock totals per site)."""
+
+    __slots__ = ("construction_site_id", "construction_site", "artikel_count", "total_quantity", "out_of_stock_count")
+
+
+class BatchSearchRecord(Record):
+    """Inventory and price matches for one pattern of a batch search, with total match counts."""
+
+    __slots__ = ("pattern", "inventory", "inventory_total", "prices", "prices_total")
+
+
+class DraftLineRecord(Record):
+    """A line of a conversation's order draft (see `order_drafts`)."""
+
+    __slots__ = ("artikel_id", "artikel_name", "menge", "einheit", "einzelpreis", "status", "missing_fields")
+
+
+class AlternativeRecord(Record):
+    """Same product from another supplier, as attached to an order position."""
+
+    __slots__ = ("artikel_id", "artikel_name", "lieferant", "preis_eur", "einheit")
+
+
+class OrderPositionRecord(Record):
+    """A `bestellpositionen` row (`POSITION_COLUMNS`) plus its `alternatives`."""
+
+    __slots__ = POSITION_COLUMNS + ("alternatives",)
+    _optional = ("alternatives",)
+
+
+class OrderRecord(Record):
+    """A `bestellungen` row (`ORDER_COLUMNS`) plus its `bestellpositionen`."""
+
+    __slots__ = ORDER_COLUMNS + ("bestellpositionen",)
+    _optional = ("bestellpositionen",)
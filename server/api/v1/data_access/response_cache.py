@@ -0,0 +1,226 @@
+"""
+Semantic cache of assistant replies to stock and price questions (data-access layer).
+
+Foremen ask the same questions again and again ("Haben wir
+Sicherheitsbrillen?", "what does the Bohrhammer cost?"). Each of them costs a
+Claude turn with tool calls and then TTS, and produces the same answer every
+time. This cache keeps the reply text, and once spoken its audio, so a repeat
+can skip both.
+
+Responsibilities:
+- Keys: the normalized question plus the language. Normalizing casefolds the
+  text, folds umlauts, drops punctuation and filler words and applies a crude
+  plural stem.
+- Similarity: exact keys are a dict lookup. Near-duplicates (ASR variants,
+  "Sicherheitsbrilen") are found through a character-trigram inverted
+  index and accepted at Jaccard >= `RESPONSE_CACHE_SIMILARITY` (default 0.85),
+  but only when their numbers are identical.
+- Strict invalidation: any change to the catalog or inventory tables (local
+  writes and LISTEN/NOTIFY via `cache.on_table_change`) empties the cache
+  and bumps its version. A reply computed across such a change is not
+  stored. Entries also expire after `RESPONSE_CACHE_TTL_S` (default 600).
+- Context: questions that point back at earlier turns ("Was kostet das?",
+  "how much is it?") are never cached or answered from the cache.
+- Opt-in: `RESPONSE_CACHE_ENABLED=1`.
+
+Non-responsibilities:
+- Deciding which replies may be cached (read-only first turns):
+  `claude_service`.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from ..observability.metrics import CACHE_REQUESTS
+from .cache import TableChange, on_table_change
+from .helpers import env_flag, env_float, stem
+
+# Tables whose content stock/price answers are derived from.
+SOURCE_TABLES = frozenset({"artikel", "inventory", "construction_sites", "product_groups", "product_group_aliases"})
+
+DEFAULT_TTL_S = 600.0
+DEFAULT_SIMILARITY = 0.85
+MAX_AUDIO_BYTES = 2_000_000
+
+_FILLER = frozenset({
+    "bitte", "mal", "denn", "eigentlich", "noch", "hey", "hallo", "ok", "okay", "also", "aeh", "aehm",
+    "ja", "nun", "please", "um", "uh", "so", "well", "hi", "hello", "just", "actually",
+})
+# Words that refer to something said earlier; the cache key cannot hold that.
+_CONTEXT_WORDS = frozenset({
+    "davon", "dafuer", "dazu", "damit", "daran", "dies", "diese", "dieser", "dieses", "diesen", "denen",
+    "selbe", "selben", "gleiche", "gleichen", "dort",
+    "it", "that", "this", "those", "these", "them", "same",
+})
+# Articles/pronouns that refer back when nothing follows them ("Was kostet das?").
+_TRAILING_PRONOUNS = frozenset({"das", "den", "dem", "die", "der", "es", "sie", "ihn", "one", "ones"})
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def enabled() -> bool:
+    return env_flag("RESPONSE_CACHE_ENABLED")
+
+
+def _words(text: str) -> List[str]:
+    folded = text.casefold().replace("ä", "ae").replace("ö", "oe").replace("ü", "ue").replace("ß", "ss")
+    folded = folded.replace("-", "")  # "Sicherheits-Brillen" is one word
+    folded = unicodedata.normalize("NFKD", folded).encode("ascii", "ignore").decode("ascii")
+    return _WORD.findall(folded)
+
+
+def normalize_question(text: str) -> str:
+    """Canonical form of a question: "Haben wir Sicherheitsbrillen?" -> "hab wir sicherheitsbrill"."""
+    return " ".join(stem(word) for word in _words(text) if word not in _FILLER)
+
+
+def refers_to_context(text: str) -> bool:
+    """True for questions about something from an earlier turn ("Haben wir davon noch was?")."""
+    words = [word for word in _words(text) if word not in _FILLER]
+    return bool(words) and (words[-1] in _TRAILING_PRONOUNS or any(word in _CONTEXT_WORDS for word in words))
+
+
+def _trigrams(key: str) -> FrozenSet[str]:
+    padded = f"  {key.replace(' ', '')} "
+    return frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+def _numbers(key: str) -> Tuple[str, ...]:
+    return tuple(re.findall(r"[0-9]+", key))
+
+
+@dataclass
+class CachedReply:
+    text: str
+    language: str
+    key: str
+    expires_at: float
+    audio: Optional[List[bytes]] = None
+    grams: FrozenSet[str] = field(default=frozenset(), repr=False)
+
+
+class SemanticResponseCache:
+    """Reply texts (and audio) by normalized question, with a trigram index for near-duplicates."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 512,
+        ttl_s: Optional[float] = None,
+        similarity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self._ttl_s = ttl_s
+        self._similarity = similarity
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], CachedReply]" = OrderedDict()
+        self._index: Dict[Tuple[str, str], Set[Tuple[str, str]]] = {}  # (language, trigram) -> entry ids
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        """Bumped on every invalidation; capture it before computing a reply."""
+        return self._version
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def note_change(self, change: TableChange) -> None:
+        if change.table in SOURCE_TABLES:
+            self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._index.clear()
+
+    def lookup(self, text: str, language: str) -> Optional[CachedReply]:
+        key = normalize_question(text)
+        if not key or refers_to_context(text):
+            return None
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get((language, key))
+            if entry is None:
+                entry = self._similar(key, language)
+            if entry is not None and entry.expires_at <= now:
+                self._drop((entry.language, entry.key))
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end((entry.language, entry.key))
+        CACHE_REQUESTS.inc(cache="responses", result="hit" if entry is not None else "miss")
+        return entry
+
+    def store(self, text: str, language: str, reply: str, *, version: int) -> bool:
+        """Cache `reply` unless the cache was invalidated since `version` was read."""
+        key = normalize_question(text)
+        ttl_s = self._ttl_s if self._ttl_s is not None else env_float("RESPONSE_CACHE_TTL_S", DEFAULT_TTL_S)
+        if not key or not reply.strip() or ttl_s <= 0 or refers_to_context(text):
+            return False
+        with self._lock:
+            if version != self._version:
+                return False
+            entry_id = (language, key)
+            self._drop(entry_id)
+            entry = CachedReply(reply, language, key, self._clock() + ttl_s, grams=_trigrams(key))
+            self._entries[entry_id] = entry
+            for gram in entry.grams:
+                self._index.setdefault((language, gram), set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+        return True
+
+    def attach_audio(self, text: str, language: str, reply: str, audio: List[bytes]) -> bool:
+        """Keep the spoken `audio` of a cached `reply` (only if the entry still holds that reply)."""
+        if sum(len(chunk) for chunk in audio) > MAX_AUDIO_BYTES:
+            return False
+        key = normalize_question(text)
+        with self._lock:
+            entry = self._entries.get((language, key)) or (self._similar(key, language) if key else None)
+            if entry is None or entry.text != reply:
+                return False
+            entry.audio = list(audio)
+            return True
+
+    def _similar(self, key: str, language: str) -> Optional[CachedReply]:
+        grams = _trigrams(key)
+        counts: Dict[Tuple[str, str], int] = {}
+        for gram in grams:
+            for entry_id in self._index.get((language, gram), ()):
+                counts[entry_id] = counts.get(entry_id, 0) + 1
+        threshold = self._similarity if self._similarity is not None else env_float(
+            "RESPONSE_CACHE_SIMILARITY", DEFAULT_SIMILARITY
+        )
+        numbers = _numbers(key)
+        best: Optional[CachedReply] = None
+        best_score = threshold
+        for entry_id, shared in counts.items():
+            entry = self._entries[entry_id]
+            score = shared / (len(grams) + len(entry.grams) - shared)
+            if score >= best_score and _numbers(entry.key) == numbers:
+                best, best_score = entry, score
+        return best
+
+    def _drop(self, entry_id: Tuple[str, str]) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for gram in entry.grams:
+            ids = self._index.get((entry.language, gram))
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._index[(entry.language, gram)]
+
+
+RESPONSE_CACHE = SemanticResponseCache()
+on_table_change(RESPONSE_CACHE.note_change)
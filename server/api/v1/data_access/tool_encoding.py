@@ -0,0 +1,219 @@
+"""
+Compact encoding of agent tool results (data-access layer).
+
+Tool results are appended to the conversation and re-sent as input tokens on
+every later round of the tool loop, so their size is paid for repeatedly.
+Rows are therefore encoded as a table rather than as a list of JSON objects:
+
+    {"columns":["artikel_id","artikelname","preis_eur"],
+     "rows":[["W-SICH-004","Sicherheitsbrille",4.99], ...],
+     "more":23}
+
+Responsibilities:
+- Projection: only the columns the caller asks for (per tool, see
+  `tools_runtime`).
+- Ranking: rows best matching the search text first (exact name, prefix,
+  whole words, substring), keeping the query's own order within a rank.
+- Top-k (`TOOL_RESULT_TOP_K`, default 15) plus a `more` count of rows left
+  out, and a character budget (`TOOL_RESULT_MAX_CHARS`, default 12000) that
+  drops whole rows, never cuts one.
+
+Non-responsibilities:
+- Which columns each tool exposes: `tools_runtime`.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .helpers import env_int
+from .records import Record
+
+DEFAULT_TOP_K = 15
+DEFAULT_MAX_CHARS = 12_000
+
+# Column the ranking compares against the search text.
+RANK_FIELD = "artikelname"
+
+
+def result_top_k() -> int:
+    """Rows per tool result (`TOOL_RESULT_TOP_K`)."""
+    return env_int("TOOL_RESULT_TOP_K", DEFAULT_TOP_K)
+
+
+def _scalar(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Record):
+        return value.to_dict()
+    return str(value)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_scalar)
+
+
+def _as_mapping(row: Any) -> Optional[Mapping[str, Any]]:
+    if isinstance(row, Record):
+        return row.to_dict()
+    if isinstance(row, Mapping):
+        return row
+    return None
+
+
+def _relevance(name: Any, phrase: str, terms: Sequence[str]) -> int:
+    """0 (best) .. 4: exact name, name prefix, whole words, substrings, anything else."""
+    if not phrase or not isinstance(name, str):
+        return 4
+    name = " ".join(name.split()).casefold()
+    if name == phrase:
+        return 0
+    if name.startswith(phrase):
+        return 1
+    if all(re.search(r"\b" + re.escape(term), name) for term in terms):
+        return 2
+    if all(term in name for term in terms):
+        return 3
+    return 4
+
+
+def rank_rows(rows: Sequence[Mapping[str, Any]], query: Optional[str]) -> List[Mapping[str, Any]]:
+    """`rows` best matching `query` first; stable, so ties keep the query's order (e.g. by price)."""
+    phrase = " ".join((query or "").split()).casefold()
+    if not phrase:
+        return list(rows)
+    terms = phrase.split()
+    return sorted(rows, key=lambda row: _relevance(row.get(RANK_FIELD), phrase, terms))
+
+
+def result_max_chars() -> int:
+    """Character budget per tool result (`TOOL_RESULT_MAX_CHARS`)."""
+    return env_int("TOOL_RESULT_MAX_CHARS", DEFAULT_MAX_CHARS)
+
+
+def fit_to_budget(
+    encode: Callable[[List[Any], int], str], items: List[Any], total: int, max_chars: int
+) -> Tuple[str, int]:
+    """
+    Encode as many leading `items` as fit in `max_chars` (at least one).
+
+    `encode(prefix, more)` gets the kept items and how many of `total` were
+    left out; returns the text and the number of items kept.
+    """
+    text = encode(items, total - len(items))
+    if len(text) <= max_chars or len(items) <= 1:
+        return text, len(items)
+    lo, hi = 1, len(items) - 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if len(encode(items[:mid], total - mid)) <= max_chars:
+            lo = mid
+        else:
+            hi = mid - 1
+    return encode(items[:lo], total - lo), lo
+
+
+def encode_tool_result(
+    result: Any,
+    *,
+    fields: Optional[Sequence[str]] = None,
+    query: Optional[str] = None,
+    top_k: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> str:
+    """
+    Encode a tool result for a `tool_result` block.
+
+    Lists of rows (records or dicts) become `{"columns", "rows", "more"?}`,
+    projected to `fields` when given, ranked against `query` and cut to
+    `top_k`. Lists of scalars become `{"items", "more"?}`. Anything else is
+    compact JSON. Either way the text stays within `max_chars` by dropping
+    whole rows.
+    """
+    if isinstance(result, str):
+        return result
+    top_k = result_top_k() if top_k is None else top_k
+    max_chars = result_max_chars() if max_chars is None else max_chars
+
+    if isinstance(result, (list, tuple)):
+        rows = [_as_mapping(item) for item in result]
+        if rows and all(row is not None for row in rows):
+            return _encode_rows(rows, fields=fields, query=query, top_k=top_k, max_chars=max_chars)
+
+        def encode_items(items: List[Any], more: int) -> str:
+            payload: Dict[str, Any] = {"items": items}
+            if more:
+                payload["more"] = more
+            return _dumps(payload)
+
+        return fit_to_budget(encode_items, list(result), len(result), max_chars)[0]
+
+    try:
+        return _dumps(result)
+    except (TypeError, ValueError):
+        return str(result)
+
+
+def tabulate(
+    rows: Sequence[Any],
+    *,
+    fields: Optional[Sequence[str]] = None,
+    query: Optional[str] = None,
+    top_k: Optional[int] = None,
+    total: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    `{"columns", "rows", "more"?}` payload for `rows` (records or dicts): projected
+    to `fields`, ranked against `query`, cut to `top_k`. `total` is the full
+    match count when `rows` is already a prefix of it (e.g. a SQL LIMIT).
+    """
+    top_k = result_top_k() if top_k is None else top_k
+    mappings = [_as_mapping(row) or {} for row in rows]
+    if not mappings:
+        columns: List[str] = list(fields or ())
+    elif fields:
+        columns = [f for f in fields if f in mappings[0]]
+    else:
+        columns = list(mappings[0].keys())
+    ranked = rank_rows(mappings, query)
+    if top_k > 0:
+        ranked = ranked[:top_k]
+    payload: Dict[str, Any] = {
+        "columns": columns,
+        "rows": [[_scalar(row.get(column)) for column in columns] for row in ranked],
+    }
+    more = max(len(mappings) if total is None else total, len(mappings)) - len(ranked)
+    if more:
+        payload["more"] = more
+    return payload
+
+
+def dumps_compact(payload: Any) -> str:
+    """JSON without whitespace; decimals as numbers, records as objects."""
+    return _dumps(payload)
+
+
+def _encode_rows(
+    rows: List[Mapping[str, Any]],
+    *,
+    fields: Optional[Sequence[str]],
+    query: Optional[str],
+    top_k: int,
+    max_chars: int,
+) -> str:
+    payload = tabulate(rows, fields=fields, query=query, top_k=top_k)
+    total = len(rows)
+    columns = payload["columns"]
+
+    def encode_table(items: List[List[Any]], more: int) -> str:
+        table: Dict[str, Any] = {"columns": columns, "rows": items}
+        if more:
+            table["more"] = more
+        return _dumps(table)
+
+    return fit_to_budget(encode_table, payload["rows"], total, max_chars)[0]
@@ -0,0 +1,150 @@
+"""
+Per-conversation memo of agent tool results (data-access layer).
+
+Within one voice session Claude often repeats a lookup: the same
+`inventory_search` across rounds, or after a clarification. `tools_runtime`
+answers those repeats from here, without touching Postgres.
+
+Responsibilities:
+- `ToolResultMemo`: results keyed by (conversation, tool key), bounded per
+  conversation and in the number of conversations (LRU).
+- Version stamps: every entry records, for the tables its tool reads, a
+  per-table change counter. Counters bump on `cache.on_table_change` events
+  (local writes and LISTEN/NOTIFY). While the change listener is connected
+  that is all a stamp needs, so a memo hit never touches Postgres. When the
+  listener is disabled or down, stamps also carry the tables'
+  `table_versions` rows (read through `get_table_versions`, cached for
+  `TABLE_VERSION_TTL_S`) to catch writes by other workers. Either way a
+  catalog or inventory write makes the older entries miss.
+- `TOOL_MEMO_TTL_S` (default 300; 0 disables) bounds staleness from writers
+  nobody announced.
+
+Non-responsibilities:
+- Deciding which tools are memoizable and normalizing their input:
+  `tools_runtime`.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from ..observability.metrics import CACHE_REQUESTS
+from .cache import TableChange, on_table_change
+from .database.change_listener import table_changes_live
+from .database.table_versions import get_table_versions
+from .helpers import env_ttl
+
+DEFAULT_TTL_S = 300.0
+
+MISS: Any = object()
+
+Stamp = Tuple[Tuple[int, ...], Optional[Tuple[int, ...]]]
+
+
+def db_table_versions(tables: Tuple[str, ...]) -> Optional[Tuple[int, ...]]:
+    """`table_versions` of `tables` in that order, or None when unavailable."""
+    if not tables:
+        return ()
+    versions = get_table_versions(tables)
+    if versions is None:
+        return None
+    by_table = {v.table: v.version for v in versions}
+    return tuple(by_table[table] for table in tables)
+
+
+class ToolResultMemo:
+    """Tool results per conversation, valid while their tables' version stamps hold."""
+
+    def __init__(
+        self,
+        *,
+        max_conversations: int = 256,
+        max_entries: int = 64,
+        ttl_s: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        db_versions: Callable[[Tuple[str, ...]], Optional[Tuple[int, ...]]] = db_table_versions,
+        changes_live: Callable[[], bool] = table_changes_live,
+    ) -> None:
+        self.max_conversations = max_conversations
+        self.max_entries = max_entries
+        self._ttl_s = ttl_s
+        self._clock = clock
+        self._db_versions = db_versions
+        self._changes_live = changes_live
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._conversations: "OrderedDict[str, OrderedDict[Hashable, Tuple[Stamp, float, Any]]]" = OrderedDict()
+
+    @property
+    def ttl_s(self) -> float:
+        return self._ttl_s if self._ttl_s is not None else env_ttl("TOOL_MEMO_TTL_S", DEFAULT_TTL_S)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._conversations.values())
+
+    def stamp(self, tables: Iterable[str]) -> Stamp:
+        """Current version stamp of `tables` (capture it before running the tool)."""
+        tables = tuple(tables)
+        # The listener reports every write: the local counters are enough.
+        # Otherwise read first: a version this process has not seen bumps them.
+        db_versions = None if self._changes_live() else self._db_versions(tables)
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables), db_versions
+
+    def note_change(self, change: TableChange) -> None:
+        with self._lock:
+            self._versions[change.table] = self._versions.get(change.table, 0) + 1
+
+    def get(self, conversation_id: str, key: Hashable, tables: Iterable[str]) -> Any:
+        """The memoized result, or `MISS` when absent, expired or stale."""
+        now = self._clock()
+        with self._lock:
+            entries = self._conversations.get(conversation_id)
+            found = entries is not None and key in entries
+        current = self.stamp(tables) if found else None
+        with self._lock:
+            entries = self._conversations.get(conversation_id)
+            entry = entries.get(key) if entries is not None else None
+            if entry is not None:
+                stamp, expires_at, value = entry
+                if stamp == current and expires_at > now:
+                    self._conversations.move_to_end(conversation_id)
+                    entries.move_to_end(key)
+                    CACHE_REQUESTS.inc(cache="tool_memo", result="hit")
+                    return list(value) if isinstance(value, list) else value
+                del entries[key]
+        CACHE_REQUESTS.inc(cache="tool_memo", result="miss")
+        return MISS
+
+    def put(self, conversation_id: str, key: Hashable, stamp: Stamp, value: Any) -> None:
+        ttl_s = self.ttl_s
+        if ttl_s <= 0:
+            return
+        expires_at = self._clock() + ttl_s
+        with self._lock:
+            entries = self._conversations.get(conversation_id)
+            if entries is None:
+                entries = self._conversations[conversation_id] = OrderedDict()
+            self._conversations.move_to_end(conversation_id)
+            entries[key] = (stamp, expires_at, list(value) if isinstance(value, list) else value)
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            while len(self._conversations) > self.max_conversations:
+                self._conversations.popitem(last=False)
+
+    def forget(self, conversation_id: Optional[str] = None) -> None:
+        """Drop one conversation's results (or all of them)."""
+        with self._lock:
+            if conversation_id is None:
+                self._conversations.clear()
+            else:
+                self._conversations.pop(conversation_id, None)
+
+
+TOOL_MEMO = ToolResultMemo()
+on_table_change(TOOL_MEMO.note_change)
@@ -17,10 +17,20 @@ So tool definitions + dispatch are defined here, backed by
 from __future__ import annotations
 
 import json
+import logging
 import re
-from typing import Any, Callable, Dict, List, Mapping, Optional
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 
+from ..observability.metrics import TOOL_EXECUTION_DURATION
+from ..observability.tracing import span
 from .database import tools as db_tools
+from .order_drafts import ORDER_DRAFTS
+from .records import ArtikelRecord, BatchSearchRecord, DraftLineRecord, InventoryItemRecord
+from .tool_encoding import dumps_compact, encode_tool_result, fit_to_budget, result_max_chars, result_top_k, tabulate
+from .tool_memo import MISS, TOOL_MEMO
+
+logger = logging.getLogger(__name__)
 
 
 class ToolRuntimeError(RuntimeError):
@@ -46,13 +56,24 @@ def _to_loose_postgres_regex(query_text: str) -> str:
 # Tool implementations (DB-backed)
 # ---------------------------------------------------------------------------
 
-def inventory_search(*, query_text: str, site_id: Optional[str] = None) -> List[Dict[str, Any]]:
-    _ = site_id  # reserved for future multi-site support
+def _site_filter(site_id: Any) -> Dict[str, Any]:
+    """`site_id` tool argument -> db filter kwargs: numeric ids or an exact site name."""
+    if site_id is None or (isinstance(site_id, str) and not site_id.strip()):
+        return {}
+    if isinstance(site_id, bool) or not isinstance(site_id, (int, str)):
+        raise ToolRuntimeError("site_id must be a site id or name")
+    if isinstance(site_id, int):
+        return {"site_id": site_id}
+    site_id = site_id.strip()
+    return {"site_id": int(site_id)} if site_id.isdigit() else {"site_name": site_id}
+
+
+def inventory_search(*, query_text: str, site_id: Optional[str] = None) -> List[InventoryItemRecord]:
     name_regex = _to_loose_postgres_regex(query_text)
-    return db_tools.get_inventory_items_by_name_regex(name_regex=name_regex)
+    return db_tools.get_inventory_items_by_name_regex(name_regex=name_regex, **_site_filter(site_id))
 
 
-def product_price_search(*, query_text: str) -> List[Dict[str, Any]]:
+def product_price_search(*, query_text: str) -> List[ArtikelRecord]:
     name_regex = _to_loose_postgres_regex(query_text)
     return db_tools.get_product_prices_by_name_regex(name_regex=name_regex)
 
@@ -61,18 +82,89 @@ def get_all_product_names() -> List[str]:
     return db_tools.get_all_product_names()
 
 
-def get_product_prices_by_name_regex(*, name_regex: str) -> List[Dict[str, Any]]:
+def get_product_prices_by_name_regex(*, name_regex: str) -> List[ArtikelRecord]:
     if not isinstance(name_regex, str) or not name_regex.strip():
         raise ToolRuntimeError("name_regex must be a non-empty string")
     return db_tools.get_product_prices_by_name_regex(name_regex=name_regex.strip())
 
 
-def get_inventory_items_by_name_regex(*, name_regex: str) -> List[Dict[str, Any]]:
+def get_inventory_items_by_name_regex(*, name_regex: str) -> List[InventoryItemRecord]:
     if not isinstance(name_regex, str) or not name_regex.strip():
         raise ToolRuntimeError("name_regex must be a non-empty string")
     return db_tools.get_inventory_items_by_name_regex(name_regex=name_regex.strip())
 
 
+MAX_BATCH_QUERIES = 20
+
+
+def batch_item_search(*, queries: List[str], site_id: Optional[str] = None) -> List[BatchSearchRecord]:
+    """Inventory + price matches for every query, from one set-based query (see `search_items_by_name_regexes`)."""
+    if not isinstance(queries, list) or not queries:
+        raise ToolRuntimeError("queries must be a non-empty list of strings")
+    if len(queries) > MAX_BATCH_QUERIES:
+        raise ToolRuntimeError(f"at most {MAX_BATCH_QUERIES} queries per call")
+    name_regexes = [_to_loose_postgres_regex(query_text) for query_text in queries]
+    results = db_tools.search_items_by_name_regexes(name_regexes, **_site_filter(site_id))
+    for query_text, result in zip(queries, results):
+        result.pattern = query_text.strip()
+    return results
+
+
+# Order draft tools: they act on the calling conversation's draft
+# (`order_drafts.ORDER_DRAFTS`); `execute_tool` passes `conversation_id`.
+
+def draft_upsert_item(
+    *,
+    conversation_id: str,
+    artikel_name: str,
+    artikel_id: Optional[str] = None,
+    menge: Optional[int] = None,
+    einheit: Optional[str] = None,
+    einzelpreis: Optional[float] = None,
+    status: str = "pending_clarification",
+    missing_fields: Optional[List[str]] = None,
+) -> str:
+    ORDER_DRAFTS.upsert(
+        conversation_id,
+        artikel_name=artikel_name,
+        artikel_id=artikel_id,
+        menge=menge,
+        einheit=einheit,
+        einzelpreis=einzelpreis,
+        status=status,
+        missing_fields=missing_fields,
+    )
+    return ORDER_DRAFTS.summary(conversation_id) or "Draft: empty."
+
+
+def draft_remove_item(
+    *, conversation_id: str, artikel_id: Optional[str] = None, artikel_name: Optional[str] = None
+) -> str:
+    ORDER_DRAFTS.remove(conversation_id, artikel_id=artikel_id, artikel_name=artikel_name)
+    return ORDER_DRAFTS.summary(conversation_id) or "Draft: empty."
+
+
+def draft_list(*, conversation_id: str) -> List[DraftLineRecord]:
+    return ORDER_DRAFTS.lines(conversation_id)
+
+
+def draft_submit(*, conversation_id: str, polier_name: str, projekt_name: str) -> Dict[str, Any]:
+    for field, value in (("polier_name", polier_name), ("projekt_name", projekt_name)):
+        if not isinstance(value, str) or not value.strip():
+            raise ToolRuntimeError(f"{field} must be a non-empty string")
+    order = ORDER_DRAFTS.submit(conversation_id, polier_name=polier_name.strip(), projekt_name=projekt_name.strip())
+    return {
+        "bestell_id": order["bestell_id"],
+        "status": order["status"],
+        "gesamt_betrag": order["gesamt_betrag"],
+        "positions": len(order.get("bestellpositionen") or ()),
+        "remaining_draft": ORDER_DRAFTS.summary(conversation_id) or "Draft: empty.",
+    }
+
+
+_DRAFT_TOOLS = frozenset({"draft_upsert_item", "draft_remove_item", "draft_list", "draft_submit"})
+
+
 # ---------------------------------------------------------------------------
 # Anthropic tool definitions + dispatch
 # ---------------------------------------------------------------------------
@@ -90,7 +182,7 @@ TOOL_DEFINITIONS: List[Dict[str, Any]] = [
                 },
                 "site_id": {
                     "type": "string",
-                    "description": "Optional site identifier (currently unused).",
+                    "description": "Optional construction site (id or exact name) to restrict the search to.",
                 },
             },
             "required": ["query_text"],
@@ -110,6 +202,87 @@ TOOL_DEFINITIONS: List[Dict[str, Any]] = [
             "required": ["query_text"],
         },
     },
+    {
+        "name": "batch_item_search",
+        "description": (
+            "Search jobsite inventory and the supplier price catalog for several items at once. "
+            "Use this instead of separate inventory_search/product_price_search calls when the user names more than one item."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "queries": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "One search text per item, e.g. ['gloves', 'Kabelbinder', 'duct tape'].",
+                },
+                "site_id": {
+                    "type": "string",
+                    "description": "Optional construction site (id or exact name) to restrict the inventory side to.",
+                },
+            },
+            "required": ["queries"],
+        },
+    },
+    {
+        "name": "draft_upsert_item",
+        "description": (
+            "Add or update a line of the order draft (matched by artikel_id, else by name). "
+            "Returns the updated draft summary."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "artikel_name": {"type": "string", "description": "Item name (as said, or from the tools)."},
+                "artikel_id": {"type": "string", "description": "artikel_id from product_price_search, once known."},
+                "menge": {"type": "integer", "description": "Quantity."},
+                "einheit": {"type": "string", "description": "Unit, e.g. 'Stück' or 'Pack'."},
+                "einzelpreis": {"type": "number", "description": "Unit price from the price search."},
+                "status": {
+                    "type": "string",
+                    "enum": ["confirmed", "needs_user_confirm", "pending_clarification"],
+                },
+                "missing_fields": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "What is still unclear (for pending_clarification).",
+                },
+            },
+            "required": ["artikel_name", "status"],
+        },
+    },
+    {
+        "name": "draft_remove_item",
+        "description": "Remove a line from the order draft by artikel_id or name. Returns the updated draft summary.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "artikel_id": {"type": "string"},
+                "artikel_name": {"type": "string"},
+            },
+            "required": [],
+        },
+    },
+    {
+        "name": "draft_list",
+        "description": "List all lines of the order draft.",
+        "input_schema": {"type": "object", "properties": {}, "required": []},
+    },
+    {
+        "name": "draft_submit",
+        "description": (
+            "Place the order for all confirmed draft lines (prices are taken from the catalog). "
+            "Only call after the user confirmed the order. Other lines stay in the draft."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "polier_name": {"type": "string", "description": "Name of the foreman placing the order."},
+                "projekt_name": {"type": "string", "description": "Project / construction site the order is for."},
+            },
+            "required": ["polier_name", "projekt_name"],
+        },
+    },
     {
         "name": "get_all_product_names",
         "description": "Retrieve all distinct product names (sorted).",
@@ -149,13 +322,64 @@ TOOL_DEFINITIONS: List[Dict[str, Any]] = [
 _TOOL_DISPATCH: Mapping[str, Callable[..., Any]] = {
     "inventory_search": inventory_search,
     "product_price_search": product_price_search,
+    "batch_item_search": batch_item_search,
+    "draft_upsert_item": draft_upsert_item,
+    "draft_remove_item": draft_remove_item,
+    "draft_list": draft_list,
+    "draft_submit": draft_submit,
     "get_all_product_names": get_all_product_names,
     "get_product_prices_by_name_regex": get_product_prices_by_name_regex,
     "get_inventory_items_by_name_regex": get_inventory_items_by_name_regex,
 }
 
 
-def execute_tool(*, name: str, tool_input: Optional[Dict[str, Any]] = None) -> Any:
+# Tools whose results are memoized per conversation, with the tables they read
+# (their version stamps invalidate the memo). `get_all_product_names` is
+# already process-wide cached.
+_MEMO_TABLES: Mapping[str, Tuple[str, ...]] = {
+    "inventory_search": ("inventory", "construction_sites"),
+    "product_price_search": ("artikel",),
+    "batch_item_search": ("inventory", "construction_sites", "artikel"),
+    "get_product_prices_by_name_regex": ("artikel",),
+    "get_inventory_items_by_name_regex": ("inventory", "construction_sites"),
+}
+
+# Free-text inputs are matched case-insensitively by their tools.
+_CASEFOLD_ARGS = frozenset({"query_text", "queries"})
+
+
+def _normalize_arg(key: str, value: str) -> str:
+    value = " ".join(value.split())
+    return value.casefold() if key in _CASEFOLD_ARGS else value
+
+
+def _memo_key(name: str, kwargs: Mapping[str, Any]) -> str:
+    """`name` + input with insignificant differences (whitespace, case of free text) removed."""
+    normalized: Dict[str, Any] = {}
+    for key, value in kwargs.items():
+        if isinstance(value, str):
+            value = _normalize_arg(key, value) or None
+        elif isinstance(value, list):
+            value = [_normalize_arg(key, v) if isinstance(v, str) else v for v in value]
+        if value is not None:
+            normalized[key] = value
+    return name + ":" + json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def execute_tool(
+    *,
+    name: str,
+    tool_input: Optional[Dict[str, Any]] = None,
+    conversation_id: Optional[str] = None,
+) -> Any:
+    """
+    Run tool `name` with `tool_input`.
+
+    With a `conversation_id`, repeated calls of a memoizable tool (same
+    normalized input) within that conversation are answered from `TOOL_MEMO`
+    until a table the tool reads changes. The draft tools act on that
+    conversation's order draft and require it.
+    """
     if not isinstance(name, str) or not name.strip():
         raise ToolRuntimeError("tool name must be a non-empty string")
 
@@ -166,25 +390,117 @@ def execute_tool(*, name: str, tool_input: Optional[Dict[str, Any]] = None) -> A
     kwargs: Dict[str, Any] = tool_input or {}
     if not isinstance(kwargs, dict):
         raise ToolRuntimeError("tool_input must be an object/dict")
-
-    return fn(**kwargs)
+    if name in _DRAFT_TOOLS:
+        if not conversation_id:
+            raise ToolRuntimeError(f"{name} needs a conversation")
+        kwargs = {**kwargs, "conversation_id": conversation_id}
+
+    memo_tables = _MEMO_TABLES.get(name) if conversation_id else None
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        with span("tool.execute", tool_name=name) as tool_span:
+            if memo_tables is not None:
+                memo_key = _memo_key(name, kwargs)
+                result = TOOL_MEMO.get(conversation_id, memo_key, memo_tables)
+                if result is not MISS:
+                    tool_span.set_attribute("memo", "hit")
+                    outcome = "memo"
+                    return result
+                stamp = TOOL_MEMO.stamp(memo_tables)
+            result = fn(**kwargs)
+            if isinstance(result, list):
+                tool_span.set_attribute("result_count", len(result))
+            if memo_tables is not None:
+                TOOL_MEMO.put(conversation_id, memo_key, stamp, result)
+            outcome = "ok"
+            return result
+    finally:
+        TOOL_EXECUTION_DURATION.observe(time.perf_counter() - started, tool=name, outcome=outcome)
+
+
+# Columns each tool's rows are reduced to in its tool_result (see
+# `tool_encoding`); the rest only costs prompt tokens on every later round.
+_INVENTORY_FIELDS = ("artikel_id", "artikelname", "quantity", "construction_site")
+_PRICE_FIELDS = ("artikel_id", "artikelname", "preis_eur", "einheit", "lieferant", "gefahrgut")
+
+_RESULT_FIELDS: Mapping[str, Tuple[str, ...]] = {
+    "inventory_search": _INVENTORY_FIELDS,
+    "get_inventory_items_by_name_regex": _INVENTORY_FIELDS,
+    "product_price_search": _PRICE_FIELDS,
+    "get_product_prices_by_name_regex": _PRICE_FIELDS,
+}
 
 
-def stringify_tool_result(result: Any) -> str:
+def _encode_batch(results: List[BatchSearchRecord], max_chars: Optional[int] = None) -> str:
     """
-    Convert a tool's Python result into a stable string for Anthropic tool_result.
-    Includes a size cap to avoid runaway prompt bloat.
+    Per query: its inventory and price tables, splitting the top-k budget across
+    queries. Over `max_chars`, every table loses rows evenly (at least one is kept).
     """
-    if isinstance(result, str):
-        text = result
-    else:
-        try:
-            text = json.dumps(result, ensure_ascii=False, default=str)
-        except Exception:
-            text = str(result)
-
-    max_chars = 12_000
-    if len(text) > max_chars:
-        text = text[:max_chars] + "\n…(truncated)…"
-    return text
+    top_k = max(3, result_top_k() // max(len(results), 1))
+    max_chars = result_max_chars() if max_chars is None else max_chars
+
+    def encode(levels: List[int], _more: int) -> str:
+        rows = len(levels)
+        return dumps_compact(
+            [
+                {
+                    "query": result.pattern,
+                    "inventory": tabulate(
+                        result.inventory, fields=_INVENTORY_FIELDS, query=result.pattern,
+                        top_k=rows, total=result.inventory_total,
+                    ),
+                    "prices": tabulate(
+                        result.prices, fields=_PRICE_FIELDS, query=result.pattern,
+                        top_k=rows, total=result.prices_total,
+                    ),
+                }
+                for result in results
+            ]
+        )
+
+    # "Items" are row counts per table: keep the largest count that fits.
+    return fit_to_budget(encode, list(range(top_k)), top_k, max_chars)[0]
+
+
+def _ranking_query(tool_input: Optional[Mapping[str, Any]]) -> Optional[str]:
+    """Search text to rank rows by: `query_text`, or the words of a `name_regex`."""
+    if not isinstance(tool_input, Mapping):
+        return None
+    query_text = tool_input.get("query_text")
+    if isinstance(query_text, str) and query_text.strip():
+        return query_text
+    name_regex = tool_input.get("name_regex")
+    if isinstance(name_regex, str):
+        return " ".join(re.findall(r"\w+", name_regex)) or None
+    return None
+
+
+def stringify_tool_result(
+    result: Any,
+    *,
+    tool_name: Optional[str] = None,
+    tool_input: Optional[Mapping[str, Any]] = None,
+) -> str:
+    """
+    Convert a tool's Python result into a compact string for Anthropic tool_result.
 
+    Rows are encoded as a table (header once), reduced to the tool's columns,
+    ranked against the search text and cut to the top k with a `more` count;
+    see `tool_encoding.encode_tool_result`.
+    """
+    try:
+        if tool_name == "batch_item_search" and isinstance(result, list):
+            return _encode_batch(result)
+        return encode_tool_result(
+            result,
+            fields=_RESULT_FIELDS.get(tool_name) if tool_name else None,
+            query=_ranking_query(tool_input),
+        )
+    except Exception:
+        # An encoder bug must not fail the turn, but it must not go unnoticed
+        # or lift the size cap either.
+        logger.exception("Encoding the %s result failed; sending its repr", tool_name or "tool")
+        text = str(result)
+        max_chars = result_max_chars()
+        return text if len(text) <= max_chars else text[: max_chars - 1] + "…"
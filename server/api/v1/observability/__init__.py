@@ -0,0 +1,21 @@
+from .tracing import (
+    InMemorySpanExporter,
+    LoggingSpanExporter,
+    configure_tracing,
+    configure_tracing_from_env,
+    span,
+    start_span,
+    turn_context,
+    use_span,
+)
+
+__all__ = [
+    "InMemorySpanExporter",
+    "LoggingSpanExporter",
+    "configure_tracing",
+    "configure_tracing_from_env",
+    "span",
+    "start_span",
+    "turn_context",
+    "use_span",
+]
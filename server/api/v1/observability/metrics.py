@@ -0,0 +1,443 @@
+"""
+In-process Prometheus-style metrics.
+
+Low-overhead counters, gauges and histograms that are safe to touch on the hot
+path (a dict lookup plus a short uncontended lock per observation), rendered in
+the Prometheus text exposition format by `/metrics`.
+
+Responsibilities:
+- Metric primitives + a registry that renders them.
+- The application's metric definitions (one place to see what is exported).
+- Small helpers to time code (`Histogram.time`, `track_db_query`) and the ASGI
+  middleware that records HTTP route latency.
+
+Non-responsibilities:
+- Tracing individual turns (see `tracing.py`).
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Seconds; tuned for API latencies (1 ms … 30 s).
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape_label(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        if not self.labelnames and self.kind in ("counter", "gauge"):
+            # Unlabelled series are exported as 0 before the first update.
+            self._children[()] = 0.0
+
+    def _label_values(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+        return header + "".join(line + "\n" for line in self._samples())
+
+
+class Counter(_Metric):
+    """Monotonically increasing value, optionally per label set."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._children[key] = self._children.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._children.get(self._label_values(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._children.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down; may be computed at scrape time via `set_function`."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._children[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._children[key] = self._children.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        """Compute the (unlabelled) value lazily on each scrape."""
+        self._function = fn
+
+    def value(self, **labels: Any) -> float:
+        if self._function is not None and not self.labelnames:
+            return float(self._function())
+        return self._children.get(self._label_values(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        if self._function is not None:
+            try:
+                return [f"{self.name} {_format_value(float(self._function()))}"]
+            except Exception:
+                return []
+        with self._lock:
+            items = list(self._children.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class _HistogramChild:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, n_buckets: int) -> None:
+        self.counts = [0] * n_buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """Bucketed distribution (cumulative buckets are computed at render time)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._label_values(labels)
+        # Index of the first bucket with upper bound >= value (+Inf is the last slot).
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = _HistogramChild(len(self.buckets) + 1)
+            child.counts[idx] += 1
+            child.sum += value
+            child.count += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def snapshot(self, **labels: Any) -> Tuple[int, float]:
+        """Return (count, sum) for a label set."""
+        child = self._children.get(self._label_values(labels))
+        if child is None:
+            return 0, 0.0
+        return child.count, child.sum
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(c.counts), c.sum, c.count) for k, c in self._children.items()]
+        lines: List[str] = []
+        bounds = list(self.buckets) + [math.inf]
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, n in zip(bounds, counts):
+                cumulative += n
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "".join(m.render() for m in metrics)
+
+
+REGISTRY = MetricsRegistry()
+
+# ---------------------------------------------------------------------------
+# Application metrics
+# ---------------------------------------------------------------------------
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+DB_QUERY_DURATION = REGISTRY.histogram(
+    "db_query_duration_seconds",
+    "Time spent in DB-backed service/data-access functions.",
+    ("function",),
+)
+TOOL_EXECUTION_DURATION = REGISTRY.histogram(
+    "tool_execution_duration_seconds",
+    "Agent tool execution time by tool name.",
+    ("tool", "outcome"),
+)
+ANTHROPIC_REQUEST_DURATION = REGISTRY.histogram(
+    "anthropic_request_duration_seconds",
+    "Latency of a single Anthropic messages.create round trip.",
+    ("model", "outcome"),
+)
+ANTHROPIC_ROUNDS_PER_TURN = REGISTRY.histogram(
+    "anthropic_rounds_per_turn",
+    "Anthropic round trips (tool-loop iterations) needed per turn.",
+    buckets=(1, 2, 3, 4, 5, 6, 8, 10),
+)
+ANTHROPIC_TOKENS = REGISTRY.counter(
+    "anthropic_tokens_total",
+    "Anthropic tokens consumed, by direction.",
+    ("direction",),
+)
+ANTHROPIC_RETRIES = REGISTRY.counter(
+    "anthropic_retries_total",
+    "Anthropic requests retried after a retryable error, by error type.",
+    ("reason",),
+)
+ANTHROPIC_HEDGED_REQUESTS = REGISTRY.counter(
+    "anthropic_hedged_requests_total",
+    "Hedged duplicate Anthropic requests sent, and how many of them won the race.",
+    ("result",),
+)
+ANTHROPIC_CIRCUIT_OPEN = REGISTRY.gauge(
+    "anthropic_circuit_open",
+    "1 while the Anthropic circuit breaker is open or half-open, else 0.",
+)
+ANTHROPIC_CIRCUIT_REJECTIONS = REGISTRY.counter(
+    "anthropic_circuit_rejections_total",
+    "Anthropic requests failed fast because the circuit breaker was open.",
+)
+MODEL_ROUTE_TURN_DURATION = REGISTRY.histogram(
+    "model_route_turn_duration_seconds",
+    "Duration of completed Claude turns (all tool rounds) by routing decision.",
+    ("route", "model"),
+)
+MODEL_ROUTE_TOKENS = REGISTRY.counter(
+    "model_route_tokens_total",
+    "Anthropic tokens consumed by routing decision and direction.",
+    ("route", "model", "direction"),
+)
+MODEL_ROUTE_COST = REGISTRY.counter(
+    "model_route_cost_usd_total",
+    "Estimated Anthropic cost in USD by routing decision.",
+    ("route", "model"),
+)
+TTS_TIME_TO_FIRST_AUDIO = REGISTRY.histogram(
+    "tts_time_to_first_audio_seconds",
+    "Time from the first text chunk sent to ElevenLabs to the first audio chunk received.",
+)
+WS_INTERRUPT_TO_SILENCE = REGISTRY.histogram(
+    "ws_interrupt_to_silence_seconds",
+    "Time from a stream cancellation request until upstream work stopped.",
+    ("reason",),
+)
+WS_OUTBOUND_MAX_QUEUE_DEPTH = REGISTRY.histogram(
+    "ws_outbound_max_queue_depth",
+    "Per-connection high-water mark of the outbound frame queues.",
+    ("queue",),
+    buckets=(0, 1, 2, 4, 8, 16, 32, 64, 128),
+)
+WS_SESSIONS_ACTIVE = REGISTRY.gauge(
+    "ws_sessions_active",
+    "Open assistant WebSocket sessions.",
+)
+SCRIBE_SESSIONS_ACTIVE = REGISTRY.gauge(
+    "scribe_sessions_active",
+    "Open Scribe (speech-to-text) bridge sessions.",
+)
+HISTORY_CONVERSATIONS = REGISTRY.gauge(
+    "history_store_conversations",
+    "Conversations held in the in-memory message history store.",
+)
+HISTORY_MESSAGES = REGISTRY.gauge(
+    "history_store_messages",
+    "Messages held in the in-memory message history store.",
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "cache_requests_total",
+    "Read-through cache lookups by result (hit, miss, coalesced).",
+    ("cache", "result"),
+)
+CACHE_ENTRIES = REGISTRY.gauge(
+    "cache_entries",
+    "Entries currently held per read-through cache.",
+    ("cache",),
+)
+CACHE_INVALIDATIONS = REGISTRY.counter(
+    "cache_invalidations_total",
+    "Explicit read-through cache invalidations.",
+    ("cache",),
+)
+DB_CHANGE_NOTIFICATIONS = REGISTRY.counter(
+    "db_change_notifications_total",
+    "Postgres table-change notifications received by the change listener.",
+    ("table",),
+)
+DB_CHANGE_LISTENER_CONNECTED = REGISTRY.gauge(
+    "db_change_listener_connected",
+    "1 while the change listener holds a LISTEN connection, else 0.",
+)
+ORDER_EVENTS_PUBLISHED = REGISTRY.counter(
+    "order_events_published_total",
+    "Order dashboard events published, by event type.",
+    ("type",),
+)
+ORDER_EVENT_SUBSCRIBERS = REGISTRY.gauge(
+    "order_event_subscribers",
+    "Dashboard clients currently streaming order events.",
+)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def track_db_query(function: Optional[str] = None) -> Callable[[F], F]:
+    """Decorator: observe the wrapped (sync) function's duration in `db_query_duration_seconds`."""
+
+    def decorator(fn: F) -> F:
+        label = function or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                DB_QUERY_DURATION.observe(time.perf_counter() - started, function=label)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+class HttpMetricsMiddleware:
+    """
+    Pure ASGI middleware recording `http_request_duration_seconds`.
+
+    Labels use the matched route template (e.g. `/api/v1/bestellungen/{order_id}`)
+    to keep cardinality bounded; unmatched paths are reported as `unmatched`.
+    """
+
+    def __init__(self, app: Any, *, exclude_paths: Sequence[str] = ("/metrics",)) -> None:
+        self.app = app
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope.get("type") != "http" or scope.get("path") in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_holder = {"status": 500}
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message.get("type") == "http.response.start":
+                status_holder["status"] = message.get("status", 500)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=scope.get("method", ""),
+                route=template,
+                status=status_holder["status"],
+            )
+
+
+def render_latest() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,360 @@
+"""
+Span-based latency tracing for voice turns.
+
+This module is deliberately dependency-free and cheap when disabled, so it can
+be called from every layer (WebSocket service, Claude service, agent, tool
+runtime, TTS) without caring whether tracing is on.
+
+Model (OpenTelemetry-compatible):
+- A *trace* is one voice turn. Its id is derived from (conversation_id, turn),
+  so spans recorded in different tasks/threads of the same turn line up.
+- A *span* is a timed stage (Claude round, tool call, DB query, TTS first byte…)
+  with attributes. Parent/child links follow `contextvars`, which asyncio tasks
+  and `asyncio.to_thread` both propagate.
+- *Span processors* receive started/finished spans. By default there are none,
+  and `span()` returns a shared no-op object.
+
+Processors:
+- `InMemorySpanExporter`: keeps finished spans in memory (tests, debugging).
+- `LoggingSpanExporter`: one structured log line per finished span.
+- `OpenTelemetrySpanProcessor`: mirrors spans into the OpenTelemetry API
+  (only if `opentelemetry-api` is installed; configure an SDK to export).
+
+Configuration: `configure_tracing_from_env()` reads `TRACING_EXPORTER`
+(`none` | `log` | `memory` | `otel`, comma-separated for several).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Attribute names shared by every span of a turn.
+ATTR_CONVERSATION_ID = "conversation.id"
+ATTR_TURN_NUMBER = "turn.number"
+
+
+class Span:
+    """A live (or finished) span. Mutate via `set_attribute`/`record_exception`."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent",
+        "attributes",
+        "start_time_ns",
+        "end_time_ns",
+        "status",
+        "error",
+        "_impl",
+    )
+
+    def __init__(self, name: str, trace_id: str, parent: Optional["Span"], attributes: Dict[str, Any]) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent = parent
+        self.attributes = attributes
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: Optional[int] = None
+        self.status = "ok"
+        self.error: Optional[str] = None
+        # Slot for processors that shadow this span (e.g. the OpenTelemetry span).
+        self._impl: Any = None
+
+    @property
+    def parent_span_id(self) -> Optional[str]:
+        return self.parent.span_id if self.parent is not None else None
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_time_ns is None:
+            return None
+        return (self.end_time_ns - self.start_time_ns) / 1_000_000.0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def record_exception(self, exc: BaseException) -> None:
+        # Cancellation (barge-in, restarted idle timer) is expected, not a failure.
+        self.status = "cancelled" if isinstance(exc, asyncio.CancelledError) else "error"
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    def end(self) -> None:
+        if self.end_time_ns is not None:
+            return
+        self.end_time_ns = time.time_ns()
+        for processor in _processors:
+            try:
+                processor.on_end(self)
+            except Exception:
+                logger.debug("Span processor failed on_end", exc_info=True)
+
+    def __repr__(self) -> str:
+        return f"Span(name={self.name!r}, duration_ms={self.duration_ms}, attributes={self.attributes!r})"
+
+
+class _NoopSpan:
+    """Returned when tracing is disabled; every method is a no-op."""
+
+    __slots__ = ()
+    name = ""
+    attributes: Dict[str, Any] = {}
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class SpanProcessor:
+    """Hook interface; mirrors OpenTelemetry's SpanProcessor."""
+
+    def on_start(self, span: Span) -> None:
+        pass
+
+    def on_end(self, span: Span) -> None:
+        pass
+
+
+class InMemorySpanExporter(SpanProcessor):
+    """Collects finished spans in process (for tests and local debugging)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._spans: List[Span] = []
+
+    def on_end(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def get_finished_spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class LoggingSpanExporter(SpanProcessor):
+    """Logs one line per finished span (grep-able by conversation/turn)."""
+
+    def on_end(self, span: Span) -> None:
+        logger.info(
+            "span name=%s duration_ms=%.1f status=%s trace=%s attrs=%s",
+            span.name,
+            span.duration_ms or 0.0,
+            span.status,
+            span.trace_id,
+            span.attributes,
+        )
+
+
+class OpenTelemetrySpanProcessor(SpanProcessor):
+    """
+    Mirror spans into the OpenTelemetry API.
+
+    Requires `opentelemetry-api`; exporting is up to whatever SDK/exporter the
+    deployment configures (without an SDK the OpenTelemetry API is a no-op).
+    """
+
+    def __init__(self, tracer_name: str = "cmats.voice") -> None:
+        from opentelemetry import trace as otel_trace  # optional dependency
+
+        self._otel_trace = otel_trace
+        self._tracer = otel_trace.get_tracer(tracer_name)
+
+    def on_start(self, span: Span) -> None:
+        context = None
+        parent_impl = span.parent._impl if span.parent is not None else None
+        if parent_impl is not None:
+            context = self._otel_trace.set_span_in_context(parent_impl)
+        span._impl = self._tracer.start_span(
+            span.name,
+            context=context,
+            attributes=_otel_attributes(span.attributes),
+            start_time=span.start_time_ns,
+        )
+
+    def on_end(self, span: Span) -> None:
+        impl = span._impl
+        if impl is None:
+            return
+        impl.set_attributes(_otel_attributes(span.attributes))
+        if span.status == "error":
+            impl.set_status(self._otel_trace.Status(self._otel_trace.StatusCode.ERROR, span.error))
+        impl.end(end_time=span.end_time_ns)
+
+
+def _otel_attributes(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    # OpenTelemetry only accepts primitive attribute values.
+    return {
+        k: v if isinstance(v, (str, bool, int, float)) else str(v)
+        for k, v in attributes.items()
+        if v is not None
+    }
+
+
+# ---------------------------------------------------------------------------
+# Global configuration
+# ---------------------------------------------------------------------------
+
+_processors: Tuple[SpanProcessor, ...] = ()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+# (conversation_id, turn_number, trace_id) for the turn being processed.
+_turn: ContextVar[Optional[Tuple[str, int, str]]] = ContextVar("trace_turn", default=None)
+
+
+def configure_tracing(*processors: SpanProcessor) -> None:
+    """Replace the active span processors (no arguments disables tracing)."""
+    global _processors
+    _processors = tuple(processors)
+
+
+def tracing_enabled() -> bool:
+    return bool(_processors)
+
+
+def configure_tracing_from_env() -> Sequence[SpanProcessor]:
+    """Configure processors from `TRACING_EXPORTER`; returns the active processors."""
+    raw = (os.getenv("TRACING_EXPORTER") or "none").strip().lower()
+    processors: List[SpanProcessor] = []
+    for name in (p.strip() for p in raw.split(",") if p.strip()):
+        if name == "none":
+            continue
+        if name == "log":
+            processors.append(LoggingSpanExporter())
+        elif name == "memory":
+            processors.append(InMemorySpanExporter())
+        elif name == "otel":
+            try:
+                processors.append(OpenTelemetrySpanProcessor())
+            except ImportError:
+                logger.warning("TRACING_EXPORTER=otel but opentelemetry-api is not installed; skipping")
+        else:
+            logger.warning("Unknown TRACING_EXPORTER entry: %s", name)
+    configure_tracing(*processors)
+    return processors
+
+
+# ---------------------------------------------------------------------------
+# Turn context + span creation
+# ---------------------------------------------------------------------------
+
+def trace_id_for_turn(conversation_id: str, turn_number: int) -> str:
+    """Stable 128-bit trace id for a (conversation, turn) pair."""
+    return hashlib.sha256(f"{conversation_id}:{turn_number}".encode("utf-8")).hexdigest()[:32]
+
+
+@contextmanager
+def turn_context(conversation_id: str, turn_number: int) -> Iterator[None]:
+    """Mark everything in this (task) context as belonging to one voice turn."""
+    token = _turn.set((conversation_id, turn_number, trace_id_for_turn(conversation_id, turn_number)))
+    span_token = _current_span.set(None)
+    try:
+        yield
+    finally:
+        _current_span.reset(span_token)
+        _turn.reset(token)
+
+
+def current_turn() -> Optional[Tuple[str, int]]:
+    """Return (conversation_id, turn_number) of the active turn, if any."""
+    turn = _turn.get()
+    return (turn[0], turn[1]) if turn is not None else None
+
+
+def _new_span(name: str, attributes: Dict[str, Any]) -> Span:
+    parent = _current_span.get()
+    turn = _turn.get()
+    if turn is not None:
+        attributes.setdefault(ATTR_CONVERSATION_ID, turn[0])
+        attributes.setdefault(ATTR_TURN_NUMBER, turn[1])
+        trace_id = turn[2]
+    elif parent is not None:
+        trace_id = parent.trace_id
+    else:
+        trace_id = secrets.token_hex(16)
+
+    new = Span(name, trace_id, parent, attributes)
+    for processor in _processors:
+        try:
+            processor.on_start(new)
+        except Exception:
+            logger.debug("Span processor failed on_start", exc_info=True)
+    return new
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Time the enclosed block as a child of the current span.
+
+    Do not hold a `span()` open across a `yield` in an async generator: the
+    context would leak into the consumer. Use `start_span()` there instead.
+    """
+    if not _processors:
+        yield NOOP_SPAN
+        return
+
+    current = _new_span(name, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+def start_span(name: str, **attributes: Any) -> Any:
+    """
+    Start a span without making it current; the caller must call `.end()`.
+
+    Use for stages that cross `yield`s (streaming generators), e.g. TTS time to
+    first audio.
+    """
+    if not _processors:
+        return NOOP_SPAN
+    return _new_span(name, attributes)
+
+
+@contextmanager
+def use_span(current: Any) -> Iterator[Any]:
+    """Make a span started with `start_span()` the parent of spans in this block."""
+    if not isinstance(current, Span):
+        yield current
+        return
+    token = _current_span.set(current)
+    try:
+        yield current
+    finally:
+        _current_span.reset(token)
@@ -1,13 +1,18 @@
 import logging
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
 from typing import List, Dict, Optional
-from ..services.artikel_service import get_all_artikel, get_alternative_products
+from .conditional import not_modified
+from .exports import streaming_export
+from ..serialization import FastJSONResponse
+from ..services.artikel_service import get_all_artikel, get_alternative_products, get_cheapest_artikel
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/artikel", tags=["artikel"])
 
-@router.get("/", response_model=List[Dict])
+@router.get("/", response_model=List[Dict], response_class=FastJSONResponse)
 async def get_all_articles(
+    request: Request,
+    response: Response,
     search: Optional[str] = Query(None, description="Search term for artikelname or lieferant"),
     category: Optional[str] = Query(None, description="Filter by category (kategorie)")
 ):
@@ -17,7 +22,13 @@ async def get_all_articles(
     Query Parameters:
         search: Optional search term to filter by artikelname or lieferant
         category: Optional category to filter by kategorie
+
+    Supports conditional GET (ETag / Last-Modified); unchanged data returns 304.
     """
+    cached = not_modified(request, response, ("artikel", "construction_sites"))
+    if cached is not None:
+        return cached
+
     # Filter out empty strings
     search = search.strip() if search and search.strip() else None
     category = category.strip() if category and category.strip() else None
@@ -25,16 +36,23 @@ async def get_all_articles(
     logger.info(f"Fetching articles with search='{search}', category='{category}'")
     articles = get_all_artikel(search=search, category=category)
     logger.info(f"Returning {len(articles)} articles")
-    return articles
+    return FastJSONResponse(articles, headers=response.headers)
+
 
+@router.get("/export")
+async def export_articles(format: str = Query("ndjson", description="ndjson or csv")):
+    """Stream the full catalog as NDJSON (default) or CSV, without loading it into memory."""
+    return await streaming_export("artikel", format)
 
-@router.get("/alternatives/{artikelname}", response_model=List[Dict])
+
+@router.get("/alternatives/{artikelname}", response_model=List[Dict], response_class=FastJSONResponse)
 async def get_alternatives(
     artikelname: str,
     exclude_id: Optional[str] = Query(None, description="Artikel ID to exclude from alternatives")
 ):
     """
-    Get alternative products with the same name but different supplier.
+    Get equivalent products (same product group, e.g. Sicherheitsbrille /
+    Schutzbrille) from any supplier, cheapest first.
     
     Query Parameters:
         exclude_id: Optional artikel_id to exclude from results
@@ -42,4 +60,13 @@ async def get_alternatives(
     logger.info(f"Fetching alternatives for '{artikelname}'")
     alternatives = get_alternative_products(artikelname, exclude_id)
     logger.info(f"Found {len(alternatives)} alternatives")
-    return alternatives
+    return FastJSONResponse(alternatives)
+
+
+@router.get("/cheapest/{artikelname}", response_class=FastJSONResponse)
+async def get_cheapest(artikelname: str):
+    """Get the cheapest priced article of the product group `artikelname` belongs to."""
+    artikel = get_cheapest_artikel(artikelname)
+    if artikel is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No priced article found")
+    return FastJSONResponse(artikel)
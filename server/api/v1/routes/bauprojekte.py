@@ -4,11 +4,14 @@ Bauprojekte (Construction Projects) Routes
 Admin endpoints for managing construction projects
 """
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, Response, status
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import date
+from ..data_access.cache import invalidate_tables
 from ..data_access.database import get_db_connection
+from ..serialization import FastJSONResponse
+from .conditional import not_modified
 
 router = APIRouter(prefix="/bauprojekte", tags=["bauprojekte"])
 
@@ -31,9 +34,12 @@ class BauprojektUpdate(BaseModel):
     status: Optional[str] = None
 
 
-@router.get("/")
-async def get_all_bauprojekte(status: Optional[str] = None):
-    """Get all construction projects, optionally filtered by status"""
+@router.get("/", response_class=FastJSONResponse)
+async def get_all_bauprojekte(request: Request, response: Response, status: Optional[str] = None):
+    """Get all construction projects, optionally filtered by status (conditional GET: 304 if unchanged)"""
+    cached = not_modified(request, response, ("bauprojekte",))
+    if cached is not None:
+        return cached
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
@@ -49,21 +55,12 @@ async def get_all_bauprojekte(status: Optional[str] = None):
         projects = []
         for row in cursor.fetchall():
             project = dict(zip(columns, row))
-            # Convert dates to ISO format
-            if project.get('start_date'):
-                project['start_date'] = project['start_date'].isoformat()
-            if project.get('end_date'):
-                project['end_date'] = project['end_date'].isoformat()
-            if project.get('created_at'):
-                project['created_at'] = project['created_at'].isoformat()
-            if project.get('updated_at'):
-                project['updated_at'] = project['updated_at'].isoformat()
             projects.append(project)
         
         cursor.close()
         conn.close()
         
-        return {"projects": projects}
+        return FastJSONResponse({"projects": projects}, headers=response.headers)
     
     except Exception as e:
         raise HTTPException(
@@ -93,16 +90,6 @@ async def get_bauprojekt(projekt_id: int):
         columns = [desc[0] for desc in cursor.description]
         project = dict(zip(columns, row))
         
-        # Convert dates to ISO format
-        if project.get('start_date'):
-            project['start_date'] = project['start_date'].isoformat()
-        if project.get('end_date'):
-            project['end_date'] = project['end_date'].isoformat()
-        if project.get('created_at'):
-            project['created_at'] = project['created_at'].isoformat()
-        if project.get('updated_at'):
-            project['updated_at'] = project['updated_at'].isoformat()
-        
         cursor.close()
         conn.close()
         
@@ -144,18 +131,11 @@ async def create_bauprojekt(projekt: BauprojektCreate):
         
         row = cursor.fetchone()
         conn.commit()
+        invalidate_tables("bauprojekte")
         
         columns = [desc[0] for desc in cursor.description]
         new_project = dict(zip(columns, row))
         
-        # Convert dates to ISO format
-        if new_project.get('start_date'):
-            new_project['start_date'] = new_project['start_date'].isoformat()
-        if new_project.get('end_date'):
-            new_project['end_date'] = new_project['end_date'].isoformat()
-        if new_project.get('created_at'):
-            new_project['created_at'] = new_project['created_at'].isoformat()
-        
         cursor.close()
         conn.close()
         
@@ -226,18 +206,11 @@ async def update_bauprojekt(projekt_id: int, projekt: BauprojektUpdate):
             )
         
         conn.commit()
+        invalidate_tables("bauprojekte")
         
         columns = [desc[0] for desc in cursor.description]
         updated_project = dict(zip(columns, row))
         
-        # Convert dates to ISO format
-        if updated_project.get('start_date'):
-            updated_project['start_date'] = updated_project['start_date'].isoformat()
-        if updated_project.get('end_date'):
-            updated_project['end_date'] = updated_project['end_date'].isoformat()
-        if updated_project.get('updated_at'):
-            updated_project['updated_at'] = updated_project['updated_at'].isoformat()
-        
         cursor.close()
         conn.close()
         
@@ -271,6 +244,7 @@ async def delete_bauprojekt(projekt_id: int):
             )
         
         conn.commit()
+        invalidate_tables("bauprojekte")
         cursor.close()
         conn.close()
         
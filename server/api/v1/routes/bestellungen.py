@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
 from fastapi import Query
+from fastapi.responses import StreamingResponse
 from typing import List, Dict, Optional
 from pydantic import BaseModel
 from ..services.bestellungen_service import get_all_bestellungen_with_items, create_bestellung, update_bestellung_status
+from ..services.order_events_service import stream_order_events
+from ..serialization import FastJSONResponse
+from .exports import streaming_export
 from ..data_access.database import get_db_connection
 import json
 from datetime import datetime
@@ -25,12 +29,12 @@ class OrderCreate(BaseModel):
     erstellt_von: Optional[str] = None
 
 
-@router.get("/")
+@router.get("/", response_class=FastJSONResponse)
 async def get_all_orders():
     """Get all orders with their details"""
     try:
         orders = get_all_bestellungen_with_items()
-        return orders
+        return FastJSONResponse(orders)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -38,7 +42,36 @@ async def get_all_orders():
         )
 
 
-@router.get("/{order_id}")
+@router.get("/events")
+async def order_events(request: Request, last_event_id: Optional[str] = Query(None)):
+    """
+    Live order events for the admin dashboard (server-sent events).
+
+    Event types: order-created, status-changed, order-updated, order-deleted,
+    item-changed, and resync (re-fetch the list). Reconnecting clients resume
+    via the Last-Event-ID header (sent automatically by EventSource) or the
+    `last_event_id` query parameter.
+    """
+    resume_from = request.headers.get("last-event-id") or last_event_id
+    return StreamingResponse(
+        stream_order_events(resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/export")
+async def export_orders(format: str = Query("ndjson", description="ndjson or csv")):
+    """
+    Stream all orders with their positions, without loading them into memory.
+
+    NDJSON: one order per line with `bestellpositionen` nested.
+    CSV: one row per position, order columns repeated.
+    """
+    return await streaming_export("bestellungen", format)
+
+
+@router.get("/{order_id}", response_class=FastJSONResponse)
 async def get_order(order_id: str):
     """Get a specific order by ID"""
     try:
@@ -51,7 +84,7 @@ async def get_order(order_id: str):
                 detail="Order not found"
             )
         
-        return order
+        return FastJSONResponse(order)
     
     except HTTPException:
         raise
@@ -141,13 +174,13 @@ async def reject_order(order_id: str, genehmigt_von: Optional[str] = None, admin
     return await update_order_status(order_id, 'rejected', genehmigt_von, admin_notizen)
 
 
-@router.get("/pending")
+@router.get("/pending", response_class=FastJSONResponse)
 async def get_pending_orders():
     """Get all orders that require approval (status=pending)"""
     try:
         all_orders = get_all_bestellungen_with_items()
         pending_orders = [order for order in all_orders if order['status'] == 'pending']
-        return {"orders": pending_orders, "count": len(pending_orders)}
+        return FastJSONResponse({"orders": pending_orders, "count": len(pending_orders)})
     
     except Exception as e:
         raise HTTPException(
@@ -0,0 +1,111 @@
+"""
+Conditional GET (ETag / Last-Modified) for collection endpoints.
+
+Validators come from the trigger-maintained `table_versions` counters, so the
+check costs one cached primary-key lookup. An unchanged collection is answered
+with `304 Not Modified` before the route runs its query or serializes rows.
+
+Usage in a route:
+
+    @router.get("/")
+    async def list_things(request: Request, response: Response):
+        cached = not_modified(request, response, ("things",))
+        if cached is not None:
+            return cached
+        ...
+
+Validators are weak ETags (`W/"1.artikel.42.construction_sites.7"`): the
+version of every table the response is built from. Filtered variants of a URL
+share them, which is fine because clients revalidate per URL.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Sequence
+
+from fastapi import Request, Response
+
+from ..data_access.database.table_versions import TableVersion, get_table_versions
+
+# Bump when the JSON these routes return changes shape, so clients holding an
+# old body don't keep revalidating it as current.
+ETAG_FORMAT_VERSION = 1
+
+
+def _etag(versions: Sequence[TableVersion]) -> str:
+    parts = [str(ETAG_FORMAT_VERSION)]
+    for v in versions:
+        parts.extend((v.table, str(v.version)))
+    return 'W/"' + ".".join(parts) + '"'
+
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: ignore W/ prefixes.
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def _not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole-second resolution.
+    return last_modified.replace(microsecond=0) <= since
+
+
+def validators_for(tables: Sequence[str]) -> Optional[Dict[str, str]]:
+    """ETag / Last-Modified / Cache-Control headers for a response built from `tables`."""
+    versions = get_table_versions(tables)
+    if not versions:
+        return None
+    return {
+        "ETag": _etag(versions),
+        "Last-Modified": _http_date(max(v.changed_at for v in versions)),
+        # Cache, but revalidate before every reuse.
+        "Cache-Control": "no-cache",
+    }
+
+
+def not_modified(request: Request, response: Response, tables: Sequence[str]) -> Optional[Response]:
+    """
+    Return a 304 response if the client's copy is current; otherwise add the
+    validators to `response` and return `None` (build the full response).
+    """
+    headers = validators_for(tables)
+    if headers is None:
+        return None
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2).
+        fresh = _etag_matches(if_none_match, headers["ETag"])
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        fresh = if_modified_since is not None and _not_modified_since(
+            if_modified_since, parsedate_to_datetime(headers["Last-Modified"])
+        )
+    if fresh:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
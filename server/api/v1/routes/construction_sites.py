@@ -1,21 +1,26 @@
 import logging
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, Response, status
 from typing import List, Dict
+from ..serialization import FastJSONResponse
 from ..services.construction_sites_service import get_all_construction_sites
+from .conditional import not_modified
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/construction-sites", tags=["construction-sites"])
 
-@router.get("/", response_model=List[Dict])
-async def get_all_construction_sites_endpoint():
+@router.get("/", response_model=List[Dict], response_class=FastJSONResponse)
+async def get_all_construction_sites_endpoint(request: Request, response: Response):
     """
-    Get all construction sites from the database.
+    Get all construction sites from the database (conditional GET: 304 if unchanged).
     """
+    cached = not_modified(request, response, ("construction_sites",))
+    if cached is not None:
+        return cached
     try:
         logger.info("Fetching all construction sites")
         sites = get_all_construction_sites()
         logger.info(f"Returning {len(sites)} construction sites")
-        return sites
+        return FastJSONResponse(sites, headers=response.headers)
     except Exception as e:
         logger.error(f"Failed to fetch construction sites: {str(e)}")
         raise HTTPException(
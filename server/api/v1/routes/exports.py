@@ -0,0 +1,44 @@
+"""
+Shared handler for the streaming export endpoints
+(`/artikel/export`, `/inventory/export`, `/bestellungen/export`).
+
+The first chunk is produced before the response starts, so a failing query
+still yields a proper 500 instead of a truncated 200 stream.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from ..services.export_service import export_chunks
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+async def streaming_export(name: str, fmt: str) -> StreamingResponse:
+    if fmt not in MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Must be one of: {', '.join(MEDIA_TYPES)}",
+        )
+    chunks = export_chunks(name, fmt)
+    try:
+        first = await run_in_threadpool(next, chunks, b"")
+    except Exception as e:
+        logger.error(f"Export of {name} failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to export {name}: {str(e)}",
+        )
+    return StreamingResponse(
+        itertools.chain((first,), chunks),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
@@ -1,11 +1,36 @@
-from fastapi import APIRouter
-from typing import List, Dict
-from ..services.inventory_service import get_all_inventory
+from fastapi import APIRouter, Query, Request, Response
+from typing import List, Dict, Optional
+from ..serialization import FastJSONResponse
+from ..services.inventory_service import get_all_inventory, get_site_stock
+from .conditional import not_modified
+from .exports import streaming_export
 
 router = APIRouter(prefix="/inventory", tags=["inventory"])
 
-@router.get("/", response_model=List[Dict])
-async def get_all_inventory_items():
-    """Get all inventory items from the database."""
-    items = get_all_inventory()
-    return items
+@router.get("/", response_model=List[Dict], response_class=FastJSONResponse)
+async def get_all_inventory_items(
+    request: Request,
+    response: Response,
+    site_id: Optional[int] = Query(None, description="Only stock at this construction site (id)"),
+):
+    """Get inventory items, optionally for one construction site (conditional GET: 304 if unchanged)."""
+    cached = not_modified(request, response, ("inventory",))
+    if cached is not None:
+        return cached
+    items = get_all_inventory(site_id=site_id)
+    return FastJSONResponse(items, headers=response.headers)
+
+
+@router.get("/sites", response_model=List[Dict], response_class=FastJSONResponse)
+async def get_inventory_per_site(request: Request, response: Response):
+    """Stock totals per construction site: artikel count, total quantity, out-of-stock count."""
+    cached = not_modified(request, response, ("inventory", "construction_sites"))
+    if cached is not None:
+        return cached
+    return FastJSONResponse(get_site_stock(), headers=response.headers)
+
+
+@router.get("/export")
+async def export_inventory(format: str = Query("ndjson", description="ndjson or csv")):
+    """Stream all inventory items as NDJSON (default) or CSV, without loading them into memory."""
+    return await streaming_export("inventory", format)
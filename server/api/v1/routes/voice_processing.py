@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+from ..services.utterance_parser_service import parse_order_utterance
 
 router = APIRouter(prefix="/websocket", tags=["voice"])
 
@@ -17,6 +18,8 @@ class OrderItem(BaseModel):
 
 class VoiceTranscriptResponse(BaseModel):
     orderItem: OrderItem | None = None
+    orderItems: list[OrderItem] = []
+    confidence: float | None = None
     message: str | None = None
 
 
@@ -24,26 +27,37 @@ class VoiceTranscriptResponse(BaseModel):
 async def process_voice_transcript(request: VoiceTranscriptRequest) -> VoiceTranscriptResponse:
     """
     Process voice transcript and extract order items.
-    
-    This endpoint receives transcribed text from the frontend and uses NLP
-    to identify products and quantities mentioned in the speech.
+
+    Quantities (digits or German/English number words), units and product
+    names are resolved locally against the catalog, without a model call.
+    `orderItems` lists every resolved item, `orderItem` is the first one, and
+    `confidence` is 1.0 for exact catalog names (lower when something was
+    guessed or is missing, e.g. "ein paar Handschuhe").
     """
-    transcript = request.transcript.strip().lower()
-    
+    transcript = request.transcript.strip()
+
     if not transcript:
         return VoiceTranscriptResponse(message="Empty transcript")
-    
-    # TODO: Implement actual NLP processing here
-    # For now, return a placeholder response
-    # In production, this should:
-    # 1. Parse the transcript for product names and quantities
-    # 2. Match products against the inventory database
-    # 3. Extract quantities and units
-    # 4. Return structured order items
-    
-    # Placeholder logic - detect simple patterns
-    # Example: "5 säcke zement" or "10 meter kabel"
-    
+
+    parsed = parse_order_utterance(transcript)
+    items = [
+        OrderItem(
+            productId=line.artikel.artikel_id,
+            name=line.artikel.artikelname,
+            quantity=line.quantity,
+            unit=line.unit or line.artikel.einheit or "",
+        )
+        for line in parsed.lines
+        if line.artikel is not None and line.quantity
+    ]
+    unresolved = [line.product for line in parsed.lines if line.artikel is None or not line.quantity]
+    message = f"Could not resolve: {', '.join(unresolved)}" if unresolved else None
+    if not parsed.lines:
+        message = "No order items recognized"
+
     return VoiceTranscriptResponse(
-        message=f"Processed transcript: {transcript}"
+        orderItem=items[0] if items else None,
+        orderItems=items,
+        confidence=parsed.confidence if parsed.lines else None,
+        message=message,
     )
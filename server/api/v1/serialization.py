@@ -0,0 +1,85 @@
+"""
+JSON serialization for API responses (shared by routes and services).
+
+Rows come out of psycopg2 holding `Decimal`, `date` and `datetime` values.
+FastAPI's default path walks every value through `jsonable_encoder` before
+`json.dumps`, which dominates response time on large listings. This module
+encodes them in one pass with orjson instead.
+
+Responsibilities:
+- `dumps(obj) -> bytes`: orjson with a fallback hook for the types orjson
+  doesn't know natively (`Decimal` -> number, sets -> lists, row `Record`s
+  -> objects).
+- `FastJSONResponse`: a `JSONResponse` rendering with `dumps`. Return it from
+  a route directly, because FastAPI runs `jsonable_encoder` on anything else
+  first.
+
+Output matches FastAPI's default encoding for the same rows: `Decimal('12.50')`
+becomes `12.5`, integral decimals become ints, and dates/datetimes are ISO 8601.
+
+Without orjson installed, `dumps` falls back to the standard library (same
+output, just slower).
+"""
+
+from __future__ import annotations
+
+import datetime as _dt
+import json
+import uuid
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from .data_access.records import Record
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is a declared dependency
+    orjson = None  # type: ignore[assignment]
+
+
+def _decimal(value: Decimal) -> Any:
+    # Same rule as fastapi.encoders.decimal_encoder.
+    if value.is_finite() and value.as_tuple().exponent >= 0:  # type: ignore[operator]
+        return int(value)
+    return float(value)
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    if isinstance(obj, Decimal):
+        return _decimal(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_default(obj: Any) -> Any:
+    if isinstance(obj, (_dt.datetime, _dt.date, _dt.time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    return _default(obj)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        """Serialize `obj` to compact UTF-8 JSON."""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+else:  # pragma: no cover
+
+    def dumps(obj: Any) -> bytes:
+        """Serialize `obj` to compact UTF-8 JSON."""
+        return json.dumps(obj, default=_stdlib_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """`JSONResponse` rendered with `dumps` (Decimal/date/datetime aware)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
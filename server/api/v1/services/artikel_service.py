@@ -1,14 +1,21 @@
 import logging
-from typing import List, Dict, Optional
-from psycopg2.extras import RealDictCursor
-from ..data_access.database import get_db_connection
+from typing import List, Optional
+from ..data_access.cache import ReadThroughCache
+from ..data_access.database.streaming import iter_records
+from ..data_access.records import SiteArtikelRecord
+from ..observability.metrics import track_db_query
+from .product_group_service import get_product_group_index
 
 logger = logging.getLogger(__name__)
 
+# The unfiltered catalog is one entry; filtered queries always hit Postgres.
+_ARTIKEL_CACHE = ReadThroughCache("artikel_all", tables=("artikel", "construction_sites"), max_entries=1)
+
+
 def get_all_artikel(
     search: Optional[str] = None,
     category: Optional[str] = None
-) -> List[Dict]:
+) -> List[SiteArtikelRecord]:
     """
     Retrieve articles from the database with optional search and category filtering.
     
@@ -17,96 +24,72 @@ def get_all_artikel(
         category: Optional category to filter by kategorie
     
     Returns:
-        List of article dictionaries
+        List of article records (dict-style access; the unfiltered list is
+        served from cache, treat rows as read-only)
     """
-    conn = get_db_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            # Build query with optional filters
-            query = """
-                SELECT 
-                    a.artikel_id,
-                    a.artikelname,
-                    a.kategorie,
-                    a.einheit,
-                    a.preis_eur,
-                    a.lieferant,
-                    a.verbrauchsart,
-                    a.gefahrgut,
-                    a.lagerort,
-                    a.construction_site_id,
-                    cs.name as construction_site_name
-                FROM artikel a
-                LEFT JOIN construction_sites cs ON a.construction_site_id = cs.id
-                WHERE 1=1
-            """
-            params = []
-            
-            if search:
-                query += " AND (LOWER(artikelname) LIKE LOWER(%s) OR LOWER(lieferant) LIKE LOWER(%s))"
-                search_pattern = f"%{search}%"
-                params.extend([search_pattern, search_pattern])
-                logger.info(f"Adding search filter: {search_pattern}")
-            
-            if category:
-                query += " AND kategorie = %s"
-                params.append(category)
-                logger.info(f"Adding category filter: {category}")
-            
-            query += " ORDER BY artikel_id"
-            
-            logger.info(f"Executing query with {len(params)} parameters")
-            cur.execute(query, params)
-            articles = cur.fetchall()
-            logger.info(f"Found {len(articles)} articles")
-            # Convert RealDictRow to regular dict
-            return [dict(row) for row in articles]
-    finally:
-        conn.close()
+    if not search and not category:
+        return _ARTIKEL_CACHE.get_or_load("all", lambda: _query_artikel(None, None))
+    return _query_artikel(search, category)
 
 
-def get_alternative_products(artikelname: str, exclude_artikel_id: Optional[str] = None) -> List[Dict]:
+@track_db_query("get_all_artikel")
+def _query_artikel(search: Optional[str], category: Optional[str]) -> List[SiteArtikelRecord]:
+    # Build query with optional filters
+    query = """
+        SELECT 
+            a.artikel_id,
+            a.artikelname,
+            a.kategorie,
+            a.einheit,
+            a.preis_eur,
+            a.lieferant,
+            a.verbrauchsart,
+            a.gefahrgut,
+            a.lagerort,
+            a.construction_site_id,
+            cs.name as construction_site_name
+        FROM artikel a
+        LEFT JOIN construction_sites cs ON a.construction_site_id = cs.id
+        WHERE 1=1
     """
-    Find alternative products with the same name but different supplier.
+    params = []
+    
+    if search:
+        query += " AND (LOWER(artikelname) LIKE LOWER(%s) OR LOWER(lieferant) LIKE LOWER(%s))"
+        search_pattern = f"%{search}%"
+        params.extend([search_pattern, search_pattern])
+        logger.info(f"Adding search filter: {search_pattern}")
+    
+    if category:
+        query += " AND kategorie = %s"
+        params.append(category)
+        logger.info(f"Adding category filter: {category}")
+    
+    query += " ORDER BY artikel_id"
+    
+    logger.info(f"Executing query with {len(params)} parameters")
+    # Rows stream from a server-side cursor straight into records (no fetchall() + dict copies)
+    articles = list(iter_records(query, params, record=SiteArtikelRecord))
+    logger.info(f"Found {len(articles)} articles")
+    return articles
+
+
+def get_alternative_products(artikelname: str, exclude_artikel_id: Optional[str] = None) -> List[SiteArtikelRecord]:
+    """
+    Find equivalent products (same product group, any supplier), cheapest first.
     
     Args:
-        artikelname: Product name to find alternatives for
+        artikelname: Product name (or alias, e.g. "Schutzbrille") to find alternatives for
         exclude_artikel_id: Optional artikel_id to exclude from results
     
     Returns:
-        List of alternative article dictionaries
+        List of alternative article records (from the cached product group index)
     """
-    conn = get_db_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            query = """
-                SELECT 
-                    a.artikel_id,
-                    a.artikelname,
-                    a.kategorie,
-                    a.einheit,
-                    a.preis_eur,
-                    a.lieferant,
-                    a.verbrauchsart,
-                    a.gefahrgut,
-                    a.lagerort,
-                    a.construction_site_id,
-                    cs.name as construction_site_name
-                FROM artikel a
-                LEFT JOIN construction_sites cs ON a.construction_site_id = cs.id
-                WHERE a.artikelname = %s
-            """
-            params = [artikelname]
-            
-            if exclude_artikel_id:
-                query += " AND a.artikel_id != %s"
-                params.append(exclude_artikel_id)
-            
-            query += " ORDER BY a.lieferant, a.artikel_id"
-            
-            cur.execute(query, params)
-            alternatives = cur.fetchall()
-            logger.info(f"Found {len(alternatives)} alternatives for {artikelname}")
-            return [dict(row) for row in alternatives]
-    finally:
-        conn.close()
+    alternatives = get_product_group_index().alternatives(artikelname, exclude_artikel_id)
+    logger.info(f"Found {len(alternatives)} alternatives for {artikelname}")
+    return alternatives
+
+
+def get_cheapest_artikel(artikelname: str) -> Optional[SiteArtikelRecord]:
+    """The cheapest priced article in `artikelname`'s product group, or None."""
+    return get_product_group_index().cheapest(artikelname)
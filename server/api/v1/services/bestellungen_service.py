@@ -1,121 +1,110 @@
-from typing import List, Dict, Optional
+from typing import Any, Iterable, Iterator, List, Dict, Optional, Tuple
 from psycopg2.extras import RealDictCursor
+from ..data_access.cache import invalidate_tables
 from ..data_access.database import get_db_connection
+from ..data_access.database.streaming import stream_query
+from ..data_access.records import (
+    ORDER_COLUMNS,
+    POSITION_COLUMNS,
+    AlternativeRecord,
+    OrderPositionRecord,
+    OrderRecord,
+)
 from ..services.artikel_service import get_alternative_products
+from ..services.product_group_service import get_product_group_index
+from ..observability.metrics import track_db_query
 from datetime import datetime
 import uuid
 import logging
 
 logger = logging.getLogger(__name__)
 
-def get_all_bestellungen_with_items() -> List[Dict]:
-    """Retrieve all orders with their associated order items."""
-    print("[DEBUG] get_all_bestellungen_with_items called", flush=True)
-    conn = get_db_connection()
+# Order totals are summed from the positions in SQL (exact NUMERIC arithmetic),
+# so the stored `gesamt_betrag` never goes stale in a response.
+_ORDER_TOTAL_SQL = "COALESCE(SUM(p.gesamt_preis) OVER (PARTITION BY b.bestell_id), 0) AS gesamt_betrag"
+
+# Shared with `export_service`, so an order has one total everywhere.
+ORDERS_WITH_ITEMS_SQL = f"""
+    SELECT {", ".join(_ORDER_TOTAL_SQL if c == "gesamt_betrag" else "b." + c for c in ORDER_COLUMNS)},
+           {", ".join("p." + c for c in POSITION_COLUMNS)}
+    FROM bestellungen b
+    LEFT JOIN bestellpositionen p ON p.bestell_id = b.bestell_id
+    ORDER BY b.erstellt_am DESC, b.bestell_id, p.position_nummer
+"""
+
+_POSITIONS_TOTAL_SQL = """
+    COALESCE((SELECT SUM(p.gesamt_preis) FROM bestellpositionen p WHERE p.bestell_id = bestellungen.bestell_id), 0)
+        AS positionen_summe
+"""
+
+
+def _alternative_records(alternatives: List) -> List[AlternativeRecord]:
+    return [
+        AlternativeRecord(
+            alt['artikel_id'],
+            alt['artikelname'],
+            alt['lieferant'],
+            float(alt['preis_eur']) if alt['preis_eur'] else 0.0,
+            alt['einheit'],
+        )
+        for alt in alternatives
+    ]
+
+
+def fold_order_rows(rows: Iterable[Tuple[Any, ...]]) -> Iterator[OrderRecord]:
+    """
+    Fold `ORDERS_WITH_ITEMS_SQL` rows (ordered by order) into order records
+    with `bestellpositionen`. Only one order is held at a time.
+    """
+    n_order = len(ORDER_COLUMNS)
+    current: Optional[OrderRecord] = None
+    for row in rows:
+        if current is None or current.bestell_id != row[0]:
+            if current is not None:
+                yield current
+            current = OrderRecord(*row[:n_order], [])
+        if row[n_order] is not None:  # LEFT JOIN: order without positions
+            current.bestellpositionen.append(OrderPositionRecord(*row[n_order:], []))
+    if current is not None:
+        yield current
+
+
+def _stream_orders_with_items() -> Iterator[OrderRecord]:
+    """One streamed join, folded into order records."""
+    with stream_query(ORDERS_WITH_ITEMS_SQL) as rows:
+        yield from fold_order_rows(rows)
+
+
+@track_db_query()
+def get_all_bestellungen_with_items() -> List[OrderRecord]:
+    """
+    Retrieve all orders with their associated order items.
+
+    `gesamt_betrag` is the exact (Decimal) sum of the positions, computed in
+    the query. Position alternatives come from the cached product group index
+    (no query per position).
+    """
     try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            # First, get all orders
-            cur.execute("""
-                SELECT 
-                    bestell_id,
-                    polier_name,
-                    projekt_name,
-                    gesamt_betrag,
-                    status,
-                    admin_notizen,
-                    erstellt_am,
-                    aktualisiert_am,
-                    erstellt_von,
-                    genehmigt_von,
-                    genehmigt_am
-                FROM bestellungen
-                ORDER BY erstellt_am DESC
-            """)
-            orders = cur.fetchall()
-            
-            # Convert to list of dicts
-            orders_list = [dict(row) for row in orders]
-            
-            # For each order, get its items and recalculate total
-            for order in orders_list:
-                cur.execute("""
-                    SELECT 
-                        position_id,
-                        artikel_id,
-                        artikel_name,
-                        menge,
-                        einheit,
-                        einzelpreis,
-                        gesamt_preis,
-                        position_nummer,
-                        notizen
-                    FROM bestellpositionen
-                    WHERE bestell_id = %s
-                    ORDER BY position_nummer
-                """, (order['bestell_id'],))
-                
-                items = cur.fetchall()
-                items_list = []
-                for item_row in items:
-                    # Convert RealDictRow to regular dict to ensure mutability
-                    item_dict = {}
-                    for key, value in item_row.items():
-                        # Convert Decimal/numeric types to float for JSON serialization
-                        if hasattr(value, '__float__') and not isinstance(value, (int, float, str)):
-                            item_dict[key] = float(str(value))
-                        else:
-                            item_dict[key] = value
-                    items_list.append(item_dict)
-                
-                # Calculate total BEFORE adding alternatives (to ensure gesamt_preis is already converted)
-                calculated_total = 0.0
-                for item in items_list:
-                    gesamt_preis = item.get('gesamt_preis', 0)
-                    logger.info(f"Item {item.get('artikel_id')}: gesamt_preis = {gesamt_preis}, type = {type(gesamt_preis)}")
-                    if isinstance(gesamt_preis, (int, float)):
-                        calculated_total += float(gesamt_preis)
-                        logger.info(f"Added {float(gesamt_preis)}, running total = {calculated_total}")
-                    elif gesamt_preis is not None:
-                        try:
-                            price_val = float(str(gesamt_preis))
-                            calculated_total += price_val
-                            logger.info(f"Converted and added {price_val}, running total = {calculated_total}")
-                        except (ValueError, TypeError) as e:
-                            logger.warning(f"Could not convert gesamt_preis: {e}")
-                
-                # Add alternatives for each item (counterparts from different suppliers)
-                for item in items_list:
-                    artikel_name = item.get('artikel_name', '')
-                    artikel_id = item.get('artikel_id', '')
-                    item['alternatives'] = []  # Initialize empty list
-                    try:
-                        alternatives = get_alternative_products(artikel_name, artikel_id)
-                        if alternatives:
-                            item['alternatives'] = [
-                                {
-                                    'artikel_id': alt['artikel_id'],
-                                    'artikel_name': alt['artikelname'],
-                                    'lieferant': alt['lieferant'],
-                                    'preis_eur': float(alt['preis_eur']) if alt['preis_eur'] else 0.0,
-                                    'einheit': alt['einheit']
-                                }
-                                for alt in alternatives
-                            ]
-                    except Exception as e:
-                        logger.error(f"Error fetching alternatives for {artikel_name}: {e}", exc_info=True)
-                        # Keep empty list on error
-                
-                order['bestellpositionen'] = items_list
-                
-                # Use the calculated total (already computed above)
-                order['gesamt_betrag'] = calculated_total
-                logger.info(f"Order {order['bestell_id']}: Calculated total = {calculated_total}, Items count = {len(items_list)}")
-            
-            return orders_list
-    finally:
-        conn.close()
+        groups = get_product_group_index()
+    except Exception as e:
+        logger.error(f"Error loading product groups for alternatives: {e}", exc_info=True)
+        groups = None  # Keep empty alternatives on error
 
+    orders_list = []
+    for order in _stream_orders_with_items():
+        # Add alternatives for each item (same product group, other suppliers)
+        if groups is not None:
+            for item in order.bestellpositionen:
+                alternatives = groups.alternatives(item.artikel_name, item.artikel_id)
+                if alternatives:
+                    item.alternatives = _alternative_records(alternatives)
+        orders_list.append(order)
 
+    logger.debug(f"Loaded {len(orders_list)} orders")
+    return orders_list
+
+
+@track_db_query()
 def create_bestellung(
     polier_name: str,
     projekt_name: str,
@@ -180,6 +169,7 @@ def create_bestellung(
                 ))
             
             conn.commit()
+            invalidate_tables("bestellungen", "bestellpositionen")
             
             # Fetch the complete order with items
             cur.execute("""
@@ -199,6 +189,7 @@ def create_bestellung(
         conn.close()
 
 
+@track_db_query()
 def update_bestellung_status(
     bestell_id: str,
     new_status: str,
@@ -230,8 +221,7 @@ def update_bestellung_status(
                         admin_notizen = COALESCE(%s, admin_notizen),
                         aktualisiert_am = CURRENT_TIMESTAMP
                     WHERE bestell_id = %s
-                    RETURNING *
-                """, (new_status, genehmigt_von, admin_notizen, bestell_id))
+                    RETURNING *, """ + _POSITIONS_TOTAL_SQL, (new_status, genehmigt_von, admin_notizen, bestell_id))
             else:
                 cur.execute("""
                     UPDATE bestellungen 
@@ -239,11 +229,13 @@ def update_bestellung_status(
                         admin_notizen = COALESCE(%s, admin_notizen),
                         aktualisiert_am = CURRENT_TIMESTAMP
                     WHERE bestell_id = %s
-                    RETURNING *
-                """, (new_status, admin_notizen, bestell_id))
+                    RETURNING *, """ + _POSITIONS_TOTAL_SQL, (new_status, admin_notizen, bestell_id))
             
             order = dict(cur.fetchone())
+            # Total of the positions (exact, from SQL) replaces the stored value
+            order['gesamt_betrag'] = order.pop('positionen_summe')
             conn.commit()
+            invalidate_tables("bestellungen")
             
             # Fetch order items
             cur.execute("""
@@ -263,34 +255,14 @@ def update_bestellung_status(
                 try:
                     artikel_name = item.get('artikel_name', '')
                     artikel_id = item.get('artikel_id', '')
-                    logger.info(f"Processing item: {artikel_name} (ID: {artikel_id})")
                     alternatives = get_alternative_products(artikel_name, artikel_id)
-                    logger.info(f"Found {len(alternatives)} alternatives for {artikel_name} (excluding {artikel_id})")
-                    item['alternatives'] = [
-                        {
-                            'artikel_id': alt['artikel_id'],
-                            'artikel_name': alt['artikelname'],
-                            'lieferant': alt['lieferant'],
-                            'preis_eur': float(alt['preis_eur']) if alt['preis_eur'] else 0.0,
-                            'einheit': alt['einheit']
-                        }
-                        for alt in alternatives
-                    ]
-                    logger.info(f"Added {len(item['alternatives'])} alternatives to item {artikel_name}")
+                    item['alternatives'] = _alternative_records(alternatives)
                 except Exception as e:
                     logger.error(f"Error fetching alternatives for {item.get('artikel_name', 'unknown')}: {e}", exc_info=True)
                     item['alternatives'] = []
             
             order['bestellpositionen'] = items_list
             
-            # Recalculate total from items to ensure accuracy
-            calculated_total = sum(
-                float(item['gesamt_preis']) if isinstance(item['gesamt_preis'], (int, float, str)) 
-                else 0.0 
-                for item in items_list
-            )
-            order['gesamt_betrag'] = calculated_total
-            
             return order
     finally:
         conn.close()
@@ -10,23 +10,48 @@ Responsibilities:
 - Validate/normalize inputs.
 - Provide a stable streaming interface for "assistant text".
 - Centralize provider error handling/logging.
+- Response cache (opt-in, `RESPONSE_CACHE_ENABLED=1`): replies to turns that
+  only read the catalog/inventory are kept in `response_cache.RESPONSE_CACHE`,
+  and repeats of the question are answered from it without calling Claude.
+  Only first turns of a conversation are cached or answered from the cache:
+  later answers depend on the history (e.g. the site picked earlier), which
+  the cache key does not hold.
+- Model routing: each turn is classified with cheap local heuristics.
+  Confirmations ("ja", "nein, das war's") and single stock/price lookups go
+  to `FAST_MODEL`; everything else, and any turn while a draft line awaits
+  clarification, stays on `MODEL`. `MODEL_ROUTING=large|fast` forces one
+  route (`auto` is the default). Latency, tokens and estimated cost are
+  recorded per route.
 
 Non-responsibilities:
 - WebSocket frame protocol (owned by `websocket_service.py`).
 - Persistence / conversation memory (can be added here later).
+- The order draft itself (see `order_draft_service.py`); only its summary is
+  added to the context here.
 """
 
 from collections.abc import AsyncIterator
 import logging
-from typing import Optional
+import os
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from ..data_access.anthropic.agent import (
     stream_anthropic_response,
     stream_anthropic_response_with_history,
     stream_anthropic_response_with_history_and_tools,
 )
+from ..data_access.anthropic.anthropic_config import FAST_MODEL, MODEL, MODEL_PRICES_USD_PER_MTOK
+from ..data_access import response_cache
+from ..data_access.order_drafts import ORDER_DRAFTS
+from ..data_access.records import DraftLineRecord
+from ..data_access.response_cache import RESPONSE_CACHE, CachedReply
 from ..data_access.tools_runtime import TOOL_DEFINITIONS
+from ..observability.metrics import MODEL_ROUTE_COST, MODEL_ROUTE_TOKENS, MODEL_ROUTE_TURN_DURATION
+from ..observability.tracing import span, start_span, use_span
 from . import message_history_service
+from .order_draft_service import with_draft_summary
 
 logger = logging.getLogger(__name__)
 
@@ -35,8 +60,134 @@ class ClaudeServiceError(RuntimeError):
     """Raised when the Claude service cannot produce a response."""
 
 
+# Tools that only read catalog/inventory data: a turn that used nothing else
+# (and at least one of them) has an answer the response cache may keep.
+CACHEABLE_TOOLS = frozenset({
+    "inventory_search",
+    "product_price_search",
+    "batch_item_search",
+    "get_all_product_names",
+    "get_product_prices_by_name_regex",
+    "get_inventory_items_by_name_regex",
+})
+
+
+def response_cache_enabled() -> bool:
+    return response_cache.enabled()
+
+
+async def _is_first_turn(conversation_id: str) -> bool:
+    """True when the history holds nothing before the current user message."""
+    history = await message_history_service.get_history(conversation_id=conversation_id)
+    return len(history) <= 1
+
+
+async def lookup_cached_reply(
+    *, user_text: str, conversation_id: str, language: str = "en"
+) -> Optional[CachedReply]:
+    """
+    The cached reply to `user_text` (or a near-identical question), if caching
+    is on and this is the first turn of `conversation_id`.
+    """
+    if not response_cache.enabled() or not isinstance(user_text, str):
+        return None
+    if not await _is_first_turn(conversation_id):
+        return None
+    return RESPONSE_CACHE.lookup(user_text.strip(), language)
+
+
+def remember_reply_audio(*, user_text: str, language: str, reply: str, audio: List[bytes]) -> bool:
+    """Attach the TTS audio of `reply` to its cache entry, so the next hit skips TTS too."""
+    if not response_cache.enabled() or not audio:
+        return False
+    return RESPONSE_CACHE.attach_audio(user_text.strip(), language, reply, audio)
+
+
+ROUTE_FAST = "fast"
+ROUTE_LARGE = "large"
+ROUTE_MODELS = {ROUTE_FAST: FAST_MODEL, ROUTE_LARGE: MODEL}
+
+# Words a plain "yes" is made of ("ja bitte", "passt, danke", "yes that's all"). No negations
+# ("das ist es nicht"), no bare pronouns ("is it?") and no submit verbs ("ja bitte bestellen"):
+# those turns reach the larger model.
+_CONFIRMATION_WORDS = frozenset({
+    "ja", "jawohl", "jo", "jep", "genau", "richtig", "korrekt", "passt", "gut", "super", "perfekt", "danke",
+    "wars", "alles", "fertig", "bitte", "so", "ok", "okay",
+    "yes", "yeah", "yep", "sure", "correct", "right", "fine", "great", "thanks",
+    "thats", "all", "done", "please",
+})
+# Question openers that ask about one product's stock or price.
+_LOOKUP_PREFIXES = (
+    "haben wir", "hast du", "habt ihr", "gibt es", "ist noch", "sind noch", "was kostet", "was kosten",
+    "wie teuer",
+    "do we have", "have we got", "how much", "how many", "what does", "what is the price",
+)
+_MULTI_ITEM = re.compile(r",|;|\b(?:und|sowie|oder|and|or|plus)\b")
+# Asking for advice or substitutes is not a lookup, whatever the opener.
+_OPEN_ENDED = re.compile(
+    r"\b(?:alternativ\w*|ersatz|statt|anstatt|stattdessen|brauch\w*|empfehl\w*|"
+    r"alternatives?|instead|substitute\w*|need|needed|recommend\w*)\b"
+)
+_ROUTING_WORD = re.compile(r"[a-zäöüß0-9]+")
+MAX_CONFIRMATION_WORDS = 6
+MAX_LOOKUP_WORDS = 10
+
+
+def classify_turn(text: str, *, draft_lines: Iterable[DraftLineRecord] = ()) -> Tuple[str, str]:
+    """
+    Route a user turn: `(route, reason)`.
+
+    Reasons: `clarification` (a draft line is pending clarification, so the
+    answer needs the larger model), `submit` (a confirmation while the draft
+    has confirmed lines: the turn may call `draft_submit` and write an
+    order), `confirmation`, `lookup` (one item, question form) and `complex`.
+    """
+    draft_lines = list(draft_lines)
+    if any(line.status == "pending_clarification" for line in draft_lines):
+        return ROUTE_LARGE, "clarification"
+    folded = text.casefold().replace("'", "").replace("’", "")
+    words = _ROUTING_WORD.findall(folded)
+    if not words:
+        return ROUTE_LARGE, "complex"
+    if len(words) <= MAX_CONFIRMATION_WORDS and _CONFIRMATION_WORDS.issuperset(words):
+        if any(line.status == "confirmed" for line in draft_lines):
+            return ROUTE_LARGE, "submit"
+        return ROUTE_FAST, "confirmation"
+    phrase = " ".join(words)
+    if (
+        len(words) <= MAX_LOOKUP_WORDS
+        and phrase.startswith(_LOOKUP_PREFIXES)
+        and not _MULTI_ITEM.search(folded)
+        and not _OPEN_ENDED.search(folded)
+    ):
+        return ROUTE_FAST, "lookup"
+    return ROUTE_LARGE, "complex"
+
+
+def select_route(*, user_text: str, conversation_id: Optional[str]) -> Tuple[str, str]:
+    """`classify_turn(...)` unless `MODEL_ROUTING` forces a route (`large`/`off` or `fast`)."""
+    mode = os.getenv("MODEL_ROUTING", "auto").strip().lower()
+    if mode in (ROUTE_LARGE, "off", "0", "false"):
+        return ROUTE_LARGE, "override"
+    if mode == ROUTE_FAST:
+        return ROUTE_FAST, "override"
+    draft_lines = ORDER_DRAFTS.lines(conversation_id) if conversation_id else []
+    return classify_turn(user_text, draft_lines=draft_lines)
+
+
+def _record_route_usage(route: str, model: str, usage: Dict[str, int]) -> None:
+    input_tokens = usage.get("input_tokens", 0)
+    output_tokens = usage.get("output_tokens", 0)
+    MODEL_ROUTE_TOKENS.inc(input_tokens, route=route, model=model, direction="input")
+    MODEL_ROUTE_TOKENS.inc(output_tokens, route=route, model=model, direction="output")
+    prices = MODEL_PRICES_USD_PER_MTOK.get(model)
+    if prices is not None:
+        cost = (input_tokens * prices[0] + output_tokens * prices[1]) / 1_000_000
+        MODEL_ROUTE_COST.inc(cost, route=route, model=model)
+
+
 async def stream_claude_reply(
-    *, user_text: str, conversation_id: Optional[str] = None, language: str = "en"
+    *, user_text: str, conversation_id: Optional[str] = None, language: str = "en", use_cache: bool = True
 ) -> AsyncIterator[str]:
     """Stream assistant text for the provided user text.
 
@@ -45,6 +196,9 @@ async def stream_claude_reply(
         conversation_id: Optional conversation id. When provided, the Anthropic call
             is made with full `messages=[...]` history from `message_history_service`.
         language: Language code ("en" or "de") for the system prompt.
+        use_cache: Answer from the response cache when possible (callers that
+            already looked it up pass False). Cacheable replies are stored
+            either way.
 
     Yields:
         Text chunks as they arrive from the provider.
@@ -59,24 +213,82 @@ async def stream_claude_reply(
     if not normalized:
         return
 
+    # Spans must not stay "current" across our yields, so this one is ended manually.
+    reply_span = start_span("claude.reply", language=language, with_history=conversation_id is not None)
+    chunks = 0
     try:
         # NO message history is saved since no conversation_id is provided
         if conversation_id is None:
             async for chunk in stream_anthropic_response(normalized, language=language):
                 if chunk:
+                    chunks += 1
                     yield chunk
         # Message history is saved since a conversation_id is provided
         else:
-            messages = await message_history_service.build_anthropic_messages(
+            caching = response_cache.enabled() and await _is_first_turn(conversation_id)
+            cached = RESPONSE_CACHE.lookup(normalized, language) if caching and use_cache else None
+            reply_span.set_attribute("cache_hit", cached is not None)
+            if cached is not None:
+                chunks += 1
+                yield cached.text
+                return
+            # Read before anything else so a catalog change during the turn keeps it out of the cache.
+            cache_version = RESPONSE_CACHE.version
+            draft_was_empty = ORDER_DRAFTS.summary(conversation_id) is None
+            tool_names: List[str] = []
+            reply_parts: List[str] = []
+            route, reason = select_route(user_text=normalized, conversation_id=conversation_id)
+            model = ROUTE_MODELS[route]
+            reply_span.set_attributes(route=route, route_reason=reason, model=model)
+            usage: Dict[str, int] = {}
+            with use_span(reply_span), span("claude.build_history"):
+                messages = await message_history_service.build_anthropic_messages(
+                    conversation_id=conversation_id,
+                    tail_messages=40,
+                )
+                messages = with_draft_summary(messages, conversation_id)
+            stream = stream_anthropic_response_with_history_and_tools(
+                messages=messages,
+                tools=TOOL_DEFINITIONS,
+                language=language,
                 conversation_id=conversation_id,
-                tail_messages=40,
+                tool_names=tool_names,
+                model=model,
+                usage=usage,
             )
-            async for chunk in stream_anthropic_response_with_history_and_tools(
-                messages=messages, tools=TOOL_DEFINITIONS, language=language
-            ):
-                if chunk:
-                    yield chunk
+            started = time.perf_counter()
+            try:
+                while True:
+                    # Each step (Claude rounds, tool calls) runs under `claude.reply`.
+                    with use_span(reply_span):
+                        try:
+                            chunk = await stream.__anext__()
+                        except StopAsyncIteration:
+                            break
+                    if chunk:
+                        if chunks == 0:
+                            reply_span.set_attribute("first_chunk_ms", _elapsed_ms(reply_span))
+                        chunks += 1
+                        reply_parts.append(chunk)
+                        yield chunk
+                MODEL_ROUTE_TURN_DURATION.observe(time.perf_counter() - started, route=route, model=model)
+            finally:
+                # Tokens are spent even when the turn is cancelled or fails.
+                _record_route_usage(route, model, usage)
+            if caching and draft_was_empty and tool_names and CACHEABLE_TOOLS.issuperset(tool_names):
+                RESPONSE_CACHE.store(normalized, language, "".join(reply_parts), version=cache_version)
     except Exception as e:
+        reply_span.record_exception(e)
         # Log once here so non-WS callers also get useful context.
         logger.exception("Claude streaming failed")
         raise ClaudeServiceError("claude_stream_failed") from e
+    finally:
+        reply_span.set_attribute("chunks", chunks)
+        reply_span.end()
+
+
+def _elapsed_ms(span_obj) -> Optional[float]:
+    start_ns = getattr(span_obj, "start_time_ns", None)
+    if start_ns is None:
+        return None
+    return round((time.time_ns() - start_ns) / 1_000_000.0, 1)
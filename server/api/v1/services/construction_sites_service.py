@@ -1,10 +1,17 @@
 import logging
 from typing import List, Dict
 from psycopg2.extras import RealDictCursor
+from ..data_access.cache import ReadThroughCache, cached
 from ..data_access.database import get_db_connection
+from ..observability.metrics import track_db_query
 
 logger = logging.getLogger(__name__)
 
+_CONSTRUCTION_SITES_CACHE = ReadThroughCache("construction_sites", tables=("construction_sites",), max_entries=1)
+
+
+@cached(_CONSTRUCTION_SITES_CACHE)
+@track_db_query()
 def get_all_construction_sites() -> List[Dict]:
     """
     Retrieve all construction sites from the database.
@@ -0,0 +1,121 @@
+"""
+Streaming table exports (NDJSON / CSV).
+
+Exports read through `stream_query` (named cursor) and emit ~64 KiB chunks as
+rows arrive, so memory stays flat however large the table is; nothing is
+`fetchall()`ed.
+
+Responsibilities:
+- `EXPORTS`: the exportable datasets (`artikel`, `inventory`, `bestellungen`)
+  and their queries.
+- `export_chunks(name, fmt)`: byte chunks for a `StreamingResponse`.
+  - NDJSON: one JSON object per line, encoded like the API (`serialization.dumps`).
+    `bestellungen` lines are whole orders with their `bestellpositionen` nested.
+    Query, fold and `gesamt_betrag` (summed from the positions) are the ones
+    `GET /bestellungen/` uses (`bestellungen_service`).
+  - CSV: a header row, then one row per record. `bestellungen` gets one row
+    per position, with the order columns repeated.
+
+Non-responsibilities:
+- HTTP (media types, filenames): `routes/exports.py`.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from ..data_access.database.streaming import stream_query
+from ..serialization import dumps
+from .bestellungen_service import ORDERS_WITH_ITEMS_SQL, fold_order_rows
+
+CHUNK_BYTES = 64 * 1024
+
+FORMATS = ("ndjson", "csv")
+
+
+@dataclass(frozen=True)
+class Export:
+    sql: str
+    # Rows are (order columns..., position columns...) to be nested per order.
+    nested_positions: bool = False
+
+
+EXPORTS: Dict[str, Export] = {
+    "artikel": Export(
+        """
+        SELECT
+            a.artikel_id, a.artikelname, a.kategorie, a.einheit, a.preis_eur,
+            a.lieferant, a.verbrauchsart, a.gefahrgut, a.lagerort,
+            a.construction_site_id, cs.name AS construction_site_name
+        FROM artikel a
+        LEFT JOIN construction_sites cs ON a.construction_site_id = cs.id
+        ORDER BY a.artikel_id
+        """
+    ),
+    "inventory": Export(
+        """
+        SELECT artikel_id, artikelname, kategorie, lieferant, construction_site, quantity, construction_site_id
+        FROM inventory
+        ORDER BY artikel_id, construction_site_id
+        """
+    ),
+    "bestellungen": Export(ORDERS_WITH_ITEMS_SQL, nested_positions=True),
+}
+
+
+def _chunked(pieces: Iterable[bytes], chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    buffer: List[bytes] = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_bytes:
+            yield b"".join(buffer)
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def ndjson_lines(records: Iterable[Any]) -> Iterator[bytes]:
+    for record in records:
+        yield dumps(record) + b"\n"
+
+
+def csv_lines(columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode("utf-8")
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def format_rows(export: Export, fmt: str, columns: Sequence[str], rows: Iterable[Tuple[Any, ...]]) -> Iterator[bytes]:
+    """Encode streamed rows as NDJSON or CSV chunks."""
+    if fmt == "csv":
+        return _chunked(csv_lines(columns, rows))
+    if export.nested_positions:
+        records: Iterable[Any] = fold_order_rows(rows)
+    else:
+        records = (dict(zip(columns, row)) for row in rows)
+    return _chunked(ndjson_lines(records))
+
+
+def export_chunks(name: str, fmt: str = "ndjson") -> Iterator[bytes]:
+    """Stream export `name` in `fmt`; raises KeyError/ValueError for unknown ones."""
+    export = EXPORTS[name]
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    def generate() -> Iterator[bytes]:
+        with stream_query(export.sql) as rows:
+            yield from format_rows(export, fmt, rows.columns, rows)
+
+    return generate()
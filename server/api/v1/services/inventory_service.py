@@ -1,25 +1,81 @@
-from typing import List, Dict
-from psycopg2.extras import RealDictCursor
+from typing import Dict, List, Optional, Sequence
 from ..data_access.database import get_db_connection
+from ..data_access.database.streaming import iter_records
+from ..data_access.records import InventoryItemRecord, SiteStockRecord
+from ..observability.metrics import track_db_query
 
-def get_all_inventory() -> List[Dict]:
-    """Retrieve all inventory items from the database."""
+@track_db_query()
+def get_all_inventory(site_id: Optional[int] = None) -> List[InventoryItemRecord]:
+    """
+    Retrieve inventory items from the database (streamed into records).
+
+    Args:
+        site_id: Optional construction site id; only that site's rows are read
+            (range scan on the (construction_site_id, artikel_id) index)
+    """
+    query = """
+        SELECT
+            artikel_id,
+            artikelname,
+            kategorie,
+            lieferant,
+            construction_site,
+            quantity,
+            construction_site_id
+        FROM inventory
+    """
+    params = []
+    if site_id is not None:
+        query += " WHERE construction_site_id = %s"
+        params.append(site_id)
+    query += " ORDER BY artikel_id, construction_site_id"
+    return list(iter_records(query, params, record=InventoryItemRecord))
+
+
+@track_db_query()
+def get_site_stock() -> List[SiteStockRecord]:
+    """Stock totals per construction site (the `inventory_site_stock` view)."""
     conn = get_db_connection()
     try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        with conn.cursor() as cur:
             cur.execute("""
-                SELECT 
-                    artikel_id,
-                    artikelname,
-                    kategorie,
-                    lieferant,
+                SELECT
+                    construction_site_id,
                     construction_site,
-                    quantity
-                FROM inventory
-                ORDER BY artikel_id
+                    artikel_count,
+                    total_quantity,
+                    out_of_stock_count
+                FROM inventory_site_stock
+                ORDER BY construction_site
             """)
-            items = cur.fetchall()
-            # Convert RealDictRow to regular dict
-            return [dict(row) for row in items]
+            return [SiteStockRecord(*row) for row in cur]
+    finally:
+        conn.close()
+
+
+@track_db_query()
+def get_artikel_stock(artikel_ids: Sequence[str], artikelnamen: Sequence[str] = ()) -> Dict[str, int]:
+    """
+    On-hand quantity over all sites by artikel_id, for the given ids or the
+    given names (same item, other supplier).
+
+    Reads `inventory` directly rather than the `inventory_artikel_stock` view:
+    a filter on the view's aggregated `artikelname` cannot be pushed below its
+    GROUP BY, so every call would sum the whole table. Here both conditions use
+    an index (`idx_inventory_artikel`, `idx_inventory_artikelname`).
+    """
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT artikel_id, COALESCE(SUM(quantity), 0)
+                FROM inventory
+                WHERE artikel_id = ANY(%s) OR artikelname = ANY(%s)
+                GROUP BY artikel_id
+                """,
+                (list(artikel_ids), list(artikelnamen)),
+            )
+            return {row[0]: int(row[1] or 0) for row in cur}
     finally:
         conn.close()
@@ -24,6 +24,7 @@ from dataclasses import dataclass
 from typing import Dict, List, Literal, Optional
 
 # Keep imports minimal; this module should be reusable from any service.
+from ..observability.metrics import HISTORY_CONVERSATIONS, HISTORY_MESSAGES
 
 Role = Literal["user", "assistant"]
 
@@ -40,6 +41,10 @@ TEST_INITIAL_MESSAGE: str = "Hello, My name is TROY"
 _lock = asyncio.Lock()
 _history_by_conversation: Dict[str, List[Message]] = {}
 
+# Store size is read lazily at scrape time (no cost on the append path).
+HISTORY_CONVERSATIONS.set_function(lambda: len(_history_by_conversation))
+HISTORY_MESSAGES.set_function(lambda: sum(len(h) for h in list(_history_by_conversation.values())))
+
 
 async def append_message(
     *,
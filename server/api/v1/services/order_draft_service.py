@@ -0,0 +1,100 @@
+"""
+Order draft service layer.
+
+The drafts themselves and the agent tools that edit them live in data access
+(`order_drafts`, `tools_runtime`). This module connects them to the rest of
+the service layer.
+
+Responsibilities:
+- Submitting: registers the draft submit handler, which prices the confirmed
+  lines from the catalog (one query) and creates the order via
+  `bestellungen_service.create_bestellung`.
+- Context: `with_draft_summary(...)` adds the conversation's one-line draft
+  summary to the latest user message, so the model sees the current draft
+  without replaying it from history.
+
+Non-responsibilities:
+- Draft storage and matching rules (see `data_access/order_drafts.py`).
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from ..data_access.database import get_db_connection
+from ..data_access.order_drafts import ORDER_DRAFTS, DraftError, register_submit_handler
+from ..data_access.records import DraftLineRecord
+from ..observability.metrics import track_db_query
+from .bestellungen_service import create_bestellung
+
+logger = logging.getLogger(__name__)
+
+# `erstellt_von` of orders placed by the voice agent.
+VOICE_AGENT_CREATOR = "voice_assistant"
+
+
+@track_db_query()
+def _catalog_prices(artikel_ids: List[str]) -> Dict[str, tuple]:
+    """artikel_id -> (artikelname, einheit, preis_eur) for the known ids."""
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT artikel_id, artikelname, einheit, preis_eur FROM artikel WHERE artikel_id = ANY(%s)",
+                (artikel_ids,),
+            )
+            return {row[0]: row[1:] for row in cur}
+    finally:
+        conn.close()
+
+
+def submit_draft(conversation_id: str, lines: List[DraftLineRecord], order_fields: Dict[str, Any]) -> Dict:
+    """Create an order from confirmed draft lines, at catalog prices."""
+    catalog = _catalog_prices(sorted({line.artikel_id for line in lines}))
+    unknown = [line.artikel_id for line in lines if line.artikel_id not in catalog]
+    if unknown:
+        raise DraftError(f"unknown artikel_id: {', '.join(unknown)}")
+    unpriced = [line.artikel_id for line in lines if catalog[line.artikel_id][2] is None]
+    if unpriced:
+        raise DraftError(f"no catalog price for: {', '.join(unpriced)}")
+
+    items = []
+    for line in lines:
+        artikelname, einheit, preis_eur = catalog[line.artikel_id]
+        items.append(
+            {
+                "artikel_id": line.artikel_id,
+                "artikel_name": artikelname,
+                "menge": line.menge,
+                "einheit": einheit or line.einheit,
+                "einzelpreis": preis_eur,
+            }
+        )
+    order = create_bestellung(
+        polier_name=order_fields["polier_name"],
+        projekt_name=order_fields["projekt_name"],
+        items=items,
+        erstellt_von=VOICE_AGENT_CREATOR,
+    )
+    logger.info(f"Submitted draft of conversation {conversation_id} as {order['bestell_id']} ({len(items)} positions)")
+    return order
+
+
+register_submit_handler(submit_draft)
+
+
+def with_draft_summary(messages: List[Dict[str, Any]], conversation_id: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    `messages` with the draft summary prepended to the latest user message.
+
+    Returns `messages` unchanged when the conversation has no draft.
+    """
+    summary = ORDER_DRAFTS.summary(conversation_id) if conversation_id else None
+    if summary is None or not messages or messages[-1].get("role") != "user":
+        return messages
+    last = messages[-1]
+    content = last.get("content")
+    if not isinstance(content, str):
+        return messages
+    return messages[:-1] + [{**last, "content": f"[{summary}]\n{content}"}]
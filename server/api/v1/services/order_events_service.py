@@ -0,0 +1,238 @@
+"""
+Live order events for the admin dashboard (server-sent events).
+
+`database/init/12_order_events.sql` makes Postgres `NOTIFY order_events` with
+a small delta for every written `bestellungen` / `bestellpositionen` row. The
+app's single `ChangeListener` connection forwards those payloads here, and
+`OrderEventHub` fans each one out to every connected dashboard, so clients
+follow new orders and status changes without re-fetching `GET /bestellungen/`.
+
+Responsibilities:
+- Map notifications to events: `order-created` (full order header),
+  `status-changed` / `order-updated` (changed fields plus `previous` values),
+  `order-deleted`, `item-changed` (one position; `op` insert/update/delete),
+  and `resync` (something was missed: re-fetch the list).
+- Resumable ids (`<epoch>:<seq>`): a recent history is kept so a reconnecting
+  client sending `Last-Event-ID` gets exactly what it missed. Ids from another
+  process lifetime, or older than the history, get a `resync` instead.
+- Slow clients don't hold anyone up: a subscriber whose queue overflows has
+  its backlog replaced by a single `resync`.
+
+Non-responsibilities:
+- Cross-worker ids: each process numbers its own events (the epoch changes on
+  restart, which is what makes stale ids detectable).
+- Delivering events when the change listener is disabled (`DB_CHANGE_LISTENER=0`).
+
+The hub is not thread-safe; it is only touched from the event loop (listener
+callbacks and SSE streams).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+from ..data_access.database.change_listener import ChangeListener
+from ..observability.metrics import ORDER_EVENT_SUBSCRIBERS, ORDER_EVENTS_PUBLISHED
+
+logger = logging.getLogger(__name__)
+
+ORDER_EVENTS_CHANNEL = "order_events"
+
+ORDER_CREATED = "order-created"
+STATUS_CHANGED = "status-changed"
+ORDER_UPDATED = "order-updated"
+ORDER_DELETED = "order-deleted"
+ITEM_CHANGED = "item-changed"
+RESYNC = "resync"
+
+
+def event_from_notification(payload: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Translate one `order_events` payload into `(event type, data)`; `None` if malformed."""
+    try:
+        note = json.loads(payload)
+        table = note["table"]
+        op = note["op"]
+    except (ValueError, TypeError, KeyError):
+        return None
+
+    if note.get("bulk"):
+        return RESYNC, {"reason": "bulk-write", "table": table, "rows": note.get("rows")}
+
+    data: Dict[str, Any] = {"bestell_id": note.get("bestell_id")}
+    if note.get("truncated"):
+        data["truncated"] = True
+    fields = note.get("fields") or {}
+    previous = note.get("previous")
+
+    if table == "bestellungen":
+        if op == "INSERT":
+            return ORDER_CREATED, {**fields, **data}
+        if op == "DELETE":
+            return ORDER_DELETED, data
+        data["changes"] = fields
+        if previous:
+            data["previous"] = previous
+        return (STATUS_CHANGED if "status" in fields else ORDER_UPDATED), data
+
+    if table == "bestellpositionen":
+        data["position_id"] = note.get("key")
+        data["op"] = str(op).lower()
+        data["changes"] = fields
+        if previous:
+            data["previous"] = previous
+        return ITEM_CHANGED, data
+
+    return None
+
+
+@dataclass(frozen=True)
+class OrderEvent:
+    id: str
+    seq: int
+    type: str
+    data: Dict[str, Any]
+
+    def to_sse(self) -> str:
+        body = json.dumps(self.data, separators=(",", ":"), ensure_ascii=False, default=str)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {body}\n\n"
+
+
+class OrderEventSubscription:
+    """One dashboard connection: a bounded queue of events to send."""
+
+    def __init__(self, hub: "OrderEventHub", queue_size: int) -> None:
+        self._hub = hub
+        self._queue: "asyncio.Queue[OrderEvent]" = asyncio.Queue(maxsize=queue_size)
+
+    async def get(self) -> OrderEvent:
+        return await self._queue.get()
+
+    def _offer(self, event: OrderEvent) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Lagging client: drop its backlog; it re-fetches and continues from here.
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(self._hub._resync_event("lagging"))
+
+    def close(self) -> None:
+        self._hub._unsubscribe(self)
+
+    def __enter__(self) -> "OrderEventSubscription":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class OrderEventHub:
+    """Fan-out of order events to many subscribers, with a replay history."""
+
+    def __init__(self, *, history: int = 1000, queue_size: int = 256) -> None:
+        self.epoch = uuid.uuid4().hex[:8]
+        self.queue_size = queue_size
+        self._seq = 0
+        self._history: Deque[OrderEvent] = deque(maxlen=history)
+        self._subscribers: Set[OrderEventSubscription] = set()
+        self._listener_connected_before = False
+
+    @property
+    def last_event_id(self) -> str:
+        return f"{self.epoch}:{self._seq}"
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> OrderEvent:
+        self._seq += 1
+        event = OrderEvent(id=f"{self.epoch}:{self._seq}", seq=self._seq, type=event_type, data=data)
+        self._history.append(event)
+        ORDER_EVENTS_PUBLISHED.inc(type=event_type)
+        for subscriber in list(self._subscribers):
+            subscriber._offer(event)
+        return event
+
+    def handle_notification(self, payload: str) -> None:
+        """`ChangeListener` callback for `ORDER_EVENTS_CHANNEL`."""
+        event = event_from_notification(payload)
+        if event is None:
+            logger.warning("Ignoring malformed order event: %.200s", payload)
+            return
+        self.publish(*event)
+
+    def handle_resync(self) -> None:
+        """`ChangeListener` reconnected: notifications may have been lost meanwhile."""
+        if self._listener_connected_before:
+            self.publish(RESYNC, {"reason": "listener-reconnected"})
+        self._listener_connected_before = True
+
+    def replay_since(self, last_event_id: str) -> Optional[List[OrderEvent]]:
+        """Events after `last_event_id`, or `None` if the gap can't be filled from history."""
+        epoch, _, raw_seq = last_event_id.strip().partition(":")
+        try:
+            seq = int(raw_seq)
+        except ValueError:
+            return None
+        if epoch != self.epoch or seq > self._seq:
+            return None
+        oldest = self._history[0].seq if self._history else self._seq + 1
+        if seq < oldest - 1:
+            return None
+        return [event for event in self._history if event.seq > seq]
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> OrderEventSubscription:
+        """
+        Start receiving events. With `last_event_id` the queue starts with the
+        missed events, or with a `resync` if they are no longer available.
+        """
+        subscription = OrderEventSubscription(self, self.queue_size)
+        if last_event_id:
+            missed = self.replay_since(last_event_id)
+            if missed is None:
+                subscription._offer(self._resync_event("unknown-last-event-id"))
+            else:
+                for event in missed:
+                    subscription._offer(event)
+        self._subscribers.add(subscription)
+        ORDER_EVENT_SUBSCRIBERS.set(len(self._subscribers))
+        return subscription
+
+    def _unsubscribe(self, subscription: OrderEventSubscription) -> None:
+        self._subscribers.discard(subscription)
+        ORDER_EVENT_SUBSCRIBERS.set(len(self._subscribers))
+
+    def _resync_event(self, reason: str) -> OrderEvent:
+        # Carries the current id: after re-fetching, the client resumes from here.
+        return OrderEvent(id=self.last_event_id, seq=self._seq, type=RESYNC, data={"reason": reason})
+
+
+ORDER_EVENTS = OrderEventHub()
+
+
+def attach_order_events(listener: ChangeListener, hub: OrderEventHub = ORDER_EVENTS) -> None:
+    """Feed the listener's `order_events` notifications into `hub`."""
+    listener.subscribe(ORDER_EVENTS_CHANNEL, hub.handle_notification, on_resync=hub.handle_resync)
+
+
+async def stream_order_events(
+    last_event_id: Optional[str] = None,
+    *,
+    hub: OrderEventHub = ORDER_EVENTS,
+    heartbeat_s: float = 15.0,
+    retry_ms: int = 3000,
+) -> AsyncIterator[str]:
+    """Server-sent event stream for one dashboard client (runs until the client disconnects)."""
+    with hub.subscribe(last_event_id) as subscription:
+        yield f"retry: {retry_ms}\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=heartbeat_s)
+            except asyncio.TimeoutError:
+                # Comment line: keeps proxies from closing an idle stream.
+                yield ": keep-alive\n\n"
+                continue
+            yield event.to_sse()
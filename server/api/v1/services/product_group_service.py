@@ -0,0 +1,123 @@
+"""
+Product equivalence groups (see `database/init/14_product_groups.sql`).
+
+Supplier SKUs (`artikel` rows) belong to a canonical product via
+`artikel.product_group_id`. Alias names map to groups, e.g. "Schutzbrille" ->
+"Sicherheitsbrille". This module keeps the whole mapping in memory, with each
+group's members ranked cheapest first. Alternatives and cheapest-supplier
+lookups are then dict reads: an order listing costs no queries for them.
+
+Responsibilities:
+- `ProductGroupIndex`: group membership and price ranking, plus
+  `alternatives(...)` and `cheapest(...)`.
+- `get_product_group_index()`: the index. It is loaded with one query over
+  `idx_artikel_group_price` and cached until `artikel`, `construction_sites`
+  or the group tables change.
+
+Non-responsibilities:
+- Assigning groups: the `artikel_product_group` trigger does that on write.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..data_access.cache import ReadThroughCache, cached
+from ..data_access.database import get_db_connection
+from ..data_access.records import SiteArtikelRecord
+from ..observability.metrics import track_db_query
+
+logger = logging.getLogger(__name__)
+
+_INDEX_CACHE = ReadThroughCache(
+    "product_groups",
+    tables=("artikel", "construction_sites", "product_groups", "product_group_aliases"),
+    max_entries=1,
+)
+
+_MEMBERS_SQL = """
+    SELECT
+        a.artikel_id,
+        a.artikelname,
+        a.kategorie,
+        a.einheit,
+        a.preis_eur,
+        a.lieferant,
+        a.verbrauchsart,
+        a.gefahrgut,
+        a.lagerort,
+        a.construction_site_id,
+        cs.name as construction_site_name,
+        a.product_group_id
+    FROM artikel a
+    LEFT JOIN construction_sites cs ON a.construction_site_id = cs.id
+    WHERE a.product_group_id IS NOT NULL
+    ORDER BY a.product_group_id, a.preis_eur NULLS LAST, a.artikel_id
+"""
+
+
+def normalize_product_name(name: Optional[str]) -> str:
+    """Alias key for `name`, as in SQL: `lower(btrim(name))`."""
+    return (name or "").strip().lower()
+
+
+class ProductGroupIndex:
+    """Artikel grouped by canonical product, each group ordered cheapest first."""
+
+    def __init__(
+        self,
+        members: Sequence[Tuple[int, SiteArtikelRecord]],
+        aliases: Sequence[Tuple[str, int]],
+    ) -> None:
+        self._groups: Dict[int, List[SiteArtikelRecord]] = {}
+        self._group_of_artikel: Dict[str, int] = {}
+        for group_id, artikel in members:  # already in price order
+            self._groups.setdefault(group_id, []).append(artikel)
+            self._group_of_artikel[artikel.artikel_id] = group_id
+        self._group_of_alias: Dict[str, int] = dict(aliases)
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def group_id(self, artikelname: Optional[str] = None, artikel_id: Optional[str] = None) -> Optional[int]:
+        """The group of `artikel_id` if known, else of `artikelname` (by alias)."""
+        if artikel_id is not None and artikel_id in self._group_of_artikel:
+            return self._group_of_artikel[artikel_id]
+        return self._group_of_alias.get(normalize_product_name(artikelname))
+
+    def members(self, group_id: Optional[int]) -> List[SiteArtikelRecord]:
+        """Members of `group_id`, cheapest first (unpriced last)."""
+        return list(self._groups.get(group_id, ())) if group_id is not None else []
+
+    def alternatives(self, artikelname: str, exclude_artikel_id: Optional[str] = None) -> List[SiteArtikelRecord]:
+        """Equivalent products from the same group, cheapest first, without `exclude_artikel_id`."""
+        group_id = self._group_of_alias.get(normalize_product_name(artikelname))
+        if group_id is None and exclude_artikel_id is not None:
+            group_id = self._group_of_artikel.get(exclude_artikel_id)
+        return [a for a in self.members(group_id) if a.artikel_id != exclude_artikel_id]
+
+    def cheapest(self, artikelname: Optional[str] = None, artikel_id: Optional[str] = None) -> Optional[SiteArtikelRecord]:
+        """The cheapest priced member of the product's group, or None."""
+        for artikel in self._groups.get(self.group_id(artikelname, artikel_id), ()):
+            if artikel.preis_eur is not None:
+                return artikel
+        return None
+
+
+@cached(_INDEX_CACHE)
+@track_db_query()
+def get_product_group_index() -> ProductGroupIndex:
+    """Load (or return the cached) product group index."""
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(_MEMBERS_SQL)
+            members = [(row[-1], SiteArtikelRecord(*row[:-1])) for row in cur]
+            cur.execute("SELECT alias_key, group_id FROM product_group_aliases")
+            aliases = cur.fetchall()
+    finally:
+        conn.close()
+    index = ProductGroupIndex(members, aliases)
+    logger.info(f"Loaded {len(index)} product groups ({len(members)} artikel, {len(aliases)} aliases)")
+    return index
@@ -1,13 +1,19 @@
 import asyncio
 import json
 import logging
+import os
 from typing import Any, Callable, Optional
 
 import websockets
 from fastapi import WebSocket, WebSocketDisconnect
 
+from ..observability.metrics import SCRIBE_SESSIONS_ACTIVE
+
 logger = logging.getLogger(__name__)
 
+# Overridable so load tests can point Scribe at a local stand-in (see server/benchmarks).
+DEFAULT_ELEVENLABS_WS_BASE_URL = "wss://api.elevenlabs.io"
+
 
 class ScribeSession:
     """
@@ -44,7 +50,8 @@ class ScribeSession:
     async def connect_to_elevenlabs(self) -> None:
         """Establish WebSocket connection to ElevenLabs Scribe API."""
         # Build WebSocket URL with query parameters
-        url = f"wss://api.elevenlabs.io/v1/speech-to-text/realtime?model_id={self.model_id}"
+        base_url = os.getenv("ELEVENLABS_WS_BASE_URL", DEFAULT_ELEVENLABS_WS_BASE_URL)
+        url = f"{base_url}/v1/speech-to-text/realtime?model_id={self.model_id}"
         
         if self.language_code:
             url += f"&language_code={self.language_code}"
@@ -189,6 +196,7 @@ class ScribeSession:
 
     async def start(self) -> None:
         """Start the bidirectional streaming session."""
+        SCRIBE_SESSIONS_ACTIVE.inc()
         try:
             # Accept client connection
             await self.client_ws.accept()
@@ -218,6 +226,7 @@ class ScribeSession:
         
         finally:
             await self.cleanup()
+            SCRIBE_SESSIONS_ACTIVE.dec()
 
     async def cleanup(self) -> None:
         """Clean up connections."""
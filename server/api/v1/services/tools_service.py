@@ -15,6 +15,7 @@ Non-responsibilities:
 from typing import Any, Dict, List, Optional
 
 from ..data_access import tools_runtime as _rt
+from ..data_access.records import ArtikelRecord, InventoryItemRecord
 
 
 class ToolsServiceError(RuntimeError):
@@ -25,31 +26,35 @@ class ToolsServiceError(RuntimeError):
 TOOL_DEFINITIONS = _rt.TOOL_DEFINITIONS
 
 
-def execute_tool(*, name: str, tool_input: Optional[Dict[str, Any]] = None) -> Any:
-    return _rt.execute_tool(name=name, tool_input=tool_input)
+def execute_tool(
+    *, name: str, tool_input: Optional[Dict[str, Any]] = None, conversation_id: Optional[str] = None
+) -> Any:
+    return _rt.execute_tool(name=name, tool_input=tool_input, conversation_id=conversation_id)
 
 
-def stringify_tool_result(result: Any) -> str:
-    return _rt.stringify_tool_result(result)
+def stringify_tool_result(
+    result: Any, *, tool_name: Optional[str] = None, tool_input: Optional[Dict[str, Any]] = None
+) -> str:
+    return _rt.stringify_tool_result(result, tool_name=tool_name, tool_input=tool_input)
 
 
 def get_all_product_names() -> List[str]:
     return _rt.get_all_product_names()
 
 
-def get_product_prices_by_name_regex(*, name_regex: str) -> List[Dict[str, Any]]:
+def get_product_prices_by_name_regex(*, name_regex: str) -> List[ArtikelRecord]:
     return _rt.get_product_prices_by_name_regex(name_regex=name_regex)
 
 
-def get_inventory_items_by_name_regex(*, name_regex: str) -> List[Dict[str, Any]]:
+def get_inventory_items_by_name_regex(*, name_regex: str) -> List[InventoryItemRecord]:
     return _rt.get_inventory_items_by_name_regex(name_regex=name_regex)
 
 
-def inventory_search(*, query_text: str, site_id: Optional[str] = None) -> List[Dict[str, Any]]:
+def inventory_search(*, query_text: str, site_id: Optional[str] = None) -> List[InventoryItemRecord]:
     return _rt.inventory_search(query_text=query_text, site_id=site_id)
 
 
-def product_price_search(*, query_text: str) -> List[Dict[str, Any]]:
+def product_price_search(*, query_text: str) -> List[ArtikelRecord]:
     return _rt.product_price_search(query_text=query_text)
 
 
@@ -5,18 +5,31 @@ Flow:
 1. Open WebSocket to ElevenLabs
 2. Send text chunks as they arrive from Claude
 3. Receive audio chunks and yield them back
+
+Closing the generator early (`aclose()` or cancelling the consumer) closes the
+ElevenLabs socket and the upstream text iterator immediately.
 """
 import os
 import json
 import base64
 import asyncio
+import time
 import websockets
 
+from ..observability.metrics import TTS_TIME_TO_FIRST_AUDIO
+from ..observability.tracing import start_span
+
 # Default voice - "Charlotte" (warm, sultry tone) - English
 DEFAULT_VOICE_ID_EN = "XB0fDUnXU5powFXDhCwa"
 # German voice - "Matilda" (multilingual, works well with German)
 DEFAULT_VOICE_ID_DE = "XrExE9yKIg1WjnnlVkGX"
 
+# Overridable so load tests can point TTS at a local stand-in (see server/benchmarks).
+DEFAULT_ELEVENLABS_WS_BASE_URL = "wss://api.elevenlabs.io"
+
+# Don't wait long for ElevenLabs' close handshake when a stream is torn down early.
+TTS_CLOSE_TIMEOUT_S = 1.0
+
 
 async def stream_tts(text_iterator, language: str = "en"):
     """
@@ -41,49 +54,87 @@ async def stream_tts(text_iterator, language: str = "en"):
     voice_id = os.getenv("ELEVENLABS_VOICE_ID", default_voice)
     model_id = "eleven_turbo_v2_5"  # Faster model (supports multilingual)
     
-    uri = f"wss://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream-input?model_id={model_id}&output_format=mp3_44100_128"
+    base_url = os.getenv("ELEVENLABS_WS_BASE_URL", DEFAULT_ELEVENLABS_WS_BASE_URL)
+    uri = f"{base_url}/v1/text-to-speech/{voice_id}/stream-input?model_id={model_id}&output_format=mp3_44100_128"
     
-    async with websockets.connect(uri) as ws:
-        # Send initial config (BOS - Beginning of Stream)
-        await ws.send(json.dumps({
-            "text": " ",
-            "voice_settings": {"stability": 0.7, "similarity_boost": 0.85, "speed": 1.15},
-            "xi_api_key": api_key
-        }))
-        
-        # Task to receive audio chunks
-        audio_queue = asyncio.Queue()
-        done_event = asyncio.Event()
+    # Manually-ended spans: this generator yields, so nothing may stay "current".
+    stream_span = start_span("tts.stream", language=language, model_id=model_id)
+    first_audio_span = None
+    first_text_at = None
+    connect_span = start_span("tts.connect")
+    try:
+        async with websockets.connect(uri, close_timeout=TTS_CLOSE_TIMEOUT_S) as ws:
+            connect_span.end()
+            # Send initial config (BOS - Beginning of Stream)
+            await ws.send(json.dumps({
+                "text": " ",
+                "voice_settings": {"stability": 0.7, "similarity_boost": 0.85, "speed": 1.15},
+                "xi_api_key": api_key
+            }))
         
-        async def receive_audio():
-            try:
-                async for message in ws:
-                    data = json.loads(message)
-                    if data.get("audio"):
-                        audio_bytes = base64.b64decode(data["audio"])
-                        await audio_queue.put(audio_bytes)
-                    if data.get("isFinal"):
-                        break
-            finally:
-                done_event.set()
-        
-        # Start receiving audio in background
-        receive_task = asyncio.create_task(receive_audio())
+            # Task to receive audio chunks
+            audio_queue = asyncio.Queue()
+            done_event = asyncio.Event()
         
-        # Send text chunks as they arrive
-        async for text_chunk in text_iterator:
-            if text_chunk:
-                await ws.send(json.dumps({"text": text_chunk}))
+            async def receive_audio():
+                got_audio = False
+                try:
+                    async for message in ws:
+                        data = json.loads(message)
+                        if data.get("audio"):
+                            if not got_audio and first_audio_span is not None:
+                                # TTS first byte: first text chunk sent → first audio received.
+                                got_audio = True
+                                first_audio_span.end()
+                                TTS_TIME_TO_FIRST_AUDIO.observe(time.perf_counter() - first_text_at)
+                            audio_bytes = base64.b64decode(data["audio"])
+                            await audio_queue.put(audio_bytes)
+                        if data.get("isFinal"):
+                            break
+                finally:
+                    done_event.set()
         
-        # Signal end of text (EOS)
-        await ws.send(json.dumps({"text": ""}))
+            # Start receiving audio in background
+            receive_task = asyncio.create_task(receive_audio())
         
-        # Yield audio chunks as they arrive
-        while not done_event.is_set() or not audio_queue.empty():
             try:
-                audio = await asyncio.wait_for(audio_queue.get(), timeout=0.1)
-                yield audio
-            except asyncio.TimeoutError:
-                continue
-        
-        await receive_task
+                # Send text chunks as they arrive
+                async for text_chunk in text_iterator:
+                    if text_chunk:
+                        if first_audio_span is None:
+                            first_audio_span = start_span("tts.first_audio")
+                            first_text_at = time.perf_counter()
+                        await ws.send(json.dumps({"text": text_chunk}))
+            
+                # Signal end of text (EOS)
+                await ws.send(json.dumps({"text": ""}))
+            
+                # Yield audio chunks as they arrive
+                while not done_event.is_set() or not audio_queue.empty():
+                    try:
+                        audio = await asyncio.wait_for(audio_queue.get(), timeout=0.1)
+                        yield audio
+                    except asyncio.TimeoutError:
+                        continue
+            
+                await receive_task
+            finally:
+                # On cancellation/close (barge-in) stop everything upstream right away:
+                # the receiver task, the text producer and the ElevenLabs socket.
+                if not receive_task.done():
+                    receive_task.cancel()
+                    try:
+                        await receive_task
+                    except (asyncio.CancelledError, Exception):
+                        pass
+                aclose = getattr(text_iterator, "aclose", None)
+                if aclose is not None:
+                    try:
+                        await aclose()
+                    except Exception:
+                        pass
+    finally:
+        connect_span.end()
+        if first_audio_span is not None:
+            first_audio_span.end()
+        stream_span.end()
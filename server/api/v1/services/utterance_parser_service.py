@@ -0,0 +1,388 @@
+"""
+Deterministic parser for simple order utterances (service layer).
+
+Many voice turns are plain "quantity + unit + product" orders: "zehn
+Kabelbinder", "5 Säcke Zement", "twenty-five m Edelstahlband". These can be
+resolved locally in well under a millisecond once the catalog is in memory,
+so they do not need a model round trip.
+
+Responsibilities:
+- Quantities: digits and German/English number words, including compounds
+  ("fünfundzwanzig", "twenty-five") and "Dutzend"/"dozen". Vague amounts
+  ("ein paar", "some") are not quantities.
+- Units: common spellings mapped to the catalog's `einheit` style
+  (Stk, m, Sack, Pack, Rolle, ...).
+- Catalog matching against `artikel` names (cached until `artikel` or
+  `construction_sites` change). An exact name match, up to plurals, is
+  unambiguous. If several suppliers carry that name, the cheapest wins.
+  Once built, the matcher is rebuilt on a background thread after such a
+  change, so the next voice turn does not load the catalog itself.
+- `parse_order_utterance(...)` -> `ParsedUtterance` with one line per item
+  (split on "und"/"and"/commas) and a confidence.
+- `apply_fast_path(...)`: adds a confident utterance to the conversation's
+  order draft and returns the spoken confirmation (for `websocket_service`).
+  Only new items that are not in stock anywhere are added this way: a
+  repeated item ("noch 5 Kabelbinder": add or replace?) and the stock policy
+  of the system prompt are left to Claude. Turns without a leading quantity
+  in every item ("Was kostet der Bohrhammer?") are rejected before the
+  catalog is touched.
+
+Non-responsibilities:
+- Anything needing judgement (specs, alternatives, inventory policy): those
+  turns go to Claude.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..data_access.cache import ReadThroughCache, TableChange, cached, on_table_change
+from ..data_access.helpers import stem
+from ..data_access.order_drafts import ORDER_DRAFTS, DraftError
+from ..data_access.records import SiteArtikelRecord
+from .artikel_service import get_all_artikel
+from .inventory_service import get_artikel_stock
+
+logger = logging.getLogger(__name__)
+
+# Minimum confidence for `apply_fast_path` (exact catalog names, up to plurals).
+FAST_PATH_MIN_CONFIDENCE = 0.95
+
+CONFIDENCE_EXACT = 1.0
+CONFIDENCE_STEM = 0.95
+CONFIDENCE_PARTIAL = 0.6
+
+_CATALOG_CACHE = ReadThroughCache("utterance_catalog", tables=("artikel", "construction_sites"), max_entries=1)
+
+_ONES: Dict[str, int] = {
+    "ein": 1, "eine": 1, "einen": 1, "eins": 1, "einem": 1, "einer": 1,
+    "zwei": 2, "zwo": 2, "drei": 3, "vier": 4, "fünf": 5, "fuenf": 5,
+    "sechs": 6, "sieben": 7, "acht": 8, "neun": 9, "zehn": 10, "elf": 11,
+    "zwölf": 12, "zwoelf": 12, "dreizehn": 13, "vierzehn": 14, "fünfzehn": 15,
+    "fuenfzehn": 15, "sechzehn": 16, "siebzehn": 17, "achtzehn": 18, "neunzehn": 19,
+    "one": 1, "a": 1, "an": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11,
+    "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15, "sixteen": 16,
+    "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+_TENS: Dict[str, int] = {
+    "zwanzig": 20, "dreißig": 30, "dreissig": 30, "vierzig": 40, "fünfzig": 50,
+    "fuenfzig": 50, "sechzig": 60, "siebzig": 70, "achtzig": 80, "neunzig": 90,
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60,
+    "seventy": 70, "eighty": 80, "ninety": 90,
+}
+_DOZEN = frozenset({"dutzend", "dozen"})
+_VAGUE = frozenset({"paar", "einige", "mehrere", "etliche", "some", "few", "several", "couple"})
+
+# Spoken / written unit -> catalog `einheit` style.
+_UNITS: Dict[str, str] = {}
+for _canonical, _spellings in {
+    "Stk": ("stk", "stck", "stück", "stueck", "stücke", "x", "pcs", "pc", "piece", "pieces"),
+    "m": ("m", "meter", "metre", "meters", "metres", "metern"),
+    "Sack": ("sack", "säcke", "saecke", "bag", "bags"),
+    "Pack": ("pack", "packs", "packung", "packungen", "pkg", "packet", "packets", "package", "packages"),
+    "Rolle": ("rolle", "rollen", "roll", "rolls"),
+    "Karton": ("karton", "kartons", "box", "boxes"),
+    "Paar": ("paar", "pair", "pairs"),
+    "kg": ("kg", "kilo", "kilogramm", "kilogram", "kilograms"),
+    "l": ("l", "liter", "litre", "liters", "litres"),
+    "Eimer": ("eimer", "bucket", "buckets"),
+    "Dose": ("dose", "dosen", "can", "cans"),
+}.items():
+    for _spelling in _spellings:
+        _UNITS[_spelling] = _canonical
+
+_FILLER = frozenset({
+    "bitte", "ich", "wir", "brauche", "brauchen", "bräuchte", "bräuchten", "möchte", "möchten",
+    "bestelle", "bestellen", "hätte", "hätten", "gern", "gerne", "noch", "dazu", "mal", "von",
+    "please", "i", "we", "need", "want", "would", "like", "order", "get", "add", "also", "of",
+    "more", "another", "füge", "hinzu", "nimm", "take",
+})
+# Commas separate items, except in decimals ("2,5 m").
+_SEPARATORS = re.compile(r"\s*(?:(?<!\d),|,(?!\d)|;|\bund\b|\bsowie\b|\band\b|\bplus\b)\s*")
+_TOKEN = re.compile(r"[0-9]+(?:[.,][0-9]+)?[a-zäöüß]*|[a-zäöüß]+(?:-[a-zäöüß]+)*", re.IGNORECASE)
+
+
+def _german_number(word: str) -> Optional[int]:
+    """"fünfundzwanzig" -> 25, "zweihundert" -> 200, "hundertzehn" -> 110."""
+    if word in _ONES:
+        return _ONES[word]
+    if word in _TENS:
+        return _TENS[word]
+    if "hundert" in word:
+        head, _, rest = word.partition("hundert")
+        factor = _ONES.get(head, 0) if head else 1
+        remainder = _german_number(rest) if rest else 0
+        if factor and remainder is not None:
+            return factor * 100 + remainder
+        return None
+    if "und" in word:
+        ones, _, tens = word.partition("und")
+        if ones in _ONES and tens in _TENS:
+            return _ONES[ones] + _TENS[tens]
+    return None
+
+
+def _number(word: str) -> Optional[int]:
+    if word.isdigit():
+        return int(word)
+    if word in ("hundred", "hundert"):
+        return 100
+    if "-" in word:  # twenty-five
+        tens, _, ones = word.partition("-")
+        if tens in _TENS and ones in _ONES:
+            return _TENS[tens] + _ONES[ones]
+        return None
+    return _german_number(word)
+
+
+def _tokens(text: str) -> List[str]:
+    return [t.casefold() for t in _TOKEN.findall(text)]
+
+
+@dataclass(frozen=True)
+class ParsedLine:
+    """One "quantity + unit + product" item of an utterance."""
+
+    text: str
+    quantity: Optional[int]
+    unit: Optional[str]
+    product: str
+    artikel: Optional[SiteArtikelRecord] = None
+    confidence: float = 0.0
+    candidates: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class ParsedUtterance:
+    lines: List[ParsedLine] = field(default_factory=list)
+
+    @property
+    def confidence(self) -> float:
+        return min((line.confidence for line in self.lines), default=0.0)
+
+
+class CatalogMatcher:
+    """Catalog names by normalized token sequence, each with its cheapest artikel."""
+
+    def __init__(self, artikel: Sequence[SiteArtikelRecord]) -> None:
+        self._by_name: Dict[Tuple[str, ...], SiteArtikelRecord] = {}
+        for row in sorted(artikel, key=lambda a: (a.preis_eur is None, a.preis_eur or 0, a.artikel_id)):
+            key = tuple(_tokens(row.artikelname or ""))
+            if key:
+                self._by_name.setdefault(key, row)  # cheapest first
+        self._by_stems: Dict[Tuple[str, ...], List[SiteArtikelRecord]] = {}
+        for key, row in self._by_name.items():
+            self._by_stems.setdefault(tuple(stem(t) for t in key), []).append(row)
+
+    def match(self, product: Sequence[str]) -> Tuple[Optional[SiteArtikelRecord], float, Tuple[str, ...]]:
+        """(artikel, confidence, candidate names) for product tokens."""
+        key = tuple(product)
+        if key in self._by_name:
+            return self._by_name[key], CONFIDENCE_EXACT, ()
+        stems = tuple(stem(t) for t in key)
+        exact_stems = self._by_stems.get(stems, [])
+        if len(exact_stems) == 1:
+            return exact_stems[0], CONFIDENCE_STEM, ()
+        # Every spoken word occurs in the name (prefix or compound part).
+        partial = [
+            row
+            for name, row in self._by_name.items()
+            if all(any(word_stem in part for part in name) for word_stem in stems)
+        ]
+        names = tuple(sorted({row.artikelname for row in (exact_stems or partial)}))[:5]
+        if len(partial) == 1 and not exact_stems:
+            return partial[0], CONFIDENCE_PARTIAL, names
+        return None, 0.0, names
+
+
+@cached(_CATALOG_CACHE)
+def get_catalog_matcher() -> CatalogMatcher:
+    matcher = CatalogMatcher(get_all_artikel())
+    _MATCHER_REFRESHER.warm = True
+    return matcher
+
+
+class _MatcherRefresher:
+    """
+    Rebuilds the catalog matcher on a daemon thread after `artikel` /
+    `construction_sites` changes, once it has been built at least once.
+    Changes arriving during a rebuild are folded into one more rebuild.
+    """
+
+    def __init__(self) -> None:
+        self.warm = False
+        self._lock = threading.Lock()
+        self._running = False
+        self._again = False
+
+    def note_change(self, change: TableChange) -> None:
+        if not self.warm or change.table not in _CATALOG_CACHE.tables:
+            return
+        with self._lock:
+            if self._running:
+                self._again = True
+                return
+            self._running = True
+        threading.Thread(target=self._run, name="catalog-matcher-refresh", daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                get_catalog_matcher()
+            except Exception:
+                logger.exception("Catalog matcher refresh failed; the next fast-path turn loads it")
+            with self._lock:
+                if not self._again:
+                    self._running = False
+                    return
+                self._again = False
+
+
+_MATCHER_REFRESHER = _MatcherRefresher()
+on_table_change(_MATCHER_REFRESHER.note_change)
+
+
+def _leads_with_quantity(segment: str) -> bool:
+    """Does the first non-filler word look like a quantity? (No catalog needed.)"""
+    words = [w for w in _tokens(segment) if w not in _FILLER]
+    if not words:
+        return False
+    first = words[0]
+    return first[0].isdigit() or first in _DOZEN or _number(first) is not None
+
+
+def _parse_segment(segment: str, matcher: CatalogMatcher) -> Optional[ParsedLine]:
+    words = [w for w in _tokens(segment) if w not in _FILLER]
+    if not words:
+        return None
+    quantity: Optional[int] = None
+    unit: Optional[str] = None
+    rest: List[str] = []
+    vague = False
+    i = 0
+    while i < len(words):
+        word = words[i]
+        digits = re.fullmatch(r"([0-9]+)([.,][0-9]+)?([a-zäöüß]*)", word)
+        if quantity is None and not rest and digits:
+            if digits.group(2):  # fractional amounts need a human decision
+                vague = True
+            quantity = int(digits.group(1))
+            if digits.group(3) in _UNITS:
+                unit = _UNITS[digits.group(3)]
+        elif word in _VAGUE and not rest and not (word == "paar" and (quantity or 1) > 1):
+            vague = True  # "ein paar" is "a few"; "zwei Paar" falls through to the unit
+        elif quantity is None and not rest and _number(word) is not None:
+            quantity = _number(word)
+            # "twenty five", "zwei hundert"
+            while i + 1 < len(words):
+                nxt = words[i + 1]
+                if quantity in _TENS.values() and nxt in _ONES and nxt not in ("a", "an"):
+                    quantity += _ONES[nxt]
+                elif nxt in ("hundred", "hundert") and quantity < 10:
+                    quantity *= 100
+                else:
+                    break
+                i += 1
+        elif word in _DOZEN and not rest:
+            quantity = (quantity or 1) * 12
+        elif unit is None and not rest and word in _UNITS and (quantity is not None or vague):
+            unit = _UNITS[word]
+        else:
+            rest.append(word)
+        i += 1
+    if not rest:
+        return None
+    artikel, confidence, candidates = matcher.match(rest)
+    if vague or not quantity:
+        confidence = min(confidence, CONFIDENCE_PARTIAL)
+    elif artikel is not None and unit is not None and artikel.einheit and _UNITS.get(artikel.einheit.casefold(), artikel.einheit) != unit:
+        confidence = min(confidence, CONFIDENCE_PARTIAL)  # "10 m" of something sold per piece
+    return ParsedLine(
+        text=segment.strip(),
+        quantity=None if vague else quantity,
+        unit=unit or (artikel.einheit if artikel is not None else None),
+        product=" ".join(rest),
+        artikel=artikel,
+        confidence=confidence,
+        candidates=candidates,
+    )
+
+
+def parse_order_utterance(text: str, *, matcher: Optional[CatalogMatcher] = None) -> ParsedUtterance:
+    """Split `text` into items and resolve each against the catalog."""
+    if not isinstance(text, str) or not text.strip():
+        return ParsedUtterance()
+    matcher = matcher or get_catalog_matcher()
+    lines = [
+        line
+        for line in (_parse_segment(segment, matcher) for segment in _SEPARATORS.split(text.strip()))
+        if line is not None
+    ]
+    return ParsedUtterance(lines)
+
+
+def _confirmation(lines: Sequence[ParsedLine], language: str) -> str:
+    items = ", ".join(
+        " ".join(str(part) for part in (line.quantity, line.unit, line.artikel.artikelname) if part and part != "Stk")
+        for line in lines
+    )
+    if language == "de":
+        return f"{items} zum Entwurf hinzugefügt. Was noch?"
+    return f"Added {items} to the draft. What else?"
+
+
+def apply_fast_path(*, conversation_id: str, text: str, language: str = "en") -> Optional[str]:
+    """
+    Resolve a simple order utterance without the model.
+
+    When every item of `text` is resolved with at least
+    `FAST_PATH_MIN_CONFIDENCE`, none of them is in the draft or in stock yet
+    and the draft has room for all of them, the items are added to the
+    conversation's order draft as confirmed lines and the spoken confirmation
+    is returned. Otherwise nothing changes and None is returned.
+    """
+    try:
+        segments = _SEPARATORS.split(text.strip()) if isinstance(text, str) else []
+        if not segments or not all(_leads_with_quantity(segment) for segment in segments if segment):
+            return None  # a question or an unclear amount: leave it to the model, catalog untouched
+        parsed = parse_order_utterance(text)
+        if not parsed.lines or parsed.confidence < FAST_PATH_MIN_CONFIDENCE:
+            return None
+        draft = ORDER_DRAFTS.lines(conversation_id)
+        if len(draft) + len(parsed.lines) > ORDER_DRAFTS.max_lines:
+            return None
+        drafted = {line.artikel_id for line in draft} | {(line.artikel_name or "").casefold() for line in draft}
+        if any(
+            line.artikel.artikel_id in drafted or line.artikel.artikelname.casefold() in drafted
+            for line in parsed.lines
+        ):
+            return None
+        stock = get_artikel_stock(
+            [line.artikel.artikel_id for line in parsed.lines],
+            [line.artikel.artikelname for line in parsed.lines],
+        )
+        if any(quantity > 0 for quantity in stock.values()):
+            return None
+    except Exception:
+        logger.exception("Fast-path checks failed; falling back to the model")
+        return None
+    try:
+        for line in parsed.lines:
+            ORDER_DRAFTS.upsert(
+                conversation_id,
+                artikel_name=line.artikel.artikelname,
+                artikel_id=line.artikel.artikel_id,
+                menge=line.quantity,
+                einheit=line.artikel.einheit,
+                einzelpreis=line.artikel.preis_eur,
+                status="confirmed",
+            )
+    except DraftError:
+        logger.exception("Fast-path draft update failed; falling back to the model")
+        return None
+    return _confirmation(parsed.lines, language)
@@ -16,27 +16,55 @@ Server → client:
 - {"type": "server_message", ...}              # acks / informational
 - {"type": "turn_complete", "trigger": "..."}  # emitted once per flushed turn
 - {"type": "assistant_start"}
-- {"type": "assistant_token", "text": "..."}   # streamed chunks
+- {"type": "assistant_token", "text": "..."}   # streamed chunks (coalesced, see below)
 - {"type": "assistant_done"}
-- {"type": "stream_cancelled", "reason": "..."}
+- {"type": "stream_cancelled", "reason": "...", "interrupt_to_silence_ms": <float>}
 - {"type": "assistant_error", "message": "..."}
 
 Binary frames
 -------------
 Binary frames are accepted and acknowledged (placeholder for future audio input).
+
+Fast path
+---------
+Turns that are plain orders of new, out-of-stock items ("zehn Kabelbinder",
+"2 Säcke Zement") are resolved by `utterance_parser_service.apply_fast_path`:
+the items go straight into the order draft and a short confirmation is
+spoken, without a Claude round trip. With `RESPONSE_CACHE_ENABLED=1`,
+repeated stock/price questions that open a conversation are answered from
+`claude_service`'s response cache, replaying the audio of the first answer
+instead of calling TTS again.
+
+Outbound scheduling
+-------------------
+All server → client frames go through a per-connection `OutboundFrameScheduler`
+(see `ws_frame_scheduler.py`): token deltas are coalesced on a short window,
+TTS audio is prioritized and backpressured, and queue depths are logged when
+the connection closes.
 """
 
 import asyncio
 import json
 import logging
+import time
 import uuid
 from typing import Any, Optional
 
 from fastapi import WebSocket, WebSocketDisconnect
 
-from .claude_service import ClaudeServiceError, stream_claude_reply
+from ..observability.metrics import WS_INTERRUPT_TO_SILENCE, WS_OUTBOUND_MAX_QUEUE_DEPTH, WS_SESSIONS_ACTIVE
+from ..observability.tracing import span, start_span, turn_context, use_span
+from .claude_service import (
+    ClaudeServiceError,
+    lookup_cached_reply,
+    remember_reply_audio,
+    response_cache_enabled,
+    stream_claude_reply,
+)
 from .message_history_service import append_message
+from .utterance_parser_service import apply_fast_path
 from .tts_service import stream_tts
+from .ws_frame_scheduler import OutboundFrameScheduler
 
 # Use Uvicorn's logger so logs reliably show up in dev/docker output.
 logger = logging.getLogger("uvicorn.error")
@@ -51,6 +79,10 @@ MAX_TURN_MESSAGES = 100
 MAX_TURN_CHARS = 50_000
 
 
+def _ms_since(started_at: float) -> float:
+    return round((time.perf_counter() - started_at) * 1000.0, 1)
+
+
 async def handle_websocket(ws: WebSocket) -> None:
     """
     WebSocket session handler (service layer).
@@ -64,6 +96,7 @@ async def handle_websocket(ws: WebSocket) -> None:
     """
     # Accept immediately so the client can start sending frames.
     await ws.accept()
+    WS_SESSIONS_ACTIVE.inc()
 
     # A single websocket session maps to a single in-memory "conversation".
     conversation_id = ws.query_params.get("conversation_id") or uuid.uuid4().hex
@@ -73,7 +106,12 @@ async def handle_websocket(ws: WebSocket) -> None:
     initial_lang = ws.query_params.get("language", "en")
     if initial_lang not in ("en", "de"):
         initial_lang = "en"
-    session_state = {"language": initial_lang}
+    # "turn" counts flushed turns; it keys latency traces together with conversation_id.
+    session_state = {"language": initial_lang, "turn": 0}
+
+    # Single writer for everything we send on this socket (coalescing + backpressure).
+    outbound = OutboundFrameScheduler(ws)
+    outbound.start()
 
     # Background task that streams the assistant response to the client.
     stream_task: Optional[asyncio.Task[None]] = None
@@ -100,6 +138,7 @@ async def handle_websocket(ws: WebSocket) -> None:
         if stream_task is None or stream_task.done():
             stream_task = None
             return
+        started_at = time.perf_counter()
         stream_task.cancel()
         try:
             await stream_task
@@ -107,14 +146,23 @@ async def handle_websocket(ws: WebSocket) -> None:
             pass
         finally:
             stream_task = None
+            # Tokens/audio of the cancelled stream that haven't left yet are stale.
+            outbound.discard_pending()
+            # "Interrupt-to-silence": upstream work (Claude request, DB queries, TTS
+            # socket) is torn down and no further audio for this stream will be sent.
+            silence_ms = round((time.perf_counter() - started_at) * 1000.0, 1)
+            WS_INTERRUPT_TO_SILENCE.observe(silence_ms / 1000.0, reason=reason)
+            logger.info("ws %s stream cancelled (%s): interrupt_to_silence_ms=%s", conversation_id, reason, silence_ms)
             # Let the client know the current stream was stopped.
             try:
-                await ws.send_json({"type": "stream_cancelled", "reason": reason})
+                outbound.send_json(
+                    {"type": "stream_cancelled", "reason": reason, "interrupt_to_silence_ms": silence_ms}
+                )
             except Exception:
                 # If we're already disconnected/closing, ignore.
                 pass
 
-    async def _stream_assistant_response(user_text: str) -> None:
+    async def _stream_assistant_response(user_text: str, turn_number: int, turn_span: Any) -> None:
         """
         Stream Claude tokens using the existing message envelope.
 
@@ -122,36 +170,114 @@ async def handle_websocket(ws: WebSocket) -> None:
         it does not own turn-buffering, state, or cancellation policy—only
         sending the stream events over this WebSocket.
         """
-        await ws.send_json({"type": "assistant_start"})
+        with turn_context(conversation_id, turn_number), use_span(turn_span):
+            try:
+                await _stream_turn(user_text, turn_span)
+            except asyncio.CancelledError:
+                turn_span.set_attribute("cancelled", True)
+                raise
+            finally:
+                turn_span.end()
+
+    async def _stream_turn(user_text: str, turn_span: Any) -> None:
+        started_at = time.perf_counter()
+        outbound.send_json({"type": "assistant_start"})
 
         assistant_text_parts: list[str] = []
         try:
-            # `stream_claude_reply()` yields text chunks as they arrive.
-            async def claude_text_stream():
-                async for text in stream_claude_reply(
+            # Simple orders ("zehn Kabelbinder") are resolved locally and skip
+            # the model round trip; everything else goes to Claude.
+            with span("ws.fast_path"):
+                fast_reply = await asyncio.to_thread(
+                    apply_fast_path,
+                    conversation_id=conversation_id,
+                    text=user_text,
+                    language=session_state["language"],
+                )
+            turn_span.set_attribute("fast_path", fast_reply is not None)
+            # Repeated stock/price questions come from the (opt-in) response cache,
+            # with the audio of the first answer when it was kept.
+            cached = None
+            if fast_reply is None:
+                cached = await lookup_cached_reply(
                     user_text=user_text, conversation_id=conversation_id, language=session_state["language"]
+                )
+            turn_span.set_attribute("response_cache_hit", cached is not None)
+            keep_audio: Optional[list[bytes]] = (
+                [] if fast_reply is None and cached is None and response_cache_enabled() else None
+            )
+
+            async def reply_source():
+                if fast_reply is not None or cached is not None:
+                    yield fast_reply if fast_reply is not None else cached.text
+                    return
+                async for text in stream_claude_reply(
+                    user_text=user_text,
+                    conversation_id=conversation_id,
+                    language=session_state["language"],
+                    use_cache=False,
                 ):
+                    yield text
+
+            # `reply_source()` yields text chunks as they arrive.
+            async def claude_text_stream():
+                async for text in reply_source():
                     if text:
+                        if not assistant_text_parts:
+                            turn_span.set_attribute("first_token_ms", _ms_since(started_at))
                         assistant_text_parts.append(text)
-                        await ws.send_json({"type": "assistant_token", "text": text})
+                        outbound.send_token(text)
                         # IMPORTANT: `stream_tts()` expects an async iterator.
                         # Yield each chunk so ElevenLabs can synthesize streaming audio.
                         yield text
 
-            async for audio_chunk in stream_tts(claude_text_stream(), language=session_state["language"]):
-                await ws.send_bytes(audio_chunk)
+            async def cached_audio_stream():
+                async for _text in claude_text_stream():
+                    pass
+                for chunk in cached.audio:
+                    yield chunk
+
+            if cached is not None and cached.audio:
+                tts_stream = cached_audio_stream()
+            else:
+                tts_stream = stream_tts(claude_text_stream(), language=session_state["language"])
+            try:
+                first_audio = True
+                async for audio_chunk in tts_stream:
+                    if first_audio:
+                        turn_span.set_attribute("first_audio_ms", _ms_since(started_at))
+                        first_audio = False
+                    if keep_audio is not None:
+                        keep_audio.append(audio_chunk)
+                    # Measures time spent waiting on the client (outbound backpressure).
+                    with span("ws.send_audio", bytes=len(audio_chunk)):
+                        await outbound.send_audio(audio_chunk)
+            finally:
+                # If we were cancelled while waiting on the client (backpressure), the
+                # generator is suspended; close it now so the TTS socket and Claude
+                # request don't linger until garbage collection.
+                await tts_stream.aclose()
         except asyncio.CancelledError:
             # Important: re-raise so upstream cancellation is respected.
             raise
-        except ClaudeServiceError:
+        except ClaudeServiceError as e:
             # Provider errors are already logged in the service layer.
-            await ws.send_json({"type": "assistant_error", "message": "anthropic_stream_error"})
-        except Exception:
+            turn_span.record_exception(e)
+            outbound.send_json({"type": "assistant_error", "message": "anthropic_stream_error"})
+        except Exception as e:
             # Never let model/provider failures crash the WS handler loop.
+            turn_span.record_exception(e)
             logger.exception("Anthropic stream error")
-            await ws.send_json({"type": "assistant_error", "message": "anthropic_stream_error"})
+            outbound.send_json({"type": "assistant_error", "message": "anthropic_stream_error"})
         else:
-            await ws.send_json({"type": "assistant_done"})
+            outbound.send_json({"type": "assistant_done"})
+            if keep_audio:
+                remember_reply_audio(
+                    user_text=user_text,
+                    language=session_state["language"],
+                    reply="".join(assistant_text_parts),
+                    audio=keep_audio,
+                )
             assistant_text = "".join(assistant_text_parts).strip()
             if assistant_text:
                 # Persist the assistant message for future turns in this session.
@@ -196,11 +322,15 @@ async def handle_websocket(ws: WebSocket) -> None:
         await append_message(conversation_id=conversation_id, role="user", content=full_text)
 
         # Useful for clients (UI state machines) and for debugging.
-        await ws.send_json({"type": "turn_complete", "trigger": trigger})
+        outbound.send_json({"type": "turn_complete", "trigger": trigger})
 
         # If a stream is in progress, cancel it and start a new one.
         await _cancel_stream(reason="new_turn")
-        stream_task = asyncio.create_task(_stream_assistant_response(full_text))
+        session_state["turn"] += 1
+        turn_number = session_state["turn"]
+        with turn_context(conversation_id, turn_number):
+            turn_span = start_span("ws.turn", trigger=trigger, chars=len(full_text))
+        stream_task = asyncio.create_task(_stream_assistant_response(full_text, turn_number, turn_span))
 
     async def _schedule_turn_flush() -> None:
         """
@@ -216,7 +346,10 @@ async def handle_websocket(ws: WebSocket) -> None:
             This is the current definition of "turn complete" for streaming/voice-like
             clients that send partial chunks over time.
             """
-            await asyncio.sleep(TURN_IDLE_SECONDS)
+            # Traced under the turn this wait will (most likely) flush into.
+            with turn_context(conversation_id, session_state["turn"] + 1):
+                with span("ws.turn_idle_wait", idle_s=TURN_IDLE_SECONDS):
+                    await asyncio.sleep(TURN_IDLE_SECONDS)
             await _flush_turn(trigger="idle_timeout")
 
         turn_task = asyncio.create_task(_idle_then_flush())
@@ -247,7 +380,7 @@ async def handle_websocket(ws: WebSocket) -> None:
             return True
 
     try:
-        await ws.send_json(
+        outbound.send_json(
             {"type": "server_hello", "message": "connected", "conversation_id": conversation_id}
         )
 
@@ -264,7 +397,7 @@ async def handle_websocket(ws: WebSocket) -> None:
                 try:
                     msg = json.loads(text)
                 except json.JSONDecodeError:
-                    await ws.send_json({"type": "error", "message": "invalid_json"})
+                    outbound.send_json({"type": "error", "message": "invalid_json"})
                     continue
 
                 msg_type = msg.get("type")
@@ -273,7 +406,7 @@ async def handle_websocket(ws: WebSocket) -> None:
                     # flush immediately and stream the assistant response.
                     user_text = msg.get("text")
                     if not isinstance(user_text, str):
-                        await ws.send_json(
+                        outbound.send_json(
                             {"type": "error", "message": "transcript.text must be a string"}
                         )
                         continue
@@ -293,7 +426,7 @@ async def handle_websocket(ws: WebSocket) -> None:
                     # Enforce the same safety limits as buffered turns.
                     ok = await _append_to_turn(user_text)
                     if not ok:
-                        await ws.send_json({"type": "error", "message": "turn_too_large"})
+                        outbound.send_json({"type": "error", "message": "turn_too_large"})
                         await _cancel_turn_timer()
                         await _flush_turn(trigger="limits")
                         continue
@@ -304,7 +437,7 @@ async def handle_websocket(ws: WebSocket) -> None:
                 if msg_type == "user_message":
                     user_text = msg.get("text")
                     if not isinstance(user_text, str):
-                        await ws.send_json(
+                        outbound.send_json(
                             {"type": "error", "message": "user_message.text must be a string"}
                         )
                         continue
@@ -324,13 +457,13 @@ async def handle_websocket(ws: WebSocket) -> None:
                     if not ok:
                         # Turn is getting too large; flush what we have and start a new turn.
                         # (We do not automatically include this overflowing message.)
-                        await ws.send_json({"type": "error", "message": "turn_too_large"})
+                        outbound.send_json({"type": "error", "message": "turn_too_large"})
                         await _cancel_turn_timer()
                         await _flush_turn(trigger="limits")
                         continue
 
                     await _schedule_turn_flush()
-                    await ws.send_json({"type": "server_message", "text": f"ack: {user_text}"})
+                    outbound.send_json({"type": "server_message", "text": f"ack: {user_text}"})
                     continue
 
                 if msg_type == "end_turn":
@@ -345,7 +478,7 @@ async def handle_websocket(ws: WebSocket) -> None:
                     await _cancel_turn_timer()
                     async with turn_lock:
                         turn_buffer.clear()
-                    await ws.send_json({"type": "server_message", "text": "interrupted"})
+                    outbound.send_json({"type": "server_message", "text": "interrupted"})
                     continue
 
                 if msg_type == "set_language":
@@ -353,21 +486,21 @@ async def handle_websocket(ws: WebSocket) -> None:
                     new_lang = msg.get("language")
                     if new_lang in ("en", "de"):
                         session_state["language"] = new_lang
-                        await ws.send_json({"type": "language_changed", "language": session_state["language"]})
+                        outbound.send_json({"type": "language_changed", "language": session_state["language"]})
                     else:
-                        await ws.send_json({"type": "error", "message": "invalid_language"})
+                        outbound.send_json({"type": "error", "message": "invalid_language"})
                     continue
 
-                await ws.send_json({"type": "error", "message": "unknown_type"})
+                outbound.send_json({"type": "error", "message": "unknown_type"})
                 continue
 
             # Binary frames are accepted (future: audio input). For now, just log size.
             data = frame.get("bytes")
             if data is not None:
-                await ws.send_json({"type": "binary_received", "bytes": len(data)})
+                outbound.send_json({"type": "binary_received", "bytes": len(data)})
                 continue
 
-            await ws.send_json({"type": "error", "message": "unsupported_frame"})
+            outbound.send_json({"type": "error", "message": "unsupported_frame"})
 
     except WebSocketDisconnect:
         # Client disconnected normally.
@@ -388,5 +521,15 @@ async def handle_websocket(ws: WebSocket) -> None:
             await _cancel_turn_timer()
         except Exception:
             pass
+        try:
+            # The peer is gone (or the session failed); nothing left is worth sending.
+            await outbound.close(flush=False)
+        except Exception:
+            pass
+        stats = outbound.stats()
+        logger.info("ws %s outbound stats: %s", conversation_id, stats)
+        WS_OUTBOUND_MAX_QUEUE_DEPTH.observe(stats["max_json_queue_depth"], queue="json")
+        WS_OUTBOUND_MAX_QUEUE_DEPTH.observe(stats["max_audio_queue_depth"], queue="audio")
+        WS_SESSIONS_ACTIVE.dec()
 
 
@@ -0,0 +1,323 @@
+"""
+Outbound frame scheduler for the assistant WebSocket.
+
+One scheduler is created per `/api/v1/websocket/` connection. Producers (token
+streaming, TTS audio, control messages) enqueue frames here instead of calling
+`ws.send_*` directly; a single writer task drains the queues onto the socket.
+
+Responsibilities:
+- Coalesce `assistant_token` deltas on a small time/size window.
+- Prioritize audio over text frames (audio is what the foreman actually hears).
+- Keep the outbound backlog bounded for slow clients (jobsite LTE):
+  - audio: producers wait for space (backpressure propagates to TTS/Claude)
+  - tokens: stale, not-yet-sent token frames are merged into one frame
+- Expose queue-depth metrics via `stats()`.
+
+Non-responsibilities:
+- Message protocol / turn handling (owned by `websocket_service.py`).
+
+Ordering guarantees:
+- JSON frames (tokens + control) keep their relative order.
+- Audio may overtake queued JSON frames, but never the reverse: a control frame
+  enqueued after an audio chunk (e.g. `assistant_done`) is sent after it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+# Flush buffered tokens after this long, even if the size threshold isn't met.
+TOKEN_WINDOW_SECONDS = 0.04
+# Flush buffered tokens once they reach this many characters.
+TOKEN_WINDOW_MAX_CHARS = 96
+
+# Bound on queued audio chunks before producers are made to wait.
+MAX_QUEUED_AUDIO_CHUNKS = 64
+# Adjacent queued audio chunks are merged up to this size (mp3 frames concatenate).
+MAX_MERGED_AUDIO_BYTES = 32 * 1024
+
+_TOKEN = "token"
+_JSON = "json"
+
+
+class OutboundFrameScheduler:
+    """
+    Per-connection outbound queue with token coalescing and audio priority.
+
+    Usage:
+        scheduler = OutboundFrameScheduler(ws)
+        scheduler.start()
+        scheduler.send_token("Hal")
+        await scheduler.send_audio(chunk)
+        scheduler.send_json({"type": "assistant_done"})
+        await scheduler.close()
+    """
+
+    def __init__(
+        self,
+        ws: WebSocket,
+        *,
+        token_window_s: float = TOKEN_WINDOW_SECONDS,
+        token_max_chars: int = TOKEN_WINDOW_MAX_CHARS,
+        max_audio_chunks: int = MAX_QUEUED_AUDIO_CHUNKS,
+        max_merged_audio_bytes: int = MAX_MERGED_AUDIO_BYTES,
+    ) -> None:
+        self._ws = ws
+        self._token_window_s = token_window_s
+        self._token_max_chars = token_max_chars
+        self._max_audio_chunks = max_audio_chunks
+        self._max_merged_audio_bytes = max_merged_audio_bytes
+
+        # Each JSON entry is (kind, payload); token payloads are mutable lists of parts
+        # so a stale (still queued) token frame can be extended in place.
+        self._frames: Deque[Tuple[str, Any]] = deque()
+        self._audio: Deque[bytearray] = deque()
+        # Number of JSON frames that must be written before the audio at the same index.
+        # Stored as (frames_ahead, chunk) ordering barrier: see `_next_is_audio`.
+        self._audio_barriers: Deque[int] = deque()
+
+        self._token_parts: List[str] = []
+        self._token_chars = 0
+        self._token_started_at: Optional[float] = None
+
+        self._wakeup = asyncio.Event()
+        self._audio_space = asyncio.Event()
+        self._audio_space.set()
+        self._closing = False
+        self._writer: Optional[asyncio.Task[None]] = None
+        self._error: Optional[BaseException] = None
+
+        # Metrics (see `stats()`).
+        self._frames_sent = 0
+        self._audio_bytes_sent = 0
+        self._tokens_in = 0
+        self._token_frames_sent = 0
+        self._token_merges = 0
+        self._audio_merges = 0
+        self._audio_waits = 0
+        self._max_json_depth = 0
+        self._max_audio_depth = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._run())
+
+    async def close(self, *, flush: bool = True) -> None:
+        """
+        Stop the writer. With `flush=True` pending frames are written first.
+        """
+        self._closing = True
+        if not flush:
+            self.discard_pending()
+        self._wakeup.set()
+        self._audio_space.set()
+        if self._writer is None:
+            return
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            pass
+        finally:
+            self._writer = None
+
+    # ------------------------------------------------------------------
+    # Producers
+    # ------------------------------------------------------------------
+
+    def send_json(self, payload: Dict[str, Any]) -> None:
+        """Enqueue a control/informational frame (never dropped or merged)."""
+        self._raise_if_failed()
+        self._flush_token_buffer()
+        self._frames.append((_JSON, payload))
+        self._note_depth()
+        self._wakeup.set()
+
+    def send_token(self, text: str) -> None:
+        """Buffer an `assistant_token` delta; it is sent coalesced with its neighbours."""
+        self._raise_if_failed()
+        if not text:
+            return
+        self._tokens_in += 1
+        if self._token_started_at is None:
+            self._token_started_at = time.monotonic()
+        self._token_parts.append(text)
+        self._token_chars += len(text)
+        if self._token_chars >= self._token_max_chars:
+            self._flush_token_buffer()
+        self._wakeup.set()
+
+    async def send_audio(self, chunk: bytes) -> None:
+        """
+        Enqueue an audio chunk, waiting while the audio backlog is full.
+
+        Waiting here is the backpressure signal: the TTS loop (and through it the
+        Claude token stream) slows down to what the client can actually receive.
+        """
+        self._raise_if_failed()
+        if not chunk:
+            return
+
+        # Control frames queued before this chunk must stay ahead of it; tokens may not.
+        self._flush_token_buffer()
+        barrier = self._json_frames_ahead()
+
+        if (
+            self._audio
+            and self._audio_barriers[-1] == barrier
+            and len(self._audio[-1]) + len(chunk) <= self._max_merged_audio_bytes
+        ):
+            self._audio[-1].extend(chunk)
+            self._audio_merges += 1
+            self._wakeup.set()
+            return
+
+        while len(self._audio) >= self._max_audio_chunks and not self._closing:
+            self._audio_waits += 1
+            self._audio_space.clear()
+            self._wakeup.set()
+            await self._audio_space.wait()
+            self._raise_if_failed()
+
+        self._audio.append(bytearray(chunk))
+        self._audio_barriers.append(barrier)
+        self._note_depth()
+        self._wakeup.set()
+
+    def discard_pending(self) -> None:
+        """Drop queued tokens and audio (e.g. after an interrupt). Control frames are kept."""
+        self._token_parts.clear()
+        self._token_chars = 0
+        self._token_started_at = None
+        self._frames = deque(f for f in self._frames if f[0] != _TOKEN)
+        self._audio.clear()
+        self._audio_barriers.clear()
+        self._audio_space.set()
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of queue depths and throughput counters for this connection."""
+        return {
+            "json_queue_depth": len(self._frames),
+            "audio_queue_depth": len(self._audio),
+            "buffered_token_chars": self._token_chars,
+            "max_json_queue_depth": self._max_json_depth,
+            "max_audio_queue_depth": self._max_audio_depth,
+            "frames_sent": self._frames_sent,
+            "audio_bytes_sent": self._audio_bytes_sent,
+            "tokens_in": self._tokens_in,
+            "token_frames_sent": self._token_frames_sent,
+            "token_merges": self._token_merges,
+            "audio_merges": self._audio_merges,
+            "audio_backpressure_waits": self._audio_waits,
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _note_depth(self) -> None:
+        self._max_json_depth = max(self._max_json_depth, len(self._frames))
+        self._max_audio_depth = max(self._max_audio_depth, len(self._audio))
+
+    def _json_frames_ahead(self) -> int:
+        # Only control frames form a barrier; queued token frames may be overtaken.
+        return sum(1 for kind, _ in self._frames if kind == _JSON)
+
+    def _flush_token_buffer(self) -> None:
+        if not self._token_parts:
+            return
+        parts = self._token_parts
+        self._token_parts = []
+        self._token_chars = 0
+        self._token_started_at = None
+
+        # Merge policy: a token frame still waiting in the queue is stale by
+        # definition (the client is behind), so extend it instead of queueing more.
+        if self._frames and self._frames[-1][0] == _TOKEN:
+            self._frames[-1][1].extend(parts)
+            self._token_merges += 1
+            return
+        self._frames.append((_TOKEN, parts))
+        self._note_depth()
+
+    def _token_deadline(self) -> Optional[float]:
+        if self._token_started_at is None:
+            return None
+        return self._token_started_at + self._token_window_s
+
+    def _next_is_audio(self) -> bool:
+        # Audio wins unless a control frame was enqueued before the head chunk.
+        return bool(self._audio) and self._audio_barriers[0] == 0
+
+    async def _send_next_json(self) -> None:
+        kind, payload = self._frames.popleft()
+        if kind == _TOKEN:
+            await self._ws.send_json({"type": "assistant_token", "text": "".join(payload)})
+            self._token_frames_sent += 1
+        else:
+            # Control frame released: audio queued behind it moves up one barrier.
+            for i in range(len(self._audio_barriers)):
+                if self._audio_barriers[i] > 0:
+                    self._audio_barriers[i] -= 1
+            await self._ws.send_json(payload)
+        self._frames_sent += 1
+
+    async def _send_next_audio(self) -> None:
+        chunk = self._audio.popleft()
+        self._audio_barriers.popleft()
+        self._audio_space.set()
+        await self._ws.send_bytes(bytes(chunk))
+        self._frames_sent += 1
+        self._audio_bytes_sent += len(chunk)
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                deadline = self._token_deadline()
+                if deadline is not None and (self._closing or time.monotonic() >= deadline):
+                    self._flush_token_buffer()
+
+                if self._next_is_audio():
+                    await self._send_next_audio()
+                    continue
+                if self._frames:
+                    await self._send_next_json()
+                    continue
+                if self._closing and not self._token_parts:
+                    return
+
+                self._wakeup.clear()
+                deadline = self._token_deadline()
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The socket is gone; surface the failure to the next producer call.
+            self._error = e
+            self._audio_space.set()
+            logger.debug("Outbound writer stopped: %s", e)
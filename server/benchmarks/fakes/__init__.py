@@ -0,0 +1,14 @@
+from .anthropic_api import FakeAnthropicConfig, create_anthropic_app
+from .elevenlabs_api import FakeElevenLabsConfig, serve_elevenlabs
+from .latency import LatencyProfile
+from .server import BackgroundServer, serve_asgi
+
+__all__ = [
+    "BackgroundServer",
+    "FakeAnthropicConfig",
+    "FakeElevenLabsConfig",
+    "LatencyProfile",
+    "create_anthropic_app",
+    "serve_asgi",
+    "serve_elevenlabs",
+]
@@ -0,0 +1,256 @@
+"""
+Local stand-in for the Anthropic Messages API (`POST /v1/messages`).
+
+Point the server at it with `ANTHROPIC_BASE_URL=<fake url>`; both the sync and
+the async SDK clients honor that variable.
+
+Behavior:
+- Scripted tool use: for a fresh user turn the fake first asks for
+  `tool_rounds` tool calls (cycling through `tool_script`), one round per
+  request, then answers with plain text. The round is derived from the number
+  of assistant `tool_use` messages after the last plain user message, so the
+  agent's multi-round tool loop is exercised exactly as in production.
+- Both `stream: false` (full `Message` JSON) and `stream: true` (SSE events:
+  `message_start`, `content_block_*`, `message_delta`, `message_stop`) are
+  supported, including `input_json_delta` for tool input.
+- Latency: `LatencyProfile.first_byte` before the response (or the first SSE
+  event), `between_chunks` per streamed text delta. Non-streamed responses also
+  pay `per_chunk_s` per output chunk so they take as long as a full generation.
+
+Non-responsibilities: validating auth headers, models, or request schemas
+beyond what's needed to pick the next scripted step.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import secrets
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from .latency import LatencyProfile
+
+DEFAULT_REPLY = (
+    "Alles klar. Ich habe den Bestand geprüft: Es sind noch genügend Kabelbinder "
+    "und Schutzbrillen auf der Baustelle vorhanden. Soll ich zusätzlich eine "
+    "Bestellung für Bohrhammer-Zubehör vorbereiten?"
+)
+
+# Tools requested on successive rounds (each gets {"query_text": <word from the user turn>}).
+DEFAULT_TOOL_SCRIPT: Tuple[str, ...] = ("inventory_search", "product_price_search")
+
+
+@dataclass
+class FakeAnthropicConfig:
+    latency: LatencyProfile = field(default_factory=LatencyProfile)
+    tool_rounds: int = 1
+    tool_script: Sequence[str] = DEFAULT_TOOL_SCRIPT
+    reply_text: str = DEFAULT_REPLY
+    # Characters per streamed text delta (roughly one token is ~4 chars).
+    chunk_chars: int = 12
+    seed: Optional[int] = None
+
+
+def _plain_user_message(message: Dict[str, Any]) -> bool:
+    if message.get("role") != "user":
+        return False
+    content = message.get("content")
+    if isinstance(content, str):
+        return True
+    if isinstance(content, list):
+        return not any(isinstance(b, dict) and b.get("type") == "tool_result" for b in content)
+    return False
+
+
+def _text_of(message: Dict[str, Any]) -> str:
+    content = message.get("content")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(b.get("text", "") for b in content if isinstance(b, dict) and b.get("type") == "text")
+    return ""
+
+
+def _scripted_step(messages: List[Dict[str, Any]], config: FakeAnthropicConfig) -> Tuple[int, str]:
+    """Return (tool round already completed, last user text) for this request."""
+    last_user = -1
+    for i, message in enumerate(messages):
+        if _plain_user_message(message):
+            last_user = i
+    user_text = _text_of(messages[last_user]) if last_user >= 0 else ""
+    completed_rounds = sum(
+        1
+        for message in messages[last_user + 1 :]
+        if message.get("role") == "assistant"
+        and isinstance(message.get("content"), list)
+        and any(isinstance(b, dict) and b.get("type") == "tool_use" for b in message["content"])
+    )
+    return completed_rounds, user_text
+
+
+def _query_from(user_text: str) -> str:
+    words = [w.strip(".,!?;:") for w in user_text.split()]
+    words = [w for w in words if len(w) > 3]
+    return words[-1] if words else "Kabelbinder"
+
+
+def _chunks(text: str, size: int) -> List[str]:
+    size = max(1, size)
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def _usage(input_chars: int, output_chars: int) -> Dict[str, int]:
+    return {"input_tokens": max(1, input_chars // 4), "output_tokens": max(1, output_chars // 4)}
+
+
+def _sse(event: str, data: Dict[str, Any]) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+def create_anthropic_app(config: Optional[FakeAnthropicConfig] = None) -> Starlette:
+    """Build the fake Messages API as an ASGI app."""
+    config = config or FakeAnthropicConfig()
+    rng = random.Random(config.seed)
+    stats = {"requests": 0, "tool_use_responses": 0, "text_responses": 0}
+
+    def _next_content(body: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], str]:
+        messages = body.get("messages") if isinstance(body.get("messages"), list) else []
+        completed_rounds, user_text = _scripted_step(messages, config)
+        offered = {t.get("name") for t in body.get("tools") or [] if isinstance(t, dict)}
+        script = [name for name in config.tool_script if name in offered]
+
+        if script and completed_rounds < config.tool_rounds:
+            tool_name = script[completed_rounds % len(script)]
+            stats["tool_use_responses"] += 1
+            return (
+                [
+                    {
+                        "type": "tool_use",
+                        "id": f"toolu_{secrets.token_hex(12)}",
+                        "name": tool_name,
+                        "input": {"query_text": _query_from(user_text)},
+                    }
+                ],
+                "tool_use",
+            )
+        stats["text_responses"] += 1
+        return [{"type": "text", "text": config.reply_text}], "end_turn"
+
+    async def messages_endpoint(request: Request) -> Response:
+        body = await request.json()
+        stats["requests"] += 1
+        content, stop_reason = _next_content(body)
+        model = body.get("model") or "claude-fake"
+        input_chars = len(json.dumps(body.get("messages") or [], ensure_ascii=False))
+        output_chars = sum(len(b.get("text", "")) + len(json.dumps(b.get("input", {}))) for b in content)
+        message_id = f"msg_{secrets.token_hex(12)}"
+
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream_events(message_id, model, content, stop_reason, input_chars, output_chars),
+                media_type="text/event-stream",
+            )
+
+        await config.latency.first_byte(rng)
+        if stop_reason == "end_turn":
+            for _ in _chunks(config.reply_text, config.chunk_chars)[1:]:
+                await config.latency.between_chunks(rng)
+        return JSONResponse(
+            {
+                "id": message_id,
+                "type": "message",
+                "role": "assistant",
+                "model": model,
+                "content": content,
+                "stop_reason": stop_reason,
+                "stop_sequence": None,
+                "usage": _usage(input_chars, output_chars),
+            }
+        )
+
+    async def _stream_events(
+        message_id: str,
+        model: str,
+        content: List[Dict[str, Any]],
+        stop_reason: str,
+        input_chars: int,
+        output_chars: int,
+    ) -> AsyncIterator[bytes]:
+        await config.latency.first_byte(rng)
+        yield _sse(
+            "message_start",
+            {
+                "type": "message_start",
+                "message": {
+                    "id": message_id,
+                    "type": "message",
+                    "role": "assistant",
+                    "model": model,
+                    "content": [],
+                    "stop_reason": None,
+                    "stop_sequence": None,
+                    "usage": _usage(input_chars, 0),
+                },
+            },
+        )
+        for index, block in enumerate(content):
+            if block["type"] == "text":
+                yield _sse(
+                    "content_block_start",
+                    {"type": "content_block_start", "index": index, "content_block": {"type": "text", "text": ""}},
+                )
+                for i, piece in enumerate(_chunks(block["text"], config.chunk_chars)):
+                    if i:
+                        await config.latency.between_chunks(rng)
+                    yield _sse(
+                        "content_block_delta",
+                        {"type": "content_block_delta", "index": index, "delta": {"type": "text_delta", "text": piece}},
+                    )
+            else:
+                yield _sse(
+                    "content_block_start",
+                    {
+                        "type": "content_block_start",
+                        "index": index,
+                        "content_block": {"type": "tool_use", "id": block["id"], "name": block["name"], "input": {}},
+                    },
+                )
+                yield _sse(
+                    "content_block_delta",
+                    {
+                        "type": "content_block_delta",
+                        "index": index,
+                        "delta": {"type": "input_json_delta", "partial_json": json.dumps(block["input"])},
+                    },
+                )
+            yield _sse("content_block_stop", {"type": "content_block_stop", "index": index})
+        yield _sse(
+            "message_delta",
+            {
+                "type": "message_delta",
+                "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+                "usage": {"output_tokens": _usage(0, output_chars)["output_tokens"]},
+            },
+        )
+        yield _sse("message_stop", {"type": "message_stop"})
+        # Let the client read the final event before the body closes.
+        await asyncio.sleep(0)
+
+    async def stats_endpoint(request: Request) -> Response:
+        return JSONResponse(dict(stats))
+
+    app = Starlette(
+        routes=[
+            Route("/v1/messages", messages_endpoint, methods=["POST"]),
+            Route("/_stats", stats_endpoint, methods=["GET"]),
+        ]
+    )
+    app.state.stats = stats
+    return app
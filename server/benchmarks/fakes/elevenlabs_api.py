@@ -0,0 +1,139 @@
+"""
+Local stand-in for the two ElevenLabs WebSocket APIs the server uses.
+
+Point the server at it with `ELEVENLABS_WS_BASE_URL=ws://<host>:<port>`.
+
+- TTS stream-input (`/v1/text-to-speech/{voice_id}/stream-input`), as used by
+  `tts_service.stream_tts`: every non-empty `{"text": ...}` message produces
+  one `{"audio": <base64>, "isFinal": false}` frame (size proportional to the
+  text, `audio_bytes_per_char`); the empty-text EOS message is answered with
+  `{"isFinal": true}`. The first audio frame waits `first_byte_s`, later ones
+  `per_chunk_s`. Synthesis runs in its own task so slow "audio" never stalls
+  reading text, as with the real service.
+- Scribe realtime (`/v1/speech-to-text/realtime`), as used by
+  `scribe_service.ScribeSession` (and by the frontend with a single-use
+  token): sends `session_started`, a `partial_transcript` per audio chunk and
+  a `committed_transcript` on commit. The "audio" is expected to be the UTF-8
+  utterance itself (base64), which makes transcripts deterministic: the load
+  driver encodes what the foreman "says" and the fake echoes it back.
+
+The payload bytes are filler, not decodable audio.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import random
+import secrets
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+from .latency import LatencyProfile
+from .server import BackgroundServer
+
+
+@dataclass
+class FakeElevenLabsConfig:
+    tts_latency: LatencyProfile = field(default_factory=LatencyProfile)
+    scribe_latency: LatencyProfile = field(default_factory=LatencyProfile)
+    # ~128 kbps mp3 at ~15 chars/s of speech.
+    audio_bytes_per_char: int = 1000
+    seed: Optional[int] = None
+
+
+async def _handle_tts(ws: ServerConnection, config: FakeElevenLabsConfig, rng: random.Random) -> None:
+    pending: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+
+    async def synthesize() -> None:
+        first = True
+        while True:
+            text = await pending.get()
+            if text is None:
+                await ws.send(json.dumps({"isFinal": True}))
+                return
+            if first:
+                await config.tts_latency.first_byte(rng)
+                first = False
+            else:
+                await config.tts_latency.between_chunks(rng)
+            audio = b"\xff" * max(1, len(text) * config.audio_bytes_per_char)
+            await ws.send(json.dumps({"audio": base64.b64encode(audio).decode("ascii"), "isFinal": False}))
+
+    synth_task = asyncio.create_task(synthesize())
+    try:
+        bos_seen = False
+        async for raw in ws:
+            message = json.loads(raw)
+            text = message.get("text")
+            if not bos_seen:
+                # BOS carries voice settings and a single space; it yields no audio.
+                bos_seen = True
+                continue
+            if text == "":
+                pending.put_nowait(None)
+                break
+            if isinstance(text, str):
+                pending.put_nowait(text)
+        await synth_task
+    except ConnectionClosed:
+        pass
+    finally:
+        synth_task.cancel()
+
+
+async def _handle_scribe(ws: ServerConnection, config: FakeElevenLabsConfig, rng: random.Random) -> None:
+    await ws.send(json.dumps({"message_type": "session_started", "session_id": secrets.token_hex(8)}))
+    heard: list[str] = []
+    first = True
+    try:
+        async for raw in ws:
+            message = json.loads(raw)
+            if message.get("message_type") != "input_audio_chunk":
+                continue
+            chunk = base64.b64decode(message.get("audio_base_64") or "")
+            if chunk:
+                heard.append(chunk.decode("utf-8", errors="ignore"))
+                if first:
+                    await config.scribe_latency.first_byte(rng)
+                    first = False
+                else:
+                    await config.scribe_latency.between_chunks(rng)
+                await ws.send(json.dumps({"message_type": "partial_transcript", "text": "".join(heard).strip()}))
+            if message.get("commit"):
+                await config.scribe_latency.between_chunks(rng)
+                await ws.send(json.dumps({"message_type": "committed_transcript", "text": "".join(heard).strip()}))
+                heard.clear()
+                first = True
+    except ConnectionClosed:
+        pass
+
+
+async def serve_elevenlabs(
+    config: Optional[FakeElevenLabsConfig] = None, *, host: str = "127.0.0.1", port: int = 0
+) -> BackgroundServer:
+    """Start the fake TTS + Scribe WebSocket server; `port=0` picks a free port."""
+    config = config or FakeElevenLabsConfig()
+    rng = random.Random(config.seed)
+
+    async def handler(ws: ServerConnection) -> None:
+        path = ws.request.path.split("?", 1)[0] if ws.request is not None else ""
+        if path.startswith("/v1/text-to-speech/") and path.endswith("/stream-input"):
+            await _handle_tts(ws, config, rng)
+        elif path == "/v1/speech-to-text/realtime":
+            await _handle_scribe(ws, config, rng)
+        else:
+            await ws.close(code=1008, reason="unknown path")
+
+    server: Any = await serve(handler, host, port, max_size=None)
+    bound_port = next(iter(server.sockets)).getsockname()[1]
+
+    async def _stop() -> None:
+        server.close()
+        await server.wait_closed()
+
+    return BackgroundServer(url=f"ws://{host}:{bound_port}", stop=_stop)
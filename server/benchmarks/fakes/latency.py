@@ -0,0 +1,51 @@
+"""
+Latency model shared by the provider fakes.
+
+Every fake answers with `first_byte_s` before its first response byte and then
+`per_chunk_s` between streamed chunks (tokens, audio frames, partial
+transcripts). `jitter` scales each delay by a uniform factor in
+[1 - jitter, 1 + jitter] so concurrent sessions don't move in lockstep.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    first_byte_s: float = 0.0
+    per_chunk_s: float = 0.0
+    jitter: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyProfile":
+        """Parse `first_byte_ms[:per_chunk_ms[:jitter]]`, e.g. `400:15:0.2`."""
+        parts = [p.strip() for p in spec.split(":") if p.strip()]
+        if not parts or len(parts) > 3:
+            raise ValueError(f"invalid latency spec: {spec!r}")
+        first_byte_ms = float(parts[0])
+        per_chunk_ms = float(parts[1]) if len(parts) > 1 else 0.0
+        jitter = float(parts[2]) if len(parts) > 2 else 0.0
+        if first_byte_ms < 0 or per_chunk_ms < 0 or not 0 <= jitter < 1:
+            raise ValueError(f"invalid latency spec: {spec!r}")
+        return cls(first_byte_s=first_byte_ms / 1000.0, per_chunk_s=per_chunk_ms / 1000.0, jitter=jitter)
+
+    def _jittered(self, seconds: float, rng: Optional[random.Random]) -> float:
+        if seconds <= 0 or self.jitter <= 0:
+            return max(0.0, seconds)
+        factor = (rng or random).uniform(1.0 - self.jitter, 1.0 + self.jitter)
+        return seconds * factor
+
+    async def first_byte(self, rng: Optional[random.Random] = None) -> None:
+        delay = self._jittered(self.first_byte_s, rng)
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def between_chunks(self, rng: Optional[random.Random] = None) -> None:
+        delay = self._jittered(self.per_chunk_s, rng)
+        if delay:
+            await asyncio.sleep(delay)
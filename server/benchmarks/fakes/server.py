@@ -0,0 +1,52 @@
+"""Run an ASGI app (e.g. the fake Anthropic API) on a background uvicorn server."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Optional
+
+import uvicorn
+
+
+class BackgroundServer:
+    """Handle for a server started with `serve_asgi()`/`serve_elevenlabs()`."""
+
+    def __init__(self, *, url: str, stop: Any) -> None:
+        self.url = url
+        self._stop = stop
+
+    async def stop(self) -> None:
+        await self._stop()
+
+
+async def serve_asgi(app: Any, *, host: str = "127.0.0.1", port: int = 0) -> BackgroundServer:
+    """
+    Start `app` in the current event loop and return once it accepts connections.
+
+    `port=0` picks a free port; the bound address is in `BackgroundServer.url`.
+    """
+    config = uvicorn.Config(app, host=host, port=port, log_level="warning", lifespan="off")
+    server = uvicorn.Server(config)
+    # We own the loop's signal handling (Ctrl+C stops the driver, not uvicorn).
+    server.install_signal_handlers = lambda: None  # type: ignore[method-assign]
+    task: "asyncio.Task[None]" = asyncio.create_task(server.serve())
+
+    while not server.started:
+        if task.done():
+            task.result()  # surfaces bind errors
+            raise RuntimeError("fake server exited before startup")
+        await asyncio.sleep(0.01)
+
+    bound_port: Optional[int] = None
+    for srv in server.servers:
+        for sock in srv.sockets:
+            bound_port = sock.getsockname()[1]
+            break
+    if bound_port is None:
+        raise RuntimeError("fake server did not bind a socket")
+
+    async def _stop() -> None:
+        server.should_exit = True
+        await task
+
+    return BackgroundServer(url=f"http://{host}:{bound_port}", stop=_stop)
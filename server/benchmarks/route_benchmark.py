@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the read-heavy REST routes, with regression thresholds.
+
+Each scenario is one GET route (plus query string). A fixed number of
+concurrent users issue requests back to back (locust-style closed loop) after
+a short warm-up; per scenario we report p50/p95/p99 latency, requests per
+second, response size and errors, and compare against `route_thresholds.json`.
+
+Targets:
+- in-process (default): the FastAPI app from `main.py` via httpx's ASGI
+  transport, using `DATABASE_URL` (seed it with `seed_large_dataset.py`);
+- `--base-url http://host:port`: a running server.
+
+Usage (from `server/`):
+    python -m benchmarks.route_benchmark                   # all scenarios
+    python -m benchmarks.route_benchmark -k artikel -c 4 -n 40
+    python -m benchmarks.route_benchmark --update-thresholds  # record a new baseline
+
+Exit status is 1 if any scenario breaks its thresholds (CI-friendly); the
+same checks run under pytest in `test_route_benchmarks.py`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from benchmarks.stats import format_table, summarize  # noqa: E402
+
+THRESHOLDS_PATH = Path(__file__).resolve().parent / "route_thresholds.json"
+
+
+@dataclass(frozen=True)
+class Scenario:
+    path: str
+    # Caps the measured requests for routes whose full response is huge.
+    max_requests: Optional[int] = None
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "artikel_all": Scenario("/api/v1/artikel/", max_requests=20),
+    "artikel_search": Scenario("/api/v1/artikel/?search=Kabelbinder"),
+    "artikel_category": Scenario("/api/v1/artikel/?category=PSA", max_requests=20),
+    "artikel_alternatives": Scenario("/api/v1/artikel/alternatives/Sicherheitsbrille%20Typ%201"),
+    "inventory_all": Scenario("/api/v1/inventory/"),
+    "bestellungen_all": Scenario("/api/v1/bestellungen/", max_requests=3),
+    "bauprojekte_all": Scenario("/api/v1/bauprojekte/"),
+    "construction_sites_all": Scenario("/api/v1/construction-sites/"),
+}
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    path: str
+    latencies_ms: List[float] = field(default_factory=list)
+    statuses: Dict[int, int] = field(default_factory=dict)
+    errors: int = 0
+    response_bytes: int = 0
+    wall_s: float = 0.0
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies_ms) + self.errors
+
+    @property
+    def error_rate(self) -> float:
+        failed = self.errors + sum(n for status, n in self.statuses.items() if status >= 400)
+        return failed / self.requests if self.requests else 0.0
+
+    @property
+    def rps(self) -> float:
+        return len(self.latencies_ms) / self.wall_s if self.wall_s > 0 else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        latency = summarize(self.latencies_ms)
+        return {
+            "path": self.path,
+            "requests": self.requests,
+            "error_rate": round(self.error_rate, 4),
+            "rps": round(self.rps, 2),
+            "avg_response_kb": round(self.response_bytes / 1024 / max(1, len(self.latencies_ms)), 1),
+            "statuses": self.statuses,
+            "latency_ms": latency,
+        }
+
+
+def make_client(base_url: Optional[str], timeout_s: float) -> httpx.AsyncClient:
+    """HTTP client for a running server, or an in-process one for `main.app`."""
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url.rstrip("/"), timeout=timeout_s)
+    import main as server_main
+
+    transport = httpx.ASGITransport(app=server_main.app)
+    return httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout_s)
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    path: str,
+    *,
+    concurrency: int,
+    requests: int,
+    warmup: int = 1,
+) -> ScenarioResult:
+    """Issue `requests` GETs of `path` from `concurrency` closed-loop users."""
+    for _ in range(warmup):
+        try:
+            await client.get(path)
+        except httpx.HTTPError:
+            pass
+
+    result = ScenarioResult(name=name, path=path)
+    remaining = requests
+
+    async def user() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started_at = time.perf_counter()
+            try:
+                response = await client.get(path)
+            except httpx.HTTPError:
+                result.errors += 1
+                continue
+            result.latencies_ms.append((time.perf_counter() - started_at) * 1000.0)
+            result.statuses[response.status_code] = result.statuses.get(response.status_code, 0) + 1
+            result.response_bytes += len(response.content)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(max(1, concurrency))))
+    result.wall_s = time.perf_counter() - started_at
+    return result
+
+
+def load_thresholds(path: Path = THRESHOLDS_PATH) -> Dict[str, Dict[str, float]]:
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return {k: v for k, v in data.items() if not k.startswith("_")}
+
+
+def check_thresholds(summary: Dict[str, Any], limits: Dict[str, float]) -> List[str]:
+    """Return human-readable violations of `limits` (empty list = pass)."""
+    violations: List[str] = []
+    latency = summary["latency_ms"]
+    for pct in ("p50", "p95", "p99"):
+        limit = limits.get(f"{pct}_ms")
+        if limit is not None and not latency[pct] <= limit:
+            violations.append(f"{pct} {latency[pct]:.1f}ms > {limit:.1f}ms")
+    min_rps = limits.get("min_rps")
+    if min_rps is not None and summary["rps"] < min_rps:
+        violations.append(f"rps {summary['rps']:.2f} < {min_rps:.2f}")
+    max_error_rate = limits.get("max_error_rate", 0.0)
+    if summary["error_rate"] > max_error_rate:
+        violations.append(f"error_rate {summary['error_rate']:.2%} > {max_error_rate:.2%}")
+    return violations
+
+
+def baseline_thresholds(summary: Dict[str, Any], *, headroom: float) -> Dict[str, float]:
+    """Thresholds that the measured run passes with `headroom` (e.g. 1.5 = +50%)."""
+    latency = summary["latency_ms"]
+    return {
+        "p95_ms": round(latency["p95"] * headroom, 1),
+        "p99_ms": round(latency["p99"] * headroom, 1),
+        "min_rps": round(summary["rps"] / headroom, 2),
+        "max_error_rate": 0.0,
+    }
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the REST list routes against thresholds.")
+    parser.add_argument("--base-url", default=None, help="running server (default: in-process main.app)")
+    parser.add_argument("-k", dest="select", default=None, help="only scenarios whose name contains this")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("-n", "--requests", type=int, default=80, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout (s)")
+    parser.add_argument("--thresholds", default=str(THRESHOLDS_PATH))
+    parser.add_argument(
+        "--update-thresholds", action="store_true", help="write this run (+headroom) as the new thresholds"
+    )
+    parser.add_argument("--headroom", type=float, default=1.5)
+    parser.add_argument("--json", dest="json_out", default=None, help="write per-scenario summaries as JSON")
+    return parser.parse_args(argv)
+
+
+async def _main(args: argparse.Namespace) -> int:
+    selected = {k: v for k, v in SCENARIOS.items() if not args.select or args.select in k}
+    thresholds_path = Path(args.thresholds)
+    thresholds = load_thresholds(thresholds_path)
+    summaries: Dict[str, Dict[str, Any]] = {}
+    failures: Dict[str, List[str]] = {}
+
+    async with make_client(args.base_url, args.timeout) as client:
+        for name, scenario in selected.items():
+            requests = min(args.requests, scenario.max_requests or args.requests)
+            result = await run_scenario(
+                client,
+                name,
+                scenario.path,
+                concurrency=min(args.concurrency, requests),
+                requests=requests,
+                warmup=args.warmup if scenario.max_requests is None else min(args.warmup, 1),
+            )
+            summary = summaries[name] = result.summary()
+            violations = check_thresholds(summary, thresholds.get(name, {}))
+            if violations:
+                failures[name] = violations
+            print(
+                f"{name:<26} {summary['rps']:>8.2f} req/s  p95 {summary['latency_ms']['p95']:>9.1f}ms  "
+                f"{summary['avg_response_kb']:>9.1f} KiB  {'FAIL ' + '; '.join(violations) if violations else 'ok'}",
+                flush=True,
+            )
+
+    print()
+    print(format_table({name: s["latency_ms"] for name, s in summaries.items()}))
+
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(summaries, indent=2), encoding="utf-8")
+    if args.update_thresholds:
+        data = json.loads(thresholds_path.read_text(encoding="utf-8")) if thresholds_path.exists() else {}
+        for name, summary in summaries.items():
+            data[name] = baseline_thresholds(summary, headroom=args.headroom)
+        thresholds_path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"\nthresholds written to {thresholds_path}")
+        return 0
+    if failures:
+        print(f"\n{len(failures)} scenario(s) over threshold: {', '.join(failures)}")
+        return 1
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    return asyncio.run(_main(_parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
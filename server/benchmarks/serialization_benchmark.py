@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark: FastAPI's default response path vs `FastJSONResponse`.
+
+Builds synthetic rows shaped like the list endpoints' (artikel with Decimal
+prices, orders with datetimes and nested positions) and times, per payload:
+
+- `default`: what a route returning a list does today
+  (`jsonable_encoder` + `JSONResponse.render`);
+- `fast`: `FastJSONResponse.render` (orjson, one pass).
+
+No database needed. Usage (from `server/`):
+    python -m benchmarks.serialization_benchmark              # 10k rows
+    python -m benchmarks.serialization_benchmark --rows 50000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from api.v1.serialization import FastJSONResponse  # noqa: E402
+from benchmarks.stats import format_table, summarize  # noqa: E402
+
+
+def artikel_rows(n: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "artikel_id": f"BX-A{i:07d}",
+            "artikelname": f"Kabelbinder {i % 500} mm",
+            "kategorie": ("PSA", "Befestigung", "Elektro", "Werkzeug")[i % 4],
+            "einheit": "Stück",
+            "preis_eur": Decimal(i % 10_000) / Decimal(100),
+            "lieferant": f"Lieferant {i % 40}",
+            "verbrauchsart": "Verbrauch",
+            "gefahrgut": i % 17 == 0,
+            "lagerort": f"Regal {i % 120}",
+            "construction_site_id": i % 50,
+            "construction_site_name": f"Baustelle {i % 50}",
+        }
+        for i in range(n)
+    ]
+
+
+def order_rows(n: int, positions: int = 5) -> List[Dict[str, Any]]:
+    base = datetime(2026, 1, 1, 8, 0, 0)
+    return [
+        {
+            "bestell_id": f"BX-O{i:08d}",
+            "polier_name": f"Polier {i % 300}",
+            "projekt_name": f"Projekt {i % 200}",
+            "gesamt_betrag": Decimal("123.45") + i,
+            "status": ("pending", "approved", "rejected", "delivered")[i % 4],
+            "admin_notizen": None,
+            "erstellt_am": base + timedelta(minutes=i),
+            "aktualisiert_am": base + timedelta(minutes=i, seconds=30),
+            "erstellt_von": None,
+            "genehmigt_von": "Admin" if i % 4 == 1 else None,
+            "genehmigt_am": base + timedelta(minutes=i + 5) if i % 4 == 1 else None,
+            "liefer_datum": date(2026, 2, 1) + timedelta(days=i % 30),
+            "bestellpositionen": [
+                {
+                    "position_id": i * positions + p,
+                    "artikel_id": f"BX-A{(i * 7 + p) % 100_000:07d}",
+                    "artikel_name": f"Artikel {(i + p) % 500}",
+                    "menge": 1 + p,
+                    "einheit": "Stück",
+                    "einzelpreis": Decimal("4.99"),
+                    "gesamt_preis": Decimal("4.99") * (1 + p),
+                    "position_nummer": p + 1,
+                    "notizen": None,
+                }
+                for p in range(positions)
+            ],
+        }
+        for i in range(n)
+    ]
+
+
+def render_default(payload: Any) -> bytes:
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def render_fast(payload: Any) -> bytes:
+    return FastJSONResponse(payload).body
+
+
+RENDERERS: Dict[str, Callable[[Any], bytes]] = {"default": render_default, "fast": render_fast}
+
+
+def time_renderer(render: Callable[[Any], bytes], payload: Any, repeat: int) -> List[float]:
+    render(payload)  # warm-up
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        render(payload)
+        timings.append((time.perf_counter() - started_at) * 1000.0)
+    return timings
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Time JSON rendering of large list payloads.")
+    parser.add_argument("--rows", type=int, default=10_000, help="rows per payload (orders get 5 positions each)")
+    parser.add_argument("--repeat", type=int, default=10)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    payloads = {"artikel": artikel_rows(args.rows), "bestellungen": order_rows(args.rows)}
+    results: Dict[str, Dict[str, float]] = {}
+    for payload_name, payload in payloads.items():
+        size_kb = len(render_fast(payload)) / 1024
+        medians = {}
+        for renderer_name, render in RENDERERS.items():
+            summary = summarize(time_renderer(render, payload, args.repeat))
+            results[f"{payload_name}/{renderer_name}"] = summary
+            medians[renderer_name] = summary["p50"]
+        print(
+            f"{payload_name:<13} {args.rows} rows, {size_kb:,.0f} KiB: "
+            f"default {medians['default']:.1f}ms, fast {medians['fast']:.1f}ms "
+            f"({medians['default'] / max(medians['fast'], 1e-9):.1f}x)",
+            flush=True,
+        )
+    print()
+    print(format_table(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
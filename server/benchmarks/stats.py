@@ -0,0 +1,41 @@
+"""Latency summaries shared by the benchmark drivers."""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, List, Sequence
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile (`pct` in 0..100); NaN for no samples."""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(values: Iterable[float]) -> Dict[str, float]:
+    """count / p50 / p95 / p99 / max / mean of `values`."""
+    samples: List[float] = list(values)
+    if not samples:
+        return {"count": 0, "p50": math.nan, "p95": math.nan, "p99": math.nan, "max": math.nan, "mean": math.nan}
+    return {
+        "count": len(samples),
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+        "max": max(samples),
+        "mean": sum(samples) / len(samples),
+    }
+
+
+def format_table(rows: Dict[str, Dict[str, float]], *, unit: str = "ms") -> str:
+    """Render `{name: summarize(...)}` as a fixed-width text table."""
+    header = f"{'metric':<28}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}{'mean':>10}  ({unit})"
+    lines = [header, "-" * len(header)]
+    for name, s in rows.items():
+        lines.append(
+            f"{name:<28}{int(s['count']):>8}{s['p50']:>10.1f}{s['p95']:>10.1f}{s['p99']:>10.1f}{s['max']:>10.1f}{s['mean']:>10.1f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,60 @@
+"""
+Route benchmarks as pytest cases (one per scenario, asserting the thresholds).
+
+Skipped unless `RUN_ROUTE_BENCHMARKS=1`, since they need a seeded Postgres
+(`DATABASE_URL`) or a running server (`BENCHMARK_BASE_URL`):
+
+    RUN_ROUTE_BENCHMARKS=1 DATABASE_URL=... python -m pytest benchmarks -q -s
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+from pathlib import Path
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from benchmarks.route_benchmark import (  # noqa: E402
+    SCENARIOS,
+    check_thresholds,
+    load_thresholds,
+    make_client,
+    run_scenario,
+)
+
+CONCURRENCY = int(os.getenv("BENCHMARK_CONCURRENCY", "8"))
+REQUESTS = int(os.getenv("BENCHMARK_REQUESTS", "80"))
+
+
+@unittest.skipUnless(os.getenv("RUN_ROUTE_BENCHMARKS") == "1", "set RUN_ROUTE_BENCHMARKS=1 to run route benchmarks")
+class TestRouteBenchmarks(unittest.TestCase):
+    def _run(self, name: str) -> None:
+        scenario = SCENARIOS[name]
+        requests = min(REQUESTS, scenario.max_requests or REQUESTS)
+
+        async def go():
+            async with make_client(os.getenv("BENCHMARK_BASE_URL"), timeout_s=120.0) as client:
+                return await run_scenario(
+                    client, name, scenario.path, concurrency=min(CONCURRENCY, requests), requests=requests
+                )
+
+        summary = asyncio.run(go()).summary()
+        print(f"\n{name}: {summary}")
+        violations = check_thresholds(summary, load_thresholds().get(name, {}))
+        self.assertEqual(violations, [], f"{name} over threshold")
+
+
+def _make_test(name: str):
+    def test(self: TestRouteBenchmarks) -> None:
+        self._run(name)
+
+    test.__name__ = f"test_{name}"
+    return test
+
+
+for _name in SCENARIOS:
+    setattr(TestRouteBenchmarks, f"test_{_name}", _make_test(_name))
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Offline load test for the voice assistant WebSocket (`/api/v1/websocket/`).
+
+Simulates N foremen talking to the assistant at the same time, with local
+fakes standing in for Anthropic, ElevenLabs TTS and ElevenLabs Scribe (see
+`benchmarks/fakes`), so runs are free, repeatable and need no network.
+
+What one simulated foreman does per turn:
+1. (optional, `--via-scribe`) streams the utterance to the fake Scribe API and
+   waits for the committed transcript, like the frontend does with its
+   single-use token;
+2. sends `{"type": "transcript", "text": ...}` to the server;
+3. reads frames until `assistant_done` (or an error / cancellation), recording
+   time to first token, time to first audio and the full turn latency.
+
+Reported: p50/p95/p99 per stage, turns per second and error counts.
+
+By default the driver starts the fakes in-process and the server (`main.py`)
+as a subprocess wired to them. Use `--server-url` to target a server you
+started yourself (it must already point at the fakes, see README).
+
+Tool calls from the fake model hit whatever `DATABASE_URL` points to; without
+a database they fail fast and the error path is what gets measured.
+
+Usage (from `server/`):
+    python -m benchmarks.voice_load_test --foremen 20 --turns 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+from websockets.asyncio.client import connect
+
+from .fakes import (
+    FakeAnthropicConfig,
+    FakeElevenLabsConfig,
+    LatencyProfile,
+    create_anthropic_app,
+    serve_asgi,
+    serve_elevenlabs,
+)
+from .stats import format_table, summarize
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+
+UTTERANCES = [
+    "Wie viele Kabelbinder haben wir noch auf der Baustelle?",
+    "Ich brauche zehn Schutzbrillen und zwei Packungen Porenbetondübel.",
+    "Was kostet ein Kreissägeblatt bei Würth?",
+    "Do we still have enough measuring tapes in stock?",
+    "Bitte bestelle drei Schleifscheiben für die Baustelle Nord.",
+]
+
+
+@dataclass
+class TurnResult:
+    foreman: int
+    turn: int
+    ok: bool
+    outcome: str
+    total_ms: float
+    stt_ms: Optional[float] = None
+    first_token_ms: Optional[float] = None
+    first_audio_ms: Optional[float] = None
+    audio_bytes: int = 0
+
+
+@dataclass
+class LoadTestReport:
+    foremen: int
+    turns_per_foreman: int
+    wall_s: float
+    results: List[TurnResult] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        ok = [r for r in self.results if r.ok]
+        outcomes: Dict[str, int] = {}
+        for r in self.results:
+            outcomes[r.outcome] = outcomes.get(r.outcome, 0) + 1
+        return {
+            "foremen": self.foremen,
+            "turns_per_foreman": self.turns_per_foreman,
+            "wall_s": round(self.wall_s, 3),
+            "turns_completed": len(ok),
+            "turns_per_s": round(len(ok) / self.wall_s, 3) if self.wall_s > 0 else 0.0,
+            "outcomes": outcomes,
+            "latency_ms": {
+                "turn_total": summarize(r.total_ms for r in ok),
+                "first_token": summarize(r.first_token_ms for r in ok if r.first_token_ms is not None),
+                "first_audio": summarize(r.first_audio_ms for r in ok if r.first_audio_ms is not None),
+                "stt_commit": summarize(r.stt_ms for r in self.results if r.stt_ms is not None),
+            },
+        }
+
+
+def _ms(started_at: float) -> float:
+    return (time.perf_counter() - started_at) * 1000.0
+
+
+async def _transcribe(scribe_ws: Any, utterance: str) -> "tuple[float, str]":
+    """Stream `utterance` as fake audio to Scribe; return (commit → transcript ms, transcript)."""
+    data = utterance.encode("utf-8")
+    step = max(1, len(data) // 3)
+    for i in range(0, len(data), step):
+        await scribe_ws.send(
+            json.dumps(
+                {
+                    "message_type": "input_audio_chunk",
+                    "audio_base_64": base64.b64encode(data[i : i + step]).decode("ascii"),
+                    "commit": False,
+                    "sample_rate": 16000,
+                }
+            )
+        )
+    started_at = time.perf_counter()
+    await scribe_ws.send(
+        json.dumps({"message_type": "input_audio_chunk", "audio_base_64": "", "commit": True, "sample_rate": 16000})
+    )
+    while True:
+        message = json.loads(await scribe_ws.recv())
+        if message.get("message_type") == "committed_transcript":
+            return _ms(started_at), message.get("text") or ""
+
+
+async def _run_turn(ws: Any, text: str, result: TurnResult) -> None:
+    started_at = time.perf_counter()
+    await ws.send(json.dumps({"type": "transcript", "text": text}))
+    while True:
+        frame = await ws.recv()
+        if isinstance(frame, bytes):
+            if result.first_audio_ms is None:
+                result.first_audio_ms = _ms(started_at)
+            result.audio_bytes += len(frame)
+            continue
+        message = json.loads(frame)
+        msg_type = message.get("type")
+        if msg_type == "assistant_token" and result.first_token_ms is None:
+            result.first_token_ms = _ms(started_at)
+        elif msg_type == "assistant_done":
+            result.ok, result.outcome = True, "ok"
+            break
+        elif msg_type in ("assistant_error", "stream_cancelled", "error"):
+            result.outcome = f"{msg_type}:{message.get('message') or message.get('reason')}"
+            break
+    result.total_ms = _ms(started_at)
+
+
+async def _interrupt(ws: Any, timeout_s: float) -> None:
+    """
+    Interrupt a late turn and discard its frames.
+
+    The server acknowledges every `interrupt` with a `server_message`
+    "interrupted", sent after any `stream_cancelled`, token or audio frame
+    of the cancelled stream, so everything before it belongs to the old turn.
+    """
+    await ws.send(json.dumps({"type": "interrupt"}))
+
+    async def drain() -> None:
+        while True:
+            frame = await ws.recv()
+            if isinstance(frame, bytes):
+                continue
+            message = json.loads(frame)
+            if message.get("type") == "server_message" and message.get("text") == "interrupted":
+                return
+
+    await asyncio.wait_for(drain(), timeout_s)
+
+
+async def run_foreman(
+    index: int,
+    *,
+    server_ws_url: str,
+    scribe_url: Optional[str],
+    turns: int,
+    think_time_s: float,
+    start_delay_s: float,
+    turn_timeout_s: float,
+    language: str,
+    results: List[TurnResult],
+) -> None:
+    await asyncio.sleep(start_delay_s)
+    url = f"{server_ws_url}?conversation_id=loadtest-{index}-{os.getpid()}&language={language}"
+    scribe_ws = None
+    try:
+        async with connect(url, max_size=None) as ws:
+            hello = json.loads(await ws.recv())
+            if hello.get("type") != "server_hello":
+                raise RuntimeError(f"unexpected first frame: {hello}")
+            if scribe_url:
+                scribe_ws = await connect(f"{scribe_url}/v1/speech-to-text/realtime?model_id=scribe_v2_realtime")
+                await scribe_ws.recv()  # session_started
+
+            for turn in range(turns):
+                text = UTTERANCES[(index + turn) % len(UTTERANCES)]
+                result = TurnResult(foreman=index, turn=turn, ok=False, outcome="timeout", total_ms=0.0)
+                results.append(result)
+                try:
+                    if scribe_ws is not None:
+                        result.stt_ms, text = await asyncio.wait_for(_transcribe(scribe_ws, text), turn_timeout_s)
+                    await asyncio.wait_for(_run_turn(ws, text, result), turn_timeout_s)
+                except asyncio.TimeoutError:
+                    result.total_ms = turn_timeout_s * 1000.0
+                    # Don't let a late reply bleed into the next turn's timings.
+                    # No acknowledgement in time ends the session (TimeoutError).
+                    await _interrupt(ws, turn_timeout_s)
+                if think_time_s > 0:
+                    await asyncio.sleep(think_time_s)
+    except Exception as e:
+        results.append(
+            TurnResult(foreman=index, turn=-1, ok=False, outcome=f"connection:{type(e).__name__}", total_ms=0.0)
+        )
+    finally:
+        if scribe_ws is not None:
+            await scribe_ws.close()
+
+
+async def run_load_test(
+    *,
+    server_ws_url: str,
+    scribe_url: Optional[str],
+    foremen: int,
+    turns: int,
+    think_time_s: float = 0.0,
+    ramp_up_s: float = 0.0,
+    turn_timeout_s: float = 30.0,
+    language: str = "de",
+) -> LoadTestReport:
+    """Drive `foremen` concurrent sessions against a running server."""
+    results: List[TurnResult] = []
+    started_at = time.perf_counter()
+    await asyncio.gather(
+        *(
+            run_foreman(
+                i,
+                server_ws_url=server_ws_url,
+                scribe_url=scribe_url,
+                turns=turns,
+                think_time_s=think_time_s,
+                start_delay_s=ramp_up_s * i / max(1, foremen),
+                turn_timeout_s=turn_timeout_s,
+                language=language,
+                results=results,
+            )
+            for i in range(foremen)
+        )
+    )
+    return LoadTestReport(
+        foremen=foremen, turns_per_foreman=turns, wall_s=time.perf_counter() - started_at, results=results
+    )
+
+
+# ---------------------------------------------------------------------------
+# Server subprocess
+# ---------------------------------------------------------------------------
+
+def _free_port() -> int:
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _start_server(*, anthropic_url: str, elevenlabs_url: str, log_path: Path) -> "tuple[subprocess.Popen, str]":
+    port = _free_port()
+    env = dict(os.environ)
+    env.update(
+        {
+            "PORT": str(port),
+            "ANTHROPIC_BASE_URL": anthropic_url,
+            "ANTHROPIC_API_KEY": "sk-ant-loadtest",
+            "ELEVENLABS_API_KEY": "loadtest",
+            "ELEVENLABS_WS_BASE_URL": elevenlabs_url,
+        }
+    )
+    log_file = open(log_path, "w", encoding="utf-8")
+    proc = subprocess.Popen(
+        [sys.executable, "main.py"], cwd=SERVER_DIR, env=env, stdout=log_file, stderr=subprocess.STDOUT
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    async with httpx.AsyncClient() as client:
+        deadline = time.monotonic() + 30.0
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"server exited with {proc.returncode}; see {log_path}")
+            try:
+                if (await client.get(f"{base_url}/health", timeout=1.0)).status_code == 200:
+                    return proc, base_url
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"server did not become healthy; see {log_path}")
+
+
+def _stop_server(proc: subprocess.Popen) -> None:
+    if proc.poll() is None:
+        proc.send_signal(signal.SIGINT)
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline load test for the voice assistant WebSocket.")
+    parser.add_argument("--foremen", type=int, default=10, help="concurrent sessions")
+    parser.add_argument("--turns", type=int, default=5, help="turns per session")
+    parser.add_argument("--think-time", type=float, default=0.5, help="pause between turns (s)")
+    parser.add_argument("--ramp-up", type=float, default=2.0, help="spread session starts over this many seconds")
+    parser.add_argument("--turn-timeout", type=float, default=30.0, help="give up on a turn after this many seconds")
+    parser.add_argument("--language", choices=("de", "en"), default="de")
+    parser.add_argument("--via-scribe", action="store_true", help="transcribe each utterance via the fake Scribe API")
+    parser.add_argument(
+        "--anthropic-latency", default="600:10:0.2", help="first_byte_ms[:per_chunk_ms[:jitter]] of the fake model"
+    )
+    parser.add_argument("--tts-latency", default="250:40:0.2", help="latency spec of the fake TTS")
+    parser.add_argument("--scribe-latency", default="150:20:0.2", help="latency spec of the fake Scribe API")
+    parser.add_argument("--tool-rounds", type=int, default=1, help="tool_use rounds the fake model asks for per turn")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--server-url", default=None, help="use an already running server (http://host:port) instead of spawning one"
+    )
+    parser.add_argument("--anthropic-port", type=int, default=0, help="port of the fake Anthropic API (0 = free port)")
+    parser.add_argument("--elevenlabs-port", type=int, default=0, help="port of the fake ElevenLabs API (0 = free port)")
+    parser.add_argument("--server-log", default="voice_load_test.server.log", help="spawned server's log file")
+    parser.add_argument("--json", dest="json_out", default=None, help="also write the summary + raw turns as JSON")
+    return parser.parse_args(argv)
+
+
+async def _main(args: argparse.Namespace) -> Dict[str, Any]:
+    anthropic = await serve_asgi(
+        create_anthropic_app(
+            FakeAnthropicConfig(
+                latency=LatencyProfile.parse(args.anthropic_latency), tool_rounds=args.tool_rounds, seed=args.seed
+            )
+        ),
+        port=args.anthropic_port,
+    )
+    elevenlabs = await serve_elevenlabs(
+        FakeElevenLabsConfig(
+            tts_latency=LatencyProfile.parse(args.tts_latency),
+            scribe_latency=LatencyProfile.parse(args.scribe_latency),
+            seed=args.seed,
+        ),
+        port=args.elevenlabs_port,
+    )
+    proc = None
+    try:
+        if args.server_url:
+            base_url = args.server_url.rstrip("/")
+        else:
+            proc, base_url = await _start_server(
+                anthropic_url=anthropic.url, elevenlabs_url=elevenlabs.url, log_path=Path(args.server_log).resolve()
+            )
+        server_ws_url = base_url.replace("http://", "ws://", 1).replace("https://", "wss://", 1) + "/api/v1/websocket/"
+        report = await run_load_test(
+            server_ws_url=server_ws_url,
+            scribe_url=elevenlabs.url if args.via_scribe else None,
+            foremen=args.foremen,
+            turns=args.turns,
+            think_time_s=args.think_time,
+            ramp_up_s=args.ramp_up,
+            turn_timeout_s=args.turn_timeout,
+            language=args.language,
+        )
+    finally:
+        if proc is not None:
+            _stop_server(proc)
+        await anthropic.stop()
+        await elevenlabs.stop()
+
+    summary = report.summary()
+    if args.json_out:
+        Path(args.json_out).write_text(
+            json.dumps({"summary": summary, "turns": [asdict(r) for r in report.results]}, indent=2), encoding="utf-8"
+        )
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    summary = asyncio.run(_main(args))
+    print(format_table(summary["latency_ms"]))
+    print(
+        f"\n{summary['turns_completed']} turns in {summary['wall_s']:.1f}s "
+        f"({summary['turns_per_s']:.2f} turns/s, {summary['foremen']} foremen)"
+    )
+    print(f"outcomes: {summary['outcomes']}")
+    return 0 if summary["turns_completed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -36,3 +36,11 @@ VALUES
     ('Renovierung Altbau', 'Sanierung eines historischen Gebäudes', 'Berlin Mitte', '2024-02-01', 'active'),
     ('Brückenbau A7', 'Neue Autobahnbrücke über die A7', 'Hamburg Nord', '2023-11-01', 'active')
 ON CONFLICT DO NOTHING;
+
+-- ETag / Last-Modified support (see database/init/13_table_versions.sql)
+DO $$
+BEGIN
+    IF to_regproc('track_table_version') IS NOT NULL THEN
+        PERFORM track_table_version('bauprojekte');
+    END IF;
+END $$;
@@ -1,10 +1,16 @@
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from dotenv import load_dotenv, find_dotenv
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
 from api.v1.routes import artikel_router, inventory_router, elevenlabs_client_token_router, ws_router, voice_processing_router, bestellungen_router, bauprojekte_router, construction_sites_router
+from api.v1.data_access.database.change_listener import create_change_listener_from_env
+from api.v1.services.order_events_service import attach_order_events
+from api.v1.observability import configure_tracing_from_env
+from api.v1.observability.metrics import CONTENT_TYPE_LATEST, HttpMetricsMiddleware, render_latest
 from cors import configure_cors
 import uvicorn
 
@@ -24,10 +30,26 @@ else:
 api_key = os.getenv("ELEVENLABS_API_KEY")
 print(f"ELEVENLABS_API_KEY loaded: {'YES (' + str(len(api_key)) + ' chars)' if api_key else 'NO'}")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Postgres NOTIFY -> cache invalidation and order dashboard events
+    # (see database/init/11_change_notifications.sql and 12_order_events.sql)
+    change_listener = create_change_listener_from_env()
+    if change_listener is not None:
+        attach_order_events(change_listener)
+        change_listener.start()
+    try:
+        yield
+    finally:
+        if change_listener is not None:
+            await change_listener.stop()
+
+
 app = FastAPI(
     title="Artikel API",
     description="API for managing construction articles",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 apiPrefix = "/api/v1"
@@ -35,6 +57,12 @@ apiPrefix = "/api/v1"
 # CORS configuration (single source of truth in server/cors.py)
 configure_cors(app)
 
+# Voice-turn latency tracing (no-op unless TRACING_EXPORTER is set)
+configure_tracing_from_env()
+
+# HTTP route latency histograms (exported on /metrics)
+app.add_middleware(HttpMetricsMiddleware)
+
 # Include routers
 app.include_router(artikel_router, prefix=apiPrefix)
 app.include_router(inventory_router, prefix=apiPrefix)
@@ -54,6 +82,11 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of the in-process metrics."""
+    return PlainTextResponse(render_latest(), media_type=CONTENT_TYPE_LATEST)
+
 def main():
     # Use port from environment variable or default to 8000
     port = int(os.getenv("PORT", 8000))
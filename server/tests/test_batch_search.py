@@ -0,0 +1,104 @@
+import json
+import sys
+import unittest
+from contextlib import contextmanager
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from api.v1.data_access import tools_runtime  # noqa: E402
+from api.v1.data_access.database import tools as db_tools  # noqa: E402
+from api.v1.data_access.records import ArtikelRecord, InventoryItemRecord  # noqa: E402
+
+# (ord, source, total, rn, artikel_id, artikelname, kategorie, einheit, preis_eur,
+#  lieferant, verbrauchsart, gefahrgut, lagerort, construction_site, quantity, construction_site_id)
+_ROWS = [
+    (1, "artikel", 2, 1, "W-1", "Kabelbinder 200mm", "Elektro", "Pack", Decimal("3.10"), "Würth", "Verbrauch", False, "R1", None, None, None),
+    (1, "artikel", 2, 2, "H-1", "Kabelbinder 300mm", "Elektro", "Pack", Decimal("4.20"), "Hilti", "Verbrauch", False, "R2", None, None, None),
+    (1, "inventory", 1, 1, "W-1", "Kabelbinder 200mm", "Elektro", None, None, "Würth", None, None, None, "Nord", 12, 1),
+    (3, "artikel", 7, 1, "W-9", "Gewebeband", "Klebeband", "Rolle", Decimal("5.00"), "Würth", "Verbrauch", False, "R3", None, None, None),
+]
+
+
+class _Cursor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.sql, self.params = sql, params
+
+    def __iter__(self):
+        return iter(_ROWS)
+
+
+class TestBatchItemSearch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cur = _Cursor()
+        self.connections = 0
+
+        @contextmanager
+        def scoped_connection():
+            self.connections += 1
+            yield mock.Mock(cursor=lambda: self.cur)
+
+        patcher = mock.patch.object(db_tools, "scoped_connection", scoped_connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_one_query_for_all_items(self) -> None:
+        results = tools_runtime.batch_item_search(queries=["kabelbinder", " handschuhe ", "gewebe band"], site_id="1")
+        self.assertEqual(self.connections, 1)
+        self.assertIn("unnest(%(patterns)s::text[]) WITH ORDINALITY", self.cur.sql)
+        self.assertIn("CROSS JOIN LATERAL", self.cur.sql)
+        self.assertIn("AND construction_site_id = %(site_id)s", self.cur.sql)
+        self.assertEqual(self.cur.params["patterns"], [".*kabelbinder.*", ".*handschuhe.*", ".*gewebe.*band.*"])
+        self.assertEqual(self.cur.params["site_id"], 1)
+
+        kabel, handschuhe, band = results
+        self.assertEqual([r.pattern for r in results], ["kabelbinder", "handschuhe", "gewebe band"])
+        self.assertIsInstance(kabel.prices[0], ArtikelRecord)
+        self.assertEqual([p.lieferant for p in kabel.prices], ["Würth", "Hilti"])
+        self.assertEqual(kabel.inventory, [InventoryItemRecord("W-1", "Kabelbinder 200mm", "Elektro", "Würth", "Nord", 12, 1)])
+        self.assertEqual((handschuhe.inventory, handschuhe.prices, handschuhe.prices_total), ([], [], 0))
+        self.assertEqual(band.prices_total, 7)
+
+    def test_result_encodes_per_item_tables(self) -> None:
+        results = tools_runtime.batch_item_search(queries=["kabelbinder", "handschuhe", "gewebeband"])
+        encoded = json.loads(tools_runtime.stringify_tool_result(results, tool_name="batch_item_search"))
+        self.assertEqual([item["query"] for item in encoded], ["kabelbinder", "handschuhe", "gewebeband"])
+        self.assertEqual(encoded[0]["inventory"]["rows"], [["W-1", "Kabelbinder 200mm", 12, "Nord"]])
+        self.assertEqual(encoded[0]["prices"]["rows"][0][:3], ["W-1", "Kabelbinder 200mm", 3.1])
+        self.assertEqual(encoded[2]["prices"]["more"], 6)
+
+    def test_result_stays_within_the_character_budget(self) -> None:
+        results = tools_runtime.batch_item_search(queries=["kabelbinder", "handschuhe", "gewebeband"])
+        full = tools_runtime._encode_batch(results, max_chars=100_000)
+        text = tools_runtime._encode_batch(results, max_chars=len(full) - 1)
+        self.assertLess(len(text), len(full))
+        encoded = json.loads(text)
+        self.assertEqual(len(encoded[0]["prices"]["rows"]), 1)
+        self.assertEqual(encoded[0]["prices"]["more"], 1)
+        self.assertEqual(encoded[2]["prices"]["more"], 6)
+
+    def test_validates_queries(self) -> None:
+        for queries in ([], "gloves", ["ok", " "], ["q"] * (tools_runtime.MAX_BATCH_QUERIES + 1)):
+            with self.assertRaises(tools_runtime.ToolRuntimeError):
+                tools_runtime.batch_item_search(queries=queries)
+        self.assertEqual(self.connections, 0)
+
+    def test_is_registered(self) -> None:
+        names = [tool["name"] for tool in tools_runtime.TOOL_DEFINITIONS]
+        self.assertIn("batch_item_search", names)
+        self.assertIs(tools_runtime._TOOL_DISPATCH["batch_item_search"], tools_runtime.batch_item_search)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import asyncio
+import socket
+import sys
+import threading
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+import psycopg2  # noqa: E402
+
+from api.v1.data_access.cache import TableChange  # noqa: E402
+from api.v1.data_access.database.change_listener import (  # noqa: E402
+    ChangeListener,
+    parse_change,
+    subscribe_table_changes,
+    table_changes_live,
+)
+
+
+class _FakeCursor:
+    def __init__(self, conn: "_FakeConnection") -> None:
+        self._conn = conn
+
+    def __enter__(self) -> "_FakeCursor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def execute(self, sql: str) -> None:
+        self._conn.executed.append(sql)
+        if sql == "SELECT 1" and self._conn.ping_gate is not None:
+            self._conn.ping_gate.wait(5)  # a hung server
+
+
+class _FakeConnection:
+    """psycopg2-like connection whose socket becomes readable on `notify()`."""
+
+    def __init__(self, ping_gate: "threading.Event | None" = None) -> None:
+        self.ping_gate = ping_gate
+        self._server, self._client = socket.socketpair()
+        self._client.setblocking(False)
+        self.executed = []
+        self.notifies = []
+        self._pending = []
+        self.dropped = False
+        self.closed = False
+
+    def set_isolation_level(self, level: int) -> None:
+        pass
+
+    def cursor(self) -> _FakeCursor:
+        return _FakeCursor(self)
+
+    def fileno(self) -> int:
+        return self._client.fileno()
+
+    def notify(self, payload: str, channel: str = "table_changes") -> None:
+        self._pending.append(SimpleNamespace(channel=channel, payload=payload))
+        self._server.send(b"x")
+
+    def drop(self) -> None:
+        self.dropped = True
+        self._server.send(b"x")
+
+    def poll(self) -> None:
+        try:
+            self._client.recv(4096)
+        except BlockingIOError:
+            pass
+        if self.dropped:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        self.notifies.extend(self._pending)
+        self._pending.clear()
+
+    def close(self) -> None:
+        self.closed = True
+        self._server.close()
+        self._client.close()
+
+
+class TestParseChange(unittest.TestCase):
+    def test_precise_payload(self) -> None:
+        change = parse_change(
+            '{"table": "artikel", "op": "UPDATE", "rows": 1, "keys": ["W-1"], "names": ["Schutzbrille"]}'
+        )
+        self.assertEqual(change, TableChange("artikel", "UPDATE", frozenset({"W-1"}), frozenset({"Schutzbrille"})))
+        self.assertTrue(change.precise)
+
+    def test_bulk_payload_means_whole_table(self) -> None:
+        change = parse_change('{"table": "inventory", "op": "TRUNCATE", "keys": null, "names": null}')
+        self.assertEqual(change, TableChange("inventory", "TRUNCATE"))
+        self.assertFalse(change.precise)
+
+    def test_malformed_payload(self) -> None:
+        self.assertIsNone(parse_change("not json"))
+        self.assertIsNone(parse_change('{"op": "UPDATE"}'))
+
+
+class TestChangeListener(unittest.IsolatedAsyncioTestCase):
+    async def test_dispatches_notifications_and_resyncs_after_reconnect(self) -> None:
+        connections = []
+        seen = []
+
+        def connect() -> _FakeConnection:
+            connections.append(_FakeConnection())
+            return connections[-1]
+
+        orders = []
+        listener = ChangeListener(connect=connect, min_backoff_s=0.01)
+        subscribe_table_changes(listener, tables=("artikel", "inventory"), handler=seen.append)
+        listener.subscribe("order_events", orders.append)
+        listener.start()
+        try:
+            await asyncio.wait_for(listener.connected.wait(), timeout=2)
+            self.assertEqual(connections[0].executed, ['LISTEN "table_changes"', 'LISTEN "order_events"'])
+            self.assertEqual([c.op for c in seen], ["RESYNC", "RESYNC"])
+            self.assertTrue(table_changes_live())
+
+            connections[0].notify('{"table": "artikel", "op": "INSERT", "keys": ["X-1"], "names": ["Helm"]}')
+            connections[0].notify("garbage")
+            connections[0].notify('{"table": "bestellungen"}', channel="order_events")
+            await self._until(lambda: len(seen) == 3 and len(orders) == 1)
+            self.assertEqual(orders, ['{"table": "bestellungen"}'])
+            self.assertEqual(seen[2], TableChange("artikel", "INSERT", frozenset({"X-1"}), frozenset({"Helm"})))
+
+            connections[0].drop()
+            await self._until(lambda: len(connections) == 2 and len(seen) == 5)
+            self.assertTrue(connections[0].closed)
+            self.assertEqual(seen[3:], [TableChange("artikel", "RESYNC"), TableChange("inventory", "RESYNC")])
+        finally:
+            await listener.stop()
+        self.assertTrue(connections[-1].closed)
+        self.assertFalse(table_changes_live())
+
+    async def test_hung_keepalive_does_not_block_the_event_loop(self) -> None:
+        release = threading.Event()
+        self.addCleanup(release.set)
+        connections = []
+
+        def connect() -> _FakeConnection:
+            connections.append(_FakeConnection(ping_gate=None if connections else release))
+            return connections[-1]
+
+        listener = ChangeListener(connect=connect, keepalive_s=0.05, min_backoff_s=0.01)
+        listener.subscribe("table_changes", lambda payload: None)
+        listener.start()
+        try:
+            # The loop keeps running (this coroutine keeps polling) and the
+            # listener gives up on the hung connection and reconnects.
+            await self._until(lambda: len(connections) == 2)
+            self.assertIn("SELECT 1", connections[0].executed)
+        finally:
+            release.set()
+            await listener.stop()
+
+    async def _until(self, predicate) -> None:
+        for _ in range(200):
+            if predicate():
+                return
+            await asyncio.sleep(0.01)
+        self.fail("condition not reached")
+
+
+if __name__ == "__main__":
+    unittest.main()
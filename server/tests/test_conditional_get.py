@@ -0,0 +1,93 @@
+import sys
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from api.v1.data_access.cache import on_table_change, remove_table_change_callback  # noqa: E402
+from api.v1.data_access.database import table_versions  # noqa: E402
+from api.v1.data_access.database.table_versions import TableVersion  # noqa: E402
+from api.v1.routes import artikel_router  # noqa: E402
+
+_CHANGED_AT = datetime(2026, 3, 1, 12, 30, 15, 250000, tzinfo=timezone.utc)
+
+
+def _versions(artikel: int = 42):
+    return [
+        TableVersion("artikel", artikel, _CHANGED_AT),
+        TableVersion("construction_sites", 7, _CHANGED_AT.replace(minute=0)),
+    ]
+
+
+class TestConditionalGet(unittest.TestCase):
+    def setUp(self) -> None:
+        app = FastAPI()
+        app.include_router(artikel_router, prefix="/api/v1")
+        self.client = TestClient(app)
+        self.versions = mock.patch("api.v1.routes.conditional.get_table_versions", return_value=_versions())
+        self.query = mock.patch("api.v1.routes.artikel.get_all_artikel", return_value=[{"artikel_id": "W-1"}])
+        self.get_versions = self.versions.start()
+        self.get_all_artikel = self.query.start()
+        self.addCleanup(self.versions.stop)
+        self.addCleanup(self.query.stop)
+
+    def test_full_response_carries_validators(self) -> None:
+        response = self.client.get("/api/v1/artikel/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{"artikel_id": "W-1"}])
+        self.assertEqual(response.headers["etag"], 'W/"1.artikel.42.construction_sites.7"')
+        self.assertEqual(response.headers["last-modified"], "Sun, 01 Mar 2026 12:30:15 GMT")
+        self.assertEqual(response.headers["cache-control"], "no-cache")
+
+    def test_matching_etag_skips_the_query(self) -> None:
+        etag = self.client.get("/api/v1/artikel/").headers["etag"]
+        self.get_all_artikel.reset_mock()
+
+        response = self.client.get("/api/v1/artikel/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response.headers["etag"], etag)
+        self.get_all_artikel.assert_not_called()
+
+        self.get_versions.return_value = _versions(artikel=43)
+        response = self.client.get("/api/v1/artikel/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.get_all_artikel.assert_called_once()
+
+    def test_if_modified_since(self) -> None:
+        fresh = self.client.get("/api/v1/artikel/", headers={"If-Modified-Since": "Sun, 01 Mar 2026 12:30:15 GMT"})
+        self.assertEqual(fresh.status_code, 304)
+        stale = self.client.get("/api/v1/artikel/", headers={"If-Modified-Since": "Sun, 01 Mar 2026 12:30:14 GMT"})
+        self.assertEqual(stale.status_code, 200)
+
+    def test_without_versions_serves_normally(self) -> None:
+        self.get_versions.return_value = None
+        response = self.client.get("/api/v1/artikel/", headers={"If-None-Match": "*"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("etag", response.headers)
+
+
+class TestTableVersions(unittest.TestCase):
+    def test_unannounced_version_move_invalidates_dependent_caches(self) -> None:
+        seen = []
+        on_table_change(seen.append)
+        self.addCleanup(remove_table_change_callback, seen.append)
+        loaded = [[TableVersion("inventory", 1, _CHANGED_AT)], [TableVersion("inventory", 2, _CHANGED_AT)]]
+        with mock.patch.object(table_versions, "_load_versions", side_effect=loaded):
+            table_versions._VERSIONS_CACHE.invalidate()
+            self.assertEqual(table_versions.get_table_versions(["inventory"])[0].version, 1)
+            table_versions._VERSIONS_CACHE.invalidate()
+            self.assertEqual(table_versions.get_table_versions(["inventory"])[0].version, 2)
+        self.assertEqual([(c.table, c.op) for c in seen if c.op == "VERSION"], [("inventory", "VERSION")])
+
+
+if __name__ == "__main__":
+    unittest.main()
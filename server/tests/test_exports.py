@@ -0,0 +1,101 @@
+import json
+import sys
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from api.v1.data_access.database.streaming import RowStream  # noqa: E402
+from api.v1.routes import bestellungen_router  # noqa: E402
+from api.v1.data_access.records import ORDER_COLUMNS, POSITION_COLUMNS  # noqa: E402
+from api.v1.services.bestellungen_service import ORDERS_WITH_ITEMS_SQL  # noqa: E402
+from api.v1.services.export_service import EXPORTS, format_rows  # noqa: E402
+
+_AT = datetime(2026, 3, 1, 9, 0)
+
+
+def _order_row(bestell_id, position_id=None, menge=None):
+    order = (bestell_id, "Müller", "Projekt A", Decimal("14.97"), "approved", None, _AT, _AT, None, None, None)
+    if position_id is None:
+        return order + (None,) * len(POSITION_COLUMNS)
+    return order + (position_id, "W-1", "Schutzbrille", menge, "Stück", Decimal("4.99"), Decimal("4.99") * menge, position_id, None)
+
+
+class _NamedCursor:
+    """Like a psycopg2 named cursor: `description` is unknown until the first fetch."""
+
+    def __init__(self, rows):
+        self._rows = list(rows)
+        self.description = None
+
+    def fetchone(self):
+        self.description = [("artikel_id",), ("quantity",)]
+        return self._rows.pop(0) if self._rows else None
+
+    def __iter__(self):
+        while self._rows:
+            yield self._rows.pop(0)
+
+
+class TestExportFormatting(unittest.TestCase):
+    def test_ndjson_nests_positions_per_order(self) -> None:
+        columns = list(ORDER_COLUMNS + POSITION_COLUMNS)
+        rows = [_order_row("ORD-1", 1, 1), _order_row("ORD-1", 2, 2), _order_row("ORD-2")]
+        lines = b"".join(format_rows(EXPORTS["bestellungen"], "ndjson", columns, rows)).splitlines()
+        orders = [json.loads(line) for line in lines]
+        self.assertEqual([o["bestell_id"] for o in orders], ["ORD-1", "ORD-2"])
+        self.assertEqual([p["gesamt_preis"] for p in orders[0]["bestellpositionen"]], [4.99, 9.98])
+        self.assertEqual(orders[0]["erstellt_am"], "2026-03-01T09:00:00")
+        self.assertEqual(orders[1]["bestellpositionen"], [])
+
+    def test_order_export_shares_the_api_query_and_total(self) -> None:
+        self.assertIs(EXPORTS["bestellungen"].sql, ORDERS_WITH_ITEMS_SQL)
+        self.assertIn("SUM(p.gesamt_preis)", ORDERS_WITH_ITEMS_SQL)
+
+    def test_csv_has_header_and_one_row_per_record(self) -> None:
+        body = b"".join(format_rows(EXPORTS["inventory"], "csv", ["artikel_id", "quantity"], [("W-1", 3), ("W-2", None)]))
+        self.assertEqual(body.decode(), "artikel_id,quantity\r\nW-1,3\r\nW-2,\r\n")
+
+    def test_row_stream_learns_columns_from_first_fetch(self) -> None:
+        stream = RowStream(_NamedCursor([("W-1", 3), ("W-2", 4)]))
+        self.assertEqual(stream.columns, ["artikel_id", "quantity"])
+        self.assertEqual(list(stream), [("W-1", 3), ("W-2", 4)])
+        self.assertEqual(list(RowStream(_NamedCursor([]))), [])
+
+
+class TestExportRoute(unittest.TestCase):
+    def setUp(self) -> None:
+        app = FastAPI()
+        app.include_router(bestellungen_router, prefix="/api/v1")
+        self.client = TestClient(app)
+
+    def test_streams_chunks_with_attachment_headers(self) -> None:
+        with mock.patch("api.v1.routes.exports.export_chunks", return_value=iter([b'{"a":1}\n', b'{"a":2}\n'])):
+            response = self.client.get("/api/v1/bestellungen/export")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        self.assertEqual(response.headers["content-disposition"], 'attachment; filename="bestellungen.ndjson"')
+        self.assertEqual(response.content, b'{"a":1}\n{"a":2}\n')
+
+    def test_query_failure_before_streaming_is_a_500(self) -> None:
+        def failing():
+            raise RuntimeError("db down")
+            yield b""
+
+        with mock.patch("api.v1.routes.exports.export_chunks", return_value=failing()):
+            response = self.client.get("/api/v1/bestellungen/export?format=csv")
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(self.client.get("/api/v1/bestellungen/export?format=xml").status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from api.v1.data_access.helpers import env_flag, env_float, env_int, env_ttl, stem  # noqa: E402
+
+
+class TestEnvHelpers(unittest.TestCase):
+    def test_numbers(self) -> None:
+        with mock.patch.dict(os.environ, {"X_FLOAT": " 0.5 ", "X_INT": "7", "X_BAD": "seven", "X_BLANK": " "}):
+            self.assertEqual(env_float("X_FLOAT", 1.0), 0.5)
+            self.assertEqual(env_int("X_INT", 1), 7)
+            self.assertEqual(env_int("X_BAD", 1), 1)
+            self.assertEqual(env_float("X_BLANK", 2.0), 2.0)
+            self.assertEqual(env_float("X_UNSET", 3.0), 3.0)
+        with mock.patch.dict(os.environ, {"X_TTL": "-5"}):
+            self.assertEqual(env_ttl("X_TTL", 300.0), 0.0)
+
+    def test_flags(self) -> None:
+        with mock.patch.dict(os.environ, {"X_ON": "Yes", "X_OFF": "off", "X_BAD": "maybe"}):
+            self.assertTrue(env_flag("X_ON"))
+            self.assertFalse(env_flag("X_OFF", default=True))
+            self.assertTrue(env_flag("X_BAD", default=True))
+            self.assertFalse(env_flag("X_UNSET"))
+
+
+class TestStem(unittest.TestCase):
+    def test_plural_folding(self) -> None:
+        self.assertEqual(stem("handschuhe"), "handschuh")
+        self.assertEqual(stem("gloves"), "glove")
+        self.assertEqual(stem("brillen"), "brill")
+        self.assertEqual(stem("band"), "band")
+
+
+if __name__ == "__main__":
+    unittest.main()
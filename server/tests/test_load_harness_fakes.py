@@ -0,0 +1,119 @@
+import json
+import sys
+import unittest
+from pathlib import Path
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+import anthropic  # noqa: E402
+from websockets.asyncio.client import connect  # noqa: E402
+
+from benchmarks.fakes import (  # noqa: E402
+    FakeAnthropicConfig,
+    create_anthropic_app,
+    serve_asgi,
+    serve_elevenlabs,
+)
+from benchmarks.stats import percentile  # noqa: E402
+from benchmarks.voice_load_test import TurnResult, _interrupt, _run_turn  # noqa: E402
+
+TOOLS = [
+    {
+        "name": "inventory_search",
+        "description": "Search inventory.",
+        "input_schema": {"type": "object", "properties": {"query_text": {"type": "string"}}},
+    }
+]
+
+
+class TestFakeAnthropicApi(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = await serve_asgi(create_anthropic_app(FakeAnthropicConfig(tool_rounds=1, reply_text="Fertig.")))
+        self.client = anthropic.AsyncAnthropic(base_url=self.server.url, api_key="test", max_retries=0)
+
+    async def asyncTearDown(self) -> None:
+        await self.client.close()
+        await self.server.stop()
+
+    async def test_tool_round_then_text(self) -> None:
+        messages = [{"role": "user", "content": "Haben wir noch Kabelbinder?"}]
+        first = await self.client.messages.create(model="m", max_tokens=64, messages=messages, tools=TOOLS)
+        self.assertEqual(first.stop_reason, "tool_use")
+        tool_use = first.content[0]
+        self.assertEqual(tool_use.name, "inventory_search")
+        self.assertEqual(tool_use.input, {"query_text": "Kabelbinder"})
+
+        messages += [
+            {"role": "assistant", "content": [tool_use.model_dump()]},
+            {"role": "user", "content": [{"type": "tool_result", "tool_use_id": tool_use.id, "content": "[]"}]},
+        ]
+        second = await self.client.messages.create(model="m", max_tokens=64, messages=messages, tools=TOOLS)
+        self.assertEqual(second.stop_reason, "end_turn")
+        self.assertEqual(second.content[0].text, "Fertig.")
+
+    async def test_streaming_text(self) -> None:
+        async with self.client.messages.stream(
+            model="m", max_tokens=64, messages=[{"role": "user", "content": "Hallo"}]
+        ) as stream:
+            text = "".join([t async for t in stream.text_stream])
+        self.assertEqual(text, "Fertig.")
+
+
+class TestFakeElevenLabs(unittest.IsolatedAsyncioTestCase):
+    async def test_tts_stream_input_round_trip(self) -> None:
+        server = await serve_elevenlabs()
+        try:
+            async with connect(f"{server.url}/v1/text-to-speech/voice/stream-input?model_id=x") as ws:
+                await ws.send(json.dumps({"text": " ", "xi_api_key": "k"}))
+                await ws.send(json.dumps({"text": "Hallo"}))
+                await ws.send(json.dumps({"text": ""}))
+                frames = [json.loads(m) async for m in ws]
+        finally:
+            await server.stop()
+        self.assertTrue(frames[0]["audio"])
+        self.assertEqual(frames[-1], {"isFinal": True})
+
+
+class _ScriptedSocket:
+    def __init__(self, frames) -> None:
+        self.frames = list(frames)
+        self.sent = []
+
+    async def send(self, message) -> None:
+        self.sent.append(json.loads(message))
+
+    async def recv(self):
+        return self.frames.pop(0)
+
+
+class TestInterruptAfterTimeout(unittest.IsolatedAsyncioTestCase):
+    async def test_late_frames_do_not_reach_the_next_turn(self) -> None:
+        ws = _ScriptedSocket([
+            json.dumps({"type": "assistant_token", "text": "spät"}),
+            b"audio",
+            json.dumps({"type": "stream_cancelled", "reason": "interrupt"}),
+            json.dumps({"type": "server_message", "text": "interrupted"}),
+            json.dumps({"type": "assistant_start"}),
+            json.dumps({"type": "assistant_done"}),
+        ])
+        await _interrupt(ws, 1.0)
+        self.assertEqual(ws.sent, [{"type": "interrupt"}])
+
+        result = TurnResult(foreman=0, turn=1, ok=False, outcome="timeout", total_ms=0.0)
+        await _run_turn(ws, "Hallo", result)
+        self.assertEqual((result.ok, result.outcome), (True, "ok"))
+
+
+class TestStats(unittest.TestCase):
+    def test_nearest_rank_percentile(self) -> None:
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7.0], 95), 7.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
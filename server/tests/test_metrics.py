@@ -0,0 +1,61 @@
+import sys
+import unittest
+from pathlib import Path
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from fastapi.testclient import TestClient  # noqa: E402
+import main as server_main  # noqa: E402
+from api.v1.observability.metrics import MetricsRegistry  # noqa: E402
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_histogram_renders_cumulative_buckets(self) -> None:
+        registry = MetricsRegistry()
+        hist = registry.histogram("op_seconds", "Op latency.", ("op",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            hist.observe(value, op="x")
+
+        text = registry.render()
+        self.assertIn("# TYPE op_seconds histogram", text)
+        self.assertIn('op_seconds_bucket{op="x",le="0.1"} 1', text)
+        self.assertIn('op_seconds_bucket{op="x",le="1"} 3', text)
+        self.assertIn('op_seconds_bucket{op="x",le="+Inf"} 4', text)
+        self.assertIn('op_seconds_count{op="x"} 4', text)
+
+    def test_counter_and_callback_gauge(self) -> None:
+        registry = MetricsRegistry()
+        counter = registry.counter("tokens_total", "Tokens.", ("direction",))
+        counter.inc(3, direction="input")
+        counter.inc(2, direction="input")
+        gauge = registry.gauge("store_size", "Size.")
+        gauge.set_function(lambda: 7)
+
+        text = registry.render()
+        self.assertIn('tokens_total{direction="input"} 5', text)
+        self.assertIn("store_size 7", text)
+
+    def test_wrong_labels_are_rejected(self) -> None:
+        registry = MetricsRegistry()
+        counter = registry.counter("c_total", "C.", ("a",))
+        with self.assertRaises(ValueError):
+            counter.inc(b="x")
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def test_metrics_endpoint_exposes_route_latency(self) -> None:
+        client = TestClient(server_main.app)
+        client.get("/health")
+        resp = client.get("/metrics")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="/health",status="200"}', resp.text)
+        self.assertIn("ws_sessions_active", resp.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import asyncio
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from api.v1.data_access.anthropic.anthropic_config import FAST_MODEL, MODEL  # noqa: E402
+from api.v1.data_access.order_drafts import ORDER_DRAFTS  # noqa: E402
+from api.v1.observability.metrics import MODEL_ROUTE_COST, MODEL_ROUTE_TOKENS, MODEL_ROUTE_TURN_DURATION  # noqa: E402
+from api.v1.services import claude_service  # noqa: E402
+from api.v1.services.claude_service import classify_turn, select_route  # noqa: E402
+
+
+class TestClassifyTurn(unittest.TestCase):
+    def test_confirmations_are_fast(self) -> None:
+        for text in ("ja", "ja bitte", "Passt, danke", "yes, that's all", "Okay."):
+            self.assertEqual(classify_turn(text), ("fast", "confirmation"), text)
+
+    def test_single_lookups_are_fast(self) -> None:
+        for text in ("Haben wir Sicherheitsbrillen?", "Was kostet der Bohrhammer?", "how much is duct tape"):
+            self.assertEqual(classify_turn(text), ("fast", "lookup"), text)
+
+    def test_everything_else_is_large(self) -> None:
+        for text in (
+            "Haben wir Kabelbinder und Handschuhe?",
+            "10 Kabelbinder bitte",
+            "Ich brauche Schrauben für Gipskarton, 4x40, Torx",
+            "Größe 9",
+            "",
+        ):
+            self.assertEqual(classify_turn(text)[0], "large", text)
+
+    def test_negations_are_not_confirmations(self) -> None:
+        for text in ("das ist es nicht", "Nein, das war's", "Nope.", "nothing else", "nein"):
+            self.assertEqual(classify_turn(text), ("large", "complex"), text)
+
+    def test_submit_turns_are_large(self) -> None:
+        for text in ("ja bitte bestellen", "okay, abschicken", "yes, send it", "please submit the order", "is it?"):
+            self.assertEqual(classify_turn(text)[0], "large", text)
+        ORDER_DRAFTS.upsert("conv-submit", artikel_name="Schutzbrille", artikel_id="W-1", menge=2, status="confirmed")
+        self.addCleanup(ORDER_DRAFTS.clear, "conv-submit")
+        self.assertEqual(select_route(user_text="ja", conversation_id="conv-submit"), ("large", "submit"))
+
+    def test_open_questions_are_not_lookups(self) -> None:
+        for text in (
+            "what do we need for tiling a bathroom?",
+            "is there an alternative to the Bohrhammer?",
+            "Gibt es eine Alternative zum Bohrhammer?",
+            "Wie viel Fliesenkleber brauchen wir für das Bad?",
+            "how much grout do we need for the bathroom?",
+        ):
+            self.assertEqual(classify_turn(text), ("large", "complex"), text)
+
+    def test_pending_clarification_keeps_the_large_model(self) -> None:
+        ORDER_DRAFTS.upsert("conv-route", artikel_name="Handschuhe", missing_fields=["size"])
+        self.addCleanup(ORDER_DRAFTS.clear, "conv-route")
+        self.assertEqual(select_route(user_text="ja", conversation_id="conv-route"), ("large", "clarification"))
+        self.assertEqual(select_route(user_text="ja", conversation_id="other"), ("fast", "confirmation"))
+
+    def test_override(self) -> None:
+        with mock.patch.dict(os.environ, {"MODEL_ROUTING": "large"}):
+            self.assertEqual(select_route(user_text="ja", conversation_id=None), ("large", "override"))
+        with mock.patch.dict(os.environ, {"MODEL_ROUTING": "fast"}):
+            self.assertEqual(select_route(user_text="Ich brauche Schrauben", conversation_id=None), ("fast", "override"))
+
+
+class TestClaudeServiceRouting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.models = []
+
+        async def fake_agent(*, messages, tools, language, conversation_id, tool_names, model, usage):
+            self.models.append(model)
+            usage["input_tokens"] = 1_000_000
+            usage["output_tokens"] = 100_000
+            yield "Okay."
+
+        patcher = mock.patch.object(claude_service, "stream_anthropic_response_with_history_and_tools", fake_agent)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.dict(os.environ, {"MODEL_ROUTING": "auto", "RESPONSE_CACHE_ENABLED": "0"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _reply(self, text):
+        async def collect():
+            return [c async for c in claude_service.stream_claude_reply(user_text=text, conversation_id="conv-metrics")]
+
+        return "".join(asyncio.run(collect()))
+
+    def test_model_and_metrics_per_route(self) -> None:
+        turns_before = MODEL_ROUTE_TURN_DURATION.snapshot(route="fast", model=FAST_MODEL)[0]
+        tokens_before = MODEL_ROUTE_TOKENS.value(route="fast", model=FAST_MODEL, direction="input")
+        cost_before = MODEL_ROUTE_COST.value(route="fast", model=FAST_MODEL)
+
+        self._reply("ja")
+        self._reply("Ich brauche Schrauben für Gipskarton")
+
+        self.assertEqual(self.models, [FAST_MODEL, MODEL])
+        self.assertEqual(MODEL_ROUTE_TURN_DURATION.snapshot(route="fast", model=FAST_MODEL)[0], turns_before + 1)
+        self.assertEqual(MODEL_ROUTE_TOKENS.value(route="fast", model=FAST_MODEL, direction="input"), tokens_before + 1_000_000)
+        self.assertAlmostEqual(MODEL_ROUTE_COST.value(route="fast", model=FAST_MODEL), cost_before + 1.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import sys
+import threading
+import unittest
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from api.v1.data_access import tools_runtime  # noqa: E402
+from api.v1.data_access.order_drafts import ORDER_DRAFTS, DraftError, OrderDraftStore  # noqa: E402
+from api.v1.services import order_draft_service  # noqa: E402
+
+
+class TestOrderDraftStore(unittest.TestCase):
+    def test_upsert_resolves_pending_line_in_place(self) -> None:
+        store = OrderDraftStore()
+        store.upsert("c", artikel_name="Handschuhe", status="pending_clarification", missing_fields=["size"])
+        store.upsert("c", artikel_name="Kabelbinder", artikel_id="W-1", menge=5, einzelpreis=Decimal("3.10"), status="confirmed")
+        lines = store.upsert("c", artikel_name=" handschuhe ", artikel_id="W-7", menge=2, status="needs_user_confirm")
+        self.assertEqual([(line.artikel_id, line.status, line.missing_fields) for line in lines], [
+            ("W-7", "needs_user_confirm", []),
+            ("W-1", "confirmed", []),
+        ])
+        self.assertEqual(
+            store.summary("c"),
+            "Draft: 1) W-7 handschuhe 2 [needs_user_confirm]; 2) W-1 Kabelbinder 5 à 3.10 [confirmed]. Confirmed total 15.50",
+        )
+
+    def test_lines_are_copies(self) -> None:
+        store = OrderDraftStore()
+        store.upsert("c", artikel_name="Band", status="pending_clarification", missing_fields=["type"])
+        store.lines("c")[0].missing_fields.append("width")
+        self.assertEqual(store.lines("c")[0].missing_fields, ["type"])
+
+    def test_validation_and_remove(self) -> None:
+        store = OrderDraftStore()
+        for kwargs in ({"artikel_name": " "}, {"artikel_name": "x", "status": "done"}, {"artikel_name": "x", "menge": 0}):
+            with self.assertRaises(DraftError):
+                store.upsert("c", **{"status": "confirmed", **kwargs})
+        store.upsert("c", artikel_name="Band", status="pending_clarification")
+        self.assertEqual(store.remove("c", artikel_name="BAND"), [])
+        self.assertIsNone(store.summary("c"))
+        with self.assertRaises(DraftError):
+            store.remove("c", artikel_name="Band")
+
+    def test_submit_hands_confirmed_lines_to_handler(self) -> None:
+        store = OrderDraftStore()
+        submitted = []
+        store.register_submit_handler(lambda cid, lines, fields: submitted.append((cid, lines, fields)) or {"ok": True})
+        with self.assertRaises(DraftError):
+            store.submit("c", polier_name="P", projekt_name="X")
+        store.upsert("c", artikel_name="Kabelbinder", artikel_id="W-1", menge=5, status="confirmed")
+        store.upsert("c", artikel_name="Handschuhe", status="pending_clarification")
+        self.assertEqual(store.submit("c", polier_name="P", projekt_name="X"), {"ok": True})
+        ((cid, lines, fields),) = submitted
+        self.assertEqual((cid, [line.artikel_id for line in lines], fields), ("c", ["W-1"], {"polier_name": "P", "projekt_name": "X"}))
+        self.assertEqual([line.artikel_name for line in store.lines("c")], ["Handschuhe"])
+
+    def test_overlapping_submits_order_once(self) -> None:
+        store = OrderDraftStore()
+        entered, release = threading.Event(), threading.Event()
+        orders = []
+
+        def handler(cid, lines, fields):
+            entered.set()
+            release.wait(5)
+            orders.append([line.artikel_id for line in lines])
+            return {"ok": True}
+
+        store.register_submit_handler(handler)
+        store.upsert("c", artikel_name="Kabelbinder", artikel_id="W-1", menge=5, status="confirmed")
+        first = threading.Thread(target=store.submit, args=("c",))
+        first.start()
+        self.assertTrue(entered.wait(5))
+        with self.assertRaises(DraftError):
+            store.submit("c")
+        release.set()
+        first.join(5)
+        self.assertEqual(orders, [["W-1"]])
+        self.assertEqual(store.lines("c"), [])
+
+    def test_failed_submit_puts_lines_back(self) -> None:
+        store = OrderDraftStore()
+        store.register_submit_handler(mock.Mock(side_effect=RuntimeError("db down")))
+        store.upsert("c", artikel_name="Kabelbinder", artikel_id="W-1", menge=5, status="confirmed")
+        store.upsert("c", artikel_name="Handschuhe", status="pending_clarification")
+        with self.assertRaises(RuntimeError):
+            store.submit("c")
+        self.assertEqual([line.artikel_name for line in store.lines("c")], ["Kabelbinder", "Handschuhe"])
+
+    def test_bounded_conversations(self) -> None:
+        store = OrderDraftStore(max_conversations=2)
+        for cid in ("a", "b", "c"):
+            store.upsert(cid, artikel_name="Band", status="pending_clarification")
+        self.assertEqual(store.lines("a"), [])
+
+
+class TestDraftTools(unittest.TestCase):
+    def setUp(self) -> None:
+        ORDER_DRAFTS.clear("conv")
+        self.addCleanup(ORDER_DRAFTS.clear, "conv")
+
+    def _run(self, name, **tool_input):
+        return tools_runtime.execute_tool(name=name, tool_input=tool_input, conversation_id="conv")
+
+    def test_tools_act_on_the_callers_draft(self) -> None:
+        summary = self._run("draft_upsert_item", artikel_name="Kabelbinder", artikel_id="W-1", menge=5, status="confirmed")
+        self.assertEqual(summary, "Draft: 1) W-1 Kabelbinder 5 [confirmed]. Confirmed total 0.00")
+        self.assertEqual(len(self._run("draft_list")), 1)
+        self.assertEqual(self._run("draft_remove_item", artikel_id="W-1"), "Draft: empty.")
+        with self.assertRaises(tools_runtime.ToolRuntimeError):
+            tools_runtime.execute_tool(name="draft_list", tool_input={})
+
+    def test_submit_creates_order_at_catalog_prices(self) -> None:
+        self._run("draft_upsert_item", artikel_name="kabelbinder", artikel_id="W-1", menge=4, einzelpreis=1.0, status="confirmed")
+        catalog = {"W-1": ("Kabelbinder 200mm", "Pack", Decimal("3.10"))}
+        created = {"bestell_id": "ORD-1", "status": "approved", "gesamt_betrag": Decimal("12.40"), "bestellpositionen": [{}]}
+        with mock.patch.object(order_draft_service, "_catalog_prices", return_value=catalog), mock.patch.object(
+            order_draft_service, "create_bestellung", return_value=created
+        ) as create:
+            result = self._run("draft_submit", polier_name="Hans", projekt_name="Nord")
+        create.assert_called_once_with(
+            polier_name="Hans",
+            projekt_name="Nord",
+            items=[{"artikel_id": "W-1", "artikel_name": "Kabelbinder 200mm", "menge": 4, "einheit": "Pack", "einzelpreis": Decimal("3.10")}],
+            erstellt_von="voice_assistant",
+        )
+        self.assertEqual(result["bestell_id"], "ORD-1")
+        self.assertEqual(result["remaining_draft"], "Draft: empty.")
+
+    def test_submit_rejects_unknown_ids(self) -> None:
+        self._run("draft_upsert_item", artikel_name="x", artikel_id="NOPE", menge=1, status="confirmed")
+        with mock.patch.object(order_draft_service, "_catalog_prices", return_value={}):
+            with self.assertRaises(DraftError):
+                self._run("draft_submit", polier_name="Hans", projekt_name="Nord")
+        self.assertEqual(len(ORDER_DRAFTS.lines("conv")), 1)
+
+    def test_summary_is_added_to_latest_user_message(self) -> None:
+        messages = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "yo"}, {"role": "user", "content": "more"}]
+        self.assertIs(order_draft_service.with_draft_summary(messages, "conv"), messages)
+        self._run("draft_upsert_item", artikel_name="Band", status="pending_clarification", missing_fields=["type"])
+        out = order_draft_service.with_draft_summary(messages, "conv")
+        self.assertEqual(out[-1]["content"], "[Draft: 1) Band [pending_clarification: type]. Confirmed total 0.00]\nmore")
+        self.assertEqual(messages[-1]["content"], "more")
+
+
+if __name__ == "__main__":
+    unittest.main()
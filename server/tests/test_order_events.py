@@ -0,0 +1,127 @@
+import asyncio
+import json
+import sys
+import unittest
+from pathlib import Path
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from api.v1.services.order_events_service import (  # noqa: E402
+    ITEM_CHANGED,
+    ORDER_CREATED,
+    RESYNC,
+    STATUS_CHANGED,
+    OrderEventHub,
+    event_from_notification,
+    stream_order_events,
+)
+
+
+def _note(**fields) -> str:
+    return json.dumps(fields)
+
+
+class TestEventFromNotification(unittest.TestCase):
+    def test_status_change_is_a_small_delta(self) -> None:
+        event = event_from_notification(
+            _note(
+                table="bestellungen",
+                op="UPDATE",
+                key="ORD-1",
+                bestell_id="ORD-1",
+                fields={"status": "approved", "genehmigt_von": "Admin"},
+                previous={"status": "pending", "genehmigt_von": None},
+            )
+        )
+        self.assertEqual(
+            event,
+            (
+                STATUS_CHANGED,
+                {
+                    "bestell_id": "ORD-1",
+                    "changes": {"status": "approved", "genehmigt_von": "Admin"},
+                    "previous": {"status": "pending", "genehmigt_von": None},
+                },
+            ),
+        )
+
+    def test_created_order_and_item_change(self) -> None:
+        kind, data = event_from_notification(
+            _note(table="bestellungen", op="INSERT", key="ORD-2", bestell_id="ORD-2", fields={"bestell_id": "ORD-2", "status": "pending"})
+        )
+        self.assertEqual((kind, data["status"]), (ORDER_CREATED, "pending"))
+
+        kind, data = event_from_notification(
+            _note(table="bestellpositionen", op="DELETE", key=7, bestell_id="ORD-2", fields={})
+        )
+        self.assertEqual((kind, data["op"], data["position_id"]), (ITEM_CHANGED, "delete", 7))
+
+    def test_bulk_write_asks_for_resync(self) -> None:
+        kind, _ = event_from_notification(_note(table="bestellungen", op="UPDATE", bulk=True, rows=5000))
+        self.assertEqual(kind, RESYNC)
+        self.assertIsNone(event_from_notification("{"))
+
+
+class TestOrderEventHub(unittest.IsolatedAsyncioTestCase):
+    async def test_fan_out_and_resume_from_last_event_id(self) -> None:
+        hub = OrderEventHub(history=3)
+        first, second = hub.subscribe(), hub.subscribe()
+        hub.publish(STATUS_CHANGED, {"bestell_id": "ORD-1"})
+        self.assertEqual((await first.get()).data, {"bestell_id": "ORD-1"})
+        self.assertEqual((await second.get()).data, {"bestell_id": "ORD-1"})
+        first.close()
+        second.close()
+
+        seen_id = hub.last_event_id
+        hub.publish(ITEM_CHANGED, {"bestell_id": "ORD-1"})
+        hub.publish(ORDER_CREATED, {"bestell_id": "ORD-2"})
+        resumed = hub.subscribe(seen_id)
+        self.assertEqual([(await resumed.get()).type for _ in range(2)], [ITEM_CHANGED, ORDER_CREATED])
+
+    async def test_unknown_or_expired_id_gets_resync(self) -> None:
+        hub = OrderEventHub(history=2)
+        old_id = hub.last_event_id
+        for n in range(3):
+            hub.publish(STATUS_CHANGED, {"n": n})
+        self.assertIsNone(hub.replay_since(old_id))
+        self.assertEqual((await hub.subscribe(old_id).get()).type, RESYNC)
+        self.assertEqual((await hub.subscribe("other-epoch:1").get()).type, RESYNC)
+
+    async def test_lagging_subscriber_gets_a_single_resync(self) -> None:
+        hub = OrderEventHub(queue_size=2)
+        slow = hub.subscribe()
+        for n in range(5):
+            hub.publish(STATUS_CHANGED, {"n": n})
+        event = await slow.get()
+        self.assertEqual((event.type, event.id), (RESYNC, hub.last_event_id))
+
+    async def test_listener_reconnect_publishes_resync(self) -> None:
+        hub = OrderEventHub()
+        hub.handle_resync()  # first connect: nothing was missed
+        sub = hub.subscribe()
+        hub.handle_resync()
+        self.assertEqual((await sub.get()).data, {"reason": "listener-reconnected"})
+
+    async def test_sse_stream_format(self) -> None:
+        hub = OrderEventHub()
+        stream = stream_order_events(hub=hub, heartbeat_s=0.01)
+        self.assertEqual(await stream.__anext__(), "retry: 3000\n\n")
+        self.assertEqual(await stream.__anext__(), ": keep-alive\n\n")
+        hub.handle_notification(
+            _note(table="bestellungen", op="UPDATE", key="ORD-1", bestell_id="ORD-1", fields={"status": "delivered"})
+        )
+        chunk = await stream.__anext__()
+        self.assertEqual(
+            chunk,
+            f"id: {hub.last_event_id}\nevent: status-changed\n"
+            'data: {"bestell_id":"ORD-1","changes":{"status":"delivered"}}\n\n',
+        )
+        await stream.aclose()
+        await asyncio.sleep(0)
+
+
+if __name__ == "__main__":
+    unittest.main()
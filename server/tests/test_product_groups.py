@@ -0,0 +1,145 @@
+import sys
+import unittest
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from api.v1.data_access.cache import invalidate_tables  # noqa: E402
+from api.v1.data_access.records import SiteArtikelRecord  # noqa: E402
+from api.v1.routes import artikel_router  # noqa: E402
+from api.v1.services import product_group_service  # noqa: E402
+from api.v1.services.product_group_service import ProductGroupIndex, normalize_product_name  # noqa: E402
+
+
+def _artikel(artikel_id, name, preis, lieferant):
+    price = Decimal(preis) if preis is not None else None
+    return SiteArtikelRecord(artikel_id, name, "PSA", "Stk", price, lieferant, "Mehrweg", False, "Container A", None, None)
+
+
+# Rows as the members query returns them: per group, cheapest first, unpriced last.
+_MEMBERS = [
+    (1, _artikel("H-SICH-013", "Sicherheitsbrille", "9.90", "Hilti")),
+    (1, _artikel("W-SICH-004", "Sicherheitsbrille", "12.50", "Würth")),
+    (1, _artikel("B-SCH-020", "Schutzbrille", None, "Bauhaus")),
+    (2, _artikel("W-BOHR-001", "Bohrhammer", "199.00", "Würth")),
+]
+_ALIASES = [("sicherheitsbrille", 1), ("schutzbrille", 1), ("bohrhammer", 2)]
+
+
+class TestProductGroupIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.index = ProductGroupIndex(_MEMBERS, _ALIASES)
+
+    def test_aliases_share_alternatives_cheapest_first(self) -> None:
+        ids = [a.artikel_id for a in self.index.alternatives("Schutzbrille", "B-SCH-020")]
+        self.assertEqual(ids, ["H-SICH-013", "W-SICH-004"])
+        ids = [a.artikel_id for a in self.index.alternatives(" sicherheitsbrille ")]
+        self.assertEqual(ids, ["H-SICH-013", "W-SICH-004", "B-SCH-020"])
+
+    def test_unknown_name_falls_back_to_the_excluded_artikel_group(self) -> None:
+        self.assertEqual([a.artikel_id for a in self.index.alternatives("Bohrmaschine", "W-BOHR-001")], [])
+        self.assertEqual([a.artikel_id for a in self.index.alternatives("Brille alt", "W-SICH-004")], ["H-SICH-013", "B-SCH-020"])
+        self.assertEqual(self.index.alternatives("Unbekannt"), [])
+
+    def test_cheapest_skips_unpriced_members(self) -> None:
+        self.assertEqual(self.index.cheapest("Schutzbrille").artikel_id, "H-SICH-013")
+        self.assertEqual(self.index.cheapest(artikel_id="W-BOHR-001").lieferant, "Würth")
+        self.assertIsNone(self.index.cheapest("Unbekannt"))
+
+    def test_members_are_copies(self) -> None:
+        self.index.members(1).clear()
+        self.assertEqual(len(self.index.members(1)), 3)
+
+    def test_normalize_matches_sql_lower_btrim(self) -> None:
+        self.assertEqual(normalize_product_name("  Schutzbrille "), "schutzbrille")
+        self.assertEqual(normalize_product_name(None), "")
+
+
+class _Cursor:
+    def __init__(self):
+        self._rows = []
+        self.queries = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.queries.append(sql)
+        if "product_group_aliases" in sql:
+            self._rows = list(_ALIASES)
+        else:
+            self._rows = [tuple(a.values()) + (group,) for group, a in _MEMBERS]
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def __iter__(self):
+        return iter(self._rows)
+
+
+class _Connection:
+    def __init__(self):
+        self.cur = _Cursor()
+        self.closed = False
+
+    def cursor(self):
+        return self.cur
+
+    def close(self):
+        self.closed = True
+
+
+class TestProductGroupLoading(unittest.TestCase):
+    def setUp(self) -> None:
+        invalidate_tables("product_groups")
+        self.addCleanup(invalidate_tables, "product_groups")
+
+    def test_loads_once_until_artikel_changes(self) -> None:
+        conn = _Connection()
+        with mock.patch.object(product_group_service, "get_db_connection", return_value=conn) as connect:
+            index = product_group_service.get_product_group_index()
+            self.assertIs(product_group_service.get_product_group_index(), index)
+            self.assertEqual(connect.call_count, 1)
+            invalidate_tables("artikel")
+            product_group_service.get_product_group_index()
+            self.assertEqual(connect.call_count, 2)
+        self.assertIn("ORDER BY a.product_group_id, a.preis_eur NULLS LAST", conn.cur.queries[0])
+        self.assertEqual(index.cheapest("Schutzbrille").artikel_id, "H-SICH-013")
+        self.assertTrue(conn.closed)
+
+
+class TestCheapestRoute(unittest.TestCase):
+    def setUp(self) -> None:
+        app = FastAPI()
+        app.include_router(artikel_router, prefix="/api/v1")
+        self.client = TestClient(app)
+        patcher = mock.patch(
+            "api.v1.services.artikel_service.get_product_group_index",
+            return_value=ProductGroupIndex(_MEMBERS, _ALIASES),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cheapest_and_alternatives(self) -> None:
+        response = self.client.get("/api/v1/artikel/cheapest/Schutzbrille")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["artikel_id"], "H-SICH-013")
+        self.assertEqual(self.client.get("/api/v1/artikel/cheapest/Unbekannt").status_code, 404)
+
+        response = self.client.get("/api/v1/artikel/alternatives/Schutzbrille", params={"exclude_id": "B-SCH-020"})
+        self.assertEqual([a["preis_eur"] for a in response.json()], [9.9, 12.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
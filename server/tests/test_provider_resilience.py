@@ -0,0 +1,160 @@
+import asyncio
+import os
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import anthropic
+import httpx
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from api.v1.data_access.anthropic import agent  # noqa: E402
+from api.v1.data_access.anthropic.resilience import (  # noqa: E402
+    CircuitBreaker,
+    LatencyWindow,
+    ProviderUnavailableError,
+    backoff_delay,
+    is_retryable,
+)
+from api.v1.observability.metrics import ANTHROPIC_HEDGED_REQUESTS, ANTHROPIC_RETRIES  # noqa: E402
+
+_REQUEST = httpx.Request("POST", "https://api.anthropic.test/v1/messages")
+
+
+def _status_error(cls, status, headers=None):
+    return cls("upstream", response=httpx.Response(status, request=_REQUEST, headers=headers), body=None)
+
+
+class TestResiliencePrimitives(unittest.TestCase):
+    def test_retryable_errors(self) -> None:
+        self.assertTrue(is_retryable(asyncio.TimeoutError()))
+        self.assertTrue(is_retryable(anthropic.APIConnectionError(request=_REQUEST)))
+        self.assertTrue(is_retryable(_status_error(anthropic.RateLimitError, 429)))
+        self.assertTrue(is_retryable(_status_error(anthropic.InternalServerError, 529)))
+        self.assertFalse(is_retryable(_status_error(anthropic.BadRequestError, 400)))
+        self.assertFalse(is_retryable(ValueError()))
+
+    def test_backoff_is_jittered_exponential_and_honours_retry_after(self) -> None:
+        for retry, upper in ((1, 0.5), (2, 1.0), (3, 2.0), (6, 4.0)):
+            delay = backoff_delay(retry)
+            self.assertGreaterEqual(delay, upper / 2)
+            self.assertLessEqual(delay, upper)
+        limited = _status_error(anthropic.RateLimitError, 429, headers={"retry-after": "3"})
+        self.assertEqual(backoff_delay(1, limited), 3.0)
+        limited = _status_error(anthropic.RateLimitError, 429, headers={"retry-after": "120"})
+        self.assertEqual(backoff_delay(1, limited), 4.0)
+
+    def test_latency_window_quantile(self) -> None:
+        window = LatencyWindow(size=100, min_samples=10)
+        for i in range(9):
+            window.observe(float(i))
+        self.assertIsNone(window.quantile(0.95))
+        for i in range(9, 100):
+            window.observe(float(i))
+        self.assertEqual(window.quantile(0.95), 94.0)
+
+    def test_circuit_breaker(self) -> None:
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_after_s=10, clock=lambda: now[0])
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "closed")
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+
+        now[0] = 10
+        self.assertEqual(breaker.state, "half_open")
+        self.assertTrue(breaker.allow())  # the probe
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        now[0] = 20
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        self.assertTrue(breaker.allow())
+
+
+class TestAnthropicCreate(unittest.TestCase):
+    def setUp(self) -> None:
+        self.calls = 0
+        self.behaviours = []
+
+        async def create(**kwargs):
+            self.calls += 1
+            behaviour = self.behaviours.pop(0)
+            if isinstance(behaviour, BaseException):
+                raise behaviour
+            if isinstance(behaviour, (int, float)):
+                await asyncio.sleep(behaviour)
+            return SimpleNamespace(usage=None, call=self.calls)
+
+        fake_client = SimpleNamespace(messages=SimpleNamespace(create=create))
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_after_s=60)
+        for patcher in (
+            mock.patch.object(agent, "async_client", fake_client),
+            mock.patch.object(agent, "PROVIDER_BREAKER", self.breaker),
+            mock.patch.object(agent, "backoff_delay", lambda retry, exc=None: 0.0),
+            mock.patch.dict(agent._latencies, clear=True),
+            mock.patch.dict(os.environ, {"ANTHROPIC_HEDGING": "0"}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _create(self):
+        return asyncio.run(agent._anthropic_create(model="test-model", messages=[]))
+
+    def test_retries_retryable_errors(self) -> None:
+        before = ANTHROPIC_RETRIES.value(reason="APIConnectionError")
+        self.behaviours = [anthropic.APIConnectionError(request=_REQUEST), None]
+        self.assertEqual(self._create().call, 2)
+        self.assertEqual(ANTHROPIC_RETRIES.value(reason="APIConnectionError"), before + 1)
+
+    def test_gives_up_after_max_retries(self) -> None:
+        self.behaviours = [_status_error(anthropic.InternalServerError, 503)] * (agent.MAX_PROVIDER_RETRIES + 1)
+        with self.assertRaises(anthropic.InternalServerError):
+            self._create()
+        self.assertEqual(self.calls, agent.MAX_PROVIDER_RETRIES + 1)
+
+    def test_does_not_retry_bad_requests(self) -> None:
+        self.behaviours = [_status_error(anthropic.BadRequestError, 400)]
+        with self.assertRaises(anthropic.BadRequestError):
+            self._create()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.breaker.state, "closed")
+
+    def test_open_circuit_fails_fast(self) -> None:
+        self.behaviours = [anthropic.APIConnectionError(request=_REQUEST)] * 3
+        with self.assertRaises(anthropic.APIConnectionError):
+            self._create()
+        self.assertEqual(self.breaker.state, "open")
+        with self.assertRaises(ProviderUnavailableError):
+            self._create()
+        self.assertEqual(self.calls, 3)
+
+    def test_hedged_request_wins_and_slow_one_is_cancelled(self) -> None:
+        window = agent._latency_window("test-model")
+        for _ in range(window.min_samples):
+            window.observe(0.01)
+        won_before = ANTHROPIC_HEDGED_REQUESTS.value(result="won")
+        self.behaviours = [30.0, None]
+        with mock.patch.dict(os.environ, {"ANTHROPIC_HEDGING": "1"}), mock.patch.object(agent, "HEDGE_MIN_DELAY_S", 0.05):
+            self.assertEqual(self._create().call, 2)
+        self.assertEqual(ANTHROPIC_HEDGED_REQUESTS.value(result="won"), won_before + 1)
+
+    def test_no_hedging_before_enough_samples(self) -> None:
+        self.behaviours = [0.1]
+        with mock.patch.dict(os.environ, {"ANTHROPIC_HEDGING": "1"}), mock.patch.object(agent, "HEDGE_MIN_DELAY_S", 0.01):
+            self.assertEqual(self._create().call, 1)
+        self.assertEqual(self.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import asyncio
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from api.v1.data_access.database.cancellation import (  # noqa: E402
+    QueryCancelScope,
+    QueryCancelledError,
+    current_cancel_scope,
+    run_in_cancel_scope,
+)
+
+
+class _FakeConnection:
+    def __init__(self) -> None:
+        self.cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+
+class TestQueryCancelScope(unittest.IsolatedAsyncioTestCase):
+    async def test_cancelling_awaiting_task_cancels_query_in_worker_thread(self) -> None:
+        scope = QueryCancelScope()
+        conn = _FakeConnection()
+        started = threading.Event()
+
+        def blocking_query() -> None:
+            current_cancel_scope().register(conn)
+            started.set()
+            # Simulates a query that only returns once Postgres cancels it.
+            conn.cancelled.wait(timeout=5)
+
+        async def run() -> None:
+            try:
+                await asyncio.to_thread(run_in_cancel_scope, scope, blocking_query)
+            except asyncio.CancelledError:
+                scope.cancel()
+                raise
+
+        task = asyncio.create_task(run())
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        self.assertTrue(conn.cancelled.is_set())
+        self.assertTrue(scope.cancelled)
+
+    def test_register_after_cancel_fails_fast(self) -> None:
+        scope = QueryCancelScope()
+        scope.cancel()
+        with self.assertRaises(QueryCancelledError):
+            scope.register(_FakeConnection())
+
+    def test_scope_is_not_active_outside_run(self) -> None:
+        scope = QueryCancelScope()
+        self.assertIs(run_in_cancel_scope(scope, current_cancel_scope), scope)
+        self.assertIsNone(current_cancel_scope())
+
+
+if __name__ == "__main__":
+    unittest.main()
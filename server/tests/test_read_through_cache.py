@@ -0,0 +1,216 @@
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from api.v1.data_access.cache import (  # noqa: E402
+    ReadThroughCache,
+    TableChange,
+    apply_change,
+    cached,
+    cached_args,
+    invalidate_tables,
+    on_table_change,
+    remove_table_change_callback,
+)
+from api.v1.data_access.records import ArtikelRecord  # noqa: E402
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestReadThroughCache(unittest.TestCase):
+    def test_hit_until_ttl_expires(self) -> None:
+        clock = _Clock()
+        cache = ReadThroughCache("t_ttl", tables=("t",), ttl_s=10, clock=clock)
+        calls = []
+
+        def load():
+            calls.append(1)
+            return [len(calls)]
+
+        self.assertEqual(cache.get_or_load("k", load), [1])
+        clock.now = 9.9
+        self.assertEqual(cache.get_or_load("k", load), [1])
+        clock.now = 10.1
+        self.assertEqual(cache.get_or_load("k", load), [2])
+
+    def test_lru_evicts_least_recently_used(self) -> None:
+        cache = ReadThroughCache("t_lru", tables=("t",), ttl_s=60, max_entries=2)
+        cache.get_or_load("a", lambda: "A")
+        cache.get_or_load("b", lambda: "B")
+        cache.get_or_load("a", lambda: "stale")  # touch a
+        cache.get_or_load("c", lambda: "C")  # evicts b
+        self.assertEqual(cache.get_or_load("a", lambda: "reloaded"), "A")
+        self.assertEqual(cache.get_or_load("b", lambda: "reloaded"), "reloaded")
+        self.assertEqual(len(cache), 2)
+
+    def test_returned_lists_are_copies(self) -> None:
+        cache = ReadThroughCache("t_copy", tables=("t",), ttl_s=60)
+        first = cache.get_or_load("k", lambda: [1, 2])
+        first.append(3)
+        self.assertEqual(cache.get_or_load("k", lambda: []), [1, 2])
+
+    def test_returned_rows_are_copies(self) -> None:
+        cache = ReadThroughCache("t_row_copy", tables=("t",), ttl_s=60)
+        row = ArtikelRecord(*(None,) * len(ArtikelRecord._fields))
+        row["artikelname"] = "Schutzbrille"
+        first = cache.get_or_load("k", lambda: [row, {"name": "Helm"}])
+        first[0]["artikelname"] = "edited"
+        first[1]["name"] = "edited"
+        again = cache.get_or_load("k", lambda: [])
+        self.assertEqual(again[0]["artikelname"], "Schutzbrille")
+        self.assertEqual(again[1], {"name": "Helm"})
+
+    def test_concurrent_misses_load_once(self) -> None:
+        cache = ReadThroughCache("t_flight", tables=("t",), ttl_s=60)
+        release = threading.Event()
+        calls = []
+
+        def load():
+            calls.append(1)
+            release.wait(5)
+            return "value"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", load))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        # Give the followers time to queue up behind the leader.
+        threading.Event().wait(0.1)
+        release.set()
+        for t in threads:
+            t.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 8)
+
+    def test_failed_leader_does_not_fail_followers(self) -> None:
+        cache = ReadThroughCache("t_fail", tables=("t",), ttl_s=60)
+        leader_started = threading.Event()
+        release = threading.Event()
+
+        def failing_load():
+            leader_started.set()
+            release.wait(5)
+            raise RuntimeError("query cancelled")
+
+        errors, results = [], []
+
+        def leader():
+            try:
+                cache.get_or_load("k", failing_load)
+            except RuntimeError as e:
+                errors.append(e)
+
+        t1 = threading.Thread(target=leader)
+        t1.start()
+        leader_started.wait(5)
+        t2 = threading.Thread(target=lambda: results.append(cache.get_or_load("k", lambda: "own")))
+        t2.start()
+        threading.Event().wait(0.05)
+        release.set()
+        t1.join(5)
+        t2.join(5)
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(results, ["own"])
+
+    def test_invalidation_during_load_is_not_stored(self) -> None:
+        cache = ReadThroughCache("t_race", tables=("t",), ttl_s=60)
+
+        def load_then_write():
+            value = "pre-write"
+            cache.invalidate()  # a write commits while we were reading
+            return value
+
+        self.assertEqual(cache.get_or_load("k", load_then_write), "pre-write")
+        self.assertEqual(cache.get_or_load("k", lambda: "post-write"), "post-write")
+
+    def test_zero_ttl_is_pass_through(self) -> None:
+        cache = ReadThroughCache("t_off", tables=("t",), ttl_s=0)
+        calls = []
+        for _ in range(3):
+            cache.get_or_load("k", lambda: calls.append(1))
+        self.assertEqual(len(calls), 3)
+
+
+class TestInvalidationHooks(unittest.TestCase):
+    def test_invalidate_tables_only_clears_dependent_caches(self) -> None:
+        artikel = ReadThroughCache("t_artikel", tables=("t_artikel_tbl",), ttl_s=60)
+        sites = ReadThroughCache("t_sites", tables=("t_sites_tbl",), ttl_s=60)
+        artikel.get_or_load("k", lambda: 1)
+        sites.get_or_load("k", lambda: 1)
+        seen = []
+        on_table_change(seen.append)
+        self.addCleanup(remove_table_change_callback, seen.append)
+
+        self.assertEqual(invalidate_tables("t_artikel_tbl"), 1)
+        self.assertEqual(len(artikel), 0)
+        self.assertEqual(len(sites), 1)
+        self.assertIn(TableChange("t_artikel_tbl"), seen)
+
+    def test_precise_change_only_drops_affected_keys(self) -> None:
+        cache = ReadThroughCache(
+            "t_precise",
+            tables=("t_precise_tbl",),
+            ttl_s=60,
+            affected=lambda key, change: cached_args(key)[0] in change.names,
+        )
+        cache.get_or_load(("Schutzbrille", None), lambda: 1)
+        cache.get_or_load(("Bohrhammer", "H-1"), lambda: 1)
+
+        change = TableChange("t_precise_tbl", "UPDATE", keys=frozenset({"W-1"}), names=frozenset({"Schutzbrille"}))
+        apply_change(change)
+        self.assertEqual(len(cache), 1)
+        # Keys unknown (bulk write): everything goes.
+        apply_change(TableChange("t_precise_tbl", "UPDATE"))
+        self.assertEqual(len(cache), 0)
+
+    def test_cached_decorator_keys_on_arguments(self) -> None:
+        calls = []
+
+        @cached(ReadThroughCache("t_decorated", tables=("t",), ttl_s=60))
+        def alternatives(name, exclude=None):
+            calls.append((name, exclude))
+            return [name]
+
+        alternatives("Bohrhammer", "H-1")
+        alternatives("Bohrhammer", "H-1")
+        alternatives("Bohrhammer", "W-1")
+        self.assertEqual(calls, [("Bohrhammer", "H-1"), ("Bohrhammer", "W-1")])
+        alternatives.cache.invalidate()
+        alternatives("Bohrhammer", "H-1")
+        self.assertEqual(len(calls), 3)
+
+    def test_cached_keys_normalize_how_arguments_are_passed(self) -> None:
+        calls = []
+
+        @cached(ReadThroughCache("t_bound", tables=("t",), ttl_s=60))
+        def alternatives(name, exclude=None, *, site=None):
+            calls.append(name)
+            return [name]
+
+        alternatives("Bohrhammer")
+        alternatives(name="Bohrhammer")
+        alternatives("Bohrhammer", None, site=None)
+        self.assertEqual(calls, ["Bohrhammer"])
+
+        alternatives(name="Schutzbrille", site="S-1")
+        keys = list(alternatives.cache._entries)
+        self.assertEqual([cached_args(key)[0] for key in keys], ["Bohrhammer", "Schutzbrille"])
+        self.assertEqual(cached_args(keys[1]), ("Schutzbrille", None, "S-1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import json
+import sys
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from functools import partial
+from pathlib import Path
+from unittest import mock
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from api.v1.data_access.database.streaming import iter_records, stream_query  # noqa: E402
+from api.v1.data_access.records import (  # noqa: E402
+    AlternativeRecord,
+    ArtikelRecord,
+    OrderPositionRecord,
+    OrderRecord,
+    POSITION_COLUMNS,
+    Record,
+    SiteArtikelRecord,
+    record_type,
+)
+from api.v1.data_access.tools_runtime import stringify_tool_result  # noqa: E402
+from api.v1.serialization import dumps  # noqa: E402
+from api.v1.services import bestellungen_service  # noqa: E402
+from api.v1.services.product_group_service import ProductGroupIndex  # noqa: E402
+
+_ARTIKEL = ("W-1", "Schutzbrille", "PSA", "Stück", Decimal("4.99"), "Würth", "Verbrauch", False, "Regal 1")
+
+_AT = datetime(2026, 3, 1, 9, 0)
+
+
+class _Cursor:
+    def __init__(self, rows, columns):
+        self._rows = list(rows)
+        self.description = [(c,) for c in columns]
+        self.itersize = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.sql = sql
+
+    def __iter__(self):
+        return iter(self._rows)
+
+
+class _Connection:
+    def __init__(self, rows, columns):
+        self.cursor_obj = _Cursor(rows, columns)
+        self.closed = False
+
+    def cursor(self, name=None):
+        self.cursor_name = name
+        return self.cursor_obj
+
+    def close(self):
+        self.closed = True
+
+
+class _Point(Record):
+    __slots__ = ("x", "y", "label")
+    _optional = ("label",)
+
+
+class TestRecord(unittest.TestCase):
+    def test_positional_init_and_dict_access(self) -> None:
+        point = _Point(1, 2)
+        self.assertEqual((point.x, point["y"], point.get("label")), (1, 2, None))
+        self.assertEqual(point.get("missing", "-"), "-")
+        self.assertIn("x", point)
+        self.assertEqual(dict(point), {"x": 1, "y": 2, "label": None})
+        self.assertEqual(point, {"x": 1, "y": 2, "label": None})
+        with self.assertRaises(KeyError):
+            point["missing"]
+        with self.assertRaises(KeyError):
+            point["missing"] = 1
+        point["label"] = "a"
+        self.assertEqual(point.to_dict()["label"], "a")
+
+    def test_records_have_no_instance_dict(self) -> None:
+        self.assertFalse(hasattr(_Point(1, 2), "__dict__"))
+
+    def test_record_type_is_cached_and_validates_columns(self) -> None:
+        self.assertIs(record_type("Row", ["a", "b"]), record_type("Row", ("a", "b")))
+        with self.assertRaises(ValueError):
+            record_type("Row", ["?column?"])
+        with self.assertRaises(ValueError):
+            record_type("Row", ["a", "a"])
+
+    def test_serializes_like_the_equivalent_dict(self) -> None:
+        row = record_type("Row", ["artikel_id", "preis_eur", "at"])("W-1", Decimal("4.99"), _AT)
+        self.assertEqual(json.loads(dumps([row])), [{"artikel_id": "W-1", "preis_eur": 4.99, "at": "2026-03-01T09:00:00"}])
+
+
+class TestRowShapes(unittest.TestCase):
+    def test_subclass_fields_extend_the_parent(self) -> None:
+        self.assertEqual(SiteArtikelRecord._fields[: len(ArtikelRecord._fields)], ArtikelRecord._fields)
+        row = SiteArtikelRecord(*_ARTIKEL, 3, "Baustelle Nord")
+        self.assertEqual((row["artikelname"], row.construction_site_name), ("Schutzbrille", "Baustelle Nord"))
+        with self.assertRaises(TypeError):
+            SiteArtikelRecord(*_ARTIKEL)
+
+    def test_nested_fields_are_optional(self) -> None:
+        self.assertIsNone(OrderPositionRecord(*range(len(POSITION_COLUMNS))).alternatives)
+        self.assertEqual(OrderRecord._fields[-1], "bestellpositionen")
+
+    def test_tool_results_stringify_as_table(self) -> None:
+        table = json.loads(stringify_tool_result([ArtikelRecord(*_ARTIKEL)]))
+        row = dict(zip(table["columns"], table["rows"][0]))
+        self.assertEqual(row["artikelname"], "Schutzbrille")
+        self.assertEqual(row["preis_eur"], 4.99)
+
+
+class TestIterRecords(unittest.TestCase):
+    def test_maps_tuples_to_records_and_closes_connection(self) -> None:
+        conn = _Connection([("W-1", 3), ("W-2", 4)], ["artikel_id", "quantity"])
+        rows = list(iter_records("SELECT 1", name="InventoryRow", itersize=50, connect=lambda: conn))
+        self.assertEqual([r["artikel_id"] for r in rows], ["W-1", "W-2"])
+        self.assertEqual(type(rows[0]).__name__, "InventoryRow")
+        self.assertEqual(conn.cursor_obj.itersize, 50)
+        self.assertTrue(conn.cursor_name.startswith("stream_"))
+        self.assertTrue(conn.closed)
+
+    def test_explicit_record_class(self) -> None:
+        conn = _Connection([(1, 2, "p")], ["x", "y", "label"])
+        (point,) = iter_records("SELECT 1", record=_Point, connect=lambda: conn)
+        self.assertIsInstance(point, _Point)
+        self.assertEqual(point.label, "p")
+
+
+class TestOrdersWithItems(unittest.TestCase):
+    def test_single_streamed_join_folds_positions_per_order(self) -> None:
+        # gesamt_betrag as summed by the query's window aggregate
+        order = ("ORD-1", "Müller", "Projekt A", Decimal("19.96"), "pending", None, _AT, _AT, None, None, None)
+        position = (1, "W-1", "Schutzbrille", Decimal("2"), "Stück", Decimal("4.99"), Decimal("9.98"), 1, None)
+        rows = [
+            order + position,
+            order + (2,) + position[1:],
+            ("ORD-2",) + order[1:] + (None,) * len(POSITION_COLUMNS),
+        ]
+        conn = _Connection(rows, [])
+        with mock.patch.object(
+            bestellungen_service, "stream_query", partial(stream_query, connect=lambda: conn)
+        ), mock.patch.object(
+            bestellungen_service,
+            "get_product_group_index",
+            return_value=ProductGroupIndex(
+                [(1, SiteArtikelRecord("H-1", "Sicherheitsbrille", "PSA", "Stk", Decimal("3.50"), "Hilti", None, False, None, None, None)),
+                 (1, SiteArtikelRecord(*_ARTIKEL, None, None))],
+                [("schutzbrille", 1), ("sicherheitsbrille", 1)],
+            ),
+        ):
+            orders = bestellungen_service.get_all_bestellungen_with_items()
+
+        self.assertEqual([o["bestell_id"] for o in orders], ["ORD-1", "ORD-2"])
+        self.assertEqual([p["position_id"] for p in orders[0]["bestellpositionen"]], [1, 2])
+        self.assertIsInstance(orders[0], OrderRecord)
+        first = orders[0]["bestellpositionen"][0]
+        self.assertIsInstance(first, OrderPositionRecord)
+        self.assertEqual((first["menge"], first["gesamt_preis"]), (Decimal("2"), Decimal("9.98")))
+        self.assertEqual(first["alternatives"], [AlternativeRecord("H-1", "Sicherheitsbrille", "Hilti", 3.5, "Stk")])
+        self.assertEqual(orders[0]["gesamt_betrag"], Decimal("19.96"))
+        self.assertIn("SUM(p.gesamt_preis) OVER (PARTITION BY b.bestell_id)", conn.cursor_obj.sql)
+        self.assertEqual(orders[1]["bestellpositionen"], [])
+        self.assertTrue(conn.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import asyncio
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from api.v1.data_access.cache import invalidate_tables  # noqa: E402
+from api.v1.data_access.order_drafts import ORDER_DRAFTS  # noqa: E402
+from api.v1.data_access.response_cache import RESPONSE_CACHE, SemanticResponseCache, normalize_question  # noqa: E402
+from api.v1.services import claude_service, message_history_service  # noqa: E402
+
+
+class TestSemanticResponseCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = [0.0]
+        self.cache = SemanticResponseCache(ttl_s=60, clock=lambda: self.now[0])
+
+    def test_normalization(self) -> None:
+        self.assertEqual(normalize_question("Haben wir Sicherheitsbrillen?"), "hab wir sicherheitsbrill")
+        self.assertEqual(normalize_question("haben wir bitte  Sicherheitsbrille"), "hab wir sicherheitsbrill")
+        self.assertEqual(normalize_question("Was kostet der Bohrhammer?"), normalize_question("was KOSTET der bohrhammer"))
+
+    def test_exact_and_similar_hits(self) -> None:
+        self.cache.store("Haben wir Sicherheitsbrillen?", "de", "Ja, 8 Stück.", version=self.cache.version)
+        self.assertEqual(self.cache.lookup("haben wir sicherheitsbrille", "de").text, "Ja, 8 Stück.")
+        self.assertEqual(self.cache.lookup("Haben wir Sicherheits-Brillen?", "de").text, "Ja, 8 Stück.")
+        self.assertEqual(self.cache.lookup("Haben wir Sicherheitsbrilen?", "de").text, "Ja, 8 Stück.")
+        self.assertIsNone(self.cache.lookup("Haben wir Sicherheitsbrillen?", "en"))
+        self.assertIsNone(self.cache.lookup("Haben wir Schutzhelme?", "de"))
+
+    def test_numbers_must_match(self) -> None:
+        self.cache.store("Haben wir 10 Kabelbinder auf Lager?", "de", "Ja.", version=self.cache.version)
+        self.assertIsNone(self.cache.lookup("Haben wir 100 Kabelbinder auf Lager?", "de"))
+        self.assertIsNone(self.cache.lookup("Haben wir 20 Kabelbinder auf Lager?", "de"))
+        self.cache.store("Was kosten Schrauben 4x40?", "de", "5 Euro.", version=self.cache.version)
+        self.assertIsNone(self.cache.lookup("Was kosten Schrauben 4x50?", "de"))
+
+    def test_questions_about_earlier_turns_are_not_cached(self) -> None:
+        for text in ("Was kostet das?", "Haben wir davon noch welche?", "how much is it?"):
+            self.assertFalse(self.cache.store(text, "de", "5 Euro.", version=self.cache.version), text)
+            self.assertIsNone(self.cache.lookup(text, "de"), text)
+        self.assertTrue(self.cache.store("Was kostet das Klebeband?", "de", "5 Euro.", version=self.cache.version))
+        self.assertIsNone(self.cache.lookup("Haben wir Zement auf Baustelle Nord?", "de"))
+
+    def test_invalidation_and_version_race(self) -> None:
+        version = self.cache.version
+        self.cache.store("what does the Bohrhammer cost", "en", "250 euros.", version=version)
+        self.cache.note_change(mock.Mock(table="bestellungen"))
+        self.assertIsNotNone(self.cache.lookup("what does the Bohrhammer cost", "en"))
+        self.cache.note_change(mock.Mock(table="artikel"))
+        self.assertIsNone(self.cache.lookup("what does the Bohrhammer cost", "en"))
+        self.assertFalse(self.cache.store("what does the Bohrhammer cost", "en", "250 euros.", version=version))
+
+    def test_ttl_and_audio(self) -> None:
+        self.cache.store("Haben wir Kabelbinder?", "de", "Ja.", version=self.cache.version)
+        self.assertFalse(self.cache.attach_audio("Haben wir Kabelbinder?", "de", "Nein.", [b"x"]))
+        self.assertTrue(self.cache.attach_audio("Haben wir Kabelbinder?", "de", "Ja.", [b"a", b"b"]))
+        self.assertEqual(self.cache.lookup("haben wir kabelbinder", "de").audio, [b"a", b"b"])
+        self.now[0] = 61
+        self.assertIsNone(self.cache.lookup("Haben wir Kabelbinder?", "de"))
+        self.assertEqual(len(self.cache), 0)
+
+
+class TestClaudeServiceResponseCache(unittest.TestCase):
+    def setUp(self) -> None:
+        RESPONSE_CACHE.clear()
+        self.addCleanup(RESPONSE_CACHE.clear)
+        patcher = mock.patch.dict(os.environ, {"RESPONSE_CACHE_ENABLED": "1"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = []
+        self.tools = ["inventory_search"]
+
+        async def fake_agent(*, messages, tools, language, conversation_id, tool_names, **kwargs):
+            self.calls.append(conversation_id)
+            tool_names.extend(self.tools)
+            yield "Ja, "
+            yield "8 Stück."
+
+        patcher = mock.patch.object(claude_service, "stream_anthropic_response_with_history_and_tools", fake_agent)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _reply(self, text, conversation_id="conv-cache", history=()):
+        async def collect():
+            for role, content in (*history, ("user", text)):
+                await message_history_service.append_message(conversation_id=conversation_id, role=role, content=content)
+            try:
+                return [c async for c in claude_service.stream_claude_reply(user_text=text, conversation_id=conversation_id, language="de")]
+            finally:
+                await message_history_service.clear_history(conversation_id=conversation_id)
+
+        return "".join(asyncio.run(collect()))
+
+    def test_conversations_on_different_sites_do_not_share_replies(self) -> None:
+        nord = (("user", "Wir sind auf der Baustelle Nord."), ("assistant", "Alles klar, Baustelle Nord."))
+        sued = (("user", "Wir sind auf der Baustelle Süd."), ("assistant", "Alles klar, Baustelle Süd."))
+        self._reply("Haben wir Zement?", conversation_id="conv-nord", history=nord)
+        self._reply("Haben wir Zement?", conversation_id="conv-sued", history=sued)
+        self._reply("Haben wir Zement?", conversation_id="conv-fresh")
+        self.assertEqual(self.calls, ["conv-nord", "conv-sued", "conv-fresh"])
+
+        async def lookup():
+            await message_history_service.append_message(conversation_id="conv-late", role="user", content="Hallo")
+            await message_history_service.append_message(conversation_id="conv-late", role="assistant", content="Hallo!")
+            await message_history_service.append_message(conversation_id="conv-late", role="user", content="Haben wir Zement?")
+            try:
+                return await claude_service.lookup_cached_reply(user_text="Haben wir Zement?", conversation_id="conv-late", language="de")
+            finally:
+                await message_history_service.clear_history(conversation_id="conv-late")
+
+        self.assertIsNotNone(RESPONSE_CACHE.lookup("Haben wir Zement?", "de"))  # stored by the fresh conversation
+        self.assertIsNone(asyncio.run(lookup()))
+
+    def test_read_only_turn_is_answered_from_cache(self) -> None:
+        self.assertEqual(self._reply("Haben wir Sicherheitsbrillen?"), "Ja, 8 Stück.")
+        self.assertEqual(self._reply("haben wir sicherheitsbrille", conversation_id="other"), "Ja, 8 Stück.")
+        self.assertEqual(len(self.calls), 1)
+        invalidate_tables("inventory")
+        self._reply("Haben wir Sicherheitsbrillen?")
+        self.assertEqual(len(self.calls), 2)
+
+    def test_turns_with_side_effects_or_errors_are_not_cached(self) -> None:
+        for tools in (["draft_upsert_item"], ["inventory_search:error"], []):
+            self.tools = tools
+            self._reply("Haben wir Kabelbinder?")
+        self.assertEqual(len(self.calls), 3)
+
+    def test_turns_with_a_draft_are_not_cached(self) -> None:
+        ORDER_DRAFTS.upsert("conv-cache", artikel_name="Band", status="pending_clarification")
+        self.addCleanup(ORDER_DRAFTS.clear, "conv-cache")
+        self._reply("Haben wir Kabelbinder?")
+        self._reply("Haben wir Kabelbinder?", conversation_id="other")
+        self.assertEqual(len(self.calls), 2)
+
+    def test_disabled_by_default(self) -> None:
+        with mock.patch.dict(os.environ, {"RESPONSE_CACHE_ENABLED": ""}):
+            self._reply("Haben wir Kabelbinder?")
+            self._reply("Haben wir Kabelbinder?")
+        self.assertEqual(len(self.calls), 2)
+        self.assertIsNone(
+            asyncio.run(claude_service.lookup_cached_reply(user_text="Haben wir Kabelbinder?", conversation_id="c", language="de"))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
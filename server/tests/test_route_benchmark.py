@@ -0,0 +1,71 @@
+import sys
+import unittest
+from pathlib import Path
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+import httpx  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from benchmarks.route_benchmark import baseline_thresholds, check_thresholds, run_scenario  # noqa: E402
+from benchmarks.seed_large_dataset import DatasetSize, supplier_names  # noqa: E402
+
+
+async def _items(request):
+    return JSONResponse([{"id": i} for i in range(10)])
+
+
+async def _broken(request):
+    return JSONResponse({"detail": "boom"}, status_code=500)
+
+
+APP = Starlette(routes=[Route("/items", _items), Route("/broken", _broken)])
+
+
+class TestRunScenario(unittest.IsolatedAsyncioTestCase):
+    async def test_counts_every_request_and_status(self) -> None:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=APP), base_url="http://t") as client:
+            result = await run_scenario(client, "items", "/items", concurrency=3, requests=10, warmup=0)
+        summary = result.summary()
+        self.assertEqual(summary["requests"], 10)
+        self.assertEqual(summary["statuses"], {200: 10})
+        self.assertEqual(check_thresholds(summary, baseline_thresholds(summary, headroom=1.5)), [])
+
+    async def test_server_errors_break_error_budget(self) -> None:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=APP), base_url="http://t") as client:
+            result = await run_scenario(client, "broken", "/broken", concurrency=2, requests=4, warmup=0)
+        violations = check_thresholds(result.summary(), {"max_error_rate": 0.0})
+        self.assertEqual(len(violations), 1)
+        self.assertIn("error_rate", violations[0])
+
+
+class TestThresholds(unittest.TestCase):
+    def test_latency_and_throughput_limits(self) -> None:
+        summary = {
+            "rps": 4.0,
+            "error_rate": 0.0,
+            "latency_ms": {"p50": 10.0, "p95": 200.0, "p99": 300.0},
+        }
+        self.assertEqual(check_thresholds(summary, {"p95_ms": 250.0, "min_rps": 2.0}), [])
+        violations = check_thresholds(summary, {"p95_ms": 150.0, "min_rps": 5.0})
+        self.assertEqual(violations, ["p95 200.0ms > 150.0ms", "rps 4.00 < 5.00"])
+
+
+class TestDatasetSize(unittest.TestCase):
+    def test_defaults_match_target_volumes(self) -> None:
+        size = DatasetSize()
+        self.assertEqual((size.artikel, size.sites, size.positions), (100_000, 50, 1_000_000))
+
+    def test_scaled_keeps_one_product_per_supplier(self) -> None:
+        size = DatasetSize().scaled(0.0001)
+        self.assertGreaterEqual(size.artikel, size.suppliers)
+        self.assertEqual(len(supplier_names(size.suppliers)), size.suppliers)
+
+
+if __name__ == "__main__":
+    unittest.main()
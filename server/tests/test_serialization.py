@@ -0,0 +1,50 @@
+import json
+import sys
+import unittest
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from api.v1.serialization import FastJSONResponse, dumps  # noqa: E402
+from benchmarks.serialization_benchmark import artikel_rows, order_rows  # noqa: E402
+
+
+class TestDumps(unittest.TestCase):
+    def test_matches_fastapi_default_encoding(self) -> None:
+        payload = artikel_rows(50) + order_rows(20)
+        self.assertEqual(json.loads(dumps(payload)), jsonable_encoder(payload))
+
+    def test_decimal_date_and_datetime(self) -> None:
+        row = {
+            "preis_eur": Decimal("12.50"),
+            "menge": Decimal("3"),
+            "start_date": date(2026, 3, 1),
+            "created_at": datetime(2026, 3, 1, 9, 5, 7, 123456),
+            "genehmigt_am": datetime(2026, 3, 1, 9, 5, tzinfo=timezone.utc),
+        }
+        self.assertEqual(
+            json.loads(dumps(row)),
+            {
+                "preis_eur": 12.5,
+                "menge": 3,
+                "start_date": "2026-03-01",
+                "created_at": "2026-03-01T09:05:07.123456",
+                "genehmigt_am": "2026-03-01T09:05:00+00:00",
+            },
+        )
+
+    def test_response_class(self) -> None:
+        response = FastJSONResponse([{"preis": Decimal("0.99"), "name": "Schutzbrille"}])
+        self.assertEqual(response.media_type, "application/json")
+        self.assertEqual(response.body, '[{"preis":0.99,"name":"Schutzbrille"}]'.encode())
+
+
+if __name__ == "__main__":
+    unittest.main()
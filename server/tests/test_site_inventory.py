@@ -0,0 +1,103 @@
+import sys
+import unittest
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from api.v1.data_access import tools_runtime  # noqa: E402
+from api.v1.data_access.database import tools as db_tools  # noqa: E402
+from api.v1.data_access.records import InventoryItemRecord, SiteStockRecord  # noqa: E402
+from api.v1.routes import inventory_router  # noqa: E402
+
+_ROW = ("W-SICH-004", "Sicherheitsbrille", "PSA", "Würth", "tiefbau", 8, 3)
+
+
+class _Cursor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.sql, self.params = sql, params
+
+    def __iter__(self):
+        return iter([_ROW])
+
+
+class TestInventorySiteFilter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cur = _Cursor()
+
+        @contextmanager
+        def scoped_connection():
+            yield mock.Mock(cursor=lambda: self.cur)
+
+        patcher = mock.patch.object(db_tools, "scoped_connection", scoped_connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_site_id_filters_by_composite_key_column(self) -> None:
+        (item,) = tools_runtime.inventory_search(query_text="brille", site_id="3")
+        self.assertIsInstance(item, InventoryItemRecord)
+        self.assertEqual(item.construction_site_id, 3)
+        self.assertIn("AND construction_site_id = %s", self.cur.sql)
+        self.assertEqual(self.cur.params, [".*brille.*", 3])
+
+    def test_site_name_is_resolved_in_sql(self) -> None:
+        tools_runtime.inventory_search(query_text="brille", site_id=" tiefbau ")
+        self.assertIn("(SELECT id FROM construction_sites WHERE name = %s)", self.cur.sql)
+        self.assertEqual(self.cur.params[1], "tiefbau")
+
+    def test_no_site_searches_everywhere(self) -> None:
+        for site_id in (None, "", "  "):
+            tools_runtime.inventory_search(query_text="brille", site_id=site_id)
+            self.assertNotIn("construction_site_id =", self.cur.sql)
+            self.assertEqual(self.cur.params, [".*brille.*"])
+
+    def test_rejects_non_scalar_site(self) -> None:
+        with self.assertRaises(tools_runtime.ToolRuntimeError):
+            tools_runtime.inventory_search(query_text="brille", site_id=["3"])
+
+    def test_tool_dispatch_passes_site(self) -> None:
+        result = tools_runtime.execute_tool(name="inventory_search", tool_input={"query_text": "brille", "site_id": 3})
+        self.assertEqual(result[0]["construction_site"], "tiefbau")
+        self.assertEqual(self.cur.params[1], 3)
+
+
+class TestInventoryRoutes(unittest.TestCase):
+    def setUp(self) -> None:
+        app = FastAPI()
+        app.include_router(inventory_router, prefix="/api/v1")
+        self.client = TestClient(app)
+        patcher = mock.patch("api.v1.routes.conditional.get_table_versions", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_site_id_query_parameter(self) -> None:
+        with mock.patch("api.v1.routes.inventory.get_all_inventory", return_value=[InventoryItemRecord(*_ROW)]) as query:
+            response = self.client.get("/api/v1/inventory/", params={"site_id": 3})
+        query.assert_called_once_with(site_id=3)
+        self.assertEqual(response.json()[0]["construction_site_id"], 3)
+        self.assertEqual(self.client.get("/api/v1/inventory/", params={"site_id": "x"}).status_code, 422)
+
+    def test_per_site_aggregates(self) -> None:
+        stock = [SiteStockRecord(3, "tiefbau", 4, 75, 1)]
+        with mock.patch("api.v1.routes.inventory.get_site_stock", return_value=stock):
+            response = self.client.get("/api/v1/inventory/sites")
+        self.assertEqual(response.json(), [
+            {"construction_site_id": 3, "construction_site": "tiefbau", "artikel_count": 4, "total_quantity": 75, "out_of_stock_count": 1}
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
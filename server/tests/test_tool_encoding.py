@@ -0,0 +1,91 @@
+import json
+import sys
+import unittest
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from api.v1.data_access.records import ArtikelRecord, InventoryItemRecord  # noqa: E402
+from api.v1.data_access.tool_encoding import encode_tool_result  # noqa: E402
+from api.v1.data_access import tools_runtime  # noqa: E402
+from api.v1.data_access.tools_runtime import stringify_tool_result  # noqa: E402
+
+
+def _artikel(artikel_id, name, price):
+    return ArtikelRecord(artikel_id, name, "PSA", "Stück", Decimal(price), "Würth", "Verbrauch", False, "Regal 1")
+
+
+class TestStringifyToolResult(unittest.TestCase):
+    def test_rows_are_projected_per_tool(self) -> None:
+        text = stringify_tool_result(
+            [_artikel("W-1", "Schutzbrille", "4.99")],
+            tool_name="product_price_search",
+            tool_input={"query_text": "brille"},
+        )
+        table = json.loads(text)
+        self.assertEqual(table["columns"], ["artikel_id", "artikelname", "preis_eur", "einheit", "lieferant", "gefahrgut"])
+        self.assertEqual(table["rows"], [["W-1", "Schutzbrille", 4.99, "Stück", "Würth", False]])
+        self.assertNotIn("more", table)
+
+    def test_best_matches_rank_first_and_ties_keep_order(self) -> None:
+        rows = [
+            _artikel("W-1", "Schutzbrillenband", "1.00"),
+            _artikel("W-2", "Brille Schutz", "2.00"),
+            _artikel("W-3", "Schutzbrille", "3.00"),
+            _artikel("W-4", "Schutzbrille getönt", "2.50"),
+        ]
+        table = json.loads(stringify_tool_result(rows, tool_name="product_price_search", tool_input={"query_text": " schutzbrille "}))
+        self.assertEqual([r[0] for r in table["rows"]], ["W-3", "W-1", "W-4", "W-2"])
+
+    def test_regex_tools_rank_by_regex_words(self) -> None:
+        rows = [
+            InventoryItemRecord("A", "Arbeitshandschuh Leder", "PSA", "Würth", "Nord", 3, 1),
+            InventoryItemRecord("B", "Handschuh", "PSA", "Würth", "Nord", 0, 1),
+        ]
+        table = json.loads(
+            stringify_tool_result(rows, tool_name="get_inventory_items_by_name_regex", tool_input={"name_regex": ".*handschuh.*"})
+        )
+        self.assertEqual(table["columns"], ["artikel_id", "artikelname", "quantity", "construction_site"])
+        self.assertEqual([r[0] for r in table["rows"]], ["B", "A"])
+
+    def test_top_k_reports_more(self) -> None:
+        rows = [_artikel(f"W-{i}", f"Schraube {i}", "0.10") for i in range(40)]
+        table = json.loads(encode_tool_result(rows, top_k=5))
+        self.assertEqual(len(table["rows"]), 5)
+        self.assertEqual(table["more"], 35)
+
+    def test_size_cap_drops_whole_rows(self) -> None:
+        rows = [{"artikelname": "x" * 50} for _ in range(10)]
+        text = encode_tool_result(rows, top_k=0, max_chars=200)
+        table = json.loads(text)
+        self.assertLessEqual(len(text), 200)
+        self.assertEqual(len(table["rows"]) + table["more"], 10)
+
+    def test_scalars_and_strings(self) -> None:
+        self.assertEqual(json.loads(stringify_tool_result(["A", "B"])), {"items": ["A", "B"]})
+        self.assertEqual(stringify_tool_result("done"), "done")
+        self.assertEqual(json.loads(stringify_tool_result([])), {"items": []})
+
+    def test_encoder_failure_is_logged_and_stays_bounded(self) -> None:
+        rows = [_artikel(f"W-{i}", "Schutzbrille", "4.99") for i in range(200)]
+        with mock.patch.object(tools_runtime, "encode_tool_result", side_effect=ValueError("bug")), \
+                mock.patch.object(tools_runtime, "result_max_chars", return_value=500), \
+                self.assertLogs(tools_runtime.logger, "ERROR"):
+            text = stringify_tool_result(rows, tool_name="product_price_search")
+        self.assertEqual(len(text), 500)
+        self.assertTrue(text.startswith("[ArtikelRecord("))
+
+    def test_smaller_than_plain_json(self) -> None:
+        rows = [_artikel(f"W-{i}", f"Schutzbrille Modell {i}", "4.99") for i in range(15)]
+        compact = stringify_tool_result(rows, tool_name="product_price_search", tool_input={"query_text": "brille"})
+        plain = json.dumps([r.to_dict() for r in rows], ensure_ascii=False, default=str)
+        self.assertLess(len(compact), len(plain) / 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from api.v1.data_access import tools_runtime  # noqa: E402
+from api.v1.data_access.cache import TableChange, invalidate_tables  # noqa: E402
+from api.v1.data_access.tool_memo import MISS, TOOL_MEMO, ToolResultMemo  # noqa: E402
+
+
+class TestExecuteToolMemo(unittest.TestCase):
+    def setUp(self) -> None:
+        self.calls = []
+
+        def inventory_search(*, query_text, site_id=None):
+            self.calls.append((query_text, site_id))
+            return [{"artikelname": "Kabelbinder", "quantity": 10}]
+
+        patcher = mock.patch.dict(tools_runtime._TOOL_DISPATCH, {"inventory_search": inventory_search})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.db_versions = {"inventory": 1, "construction_sites": 1, "artikel": 1}
+        patcher = mock.patch.object(
+            TOOL_MEMO, "_db_versions", lambda tables: tuple(self.db_versions[t] for t in tables)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        TOOL_MEMO.forget()
+        self.addCleanup(TOOL_MEMO.forget)
+
+    def _run(self, query_text, conversation_id="c1", **extra):
+        return tools_runtime.execute_tool(
+            name="inventory_search",
+            tool_input={"query_text": query_text, **extra},
+            conversation_id=conversation_id,
+        )
+
+    def test_repeated_call_is_served_from_memo(self) -> None:
+        first = self._run("Kabelbinder")
+        second = self._run("Kabelbinder")
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_input_is_normalized(self) -> None:
+        self._run("Kabelbinder ")
+        self._run("  kabelbinder")
+        self.assertEqual(len(self.calls), 1)
+        self._run("kabelbinder", site_id="3")
+        self.assertEqual(len(self.calls), 2)
+
+    def test_table_change_invalidates(self) -> None:
+        self._run("Kabelbinder")
+        invalidate_tables("artikel")
+        self._run("Kabelbinder")
+        self.assertEqual(len(self.calls), 1)
+        invalidate_tables("inventory")
+        self._run("Kabelbinder")
+        self.assertEqual(len(self.calls), 2)
+
+    def test_writes_by_other_workers_invalidate(self) -> None:
+        # No change notification reaches this process; only table_versions moves.
+        self._run("Kabelbinder")
+        self.db_versions["artikel"] += 1
+        self._run("Kabelbinder")
+        self.assertEqual(len(self.calls), 1)
+        self.db_versions["inventory"] += 1
+        self._run("Kabelbinder")
+        self.assertEqual(len(self.calls), 2)
+
+    def test_conversations_are_isolated(self) -> None:
+        self._run("Kabelbinder", conversation_id="c1")
+        self._run("Kabelbinder", conversation_id="c2")
+        self._run("Kabelbinder", conversation_id=None)
+        self._run("Kabelbinder", conversation_id=None)
+        self.assertEqual(len(self.calls), 4)
+
+    def test_errors_are_not_memoized(self) -> None:
+        def failing(**_kwargs):
+            self.calls.append("fail")
+            raise RuntimeError("db down")
+
+        with mock.patch.dict(tools_runtime._TOOL_DISPATCH, {"inventory_search": failing}):
+            for _ in range(2):
+                with self.assertRaises(RuntimeError):
+                    self._run("Kabelbinder")
+        self.assertEqual(self.calls, ["fail", "fail"])
+
+    def test_returned_list_is_a_copy(self) -> None:
+        self._run("Kabelbinder").clear()
+        self.assertEqual(len(self._run("Kabelbinder")), 1)
+
+
+class TestToolResultMemo(unittest.TestCase):
+    def test_ttl_expiry(self) -> None:
+        now = [0.0]
+        memo = ToolResultMemo(ttl_s=10, clock=lambda: now[0], db_versions=lambda tables: None)
+        memo.put("c", "k", memo.stamp(("artikel",)), "v")
+        now[0] = 9.0
+        self.assertEqual(memo.get("c", "k", ("artikel",)), "v")
+        now[0] = 10.0
+        self.assertIs(memo.get("c", "k", ("artikel",)), MISS)
+
+    def test_live_change_listener_skips_table_versions(self) -> None:
+        live = [True]
+        reads = []
+        memo = ToolResultMemo(
+            ttl_s=60, db_versions=lambda tables: reads.append(tables) or (1,), changes_live=lambda: live[0]
+        )
+        memo.put("c", "k", memo.stamp(("artikel",)), "v")
+        self.assertEqual(memo.get("c", "k", ("artikel",)), "v")
+        self.assertEqual(reads, [])
+        memo.note_change(TableChange("artikel"))
+        self.assertIs(memo.get("c", "k", ("artikel",)), MISS)
+        # Listener down: stamps go back to table_versions.
+        live[0] = False
+        memo.put("c", "k", memo.stamp(("artikel",)), "v")
+        self.assertEqual(memo.get("c", "k", ("artikel",)), "v")
+        self.assertEqual(reads, [("artikel",), ("artikel",)])
+
+    def test_zero_ttl_disables(self) -> None:
+        memo = ToolResultMemo(ttl_s=0)
+        memo.put("c", "k", memo.stamp(()), "v")
+        self.assertEqual(len(memo), 0)
+
+    def test_bounds(self) -> None:
+        memo = ToolResultMemo(max_conversations=2, max_entries=2, ttl_s=60)
+        stamp = memo.stamp(())
+        for key in ("a", "b", "c"):
+            memo.put("c1", key, stamp, key)
+        self.assertIs(memo.get("c1", "a", ()), MISS)
+        self.assertEqual(memo.get("c1", "c", ()), "c")
+        memo.put("c2", "x", stamp, 1)
+        memo.put("c3", "x", stamp, 1)
+        self.assertIs(memo.get("c1", "c", ()), MISS)
+        self.assertEqual(len(memo), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from api.v1.observability import tracing  # noqa: E402
+
+
+class TestTracing(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.exporter = tracing.InMemorySpanExporter()
+        tracing.configure_tracing(self.exporter)
+
+    def tearDown(self) -> None:
+        tracing.configure_tracing()
+
+    async def test_spans_are_keyed_by_conversation_and_turn_across_threads(self) -> None:
+        def db_work() -> None:
+            with tracing.span("db.query", query="q"):
+                pass
+
+        with tracing.turn_context("conv-1", 3):
+            with tracing.span("anthropic.round", round=1):
+                await asyncio.to_thread(db_work)
+
+        spans = {s.name: s for s in self.exporter.get_finished_spans()}
+        self.assertEqual(set(spans), {"anthropic.round", "db.query"})
+        self.assertEqual(spans["db.query"].parent_span_id, spans["anthropic.round"].span_id)
+        self.assertEqual(spans["db.query"].trace_id, tracing.trace_id_for_turn("conv-1", 3))
+        for s in spans.values():
+            self.assertEqual(s.attributes[tracing.ATTR_CONVERSATION_ID], "conv-1")
+            self.assertEqual(s.attributes[tracing.ATTR_TURN_NUMBER], 3)
+
+    async def test_manual_span_parents_children_via_use_span(self) -> None:
+        with tracing.turn_context("conv-1", 1):
+            turn = tracing.start_span("ws.turn")
+        with tracing.use_span(turn):
+            with tracing.span("claude.reply"):
+                pass
+        turn.end()
+
+        child, parent = self.exporter.get_finished_spans()
+        self.assertEqual(child.parent_span_id, parent.span_id)
+        self.assertEqual(child.trace_id, parent.trace_id)
+
+    async def test_cancelled_span_is_marked_cancelled(self) -> None:
+        async def wait() -> None:
+            with tracing.span("ws.turn_idle_wait"):
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(wait())
+        await asyncio.sleep(0)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        (s,) = self.exporter.get_finished_spans()
+        self.assertEqual(s.status, "cancelled")
+
+    def test_disabled_tracing_is_noop(self) -> None:
+        tracing.configure_tracing()
+        with tracing.span("anything") as s:
+            s.set_attribute("k", "v")
+        self.assertIs(s, tracing.NOOP_SPAN)
+        self.assertIs(tracing.start_span("x"), tracing.NOOP_SPAN)
+        self.assertEqual(self.exporter.get_finished_spans(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import sys
+import threading
+import unittest
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from api.v1.data_access.cache import TableChange  # noqa: E402
+from api.v1.data_access.order_drafts import ORDER_DRAFTS, DraftError  # noqa: E402
+from api.v1.data_access.records import SiteArtikelRecord  # noqa: E402
+from api.v1.routes import voice_processing_router  # noqa: E402
+from api.v1.services import utterance_parser_service  # noqa: E402
+from api.v1.services.utterance_parser_service import CatalogMatcher, apply_fast_path, parse_order_utterance  # noqa: E402
+
+
+def _artikel(artikel_id, name, einheit, price):
+    return SiteArtikelRecord(artikel_id, name, "K", einheit, Decimal(price), "Würth", "Einweg", False, "Container A", 1, "tiefbau")
+
+
+_CATALOG = CatalogMatcher([
+    _artikel("W-KABE-008", "Kabelbinder", "Stk", "0.15"),
+    _artikel("H-KABE-017", "Kabelbinder", "Stk", "0.12"),
+    _artikel("W-EDEL-006", "Edelstahlband", "m", "4.50"),
+    _artikel("W-SICH-004", "Sicherheitsbrille", "Stk", "12.50"),
+    _artikel("W-ZEME-030", "Zement", "Sack", "8.00"),
+    _artikel("W-HAND-019", "Arbeitshandschuhe Gr.9", "Paar", "3.00"),
+    _artikel("W-HAND-020", "Arbeitshandschuhe Gr.10", "Paar", "3.00"),
+])
+
+
+def _parse(text):
+    return parse_order_utterance(text, matcher=_CATALOG)
+
+
+class TestQuantities(unittest.TestCase):
+    def test_number_words_and_digits(self) -> None:
+        cases = {
+            "zehn Kabelbinder": 10,
+            "fünfundzwanzig Kabelbinder": 25,
+            "zweihundert Kabelbinder": 200,
+            "twenty-five Kabelbinder": 25,
+            "twenty five Kabelbinder": 25,
+            "a dozen Kabelbinder": 12,
+            "ein Dutzend Kabelbinder": 12,
+            "Ich brauche bitte 40 Kabelbinder": 40,
+            "10stk Kabelbinder": 10,
+        }
+        for text, quantity in cases.items():
+            with self.subTest(text=text):
+                (line,) = _parse(text).lines
+                self.assertEqual(line.quantity, quantity)
+                self.assertEqual(line.confidence, 1.0)
+
+    def test_vague_or_fractional_amounts_are_not_confident(self) -> None:
+        for text in ("ein paar Kabelbinder", "some Kabelbinder", "2,5 m Edelstahlband", "Kabelbinder"):
+            with self.subTest(text=text):
+                self.assertLess(_parse(text).confidence, utterance_parser_service.FAST_PATH_MIN_CONFIDENCE)
+
+
+class TestCatalogMatching(unittest.TestCase):
+    def test_exact_name_picks_cheapest_supplier(self) -> None:
+        (line,) = _parse("zehn Kabelbinder").lines
+        self.assertEqual((line.artikel.artikel_id, line.unit), ("H-KABE-017", "Stk"))
+
+    def test_units_and_multiple_items(self) -> None:
+        lines = _parse("25 Meter Edelstahlband und zwei Säcke Zement, drei Sicherheitsbrillen").lines
+        self.assertEqual(
+            [(line.quantity, line.unit, line.artikel.artikel_id) for line in lines],
+            [(25, "m", "W-EDEL-006"), (2, "Sack", "W-ZEME-030"), (3, "Stk", "W-SICH-004")],
+        )
+        self.assertEqual([line.confidence for line in lines], [1.0, 1.0, 0.95])
+
+    def test_ambiguous_names_and_unit_mismatch(self) -> None:
+        (gloves,) = _parse("zwei Paar Arbeitshandschuhe").lines
+        self.assertIsNone(gloves.artikel)
+        self.assertEqual(gloves.candidates, ("Arbeitshandschuhe Gr.10", "Arbeitshandschuhe Gr.9"))
+        (wrong_unit,) = _parse("10 m Kabelbinder").lines
+        self.assertLess(wrong_unit.confidence, 0.95)
+        self.assertEqual(_parse("twenty-five cable ties").confidence, 0.0)
+
+
+class TestFastPath(unittest.TestCase):
+    def setUp(self) -> None:
+        patcher = mock.patch.object(utterance_parser_service, "get_catalog_matcher", return_value=_CATALOG)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.stock = {}
+        patcher = mock.patch.object(utterance_parser_service, "get_artikel_stock", side_effect=lambda ids, names: self.stock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(ORDER_DRAFTS.clear, "conv")
+
+    def test_confident_utterance_goes_to_the_draft(self) -> None:
+        reply = apply_fast_path(conversation_id="conv", text="zehn Kabelbinder", language="de")
+        self.assertEqual(reply, "10 Kabelbinder zum Entwurf hinzugefügt. Was noch?")
+        (line,) = ORDER_DRAFTS.lines("conv")
+        self.assertEqual((line.artikel_id, line.menge, line.status), ("H-KABE-017", 10, "confirmed"))
+
+    def test_anything_unclear_goes_to_the_model(self) -> None:
+        self.assertIsNone(apply_fast_path(conversation_id="conv", text="zehn Kabelbinder und ein paar Handschuhe"))
+        self.assertEqual(ORDER_DRAFTS.lines("conv"), [])
+
+    def test_items_already_in_the_draft_go_to_the_model(self) -> None:
+        apply_fast_path(conversation_id="conv", text="zehn Kabelbinder", language="de")
+        self.assertIsNone(apply_fast_path(conversation_id="conv", text="noch 5 Kabelbinder", language="de"))
+        (line,) = ORDER_DRAFTS.lines("conv")
+        self.assertEqual(line.menge, 10)
+
+    def test_items_in_stock_go_to_the_model(self) -> None:
+        self.stock = {"W-KABE-008": 40}
+        self.assertIsNone(apply_fast_path(conversation_id="conv", text="zehn Kabelbinder"))
+        self.assertEqual(ORDER_DRAFTS.lines("conv"), [])
+
+    def test_full_draft_goes_to_the_model_unchanged(self) -> None:
+        with mock.patch.object(ORDER_DRAFTS, "max_lines", 1):
+            self.assertIsNone(apply_fast_path(conversation_id="conv", text="zehn Kabelbinder und fünf Säcke Zement"))
+        self.assertEqual(ORDER_DRAFTS.lines("conv"), [])
+        with mock.patch.object(ORDER_DRAFTS, "upsert", side_effect=DraftError("full")):
+            self.assertIsNone(apply_fast_path(conversation_id="conv", text="zehn Kabelbinder"))
+
+    def test_turns_without_a_quantity_skip_the_catalog(self) -> None:
+        with mock.patch.object(utterance_parser_service, "get_catalog_matcher") as get_matcher:
+            for text in ("Was kostet der Bohrhammer?", "Kabelbinder und 5 Säcke Zement", "is it?", ""):
+                self.assertIsNone(apply_fast_path(conversation_id="conv", text=text))
+        get_matcher.assert_not_called()
+
+    def test_route_returns_order_items(self) -> None:
+        app = FastAPI()
+        app.include_router(voice_processing_router)
+        body = TestClient(app).post("/websocket/process-voice", json={"transcript": "Fünf Säcke Zement"}).json()
+        self.assertEqual(body["orderItem"], {"productId": "W-ZEME-030", "name": "Zement", "quantity": 5, "unit": "Sack"})
+        self.assertEqual(body["confidence"], 1.0)
+        self.assertIsNone(body["message"])
+
+
+class TestMatcherRefresh(unittest.TestCase):
+    def test_rebuilds_in_the_background_after_catalog_changes(self) -> None:
+        refresher = utterance_parser_service._MatcherRefresher()
+        rebuilt = threading.Event()
+        with mock.patch.object(utterance_parser_service, "get_catalog_matcher", side_effect=lambda: rebuilt.set()):
+            refresher.note_change(TableChange("artikel"))
+            self.assertFalse(rebuilt.wait(0.05))  # never built: nothing to refresh
+            refresher.warm = True
+            refresher.note_change(TableChange("inventory"))
+            self.assertFalse(rebuilt.wait(0.05))
+            refresher.note_change(TableChange("artikel"))
+            self.assertTrue(rebuilt.wait(5))
+
+
+if __name__ == "__main__":
+    unittest.main()
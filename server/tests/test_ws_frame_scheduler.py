@@ -0,0 +1,114 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+from api.v1.services.ws_frame_scheduler import OutboundFrameScheduler  # noqa: E402
+
+
+class _RecordingWebSocket:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.sent = []
+        self.delay = delay
+
+    async def send_json(self, payload) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(("json", payload))
+
+    async def send_bytes(self, data: bytes) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(("bytes", data))
+
+
+class TestOutboundFrameScheduler(unittest.IsolatedAsyncioTestCase):
+    async def test_tokens_are_coalesced_within_window(self) -> None:
+        ws = _RecordingWebSocket()
+        scheduler = OutboundFrameScheduler(ws, token_window_s=0.05, token_max_chars=1000)
+        scheduler.start()
+        for part in ("Ha", "llo", " Welt"):
+            scheduler.send_token(part)
+        await asyncio.sleep(0.1)
+        await scheduler.close()
+
+        self.assertEqual(ws.sent, [("json", {"type": "assistant_token", "text": "Hallo Welt"})])
+        self.assertEqual(scheduler.stats()["tokens_in"], 3)
+
+    async def test_control_frames_keep_order_with_tokens(self) -> None:
+        ws = _RecordingWebSocket()
+        scheduler = OutboundFrameScheduler(ws, token_window_s=10.0)
+        scheduler.start()
+        scheduler.send_json({"type": "assistant_start"})
+        scheduler.send_token("ok")
+        scheduler.send_json({"type": "assistant_done"})
+        await scheduler.close()
+
+        self.assertEqual(
+            [p["type"] for _, p in ws.sent],
+            ["assistant_start", "assistant_token", "assistant_done"],
+        )
+
+    async def test_audio_overtakes_tokens_but_not_earlier_control_frames(self) -> None:
+        ws = _RecordingWebSocket()
+        scheduler = OutboundFrameScheduler(ws, token_window_s=10.0)
+        scheduler.send_json({"type": "assistant_start"})
+        scheduler.send_token("text")
+        await scheduler.send_audio(b"\x01")
+        scheduler.send_json({"type": "assistant_done"})
+        scheduler.start()
+        await scheduler.close()
+
+        kinds = [p if kind == "bytes" else p["type"] for kind, p in ws.sent]
+        self.assertEqual(kinds, ["assistant_start", b"\x01", "assistant_token", "assistant_done"])
+
+    async def test_stale_token_frames_are_merged_for_slow_clients(self) -> None:
+        ws = _RecordingWebSocket(delay=0.05)
+        scheduler = OutboundFrameScheduler(ws, token_window_s=0.0, token_max_chars=1)
+        scheduler.start()
+        scheduler.send_json({"type": "assistant_start"})
+        for part in "abcdef":
+            scheduler.send_token(part)
+        await scheduler.close()
+
+        tokens = "".join(p["text"] for _, p in ws.sent if p["type"] == "assistant_token")
+        self.assertEqual(tokens, "abcdef")
+        self.assertLess(scheduler.stats()["token_frames_sent"], 6)
+        self.assertGreater(scheduler.stats()["token_merges"], 0)
+
+    async def test_audio_backlog_applies_backpressure(self) -> None:
+        ws = _RecordingWebSocket()
+        scheduler = OutboundFrameScheduler(ws, max_audio_chunks=2, max_merged_audio_bytes=1)
+        await scheduler.send_audio(b"a")
+        await scheduler.send_audio(b"b")
+
+        blocked = asyncio.ensure_future(scheduler.send_audio(b"c"))
+        await asyncio.sleep(0.01)
+        self.assertFalse(blocked.done())
+
+        scheduler.start()
+        await asyncio.wait_for(blocked, timeout=1.0)
+        await scheduler.close()
+        self.assertEqual([p for _, p in ws.sent], [b"a", b"b", b"c"])
+        self.assertEqual(scheduler.stats()["audio_backpressure_waits"], 1)
+
+    async def test_discard_pending_drops_tokens_and_audio(self) -> None:
+        ws = _RecordingWebSocket()
+        scheduler = OutboundFrameScheduler(ws)
+        scheduler.send_token("stale")
+        await scheduler.send_audio(b"stale")
+        scheduler.discard_pending()
+        scheduler.send_json({"type": "stream_cancelled", "reason": "interrupt"})
+        scheduler.start()
+        await scheduler.close()
+
+        self.assertEqual(ws.sent, [("json", {"type": "stream_cancelled", "reason": "interrupt"})])
+
+
+if __name__ == "__main__":
+    unittest.main()